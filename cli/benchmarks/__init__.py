@@ -0,0 +1 @@
+"""Benchmarks for the spatialpack validator and the demo pipelines."""
@@ -0,0 +1,122 @@
+"""
+Import-time regression check for the CLI.
+
+Runs ``python -X importtime -m spatialpack ...`` for ``--help``,
+``--version`` and every subcommand's ``--help``, and fails if one imports a
+module it should not (subcommands and their heavy dependencies are loaded
+lazily, see ``spatialpack.commands.LazyGroup``) or, with ``--budget-ms``, if
+its imports take longer than the budget.
+
+Import times are the best of ``--repeat`` runs, summed from the ``self``
+column, so they exclude interpreter startup before ``site``.
+
+Usage (from cli/):
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime --budget-ms 120 --repeat 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from spatialpack.commands import COMMANDS
+
+CLI_DIR = Path(__file__).parent.parent
+
+# Modules that must stay unimported unless a subcommand's own module needs them
+HEAVY = ("duckdb", "h3", "jsonschema", "referencing", "pyarrow", "numpy", "spatialpack.delta", "fastcdc")
+
+# Heavy modules a subcommand's module imports at the top, so its --help may load them
+OWN_IMPORTS = {
+    "delta": ("spatialpack.delta", "fastcdc"),
+    "apply-delta": ("spatialpack.delta", "fastcdc"),
+}
+
+# Further modules a subcommand's --help must not import
+EXTRA = {"validate": ("spatialpack.validators.manifest",)}
+
+# (arguments, modules that must not be imported)
+CHECKS = [
+    (["--help"], HEAVY + ("rich", "spatialpack.commands.validate", "spatialpack.validators")),
+    (["--version"], HEAVY + ("rich", "spatialpack.commands.validate", "spatialpack.validators")),
+] + [
+    (
+        [name, "--help"],
+        tuple(module for module in HEAVY if module not in OWN_IMPORTS.get(name, ())) + EXTRA.get(name, ()),
+    )
+    for name in sorted(COMMANDS)
+]
+
+
+def measure(args: list[str]) -> dict:
+    """Run ``spatialpack <args>`` under ``-X importtime``.
+
+    Returns:
+        dict with ``ms`` (summed self time), ``modules`` (name -> cumulative
+        microseconds), ``top_level`` (the same for imports not nested in
+        another) and ``returncode``.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(CLI_DIR), env.get("PYTHONPATH")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "spatialpack", *args],
+        cwd=CLI_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    modules = {}
+    top_level = {}
+    self_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, cumulative, raw_name = line[len("import time:"):].split("|")
+        name = raw_name.strip()
+        modules[name] = int(cumulative)
+        if raw_name[1:2] != " ":
+            top_level[name] = int(cumulative)
+        self_us += int(own)
+    return {"ms": self_us / 1000, "modules": modules, "top_level": top_level, "returncode": proc.returncode}
+
+
+def _forbidden(modules: dict, names: tuple[str, ...]) -> list[str]:
+    return sorted(n for n in names if any(m == n or m.startswith(n + ".") for m in modules))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check CLI import time and lazy loading")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per check; the fastest counts (default: 3)")
+    parser.add_argument("--budget-ms", type=float, help="Fail if a check's imports take longer than this")
+    parser.add_argument("--top", type=int, default=5, help="Slowest top-level imports to list (default: 5)")
+    args = parser.parse_args()
+
+    failures = 0
+    for argv, forbidden in CHECKS:
+        runs = [measure(argv) for _ in range(max(1, args.repeat))]
+        best = min(runs, key=lambda run: run["ms"])
+        label = "spatialpack " + " ".join(argv)
+        problems = []
+        if best["returncode"] != 0:
+            problems.append(f"exited with {best['returncode']}")
+        leaked = _forbidden(best["modules"], forbidden)
+        if leaked:
+            problems.append("imports " + ", ".join(leaked))
+        if args.budget_ms is not None and best["ms"] > args.budget_ms:
+            problems.append(f"over budget ({best['ms']:.1f} ms > {args.budget_ms:.1f} ms)")
+
+        status = "FAIL" if problems else "ok"
+        print(f"{status:4}  {label:32} {best['ms']:7.1f} ms  {len(best['modules'])} modules")
+        top = sorted(best["top_level"].items(), key=lambda item: item[1], reverse=True)[:args.top]
+        print("      slowest: " + ", ".join(f"{name} {us / 1000:.1f} ms" for name, us in top))
+        for problem in problems:
+            print(f"      {problem}")
+        failures += bool(problems)
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Throughput benchmark for ``spatialpack.policy.PolicyEngine``.
+
+Builds a synthetic policy and manifest (``--layers`` layers, one
+``layer_policies`` pattern per layer group, a mix of public, internal and
+restricted layers), compiles it, and times access checks over a fixed
+request mix: known tenants, tenants the policy does not name, anonymous
+requests and unknown layers.
+
+- ``compile``: ``PolicyEngine(policy, manifest)``
+- ``allowed``: the decision-table lookup used on the request path
+- ``decide``: the same decision with its reason, for audit tooling
+- ``uncompiled``: glob matching and rule evaluation on every request, as
+  a baseline for the table
+
+Usage (from cli/):
+    python -m benchmarks.policy
+    python -m benchmarks.policy --layers 2000 --requests 1000000 --min-rate 2000000
+"""
+
+import argparse
+import random
+import sys
+import time
+from typing import Callable, Optional
+
+from spatialpack.policy import ROLE_ORDER, PolicyEngine
+
+GROUPS = ("solar", "terrain", "hazard", "soils", "grid", "cadastre", "imagery", "water")
+VISIBILITY_CYCLE = ("public", "internal", "restricted")
+
+
+def synthetic_policy(layers: int, tenants: int) -> tuple[dict, dict]:
+    """``(policy, manifest)`` with ``layers`` layers spread over ``GROUPS``."""
+    tenant_ids = [f"t{i}" for i in range(tenants)]
+    manifest_layers = []
+    for i in range(layers):
+        classification = VISIBILITY_CYCLE[i % len(VISIBILITY_CYCLE)]
+        manifest_layers.append({
+            "id": f"{GROUPS[i % len(GROUPS)]}.layer_{i}",
+            "security": {
+                "classification": classification,
+                "visibility": [f"{tenant_ids[i % tenants]}:{ROLE_ORDER[i % 2]}"],
+            },
+        })
+    layer_policies = [
+        {"layer_pattern": f"{group}.*", "min_role": "analyst" if index % 4 == 3 else None}
+        for index, group in enumerate(GROUPS)
+    ]
+    policy = {
+        "policy_id": "bench",
+        "access": {"default_visibility": "internal", "authentication_required": False},
+        "layer_policies": layer_policies,
+    }
+    return policy, {"pack_id": "bench", "tenant": tenant_ids[0], "layers": manifest_layers}
+
+
+def request_mix(engine: PolicyEngine, count: int, tenants: int, seed: int = 0) -> list[tuple[Optional[str], str]]:
+    rng = random.Random(seed)
+    layer_ids = list(engine.layers)
+    principals = [None] + [f"t{i}:{role}" for i in range(tenants) for role in ROLE_ORDER]
+    # Tenants the policy does not name share one set of rows
+    principals += [f"guest{i}:viewer" for i in range(tenants)]
+    requests = []
+    for _ in range(count):
+        layer_id = rng.choice(layer_ids) if rng.random() < 0.99 else "missing.layer"
+        requests.append((rng.choice(principals), layer_id))
+    return requests
+
+
+def uncompiled_check(policy: dict, manifest: dict) -> Callable[[Optional[str], str], bool]:
+    """Per-request evaluation without the decision table."""
+    engine = PolicyEngine(policy, manifest)
+    layers = {layer["id"]: layer for layer in manifest["layers"]}
+    rules = engine._rules(policy)
+
+    def check(principal: Optional[str], layer_id: str) -> bool:
+        layer = layers.get(layer_id)
+        if layer is None:
+            return False
+        # Re-resolve the layer's pattern and allow list, then evaluate the rules
+        engine.layers[layer_id] = engine._layer_rule(layer, rules)
+        return engine._evaluate(principal, layer_id).allow
+
+    return check
+
+
+def rate(check: Callable, requests: list, repeat: int) -> float:
+    """Best checks per second over ``repeat`` passes."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for principal, layer_id in requests:
+            check(principal, layer_id)
+        best = min(best, time.perf_counter() - start)
+    return len(requests) / best
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--layers", type=int, default=500, help="Layers in the synthetic manifest")
+    parser.add_argument("--tenants", type=int, default=20, help="Tenants named by the manifest")
+    parser.add_argument("--requests", type=int, default=200_000, help="Checks per timed pass")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes; the best is reported")
+    parser.add_argument("--min-rate", type=float, help="Exit 1 if allowed() is slower than this many checks/s")
+    args = parser.parse_args(argv)
+
+    policy, manifest = synthetic_policy(args.layers, args.tenants)
+    start = time.perf_counter()
+    engine = PolicyEngine(policy, manifest)
+    compile_ms = (time.perf_counter() - start) * 1000
+    requests = request_mix(engine, args.requests, args.tenants)
+
+    summary = engine.summary()
+    print(
+        f"compile      {compile_ms:10.1f} ms   "
+        f"({summary['layers']} layers x {summary['principal_classes']} principal classes)"
+    )
+    allowed_rate = rate(engine.allowed, requests, args.repeat)
+    print(f"allowed      {allowed_rate / 1e6:10.2f} M checks/s")
+    print(f"decide       {rate(engine.decide, requests, args.repeat) / 1e6:10.2f} M checks/s")
+    # The baseline is far slower; a slice of the requests is enough
+    baseline = requests[:max(1, args.requests // 20)]
+    print(f"uncompiled   {rate(uncompiled_check(policy, manifest), baseline, 1) / 1e6:10.2f} M checks/s")
+
+    if args.min_rate is not None and allowed_rate < args.min_rate:
+        print(f"allowed() below --min-rate {args.min_rate:,.0f} checks/s", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
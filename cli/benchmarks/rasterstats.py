@@ -0,0 +1,142 @@
+"""
+Throughput benchmark for ``spatialpack.rasterstats.compute_raster_stats``.
+
+Writes a synthetic tiled, Deflate-compressed GeoTIFF (``--size`` pixels
+square, ``--dtype`` int16 or float32, a nodata border around a smooth DEM
+like surface) with its IFD ahead of the tile data, as in a COG. It then
+times, in megapixels per second:
+
+- ``stats``: min/max/mean in one process, and with ``--jobs`` workers
+- ``distribution``: the same plus a 64-bin histogram and percentiles
+
+The engine (``numpy`` or ``python``) depends on whether NumPy is installed.
+
+Usage (from cli/):
+    python -m benchmarks.rasterstats
+    python -m benchmarks.rasterstats --size 8192 --dtype float32 --jobs 8 --min-rate 20
+"""
+
+import argparse
+import math
+import os
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from array import array
+from pathlib import Path
+from typing import Optional
+
+from spatialpack.rasterstats import compute_raster_stats
+
+NODATA = -9999
+
+
+def _tile_values(x0: int, y0: int, tile: int, size: int, typecode: str) -> array:
+    """One tile of a smooth surface with a nodata border (and padding past the edge)."""
+    border = size // 16
+    values = array(typecode)
+    for y in range(y0, y0 + tile):
+        row_wave = math.sin(y / 97.0)
+        if y >= size or y < border or y >= size - border:
+            values.extend([NODATA] * tile)
+            continue
+        values.extend(
+            NODATA if x >= size or x < border or x >= size - border
+            else (300 + 250 * math.sin(x / 131.0) * row_wave + (x * 7 + y * 13) % 41)
+            if typecode == "f" else
+            int(300 + 250 * math.sin(x / 131.0) * row_wave + (x * 7 + y * 13) % 41)
+            for x in range(x0, x0 + tile)
+        )
+    return values
+
+
+def write_geotiff(path: Path, size: int, tile: int = 512, typecode: str = "h") -> None:
+    """Tiled little-endian GeoTIFF, IFD first, Deflate, GDAL_NODATA set."""
+    across = -(-size // tile)
+    tiles = [
+        zlib.compress(_tile_values(col * tile, row * tile, tile, size, typecode).tobytes(), 6)
+        for row in range(across) for col in range(across)
+    ]
+    nodata = f"{NODATA}\0".encode()
+    bits, sample_format = (32, 3) if typecode == "f" else (16, 2)
+    # (tag, type, count, inline value or external bytes)
+    count = len(tiles)
+    entries = [
+        (256, 4, 1, size), (257, 4, 1, size), (258, 3, 1, bits), (259, 3, 1, 8), (262, 3, 1, 1),
+        (277, 3, 1, 1), (322, 3, 1, tile), (323, 3, 1, tile), (324, 4, count, None), (325, 4, count, None),
+        (339, 3, 1, sample_format), (42113, 2, len(nodata), nodata),
+    ]
+    ifd_size = 2 + 12 * len(entries) + 4
+    external_start = 8 + ifd_size
+    data_start = external_start + 8 * count + len(nodata)
+    offsets, position = [], data_start
+    for data in tiles:
+        offsets.append(position)
+        position += len(data)
+    externals = {
+        324: struct.pack(f"<{count}I", *offsets),
+        325: struct.pack(f"<{count}I", *(len(data) for data in tiles)),
+        42113: nodata,
+    }
+
+    ifd, external = bytearray(struct.pack("<H", len(entries))), bytearray()
+    for tag, field_type, n, value in entries:
+        if tag in externals and len(externals[tag]) > 4:
+            ifd += struct.pack("<HHII", tag, field_type, n, external_start + len(external))
+            external += externals[tag]
+        elif tag in externals:
+            ifd += struct.pack("<HHI", tag, field_type, n) + externals[tag].ljust(4, b"\0")
+        else:
+            code = "H" if field_type == 3 else "I"
+            ifd += struct.pack("<HHI", tag, field_type, n) + struct.pack("<" + code, value).ljust(4, b"\0")
+    ifd += b"\0\0\0\0"
+    with open(path, "wb") as out:
+        out.write(b"II" + struct.pack("<HI", 42, 8))
+        out.write(ifd)
+        out.write(external)
+        for data in tiles:
+            out.write(data)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=2048, help="Raster width and height in pixels")
+    parser.add_argument("--tile", type=int, default=512, help="Tile width and height")
+    parser.add_argument("--dtype", choices=("int16", "float32"), default="int16", help="Pixel type")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Workers for the parallel runs")
+    parser.add_argument("--min-rate", type=float, help="Exit 1 if any run is slower than this many Mpx/s")
+    args = parser.parse_args(argv)
+
+    rates = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "dem.tif"
+        start = time.perf_counter()
+        write_geotiff(path, args.size, args.tile, "f" if args.dtype == "float32" else "h")
+        print(
+            f"wrote {args.size}x{args.size} {args.dtype} ({path.stat().st_size / 1e6:.1f} MB) "
+            f"in {time.perf_counter() - start:.1f} s"
+        )
+        megapixels = args.size * args.size / 1e6
+        for label, options in (
+            ("stats", {}),
+            ("distribution", {"histogram_bins": 64, "percentiles": (2, 50, 98)}),
+        ):
+            for jobs in sorted({1, args.jobs}):
+                result = compute_raster_stats(path, jobs=jobs, **options)
+                rate = megapixels / (result["elapsed_ms"] / 1000)
+                rates[f"{label} x{jobs}"] = rate
+                print(
+                    f"{label:<13} {jobs:>2} worker(s)  {rate:8.1f} Mpx/s  "
+                    f"({result['engine']}, {result['passes']} pass(es), mean {result['mean']:.2f})"
+                )
+
+    if args.min_rate is not None and min(rates.values()) < args.min_rate:
+        print(f"compute_raster_stats() below --min-rate {args.min_rate:g} Mpx/s", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
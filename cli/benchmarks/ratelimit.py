@@ -0,0 +1,90 @@
+"""
+Throughput benchmark for ``spatialpack.ratelimit.RateLimiter``.
+
+Times ``acquire`` for a tile-serving request mix (``--tenants`` tenants over
+``--packs`` packs, each limited like the sample policy) from one thread and
+from ``--threads`` threads sharing the limiter, with the ledger flushing in
+the background. Then times one ledger flush of a pending counter for
+every (tenant, pack) key.
+
+Usage (from cli/):
+    python -m benchmarks.ratelimit
+    python -m benchmarks.ratelimit --tenants 5000 --threads 8 --min-rate 50000
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from spatialpack.ratelimit import RateLimiter, RateLimits
+
+
+def run(limiter: RateLimiter, requests: list[tuple[str, str, int]], threads: int) -> float:
+    """Checks per second with ``requests`` split across ``threads`` threads."""
+    chunks = [requests[i::threads] for i in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+
+    def work(chunk: list[tuple[str, str, int]]) -> None:
+        acquire = limiter.acquire
+        barrier.wait()
+        for tenant, pack_id, nbytes in chunk:
+            acquire(tenant, pack_id, nbytes)
+
+    workers = [threading.Thread(target=work, args=(chunk,)) for chunk in chunks]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return len(requests) / (time.perf_counter() - start)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tenants", type=int, default=1000, help="Distinct tenants")
+    parser.add_argument("--packs", type=int, default=10, help="Distinct pack ids")
+    parser.add_argument("--requests", type=int, default=500_000, help="Checks per timed run")
+    parser.add_argument("--threads", type=int, default=4, help="Threads for the concurrent run")
+    parser.add_argument("--shards", type=int, default=16, help="Limiter lock shards")
+    parser.add_argument("--min-rate", type=float, help="Exit 1 if either run is slower than this many checks/s")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    packs = [f"bench:pack:{i}" for i in range(args.packs)]
+    requests = [
+        (f"tenant{rng.randrange(args.tenants)}", rng.choice(packs), rng.randrange(200, 60_000))
+        for _ in range(args.requests)
+    ]
+
+    rates = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, threads in (("1 thread", 1), (f"{args.threads} threads", args.threads)):
+            with RateLimiter(Path(tmp) / f"usage-{threads}.sqlite", shards=args.shards) as limiter:
+                for pack_id in packs:
+                    limiter.set_limits(pack_id, RateLimits(requests_per_minute=600, bytes_per_day=10**9))
+                limiter.start(interval=0.5)
+                rates[label] = run(limiter, requests, threads)
+            print(f"acquire ({label:>10})  {rates[label] / 1e3:10.1f} k checks/s")
+
+        # One batch holding a pending counter for every (tenant, pack) key
+        with RateLimiter(Path(tmp) / "usage-flush.sqlite", shards=args.shards) as limiter:
+            for tenant, pack_id, nbytes in requests:
+                limiter.record(tenant, pack_id, nbytes)
+            start = time.perf_counter()
+            rows = limiter.flush()
+            print(f"flush                 {(time.perf_counter() - start) * 1000:10.1f} ms for {rows} rows")
+
+    if args.min_rate is not None and min(rates.values()) < args.min_rate:
+        print(f"acquire() below --min-rate {args.min_rate:,.0f} checks/s", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
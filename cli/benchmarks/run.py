@@ -0,0 +1,317 @@
+"""
+Benchmark harness for the validator and the demo pipelines.
+
+For each scale tier a synthetic pack (see ``benchmarks.synthetic``) and a
+synthetic assets CSV are generated, then these cases are timed:
+
+- ``validate``: ``ManifestValidator.validate`` (no cache)
+- ``validate_deep``: the same with ``deep=True`` (Parquet footers)
+- ``verify_hashes``: ``verify_assets`` over every layer, no digest cache
+- ``verify_hashes_cached``: ``verify_assets`` with a primed digest cache
+- ``ingest``: ``load-assets.py --streaming`` into a scratch database
+- ``export``: ``export-geojson.py`` streaming and verification of that database
+
+Results are written as JSON with the git commit, so runs on different
+commits can be compared with ``--compare``.
+
+Usage (from cli/):
+    python -m benchmarks.run
+    python -m benchmarks.run --tier large --repeat 5
+    python -m benchmarks.run --compare benchmarks/results/<baseline>.json
+"""
+
+import argparse
+import importlib.util
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import duckdb
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.synthetic import generate_pack, write_assets_csv
+from spatialpack import __version__
+from spatialpack.integrity import HashCache, verify_assets
+from spatialpack.validators.manifest import ManifestValidator
+
+console = Console()
+
+BENCH_DIR = Path(__file__).parent
+DEFAULT_WORKDIR = Path(".spatialpack") / "bench"
+DEFAULT_RESULTS_DIR = BENCH_DIR / "results"
+DEFAULT_DEMO_DIR = BENCH_DIR.parent.parent / "demo" / "demo-offline-gis"
+
+# Pack and CSV sizes per tier; rows are per layer and for the assets CSV
+TIERS = {
+    "small": {"layers": 2, "rows": 10_000, "extra_layers": 10},
+    "medium": {"layers": 8, "rows": 250_000, "extra_layers": 500},
+    "large": {"layers": 16, "rows": 1_000_000, "extra_layers": 5_000},
+}
+
+CASES = ["validate", "validate_deep", "verify_hashes", "verify_hashes_cached", "ingest", "export"]
+
+# Median slowdown reported as a regression by --compare
+DEFAULT_THRESHOLD = 0.10
+
+
+class BenchmarkError(RuntimeError):
+    """Raised when a case cannot run (e.g. a demo script exits with an error)."""
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=BENCH_DIR,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True, text=True, check=True, cwd=BENCH_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("-dirty" if dirty else "")
+
+
+def _load_script(path: Path, name: str) -> Any:
+    """Import a demo script (hyphenated file name) as a module."""
+    if not path.exists():
+        raise BenchmarkError(f"Demo script not found: {path}")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _time_case(fn: Callable[[], Optional[dict]], repeat: int, warmup: int) -> dict:
+    """Run ``fn`` ``warmup`` times untimed, then ``repeat`` times timed."""
+    for _ in range(warmup):
+        fn()
+    runs, metrics = [], None
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        metrics = fn()
+        runs.append((time.perf_counter_ns() - start) / 1e6)
+    result = {
+        "runs_ms": [round(ms, 3) for ms in runs],
+        "min_ms": round(min(runs), 3),
+        "median_ms": round(statistics.median(runs), 3),
+    }
+    if metrics:
+        result.update(metrics)
+    return result
+
+
+def _run_demo_ingest(load_assets: Any, csv_path: Path, db_path: Path) -> None:
+    """Run load-assets.py --streaming against a scratch database."""
+    load_assets.DB_FILE = db_path
+    output = io.StringIO()
+    try:
+        with redirect_stdout(output):
+            load_assets.main_streaming(csv_path)
+    except SystemExit as e:
+        errors = [line.strip() for line in output.getvalue().splitlines() if "[ERROR]" in line]
+        raise BenchmarkError(errors[0] if errors else f"load-assets.py exited with {e.code}") from None
+
+
+def _run_demo_export(export_geojson: Any, db_path: Path, output: Path) -> int:
+    """Stream and verify a FeatureCollection the way export-geojson.py does."""
+    con = duckdb.connect(str(db_path), read_only=True)
+    try:
+        con.execute("LOAD spatial")
+        count = export_geojson.write_features(con, output, "geojson")
+    finally:
+        con.close()
+    export_geojson.verify_output(output, "geojson", count)
+    return count
+
+
+def run_tier(name: str, params: dict, workdir: Path, demo_dir: Path, repeat: int, warmup: int,
+             cases: list[str]) -> dict:
+    """Generate inputs for one tier and time the selected cases."""
+    tier_dir = workdir / name
+    pack = tier_dir / "pack"
+    console.print(f"[bold]{name}[/bold]: {params['layers']} layers x {params['rows']:,} rows, "
+                  f"{params['extra_layers']:,} extra manifest layers")
+
+    generate_start = time.perf_counter()
+    pack_info = generate_pack(pack, **params)
+    csv_path = tier_dir / "assets.csv"
+    if "ingest" in cases or "export" in cases:
+        if not csv_path.exists() or not pack_info["reused"]:
+            write_assets_csv(csv_path, params["rows"])
+    console.print(f"[dim]  inputs {'reused' if pack_info['reused'] else 'generated'} "
+                  f"in {time.perf_counter() - generate_start:.1f} s[/dim]")
+
+    manifest = json.loads((pack / "spatialpack.json").read_text(encoding="utf-8"))
+    asset_hashes = manifest.get("integrity", {}).get("asset_hashes", {})
+    hashed_bytes = sum((pack / asset).stat().st_size for asset in asset_hashes)
+    hash_cache_path = tier_dir / "hashes.json"
+    db_path = tier_dir / "demo.duckdb"
+    geojson_path = tier_dir / "assets.geojson"
+
+    def validate(deep: bool) -> dict:
+        result = ManifestValidator(pack, deep=deep).validate()
+        return {"errors": len(result["errors"]), "warnings": len(result["warnings"])}
+
+    def hashes(cached: bool) -> dict:
+        cache = HashCache(hash_cache_path) if cached else None
+        results = verify_assets(pack, asset_hashes, cache)
+        bad = sum(1 for r in results.values() if r["status"] != "ok")
+        if bad:
+            raise BenchmarkError(f"{bad} assets failed verification")
+        return {"files": len(results), "bytes": hashed_bytes}
+
+    def prime_hash_cache() -> None:
+        hash_cache_path.unlink(missing_ok=True)
+        cache = HashCache(hash_cache_path)
+        verify_assets(pack, asset_hashes, cache)
+        cache.save()
+
+    def ingest() -> dict:
+        _run_demo_ingest(load_assets, csv_path, db_path)
+        return {"rows": params["rows"], "csv_bytes": csv_path.stat().st_size}
+
+    def export() -> dict:
+        if not db_path.exists():
+            raise BenchmarkError("no database from the ingest case")
+        count = _run_demo_export(export_geojson, db_path, geojson_path)
+        return {"rows": count, "bytes": geojson_path.stat().st_size}
+
+    scripts = demo_dir / "scripts"
+    load_assets = export_geojson = None
+    runners = {
+        "validate": lambda: validate(False),
+        "validate_deep": lambda: validate(True),
+        "verify_hashes": lambda: hashes(False),
+        "verify_hashes_cached": lambda: hashes(True),
+        "ingest": ingest,
+        "export": export,
+    }
+
+    results: dict[str, dict] = {}
+    for case in cases:
+        try:
+            if case == "verify_hashes_cached":
+                prime_hash_cache()
+            if case == "ingest" and load_assets is None:
+                load_assets = _load_script(scripts / "load-assets.py", "load_assets")
+                db_path.unlink(missing_ok=True)
+            if case == "export" and export_geojson is None:
+                export_geojson = _load_script(scripts / "export-geojson.py", "export_geojson")
+            results[case] = _time_case(runners[case], repeat, warmup)
+        except (BenchmarkError, duckdb.Error, OSError, AssertionError) as e:
+            results[case] = {"error": str(e) or type(e).__name__}
+            console.print(f"  [yellow]{case}: {results[case]['error']}[/yellow]")
+            continue
+        console.print(f"  {case}: median {results[case]['median_ms']:.1f} ms")
+
+    return {
+        "params": params,
+        "pack": {"manifest_bytes": pack_info["manifest_bytes"], "layer_bytes": pack_info["layer_bytes"]},
+        "cases": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> int:
+    """Print median ratios against a baseline; returns the regression count."""
+    table = Table(
+        title=f"{current['meta'].get('commit')} vs {baseline['meta'].get('commit')}",
+        show_header=True,
+        header_style="bold",
+    )
+    for column in ("Tier", "Case", "Baseline", "Current", "Change"):
+        table.add_column(column, justify="left" if column in ("Tier", "Case") else "right")
+
+    regressions = 0
+    for tier, tier_result in current["tiers"].items():
+        base_tier = baseline.get("tiers", {}).get(tier)
+        if base_tier is None or base_tier.get("params") != tier_result["params"]:
+            continue
+        for case, result in tier_result["cases"].items():
+            base = base_tier["cases"].get(case, {})
+            if "median_ms" not in result or "median_ms" not in base:
+                continue
+            change = result["median_ms"] / base["median_ms"] - 1 if base["median_ms"] else 0.0
+            style = "red" if change > threshold else "green" if change < -threshold else ""
+            regressions += change > threshold
+            table.add_row(
+                tier,
+                case,
+                f"{base['median_ms']:.1f} ms",
+                f"{result['median_ms']:.1f} ms",
+                f"[{style}]{change:+.1%}[/{style}]" if style else f"{change:+.1%}",
+            )
+    console.print(table)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the validator and demo pipelines")
+    parser.add_argument("--tier", action="append", choices=sorted(TIERS),
+                        help="Scale tier to run (repeatable; default: small and medium)")
+    parser.add_argument("--case", action="append", choices=CASES, help="Only run these cases (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case (default: 3)")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per case (default: 1)")
+    parser.add_argument("--workdir", type=Path, default=DEFAULT_WORKDIR,
+                        help="Where generated packs are kept between runs (default: .spatialpack/bench)")
+    parser.add_argument("--demo-dir", type=Path, default=DEFAULT_DEMO_DIR,
+                        help="demo-offline-gis directory with the ingest/export scripts")
+    parser.add_argument("--output", type=Path,
+                        help="Results file (default: benchmarks/results/<timestamp>-<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="Baseline results file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Median slowdown counted as a regression (default: 0.10)")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Exit 1 if --compare finds a regression")
+    args = parser.parse_args()
+    if args.repeat < 1 or args.warmup < 0:
+        parser.error("--repeat must be >= 1 and --warmup >= 0")
+
+    tiers = args.tier or ["small", "medium"]
+    cases = [case for case in CASES if not args.case or case in args.case]
+    started = datetime.now(timezone.utc)
+    commit = _git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "started_at": started.isoformat().replace("+00:00", "Z"),
+            "spatialpack": __version__,
+            "python": platform.python_version(),
+            "duckdb": duckdb.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+        },
+        "tiers": {},
+    }
+    for tier in tiers:
+        report["tiers"][tier] = run_tier(
+            tier, TIERS[tier], args.workdir, args.demo_dir, args.repeat, args.warmup, cases
+        )
+
+    output = args.output or DEFAULT_RESULTS_DIR / f"{started:%Y%m%dT%H%M%SZ}-{commit or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    console.print(f"\n[dim]Results written to: {output}[/dim]")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Synthetic Spatial Pack generator for benchmarks.
+
+Builds a pack with ``layers`` GeoParquet point layers of ``rows`` rows each
+(WKB geometry plus a GeoParquet 1.1 ``bbox`` covering column), a manifest
+padded with ``extra_layers`` remote layer entries, and an optional
+``integrity.asset_hashes`` block. Output is deterministic for a given seed.
+
+A ``bench-params.json`` beside the manifest records the parameters; calling
+``generate_pack`` again with the same parameters reuses the pack.
+
+Usage:
+    python -m benchmarks.synthetic ./bench-pack --layers 4 --rows 100000
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import struct
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Optional
+
+import duckdb
+
+PARAMS_FILE = "bench-params.json"
+
+# Western Australia, matching the example packs
+BBOX = [112.9, -35.2, 129.0, -13.7]
+
+CATEGORIES = ["substation", "depot", "yard", "tower", "switchyard"]
+
+# Values accepted by demo/demo-offline-gis/scripts/load-assets.py
+ASSET_TYPES = ["Substation", "Depot", "Yard", "Tower", "Switchyard"]
+ASSET_STATUSES = ["OK", "Watch", "Alert", "Critical"]
+REGIONS = ["Perth", "Peel", "South West", "Goldfields-Esperance", "Pilbara", "Kimberley"]
+
+# Rows per Parquet row group
+ROW_GROUP_ROWS = 65536
+
+
+def _points(rng: random.Random, count: int):
+    for _ in range(count):
+        yield rng.uniform(BBOX[0], BBOX[2]), rng.uniform(BBOX[1], BBOX[3])
+
+
+def _write_layer_csv(path: Path, rows: int, rng: random.Random) -> None:
+    """Rows with hex WKB points, for DuckDB to convert to Parquet."""
+    with open(path, "w", encoding="ascii", newline="\n") as f:
+        f.write("id,category,value,x,y,wkb\n")
+        for i, (x, y) in enumerate(_points(rng, rows)):
+            wkb = struct.pack("<BIdd", 1, 1, x, y).hex()
+            f.write(f"{i},{CATEGORIES[i % len(CATEGORIES)]},{rng.random() * 1000:.3f},{x!r},{y!r},{wkb}\n")
+
+
+def _geo_metadata() -> str:
+    return json.dumps({
+        "version": "1.1.0",
+        "primary_column": "geometry",
+        "columns": {
+            "geometry": {
+                "encoding": "WKB",
+                "geometry_types": ["Point"],
+                "bbox": BBOX,
+                "covering": {
+                    "bbox": {
+                        "xmin": ["bbox", "xmin"],
+                        "ymin": ["bbox", "ymin"],
+                        "xmax": ["bbox", "xmax"],
+                        "ymax": ["bbox", "ymax"],
+                    }
+                },
+            }
+        },
+    })
+
+
+def _write_layer(con: duckdb.DuckDBPyConnection, path: Path, rows: int, rng: random.Random) -> None:
+    csv_path = path.with_suffix(".csv")
+    _write_layer_csv(csv_path, rows, rng)
+    source = str(csv_path).replace("'", "''")
+    target = str(path).replace("'", "''")
+    geo = _geo_metadata().replace("'", "''")
+    try:
+        con.execute(f"""
+            COPY (
+                SELECT id, category, value,
+                       {{'xmin': x, 'ymin': y, 'xmax': x, 'ymax': y}} AS bbox,
+                       from_hex(wkb) AS geometry
+                FROM read_csv('{source}', header = true,
+                              columns = {{'id': 'INTEGER', 'category': 'VARCHAR', 'value': 'DOUBLE',
+                                          'x': 'DOUBLE', 'y': 'DOUBLE', 'wkb': 'VARCHAR'}})
+            ) TO '{target}' (FORMAT parquet, ROW_GROUP_SIZE {ROW_GROUP_ROWS}, KV_METADATA {{geo: '{geo}'}})
+        """)
+    finally:
+        csv_path.unlink()
+
+
+def write_assets_csv(path: Path, rows: int, seed: int = 0) -> Path:
+    """Write an assets.csv in the demo's load-assets.py format."""
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write("id,name,type,status,lat,lon,description,last_inspection,capacity,region\n")
+        for i, (lon, lat) in enumerate(_points(rng, rows), start=1):
+            asset_type = ASSET_TYPES[i % len(ASSET_TYPES)]
+            f.write(
+                f"{i},{asset_type} {i},{asset_type},{ASSET_STATUSES[rng.randrange(len(ASSET_STATUSES))]},"
+                f"{lat:.6f},{lon:.6f},Synthetic {asset_type.lower()},"
+                f"{start + timedelta(days=i % 365)},{rng.randrange(10, 500)} units,"
+                f"{REGIONS[i % len(REGIONS)]}\n"
+            )
+    return path
+
+
+def _sha256(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(8 * 1024 * 1024):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def generate_pack(
+    output: Path,
+    layers: int = 2,
+    rows: int = 10_000,
+    extra_layers: int = 0,
+    integrity: bool = True,
+    seed: int = 0,
+    con: Optional[duckdb.DuckDBPyConnection] = None,
+) -> dict:
+    """Create (or reuse) a synthetic pack at ``output``.
+
+    Args:
+        output: Pack directory
+        layers: GeoParquet layers to write
+        rows: Rows per layer
+        extra_layers: Remote layer entries added to pad the manifest
+        integrity: Write integrity.asset_hashes for the layer files
+        seed: Random seed
+
+    Returns:
+        The parameters plus ``manifest_bytes``, ``layer_bytes`` and
+        ``reused`` (True if an identical pack already existed).
+    """
+    output = Path(output)
+    params = {
+        "layers": layers,
+        "rows": rows,
+        "extra_layers": extra_layers,
+        "integrity": integrity,
+        "seed": seed,
+    }
+    params_path = output / PARAMS_FILE
+    manifest_path = output / "spatialpack.json"
+    try:
+        existing = json.loads(params_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        existing = None
+    if existing is not None and existing.get("params") == params and manifest_path.exists():
+        return {**existing, "reused": True}
+
+    (output / "layers").mkdir(parents=True, exist_ok=True)
+    (output / "metadata").mkdir(exist_ok=True)
+    for stale in (output / "layers").glob("layer_*.parquet"):
+        stale.unlink()
+    con = con or duckdb.connect()
+
+    manifest_layers = []
+    asset_hashes = {}
+    layer_bytes = 0
+    for i in range(layers):
+        rel = f"layers/layer_{i:03d}.parquet"
+        path = output / rel
+        _write_layer(con, path, rows, random.Random(seed * 1_000_003 + i))
+        layer_bytes += path.stat().st_size
+        if integrity:
+            asset_hashes[rel] = f"sha256:{_sha256(path)}"
+        manifest_layers.append({
+            "id": f"bench.layer_{i:03d}",
+            "type": "vector",
+            "schema": "sp.bench.points.v1",
+            "title": f"Synthetic layer {i}",
+            "parquet": f"./{rel}",
+            "geometry_type": "Point",
+            "stats": {
+                "features": rows,
+                "attribute_completeness": {"id": 1.0, "category": 1.0, "value": 1.0},
+            },
+        })
+    for i in range(extra_layers):
+        manifest_layers.append({
+            "id": f"bench.remote_{i:05d}",
+            "type": "vector",
+            "schema": "sp.bench.remote.v1",
+            "title": f"Remote layer {i}",
+            "parquet": f"https://cdn.example.com/bench/remote_{i:05d}.parquet",
+            "stats": {"features": 1000 + i},
+        })
+
+    manifest = {
+        "pack_id": "bench:wa:synthetic:v1",
+        "version": "1.0.0",
+        "created_at": "2025-01-01T00:00:00Z",
+        "geography": "wa",
+        "theme": "synthetic",
+        "bbox": BBOX,
+        "crs": "EPSG:4326",
+        "tenant": "bench",
+        "license": {"id": "CC-BY-4.0", "name": "Creative Commons Attribution 4.0"},
+        "layers": manifest_layers,
+    }
+    if integrity:
+        manifest["integrity"] = {"asset_hashes": asset_hashes}
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    info = {
+        "params": params,
+        "manifest_bytes": manifest_path.stat().st_size,
+        "layer_bytes": layer_bytes,
+    }
+    params_path.write_text(json.dumps(info, indent=2), encoding="utf-8")
+    return {**info, "reused": False}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic Spatial Pack")
+    parser.add_argument("output", type=Path, help="Pack directory to create")
+    parser.add_argument("--layers", type=int, default=2, help="GeoParquet layers (default: 2)")
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows per layer (default: 10000)")
+    parser.add_argument("--extra-layers", type=int, default=0,
+                        help="Remote layer entries that pad the manifest (default: 0)")
+    parser.add_argument("--no-integrity", action="store_true", help="Omit integrity.asset_hashes")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args()
+
+    info = generate_pack(
+        args.output,
+        layers=args.layers,
+        rows=args.rows,
+        extra_layers=args.extra_layers,
+        integrity=not args.no_integrity,
+        seed=args.seed,
+    )
+    state = "Reused" if info["reused"] else "Generated"
+    print(f"{state} {args.output}: {args.layers} layers x {args.rows} rows, "
+          f"{info['layer_bytes'] / 1e6:.1f} MB of layers, {info['manifest_bytes'] / 1e3:.1f} KB manifest")
+
+
+if __name__ == "__main__":
+    main()
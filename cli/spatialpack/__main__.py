@@ -4,27 +4,33 @@ Spatialpack CLI entry point.
 Usage:
     spatialpack validate ./my-pack/
     spatialpack validate ./my-pack/ --strict --output report.json
+    spatialpack delta ./pack-v1/ ./pack-v2/ --output v1-v2.spdelta
+    spatialpack apply-delta ./pack/ v1-v2.spdelta
+    spatialpack bundle ./my-pack/ -o my-pack.spack && spatialpack validate my-pack.spack --deep
+    spatialpack unbundle my-pack.spack ./my-pack-copy/
+    spatialpack index ./packs/ && spatialpack search ./packs/ --bbox 115,-35,120,-30
+    spatialpack h3-index ./my-pack/ && spatialpack h3-lookup ./my-pack/ roads --packet-scope
+    spatialpack query ./my-pack/ "SELECT count(*) FROM roads" --bbox 115.7,-32.1,116.0,-31.8
+    spatialpack stats ./my-pack/ --histogram 64 --percentiles 2,50,98 -j 0
+    spatialpack policy check ./my-pack/ --principal acme:viewer --layer roads
+    spatialpack serve --root ./packs/ --port 8750
+    spatialpack serve-assets --root ./demo-offline-gis/ --port 3000
 """
 
 import click
-from rich.console import Console
 
 from spatialpack import __version__
-from spatialpack.commands.validate import validate
+from spatialpack.commands import COMMANDS, LazyGroup
 
-console = Console()
 
-
-@click.group()
+# Subcommands (and rich, jsonschema, duckdb, h3 behind them) are imported
+# only when invoked; see COMMANDS in spatialpack.commands
+@click.group(cls=LazyGroup, lazy_commands=COMMANDS)
 @click.version_option(version=__version__, prog_name="spatialpack")
 def cli():
     """Spatialpack CLI - Validate and manage Spatial Packs."""
     pass
 
 
-# Register commands
-cli.add_command(validate)
-
-
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,378 @@
+"""
+Single-file pack archives (``.spack``).
+
+``bundle_pack`` writes a pack directory as one file::
+
+    header (64 B) | index (JSON) | pad | member | pad | member | ...
+
+The header and index come first, so a reader learns where every member is
+from the first few KB. Members are stored uncompressed, each starting on an
+``alignment``-byte boundary (a page by default). Any member can then be
+memory mapped, range read or ``sendfile``d in place, without extraction.
+
+The header is little-endian:
+
+- magic ``SPACKARC``
+- format version and flags (u16 each)
+- alignment (u32)
+- index offset, index length, data offset and archive size (u64 each)
+- CRC-32 of the index (u32)
+- 12 reserved bytes
+
+The index is JSON:
+``{"format", "version", "pack_id", "created_at", "members": [{"path",
+"offset", "length", "sha256"}]}``. Offsets are absolute. Hidden files and
+folders, such as ``.spatialpack`` caches, are not bundled.
+
+``ArchiveReader`` opens an archive with one read-only mmap. ``view``
+returns members as zero-copy memoryviews, and ``range_source`` gives the
+COG and PMTiles inspectors a reader over one member.
+``ManifestValidator`` accepts an archive path in place of a pack directory.
+"""
+
+import json
+import mmap
+import os
+import struct
+import time
+import zlib
+from datetime import datetime, timezone
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Any, NamedTuple, Optional, Union
+
+from spatialpack.integrity import CHUNK_SIZE, SUPPORTED_ALGORITHMS, _new_hasher, blake3, parse_hash
+from spatialpack.validators.ranges import RangeSource
+
+ARCHIVE_SUFFIX = ".spack"
+MAGIC = b"SPACKARC"
+FORMAT_VERSION = 1
+DEFAULT_ALIGNMENT = 4096
+
+_HEADER = struct.Struct("<8sHHIQQQQI12x")
+HEADER_SIZE = _HEADER.size  # 64
+
+_EMPTY_DIGEST = "0" * 64
+
+
+class ArchiveError(ValueError):
+    """Raised when an archive cannot be written or read."""
+
+
+class ArchiveMember(NamedTuple):
+    """One file in an archive; ``offset`` is absolute."""
+
+    path: str
+    offset: int
+    length: int
+    sha256: str
+
+
+def _align(value: int, alignment: int) -> int:
+    return -(-value // alignment) * alignment
+
+
+def _pack_files(pack_path: Path) -> list[tuple[str, Path, int]]:
+    """``(relative path, path, size)`` for every non-hidden file, sorted."""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(pack_path):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for name in sorted(filenames):
+            if name.startswith("."):
+                continue
+            path = Path(dirpath, name)
+            try:
+                size = path.stat().st_size
+            except OSError as e:
+                raise ArchiveError(f"Cannot read {path}: {e}") from e
+            files.append((path.relative_to(pack_path).as_posix(), path, size))
+    return sorted(files)
+
+
+def _encode_index(pack_id: Optional[str], created_at: str, members: list[ArchiveMember]) -> bytes:
+    return json.dumps(
+        {
+            "format": "spatialpack-archive",
+            "version": FORMAT_VERSION,
+            "pack_id": pack_id,
+            "created_at": created_at,
+            "members": [member._asdict() for member in members],
+        },
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def bundle_pack(pack_path: Path, output: Path, alignment: int = DEFAULT_ALIGNMENT) -> dict:
+    """Write ``pack_path`` as a single archive at ``output``.
+
+    The archive is written beside ``output`` and renamed into place, so a
+    failed run leaves no partial file.
+
+    Returns:
+        dict with ``archive``, ``members``, ``bytes`` (archive size),
+        ``payload_bytes``, ``padding_bytes`` and ``elapsed_ms``
+
+    Raises:
+        ArchiveError: if the pack cannot be read or changes while bundling
+    """
+    start = time.perf_counter()
+    pack_path = Path(pack_path)
+    output = Path(output)
+    if alignment < 8 or alignment & (alignment - 1):
+        raise ArchiveError(f"Alignment must be a power of two >= 8, got {alignment}")
+    manifest_path = pack_path / "spatialpack.json"
+    if not manifest_path.is_file():
+        raise ArchiveError(f"spatialpack.json not found in {pack_path}")
+    try:
+        pack_id = json.loads(manifest_path.read_text(encoding="utf-8")).get("pack_id")
+    except (OSError, ValueError, AttributeError):
+        pack_id = None  # bundled as-is; validation reports the manifest problem
+    if output.resolve().is_relative_to(pack_path.resolve()):
+        raise ArchiveError("The archive must be written outside the pack directory")
+    files = _pack_files(pack_path)
+    created_at = datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+    # The index records member offsets, which depend on the index length:
+    # lay out until the data offset stops growing (digests are fixed-width)
+    data_offset = _align(HEADER_SIZE, alignment)
+    while True:
+        members, offset = [], data_offset
+        for rel, _, size in files:
+            members.append(ArchiveMember(rel, offset, size, _EMPTY_DIGEST))
+            offset = _align(offset + size, alignment)
+        index = _encode_index(pack_id, created_at, members)
+        needed = _align(HEADER_SIZE + len(index), alignment)
+        if needed <= data_offset:
+            break
+        data_offset = needed
+    archive_size = members[-1].offset + members[-1].length if members else data_offset
+
+    tmp = output.with_name(output.name + ".tmp")
+    try:
+        with open(tmp, "wb") as out:
+            for i, (rel, path, size) in enumerate(files):
+                out.seek(members[i].offset)
+                hasher = _new_hasher("sha256")
+                copied = 0
+                with open(path, "rb") as src:
+                    while chunk := src.read(CHUNK_SIZE):
+                        hasher.update(chunk)
+                        out.write(chunk)
+                        copied += len(chunk)
+                if copied != size:
+                    raise ArchiveError(f"{rel} changed size while bundling")
+                members[i] = members[i]._replace(sha256=hasher.hexdigest())
+            index = _encode_index(pack_id, created_at, members)
+            out.seek(0)
+            out.write(_HEADER.pack(
+                MAGIC, FORMAT_VERSION, 0, alignment,
+                HEADER_SIZE, len(index), data_offset, archive_size, zlib.crc32(index),
+            ))
+            out.write(index)
+            out.truncate(archive_size)
+        os.replace(tmp, output)
+    except OSError as e:
+        tmp.unlink(missing_ok=True)
+        raise ArchiveError(f"Cannot write {output}: {e}") from e
+    except ArchiveError:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    payload = sum(size for _, _, size in files)
+    return {
+        "archive": str(output),
+        "members": len(members),
+        "bytes": archive_size,
+        "payload_bytes": payload,
+        "padding_bytes": archive_size - HEADER_SIZE - len(index) - payload,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+class ArchiveReader:
+    """Read-only access to a ``.spack`` archive through one mmap."""
+
+    def __init__(self, path: Union[str, Path]):
+        """Open ``path`` and read its header and index.
+
+        Raises:
+            ArchiveError: if the file is not a readable archive
+        """
+        self.path = Path(path)
+        try:
+            self._file = open(self.path, "rb")
+        except OSError as e:
+            raise ArchiveError(f"Cannot open {self.path}: {e}") from e
+        self._mmap: Optional[mmap.mmap] = None
+        try:
+            self._open()
+        except BaseException:
+            self.close()
+            raise
+
+    def _open(self) -> None:
+        head = self._file.read(HEADER_SIZE)
+        if len(head) < HEADER_SIZE or head[:len(MAGIC)] != MAGIC:
+            raise ArchiveError(f"{self.path} is not a spatialpack archive")
+        (
+            _, version, _, self.alignment,
+            index_offset, index_length, self.data_offset, archive_size, index_crc,
+        ) = _HEADER.unpack(head)
+        if version > FORMAT_VERSION:
+            raise ArchiveError(f"{self.path} uses archive format {version}; this version reads up to {FORMAT_VERSION}")
+        self.size = os.fstat(self._file.fileno()).st_size
+        if self.size < archive_size:
+            raise ArchiveError(f"{self.path} is truncated ({self.size} of {archive_size} bytes)")
+        index = os.pread(self._file.fileno(), index_length, index_offset)
+        if len(index) != index_length or zlib.crc32(index) != index_crc:
+            raise ArchiveError(f"{self.path} has a corrupt index")
+        try:
+            document = json.loads(index)
+            self.pack_id: Optional[str] = document.get("pack_id")
+            self.created_at: Optional[str] = document.get("created_at")
+            self.members = {
+                entry["path"]: ArchiveMember(entry["path"], entry["offset"], entry["length"], entry["sha256"])
+                for entry in document["members"]
+            }
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            raise ArchiveError(f"{self.path} has an unreadable index: {e}") from e
+        for member in self.members.values():
+            if member.offset < self.data_offset or member.offset + member.length > archive_size:
+                raise ArchiveError(f"{self.path}: member {member.path} lies outside the archive")
+        self._dirs = {
+            "/".join(parts[:i]) for parts in (name.split("/") for name in self.members) for i in range(1, len(parts))
+        }
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.members
+
+    def names(self) -> list[str]:
+        return list(self.members)
+
+    def is_dir(self, name: str) -> bool:
+        """Whether any member lies under the folder ``name``."""
+        return name.strip("/") in self._dirs
+
+    def glob(self, pattern: str) -> list[str]:
+        """Member names matching a glob (``*`` also crosses ``/``)."""
+        return [name for name in self.members if fnmatchcase(name, pattern)]
+
+    def member(self, name: str) -> ArchiveMember:
+        try:
+            return self.members[name]
+        except KeyError:
+            raise ArchiveError(f"{name} is not in {self.path}") from None
+
+    def view(self, name: str) -> memoryview:
+        """Zero-copy view of a member's bytes (valid until ``close``)."""
+        member = self.member(name)
+        return memoryview(self._mmap)[member.offset:member.offset + member.length]
+
+    def read(self, name: str, offset: int = 0, length: Optional[int] = None) -> bytes:
+        """Bytes ``[offset, offset + length)`` of a member."""
+        member = self.member(name)
+        end = member.length if length is None else min(member.length, offset + length)
+        return self._mmap[member.offset + offset:member.offset + max(offset, end)]
+
+    def range_source(self, name: str) -> RangeSource:
+        """Range reader over one member, for the COG and PMTiles inspectors."""
+        return RangeSource(f"{self.path}!{name}", buffer=self.view(name))
+
+    def hash_member(self, name: str, algorithm: str = "sha256") -> str:
+        hasher = _new_hasher(algorithm)
+        view = self.view(name)
+        try:
+            for start in range(0, len(view), CHUNK_SIZE):
+                hasher.update(view[start:start + CHUNK_SIZE])
+        finally:
+            view.release()
+        return hasher.hexdigest()
+
+    def verify(self) -> dict[str, bool]:
+        """Member name -> whether its bytes match the SHA-256 recorded at bundle time."""
+        return {name: self.hash_member(name) == member.sha256 for name, member in self.members.items()}
+
+    def verify_assets(self, asset_hashes: dict[str, str]) -> dict[str, dict]:
+        """Check members against manifest ``asset_hashes``.
+
+        Returns the same ``{"status", "algorithm", "expected", "actual"}``
+        results as ``spatialpack.integrity.verify_assets``.
+        """
+        results = {}
+        for asset, value in asset_hashes.items():
+            algorithm, expected = parse_hash(value)
+            result = {"status": "ok", "algorithm": algorithm, "expected": expected, "actual": None}
+            name = asset.removeprefix("./")
+            if algorithm not in SUPPORTED_ALGORITHMS or (algorithm == "blake3" and blake3 is None):
+                result["status"] = "unsupported"
+            elif name not in self.members:
+                result["status"] = "missing"
+            else:
+                result["actual"] = self.hash_member(name, algorithm)
+                if result["actual"] != expected:
+                    result["status"] = "mismatch"
+            results[asset] = result
+        return results
+
+    def extract(self, dest: Path, verify: bool = True) -> dict:
+        """Write every member under ``dest``.
+
+        Returns:
+            dict with ``members``, ``bytes`` and ``elapsed_ms``
+
+        Raises:
+            ArchiveError: on a member path escaping ``dest`` or (with
+                ``verify``) a digest mismatch
+        """
+        start = time.perf_counter()
+        dest = Path(dest)
+        root = dest.resolve()
+        written = 0
+        for name, member in self.members.items():
+            target = (root / name).resolve()
+            if not target.is_relative_to(root) or target == root:
+                raise ArchiveError(f"Refusing to extract {name} outside {dest}")
+            target.parent.mkdir(parents=True, exist_ok=True)
+            hasher = _new_hasher("sha256") if verify else None
+            view = self.view(name)
+            try:
+                with open(target, "wb") as out:
+                    for offset in range(0, len(view), CHUNK_SIZE):
+                        chunk = view[offset:offset + CHUNK_SIZE]
+                        if hasher is not None:
+                            hasher.update(chunk)
+                        out.write(chunk)
+            except OSError as e:
+                raise ArchiveError(f"Cannot write {target}: {e}") from e
+            finally:
+                view.release()
+            if hasher is not None and hasher.hexdigest() != member.sha256:
+                raise ArchiveError(f"{name} does not match its recorded SHA-256; the archive is damaged")
+            written += member.length
+        return {
+            "members": len(self.members),
+            "bytes": written,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass  # views still exported; the map is released with them
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def unbundle(archive_path: Path, dest: Path, verify: bool = True) -> dict:
+    """Extract an archive into the directory ``dest`` (see ``ArchiveReader.extract``)."""
+    with ArchiveReader(archive_path) as reader:
+        return reader.extract(dest, verify=verify)
@@ -0,0 +1,437 @@
+"""
+Local HTTP server for pack assets: PMTiles archives, COGs and static files.
+
+``AssetServer`` serves a directory tree over HTTP/1.1 on asyncio streams,
+for offline use such as ``demo/demo-offline-gis`` on a field laptop:
+
+- single byte ranges (``bytes=a-b``, ``a-``, ``-n``) with 206 and 416, as
+  pmtiles.js and COG readers request them
+- bodies sent with ``loop.sendfile``, i.e. ``os.sendfile`` on plain sockets,
+  so file bytes go from the page cache to the socket without being copied
+  through Python
+- strong ETags from a pack's ``integrity.asset_hashes`` while a file keeps
+  the size and mtime it had at start-up, weak stat ETags otherwise;
+  ``If-None-Match`` and ``If-Range`` are honoured
+- ``/<archive>.pmtiles/{z}/{x}/{y}`` returns one tile; archive headers and
+  directories are kept in an LRU cache, so a warm tile request is a bisect
+  and one ``sendfile``
+- optional per-tenant limits (``spatialpack.ratelimit``) on files inside
+  packs, keyed by the ``X-Spatialpack-Tenant`` header
+
+Hidden paths (``.spatialpack`` caches and the usage ledger) are never served.
+"""
+
+import asyncio
+import json
+import math
+import mimetypes
+import os
+import re
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import unquote, urlsplit
+
+from spatialpack import __version__
+from spatialpack.cache import stat_fingerprint
+from spatialpack.catalog import find_manifests
+from spatialpack.integrity import parse_hash
+from spatialpack.ratelimit import RateLimiter
+from spatialpack.server import (
+    KEEPALIVE_TIMEOUT,
+    LRUCache,
+    ServerError,
+    keep_alive,
+    read_request_head,
+    run_server,
+)
+from spatialpack.validators.pmtiles import (
+    HEADER_SIZE,
+    TILE_TYPES,
+    PMTilesError,
+    _decompress,
+    find_entry,
+    parse_directory,
+    parse_header,
+    zxy_to_tile_id,
+)
+
+# Archive headers and directories kept by default
+DIRECTORY_CACHE_SIZE = 512
+
+TENANT_HEADER = "x-spatialpack-tenant"
+ANONYMOUS_TENANT = "anonymous"
+
+METHODS = ("GET", "HEAD")
+
+# PMTiles leaf directories nest at most this deep in practice
+MAX_DIRECTORY_DEPTH = 4
+
+CONTENT_TYPES = {
+    ".pmtiles": "application/vnd.pmtiles",
+    ".tif": "image/tiff",
+    ".tiff": "image/tiff",
+    ".parquet": "application/vnd.apache.parquet",
+    ".geojson": "application/geo+json",
+    ".json": "application/json",
+    ".js": "text/javascript",
+    ".css": "text/css",
+    ".html": "text/html; charset=utf-8",
+}
+
+TILE_CONTENT_TYPES = {
+    "mvt": "application/vnd.mapbox-vector-tile",
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "webp": "image/webp",
+    "avif": "image/avif",
+}
+TILE_ENCODINGS = {"gzip": "gzip", "brotli": "br", "zstd": "zstd"}
+
+_TILE_PATH = re.compile(r"(?P<archive>.+\.pmtiles)/(?P<z>\d+)/(?P<x>\d+)/(?P<y>\d+)(?:\.[A-Za-z0-9]+)?")
+_HEX = re.compile(r"[0-9a-f]{16,}")
+
+
+def parse_range(value: str, size: int) -> Optional[tuple[int, int]]:
+    """Inclusive ``(start, end)`` of a single-range ``Range`` header.
+
+    Returns None when the whole file should be sent instead: other units,
+    multiple ranges or malformed values, which RFC 9110 lets a server ignore.
+
+    Raises:
+        ServerError: 416 if the range lies outside the file
+    """
+    unit, sep, spec = value.partition("=")
+    if unit.strip().lower() != "bytes" or not sep or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            suffix = int(last)
+            start, end = max(0, size - suffix), size - 1
+            if suffix == 0:
+                start = size
+    except ValueError:
+        return None
+    if start < 0 or start > end or start >= size:
+        raise ServerError(
+            HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE,
+            f"Range {value!r} is outside the file ({size} bytes)",
+            {"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """``If-None-Match`` comparison (weak, as RFC 9110 specifies for it)."""
+    if header.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    return any((tag.strip()[2:] if tag.strip().startswith("W/") else tag.strip()) == bare for tag in header.split(","))
+
+
+class AssetServer:
+    """Asyncio HTTP server for the files under one directory."""
+
+    def __init__(
+        self,
+        root: Path,
+        directory_cache: int = DIRECTORY_CACHE_SIZE,
+        limiter: Optional[RateLimiter] = None,
+        cors: bool = False,
+    ):
+        """
+        Args:
+            root: Directory to serve; packs under it supply ETags and pack ids
+            directory_cache: PMTiles headers and directories to keep
+            limiter: Rate limiter for files inside packs (None: no limits)
+            cors: Allow cross-origin reads (``Access-Control-Allow-Origin: *``)
+        """
+        self.root = Path(root).resolve()
+        self.limiter = limiter
+        self.cors = cors
+        self.directories = LRUCache(directory_cache)
+        self.stats = {"requests": 0, "bytes_sent": 0, "tiles": 0, "not_modified": 0, "rate_limited": 0}
+        # Asset path -> (fingerprint when loaded, strong ETag)
+        self._hashes: dict[Path, tuple[list[int], str]] = {}
+        # Pack directory -> pack_id
+        self.packs: dict[Path, str] = {}
+        self._load_manifests()
+
+    def _load_manifests(self) -> None:
+        for manifest_path in find_manifests(self.root):
+            try:
+                with open(manifest_path, encoding="utf-8") as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if not isinstance(manifest, dict):
+                continue
+            pack_dir = Path(manifest_path).resolve().parent
+            if isinstance(manifest.get("pack_id"), str):
+                self.packs[pack_dir] = manifest["pack_id"]
+            hashes = (manifest.get("integrity") or {}).get("asset_hashes") or {}
+            for rel, value in hashes.items() if isinstance(hashes, dict) else ():
+                if not isinstance(value, str):
+                    continue
+                algorithm, hex_digest = parse_hash(value)
+                if not _HEX.fullmatch(hex_digest):
+                    continue  # placeholder values
+                path = (pack_dir / rel).resolve()
+                fingerprint = stat_fingerprint(path)
+                if fingerprint is not None:
+                    self._hashes[path] = (fingerprint, f'"{algorithm}-{hex_digest}"')
+
+    @property
+    def hashed_assets(self) -> int:
+        return len(self._hashes)
+
+    async def serve(self, host: str, port: int) -> None:
+        """Serve until cancelled, SIGINT or SIGTERM."""
+        await run_server(self.handle, host, port)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve HTTP/1.1 requests on one connection (keep-alive aware)."""
+        try:
+            while True:
+                too_long = False
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEPALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                except ValueError:
+                    # Longer than the reader's limit; answered below, then closed
+                    request_line, too_long = b"", True
+                if not request_line and not too_long:
+                    break
+                self.stats["requests"] += 1
+                persistent, head = False, request_line.startswith(b"HEAD ")
+                try:
+                    if too_long:
+                        raise ServerError(HTTPStatus.REQUEST_URI_TOO_LONG, "Request line too long")
+                    method, target, version, headers = await read_request_head(reader, request_line)
+                    persistent = keep_alive(version, headers)
+                    if headers.get("content-length", "0") != "0" or "transfer-encoding" in headers:
+                        raise ServerError(HTTPStatus.BAD_REQUEST, "Request bodies are not accepted")
+                    if method == "OPTIONS" and self.cors:
+                        await self._respond(writer, HTTPStatus.NO_CONTENT, {}, persistent)
+                    elif method not in METHODS:
+                        raise ServerError(
+                            HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed", {"Allow": ", ".join(METHODS)}
+                        )
+                    else:
+                        await self._serve(writer, target, headers, persistent, head)
+                except ServerError as e:
+                    if e.status == HTTPStatus.BAD_REQUEST:
+                        persistent = False
+                    payload = json.dumps({"error": str(e)}).encode("utf-8")
+                    extra = {"Content-Type": "application/json", "Content-Length": str(len(payload)), **e.headers}
+                    await self._respond(writer, e.status, extra, persistent, b"" if head else payload)
+                if not persistent:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def _resolve(self, url_path: str) -> Path:
+        """File under the root for a URL path (``index.html`` for directories)."""
+        rel = url_path.lstrip("/")
+        if any(part.startswith(".") for part in rel.split("/") if part):
+            raise ServerError(HTTPStatus.NOT_FOUND, f"Not found: /{rel}")
+        path = (self.root / rel).resolve()
+        if path != self.root and self.root not in path.parents:
+            raise ServerError(HTTPStatus.FORBIDDEN, f"Path is outside the served root: /{rel}")
+        if path.is_dir():
+            path = path / "index.html"
+        if not path.is_file():
+            raise ServerError(HTTPStatus.NOT_FOUND, f"Not found: /{rel}")
+        return path
+
+    def _etag(self, path: Path, stat: os.stat_result) -> tuple[str, bool]:
+        """``(etag, from_manifest)`` for an open file."""
+        known = self._hashes.get(path)
+        if known is not None and known[0] == [stat.st_size, stat.st_mtime_ns, stat.st_ino]:
+            return known[1], True
+        return f'W/"{stat.st_size:x}-{stat.st_mtime_ns:x}"', False
+
+    def _admit(self, path: Path, headers: dict, nbytes: int) -> None:
+        """Charge a request for a file inside a pack to the tenant's limits."""
+        if self.limiter is None:
+            return
+        pack_id = next((self.packs[p] for p in path.parents if p in self.packs), None)
+        if pack_id is None:
+            return
+        retry_after = self.limiter.acquire(headers.get(TENANT_HEADER) or ANONYMOUS_TENANT, pack_id, nbytes)
+        if retry_after:
+            self.stats["rate_limited"] += 1
+            raise ServerError(
+                HTTPStatus.TOO_MANY_REQUESTS, "Rate limit exceeded", {"Retry-After": str(math.ceil(retry_after))}
+            )
+
+    async def _serve(self, writer: asyncio.StreamWriter, target: str, headers: dict, persistent: bool, head: bool) -> None:
+        url_path = unquote(urlsplit(target).path)
+        tile = _TILE_PATH.fullmatch(url_path.lstrip("/"))
+        path = self._resolve(tile["archive"] if tile else url_path)
+        try:
+            f = open(path, "rb")
+        except OSError as e:
+            raise ServerError(HTTPStatus.NOT_FOUND, f"Cannot open {url_path}: {e.strerror}") from None
+        with f:
+            stat = os.fstat(f.fileno())
+            etag, from_manifest = self._etag(path, stat)
+            if tile:
+                await self._serve_tile(writer, f, path, stat, etag, tile, headers, persistent, head)
+                return
+
+            response = {
+                "Content-Type": CONTENT_TYPES.get(path.suffix.lower())
+                or mimetypes.guess_type(path.name)[0]
+                or "application/octet-stream",
+                "Accept-Ranges": "bytes",
+                "ETag": etag,
+                # Hashed pack assets only change with a new manifest; the rest revalidate
+                "Cache-Control": "public, max-age=86400" if from_manifest else "no-cache",
+            }
+            if "if-none-match" in headers and _etag_matches(headers["if-none-match"], etag):
+                self._admit(path, headers, 0)
+                self.stats["not_modified"] += 1
+                await self._respond(writer, HTTPStatus.NOT_MODIFIED, {"ETag": etag}, persistent)
+                return
+
+            status, start, length = HTTPStatus.OK, 0, stat.st_size
+            # Ranges apply unless If-Range names another version (weak ETags never match it)
+            if "range" in headers and headers.get("if-range", etag) == etag and not (
+                "if-range" in headers and etag.startswith("W/")
+            ):
+                span = parse_range(headers["range"], stat.st_size)
+                if span is not None:
+                    status, start, length = HTTPStatus.PARTIAL_CONTENT, span[0], span[1] - span[0] + 1
+                    response["Content-Range"] = f"bytes {span[0]}-{span[1]}/{stat.st_size}"
+            response["Content-Length"] = str(length)
+            self._admit(path, headers, 0 if head else length)
+            await self._send_file(writer, status, response, persistent, f, start, 0 if head else length)
+
+    async def _serve_tile(
+        self,
+        writer: asyncio.StreamWriter,
+        f: Any,
+        path: Path,
+        stat: os.stat_result,
+        etag: str,
+        tile: "re.Match[str]",
+        headers: dict,
+        persistent: bool,
+        head: bool,
+    ) -> None:
+        z, x, y = int(tile["z"]), int(tile["x"]), int(tile["y"])
+        try:
+            tile_id = zxy_to_tile_id(z, x, y)
+        except PMTilesError as e:
+            raise ServerError(HTTPStatus.NOT_FOUND, str(e)) from None
+        key = (path, stat.st_size, stat.st_mtime_ns)
+        try:
+            header, located = self._locate_tile(f.fileno(), key, tile_id)
+        except (PMTilesError, OSError) as e:
+            raise ServerError(HTTPStatus.INTERNAL_SERVER_ERROR, f"Cannot read {tile['archive']}: {e}") from None
+
+        self.stats["tiles"] += 1
+        tile_etag = f'{etag[:-1]}-{z}-{x}-{y}"'
+        if located is None:
+            self._admit(path, headers, 0)
+            await self._respond(writer, HTTPStatus.NO_CONTENT, {"ETag": tile_etag}, persistent)
+            return
+        response = {
+            "Content-Type": TILE_CONTENT_TYPES.get(header["tile_type"], "application/octet-stream"),
+            "ETag": tile_etag,
+            "Cache-Control": "public, max-age=86400" if not etag.startswith("W/") else "no-cache",
+            "Content-Length": str(located[1]),
+        }
+        if header["tile_compression"] in TILE_ENCODINGS:
+            response["Content-Encoding"] = TILE_ENCODINGS[header["tile_compression"]]
+        if "if-none-match" in headers and _etag_matches(headers["if-none-match"], tile_etag):
+            self._admit(path, headers, 0)
+            self.stats["not_modified"] += 1
+            await self._respond(writer, HTTPStatus.NOT_MODIFIED, {"ETag": tile_etag}, persistent)
+            return
+        self._admit(path, headers, 0 if head else located[1])
+        await self._send_file(writer, HTTPStatus.OK, response, persistent, f, located[0], 0 if head else located[1])
+
+    def _locate_tile(self, fd: int, key: tuple, tile_id: int) -> tuple[dict, Optional[tuple[int, int]]]:
+        """``(header, (offset, length) of the tile or None)``, via the directory cache."""
+        header = self.directories.get(key + ("header",), lambda: parse_header(os.pread(fd, HEADER_SIZE, 0)))
+        if header["tile_type"] not in TILE_TYPES.values():
+            raise PMTilesError(f"Unknown tile type {header['tile_type']}")
+        offset, length = header["root_offset"], header["root_length"]
+        for _ in range(MAX_DIRECTORY_DEPTH):
+            tile_ids, entries = self.directories.get(
+                key + (offset, length),
+                lambda: self._read_directory(fd, offset, length, header["internal_compression"]),
+            )
+            entry = find_entry(tile_ids, entries, tile_id)
+            if entry is None:
+                return header, None
+            if entry[3] > 0:
+                return header, (header["data_offset"] + entry[1], entry[2])
+            offset, length = header["leaf_offset"] + entry[1], entry[2]
+        raise PMTilesError("Leaf directories nest too deep")
+
+    @staticmethod
+    def _read_directory(fd: int, offset: int, length: int, compression: str) -> tuple[list[int], list]:
+        raw = os.pread(fd, length, offset)
+        if len(raw) != length:
+            raise PMTilesError("Directory extends past the end of the archive")
+        entries = parse_directory(_decompress(raw, compression))
+        return [entry[0] for entry in entries], entries
+
+    def _head_block(self, status: HTTPStatus, headers: dict, persistent: bool) -> bytes:
+        headers = {
+            **headers,
+            "Connection": "keep-alive" if persistent else "close",
+            "Server": f"spatialpack/{__version__}",
+        }
+        if self.cors:
+            headers["Access-Control-Allow-Origin"] = "*"
+            headers["Access-Control-Allow-Headers"] = "Range, If-None-Match, If-Range, X-Spatialpack-Tenant"
+            headers["Access-Control-Expose-Headers"] = "Content-Range, Content-Length, ETag, Accept-Ranges"
+        if status in (HTTPStatus.NO_CONTENT, HTTPStatus.NOT_MODIFIED):
+            headers.pop("Content-Length", None)
+        elif "Content-Length" not in headers:
+            headers["Content-Length"] = "0"
+        return (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            + "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+            + "\r\n"
+        ).encode("latin-1")
+
+    async def _respond(
+        self, writer: asyncio.StreamWriter, status: HTTPStatus, headers: dict, persistent: bool, payload: bytes = b""
+    ) -> None:
+        writer.write(self._head_block(status, headers, persistent) + payload)
+        await writer.drain()
+
+    async def _send_file(
+        self,
+        writer: asyncio.StreamWriter,
+        status: HTTPStatus,
+        headers: dict,
+        persistent: bool,
+        f: Any,
+        offset: int,
+        count: int,
+    ) -> None:
+        writer.write(self._head_block(status, headers, persistent))
+        await writer.drain()
+        if count:
+            # os.sendfile on plain sockets; asyncio falls back to read/write otherwise
+            sent = await asyncio.get_running_loop().sendfile(writer.transport, f, offset, count)
+            self.stats["bytes_sent"] += sent
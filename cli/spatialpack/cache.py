@@ -0,0 +1,106 @@
+"""
+Persistent per-pack caches for incremental validation.
+
+Caches live under ``<pack>/.spatialpack/cache``. They are advisory: a cache
+that cannot be read or written is treated as empty and never causes a
+validation failure.
+
+The validation cache stores the errors and warnings of each rule group
+(see ``ManifestValidator.RULE_GROUPS``) under a key derived from everything
+that group depends on, so only groups whose inputs changed are re-run.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+# Cache location relative to the pack directory
+CACHE_DIR = Path(".spatialpack") / "cache"
+VALIDATION_CACHE_FILE = "validation.json"
+
+
+def stat_fingerprint(path: Path) -> Optional[list[int]]:
+    """Return ``[size, mtime_ns, inode]`` for a file, or None if missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+
+def digest(*parts: Any) -> str:
+    """Stable SHA-256 over JSON-serialisable parts (bytes are hashed raw)."""
+    hasher = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, bytes):
+            hasher.update(part)
+        else:
+            hasher.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+def read_json(path: Path) -> dict:
+    """Read a JSON cache file, returning an empty dict on any failure."""
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def write_json_atomic(path: Path, data: dict) -> bool:
+    """Write JSON via a temp file and rename; returns False on failure."""
+    path = Path(path)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp_path, path)
+    except OSError:
+        return False
+    return True
+
+
+class ValidationCache:
+    """Rule-group results keyed by a fingerprint of their inputs."""
+
+    def __init__(self, cache_path: Path):
+        self.cache_path = Path(cache_path)
+        self._groups: dict[str, dict] = read_json(self.cache_path)
+        self._dirty = False
+
+    @classmethod
+    def for_pack(cls, pack_path: Path) -> "ValidationCache":
+        return cls(Path(pack_path) / CACHE_DIR / VALIDATION_CACHE_FILE)
+
+    def get(self, group: str, key: str) -> Optional[dict]:
+        """Return the cached ``{errors, warnings, layers_validated, asset_details}`` or None."""
+        entry = self._groups.get(group)
+        if entry and entry.get("key") == key:
+            return entry
+        return None
+
+    def put(
+        self,
+        group: str,
+        key: str,
+        errors: list,
+        warnings: list,
+        layers_validated: int,
+        asset_details: Optional[dict] = None,
+    ) -> None:
+        self._groups[group] = {
+            "key": key,
+            "errors": errors,
+            "warnings": warnings,
+            "layers_validated": layers_validated,
+            "asset_details": asset_details or {},
+        }
+        self._dirty = True
+
+    def save(self) -> None:
+        if self._dirty and write_json_atomic(self.cache_path, self._groups):
+            self._dirty = False
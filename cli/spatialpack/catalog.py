@@ -0,0 +1,322 @@
+"""
+Local multi-pack catalog for fast spatial and facet search.
+
+``build_catalog`` scans a directory tree for ``spatialpack.json`` manifests
+into an SQLite database: one row per pack with its search facets (geography,
+theme, tenant, license, created_at), one row per layer schema, and an R*Tree
+over the pack bboxes. Rescans are incremental: manifests whose size and
+mtime are unchanged are not re-read.
+
+``search_catalog`` answers bbox/facet queries from the index alone, so a
+search over tens of thousands of packs touches no manifest files.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+from spatialpack.cache import CACHE_DIR
+
+CATALOG_FILE = "catalog.sqlite"
+
+# Bump when the table layout changes; older catalogs are rebuilt
+CATALOG_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS packs (
+    id INTEGER PRIMARY KEY,
+    manifest_path TEXT NOT NULL UNIQUE,
+    manifest_size INTEGER NOT NULL,
+    manifest_mtime_ns INTEGER NOT NULL,
+    pack_id TEXT,
+    version TEXT,
+    geography TEXT,
+    theme TEXT,
+    tenant TEXT,
+    license TEXT,
+    crs TEXT,
+    created_at TEXT,
+    min_x REAL, min_y REAL, max_x REAL, max_y REAL
+);
+CREATE INDEX IF NOT EXISTS packs_theme ON packs (theme);
+CREATE INDEX IF NOT EXISTS packs_geography ON packs (geography);
+CREATE INDEX IF NOT EXISTS packs_license ON packs (license);
+CREATE INDEX IF NOT EXISTS packs_tenant ON packs (tenant);
+CREATE INDEX IF NOT EXISTS packs_created_at ON packs (created_at);
+CREATE TABLE IF NOT EXISTS layers (
+    pack INTEGER NOT NULL REFERENCES packs (id) ON DELETE CASCADE,
+    layer_id TEXT,
+    type TEXT,
+    schema TEXT
+);
+CREATE INDEX IF NOT EXISTS layers_schema ON layers (schema, pack);
+CREATE INDEX IF NOT EXISTS layers_pack ON layers (pack);
+CREATE VIRTUAL TABLE IF NOT EXISTS pack_bbox USING rtree (id, min_x, max_x, min_y, max_y);
+"""
+
+# Directory names never searched for packs
+_SKIP_DIRS = {"node_modules", "__pycache__"}
+
+
+class CatalogError(ValueError):
+    """Raised when a catalog cannot be opened or queried."""
+
+
+def default_catalog_path(root: Path) -> Path:
+    """Catalog location for a tree: ``<root>/.spatialpack/cache/catalog.sqlite``."""
+    return Path(root) / CACHE_DIR / CATALOG_FILE
+
+
+def connect(catalog_path: Path, create: bool = False) -> sqlite3.Connection:
+    """Open a catalog, creating (or rebuilding an outdated) one if asked."""
+    catalog_path = Path(catalog_path)
+    if not create and not catalog_path.is_file():
+        raise CatalogError(f"Catalog not found: {catalog_path} (run 'spatialpack index' first)")
+    if create:
+        catalog_path.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(catalog_path)
+    con.execute("PRAGMA foreign_keys = ON")
+    (user_version,) = con.execute("PRAGMA user_version").fetchone()
+    if user_version != CATALOG_VERSION:
+        if not create:
+            con.close()
+            raise CatalogError(f"Catalog {catalog_path} is outdated (run 'spatialpack index --rebuild')")
+        con.executescript("DROP TABLE IF EXISTS layers; DROP TABLE IF EXISTS pack_bbox; DROP TABLE IF EXISTS packs;")
+        con.executescript(_SCHEMA)
+        con.execute(f"PRAGMA user_version = {CATALOG_VERSION}")
+    return con
+
+
+def find_manifests(root: Path) -> dict[str, os.stat_result]:
+    """Map absolute manifest path to its stat for every pack under ``root``.
+
+    Hidden directories (including ``.spatialpack``) are skipped, and a pack
+    directory is not searched further for nested packs.
+    """
+    manifests = {}
+    for dirpath, dirs, files in os.walk(root):
+        if "spatialpack.json" in files:
+            path = os.path.abspath(os.path.join(dirpath, "spatialpack.json"))
+            try:
+                manifests[path] = os.stat(path)
+            except OSError:
+                pass
+            dirs.clear()
+            continue
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d not in _SKIP_DIRS]
+    return manifests
+
+
+def _pack_row(manifest: dict) -> dict[str, Any]:
+    """Extract the indexed facets from a manifest."""
+    def text(value: Any) -> Optional[str]:
+        return value if isinstance(value, str) else None
+
+    license_info = manifest.get("license")
+    bbox = manifest.get("bbox")
+    if not (isinstance(bbox, list) and len(bbox) == 4 and all(isinstance(v, (int, float)) for v in bbox)):
+        bbox = [None] * 4
+    return {
+        "pack_id": text(manifest.get("pack_id")),
+        "version": text(manifest.get("version")),
+        "geography": text(manifest.get("geography")),
+        "theme": text(manifest.get("theme")),
+        "tenant": text(manifest.get("tenant")),
+        "license": text(license_info.get("id")) if isinstance(license_info, dict) else None,
+        "crs": text(manifest.get("crs")),
+        "created_at": text(manifest.get("created_at")),
+        "min_x": bbox[0], "min_y": bbox[1], "max_x": bbox[2], "max_y": bbox[3],
+    }
+
+
+def build_catalog(root: Path, catalog_path: Optional[Path] = None, rebuild: bool = False) -> dict:
+    """Scan ``root`` for packs and bring the catalog up to date.
+
+    Args:
+        root: Directory tree to scan
+        catalog_path: Catalog database (default: under ``root``)
+        rebuild: Drop and re-read every manifest
+
+    Returns:
+        dict with ``catalog``, ``packs``, ``added``, ``updated``,
+        ``removed``, ``unchanged``, ``errors`` (list of ``{path, message}``)
+        and ``elapsed_ms``.
+    """
+    start = time.perf_counter()
+    catalog_path = Path(catalog_path or default_catalog_path(root))
+    if rebuild and catalog_path.exists():
+        catalog_path.unlink()
+
+    manifests = find_manifests(root)
+    con = connect(catalog_path, create=True)
+    stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+    errors = []
+    try:
+        with con:
+            known = {
+                path: (row_id, size, mtime_ns)
+                for row_id, path, size, mtime_ns in con.execute(
+                    "SELECT id, manifest_path, manifest_size, manifest_mtime_ns FROM packs"
+                )
+            }
+
+            # Packs whose manifest disappeared
+            gone = [(row_id,) for path, (row_id, _, _) in known.items() if path not in manifests]
+            con.executemany("DELETE FROM pack_bbox WHERE id = ?", gone)
+            con.executemany("DELETE FROM packs WHERE id = ?", gone)
+            stats["removed"] = len(gone)
+
+            for path, stat in manifests.items():
+                previous = known.get(path)
+                if previous and previous[1:] == (stat.st_size, stat.st_mtime_ns):
+                    stats["unchanged"] += 1
+                    continue
+                try:
+                    manifest = json.loads(Path(path).read_text(encoding="utf-8"))
+                    if not isinstance(manifest, dict):
+                        raise ValueError("manifest is not a JSON object")
+                except (OSError, ValueError) as e:
+                    errors.append({"path": path, "message": str(e)})
+                    if previous:
+                        con.execute("DELETE FROM pack_bbox WHERE id = ?", (previous[0],))
+                        con.execute("DELETE FROM packs WHERE id = ?", (previous[0],))
+                        stats["removed"] += 1
+                    continue
+
+                row = _pack_row(manifest)
+                row.update(manifest_path=path, manifest_size=stat.st_size, manifest_mtime_ns=stat.st_mtime_ns)
+                if previous:
+                    row_id = previous[0]
+                    con.execute("DELETE FROM layers WHERE pack = ?", (row_id,))
+                    con.execute("DELETE FROM pack_bbox WHERE id = ?", (row_id,))
+                    con.execute(
+                        f"UPDATE packs SET {', '.join(f'{k} = :{k}' for k in row)} WHERE id = :id",
+                        {**row, "id": row_id},
+                    )
+                    stats["updated"] += 1
+                else:
+                    row_id = con.execute(
+                        f"INSERT INTO packs ({', '.join(row)}) VALUES ({', '.join(':' + k for k in row)})",
+                        row,
+                    ).lastrowid
+                    stats["added"] += 1
+
+                if row["min_x"] is not None:
+                    con.execute(
+                        "INSERT INTO pack_bbox VALUES (?, ?, ?, ?, ?)",
+                        (row_id, row["min_x"], row["max_x"], row["min_y"], row["max_y"]),
+                    )
+                layers = manifest.get("layers")
+                con.executemany(
+                    "INSERT INTO layers (pack, layer_id, type, schema) VALUES (?, ?, ?, ?)",
+                    [
+                        (row_id, layer.get("id"), layer.get("type"), layer.get("schema"))
+                        for layer in (layers if isinstance(layers, list) else [])
+                        if isinstance(layer, dict)
+                    ],
+                )
+        (packs,) = con.execute("SELECT count(*) FROM packs").fetchone()
+    finally:
+        con.close()
+
+    return {
+        "catalog": str(catalog_path),
+        "packs": packs,
+        **stats,
+        "errors": errors,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def search_catalog(
+    catalog_path: Path,
+    bbox: Optional[Sequence[float]] = None,
+    schemas: Sequence[str] = (),
+    theme: Optional[str] = None,
+    geography: Optional[str] = None,
+    license_id: Optional[str] = None,
+    tenant: Optional[str] = None,
+    created_after: Optional[str] = None,
+    created_before: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> list[dict]:
+    """Search a catalog; all given filters must match.
+
+    Args:
+        catalog_path: Catalog database built by :func:`build_catalog`
+        bbox: ``[minX, minY, maxX, maxY]``; packs whose bbox intersects it
+        schemas: Layer schema identifiers; packs with a layer using any of them
+        theme, geography, license_id, tenant: Exact facet matches
+        created_after, created_before: Inclusive ISO 8601 bounds on created_at
+        limit: Maximum results
+
+    Returns:
+        Matching packs ordered by pack_id and version, each a dict of the
+        indexed facets plus ``path`` (the pack directory), ``bbox`` and
+        ``schemas``.
+    """
+    clauses, params = [], []
+    joins = ""
+    if bbox is not None:
+        # The R*Tree stores float32 bounds rounded outwards; the packs
+        # columns give the exact test
+        joins = "JOIN pack_bbox r ON r.id = p.id"
+        clauses.append(
+            "r.max_x >= ? AND r.min_x <= ? AND r.max_y >= ? AND r.min_y <= ? "
+            "AND p.max_x >= ? AND p.min_x <= ? AND p.max_y >= ? AND p.min_y <= ?"
+        )
+        params.extend([bbox[0], bbox[2], bbox[1], bbox[3]] * 2)
+    if schemas:
+        clauses.append(f"p.id IN (SELECT pack FROM layers WHERE schema IN ({', '.join('?' * len(schemas))}))")
+        params.extend(schemas)
+    for column, value in (("theme", theme), ("geography", geography), ("license", license_id), ("tenant", tenant)):
+        if value is not None:
+            clauses.append(f"p.{column} = ?")
+            params.append(value)
+    if created_after is not None:
+        clauses.append("p.created_at >= ?")
+        params.append(created_after)
+    if created_before is not None:
+        clauses.append("p.created_at <= ?")
+        params.append(created_before)
+
+    sql = (
+        "SELECT p.id, p.manifest_path, p.pack_id, p.version, p.geography, p.theme, p.tenant, "
+        "p.license, p.crs, p.created_at, p.min_x, p.min_y, p.max_x, p.max_y "
+        f"FROM packs p {joins}"
+        + (f" WHERE {' AND '.join(clauses)}" if clauses else "")
+        + " ORDER BY p.pack_id, p.version"
+        + (" LIMIT ?" if limit else "")
+    )
+    if limit:
+        params.append(limit)
+
+    con = connect(catalog_path)
+    try:
+        rows = con.execute(sql, params).fetchall()
+        layer_schemas: dict[int, list[str]] = {}
+        ids = [row[0] for row in rows]
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            for pack, schema in con.execute(
+                f"SELECT pack, schema FROM layers WHERE pack IN ({', '.join('?' * len(batch))}) "
+                "AND schema IS NOT NULL ORDER BY rowid",
+                batch,
+            ):
+                layer_schemas.setdefault(pack, []).append(schema)
+    except sqlite3.Error as e:
+        raise CatalogError(f"Catalog query failed: {e}") from e
+    finally:
+        con.close()
+
+    results = []
+    for row_id, manifest_path, *facets, min_x, min_y, max_x, max_y in rows:
+        result = dict(zip(("pack_id", "version", "geography", "theme", "tenant", "license", "crs", "created_at"), facets))
+        result["path"] = str(Path(manifest_path).parent)
+        result["bbox"] = None if min_x is None else [min_x, min_y, max_x, max_y]
+        result["schemas"] = sorted(set(layer_schemas.get(row_id, [])))
+        results.append(result)
+    return results
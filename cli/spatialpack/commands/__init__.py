@@ -1,5 +1,133 @@
-"""Spatialpack CLI commands."""
+"""Spatialpack CLI commands.
 
-from spatialpack.commands.validate import validate
+Command modules are imported on first use: ``LazyGroup`` resolves a
+subcommand only when it is invoked (or its own ``--help`` is shown), and the
+re-exports below are resolved through ``__getattr__``. Once a command module
+is imported its name on this package is the module (``delta``, ``query`` and
+``validate`` share a name with their command), so import commands from their
+modules where that matters.
+"""
 
-__all__ = ["validate"]
+import importlib
+from typing import Any, Optional
+
+import click
+
+# Command name -> ("module:attribute", short help shown in the group --help)
+COMMANDS: dict[str, tuple[str, str]] = {
+    "validate": (
+        "spatialpack.commands.validate:validate",
+        "Validate one or more Spatial Packs.",
+    ),
+    "bundle": (
+        "spatialpack.commands.archive:bundle",
+        "Bundle the pack at PACK_PATH into a single .spack archive.",
+    ),
+    "unbundle": (
+        "spatialpack.commands.archive:unbundle_command",
+        "Extract the .spack archive ARCHIVE_PATH into the directory DEST.",
+    ),
+    "delta": (
+        "spatialpack.commands.delta:delta",
+        "Build a delta archive that upgrades FROM_PACK to TO_PACK.",
+    ),
+    "apply-delta": (
+        "spatialpack.commands.delta:apply_delta_command",
+        "Upgrade the pack at PACK_PATH in place with the delta DELTA_PATH.",
+    ),
+    "index": (
+        "spatialpack.commands.catalog:index",
+        "Index every spatialpack.json under ROOT into a local catalog.",
+    ),
+    "search": (
+        "spatialpack.commands.catalog:search",
+        "Search the pack catalog built by 'spatialpack index'.",
+    ),
+    "h3-index": (
+        "spatialpack.commands.h3index:h3_index",
+        "Build H3 sidecar indexes for the GeoParquet layers of a pack.",
+    ),
+    "h3-lookup": (
+        "spatialpack.commands.h3index:h3_lookup",
+        "List the row groups of LAYER_ID that a cell or bbox query must read.",
+    ),
+    "policy": (
+        "spatialpack.commands.policy:policy",
+        "Evaluate layer access policies.",
+    ),
+    "query": (
+        "spatialpack.commands.query:query",
+        "Run SQL over the GeoParquet layers of PACK_PATH.",
+    ),
+    "stats": (
+        "spatialpack.commands.stats:stats",
+        "Compute raster statistics for the COG layers of a pack.",
+    ),
+    "serve": (
+        "spatialpack.commands.serve:serve",
+        "Run a long-lived validation service over HTTP.",
+    ),
+    "serve-assets": (
+        "spatialpack.commands.serve_assets:serve_assets",
+        "Serve pack files and PMTiles tiles over HTTP with range requests.",
+    ),
+}
+
+
+def _load(target: str) -> Any:
+    module_name, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+class LazyGroup(click.Group):
+    """Group whose subcommands are imported only when they are resolved.
+
+    ``lazy_commands`` maps command names to ``("module:attribute", short
+    help)``; the short help lets the group's ``--help`` list every command
+    without importing any of them.
+    """
+
+    def __init__(self, *args: Any, lazy_commands: Optional[dict[str, tuple[str, str]]] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = dict(lazy_commands or {})
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        if cmd_name not in self.commands and cmd_name in self.lazy_commands:
+            command = _load(self.lazy_commands[cmd_name][0])
+            if not isinstance(command, click.Command):
+                raise TypeError(f"{self.lazy_commands[cmd_name][0]} is not a click command")
+            self.add_command(command, cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        names = self.list_commands(ctx)
+        if not names:
+            return
+        limit = formatter.width - 6 - max(len(name) for name in names)
+        rows = []
+        for name in names:
+            command = self.commands.get(name)
+            if command is None:
+                # Truncate the listed help as click would, without importing the command
+                command = click.Command(name, short_help=self.lazy_commands[name][1])
+                rows.append((name, command.get_short_help_str(limit)))
+            elif not command.hidden:
+                rows.append((name, command.get_short_help_str(limit)))
+        with formatter.section("Commands"):
+            formatter.write_dl(rows)
+
+
+# Public re-exports: each command's function name -> "module:attribute"
+_EXPORTS = {target.partition(":")[2]: target for target, _ in COMMANDS.values()}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _EXPORTS:
+        return _load(_EXPORTS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["COMMANDS", "LazyGroup", *sorted(_EXPORTS)]
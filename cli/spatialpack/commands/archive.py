@@ -0,0 +1,106 @@
+"""
+Archive commands for spatialpack CLI.
+
+``bundle`` writes a pack directory as one ``.spack`` file: an index up
+front and uncompressed, page-aligned members that readers can mmap or range
+read in place. ``unbundle`` restores the directory. ``validate`` accepts
+``.spack`` files directly.
+"""
+
+import sys
+from pathlib import Path
+from typing import Optional
+
+import click
+from rich.console import Console
+
+from spatialpack.archive import ARCHIVE_SUFFIX, DEFAULT_ALIGNMENT, ArchiveError, bundle_pack, unbundle
+from spatialpack.commands.common import format_bytes
+
+console = Console()
+
+
+@click.command()
+@click.argument("pack_path", type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Archive path (default: <pack directory>.spack beside the pack)",
+)
+@click.option(
+    "--alignment",
+    type=click.IntRange(min=8),
+    default=DEFAULT_ALIGNMENT,
+    show_default=True,
+    help="Byte boundary each member starts on (a power of two)",
+)
+@click.option(
+    "--quiet",
+    "-q",
+    is_flag=True,
+    default=False,
+    help="Suppress output except errors",
+)
+def bundle(pack_path: Path, output: Optional[Path], alignment: int, quiet: bool) -> None:
+    """Bundle the pack at PACK_PATH into a single .spack archive.
+
+    Files are stored uncompressed at aligned offsets behind an index, so
+    layers can be memory mapped or served with range requests straight from
+    the archive. Hidden files (such as .spatialpack caches) are left out.
+    """
+    if output is None:
+        resolved = pack_path.resolve()
+        output = resolved.with_name(resolved.name + ARCHIVE_SUFFIX)
+
+    try:
+        result = bundle_pack(pack_path, output, alignment=alignment)
+    except ArchiveError as e:
+        console.print(f"[bold red]Cannot bundle pack:[/bold red] {e}")
+        sys.exit(1)
+
+    if not quiet:
+        console.print(f"[bold green]Bundled[/bold green] {pack_path} -> {output}")
+        console.print(
+            f"[dim]{result['members']} files, {format_bytes(result['payload_bytes'])} "
+            f"({format_bytes(result['bytes'])} with index and {alignment}-byte alignment) "
+            f"in {result['elapsed_ms']:.0f} ms[/dim]"
+        )
+
+
+@click.command()
+@click.argument("archive_path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.argument("dest", type=click.Path(file_okay=False, path_type=Path))
+@click.option(
+    "--verify/--no-verify",
+    default=True,
+    help="Check each file against the SHA-256 recorded when bundling",
+)
+@click.option(
+    "--quiet",
+    "-q",
+    is_flag=True,
+    default=False,
+    help="Suppress output except errors",
+)
+def unbundle_command(archive_path: Path, dest: Path, verify: bool, quiet: bool) -> None:
+    """Extract the .spack archive ARCHIVE_PATH into the directory DEST.
+
+    DEST is created if needed and must be empty.
+    """
+    if dest.exists() and any(dest.iterdir()):
+        console.print(f"[bold red]Cannot unbundle:[/bold red] {dest} is not empty")
+        sys.exit(1)
+
+    try:
+        result = unbundle(archive_path, dest, verify=verify)
+    except ArchiveError as e:
+        console.print(f"[bold red]Cannot unbundle:[/bold red] {e}")
+        sys.exit(1)
+
+    if not quiet:
+        console.print(f"[bold green]Unbundled[/bold green] {archive_path} -> {dest}")
+        console.print(
+            f"[dim]{result['members']} files, {format_bytes(result['bytes'])}"
+            f"{', verified' if verify else ''} in {result['elapsed_ms']:.0f} ms[/dim]"
+        )
@@ -0,0 +1,153 @@
+"""
+Catalog commands for spatialpack CLI.
+
+``index`` scans a directory tree of Spatial Packs into a local SQLite
+catalog; ``search`` answers bbox, layer schema and facet queries from it
+without re-reading manifests.
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from spatialpack.catalog import CatalogError, build_catalog, default_catalog_path, search_catalog
+from spatialpack.commands.common import parse_bbox
+
+console = Console()
+
+
+@click.command()
+@click.argument(
+    "root",
+    default=".",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+)
+@click.option(
+    "--index",
+    "catalog_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Catalog database (default: ROOT/.spatialpack/cache/catalog.sqlite)",
+)
+@click.option(
+    "--rebuild",
+    is_flag=True,
+    default=False,
+    help="Re-read every manifest instead of only changed ones",
+)
+@click.option(
+    "--quiet",
+    "-q",
+    is_flag=True,
+    default=False,
+    help="Suppress output except errors",
+)
+def index(root: Path, catalog_path: Optional[Path], rebuild: bool, quiet: bool) -> None:
+    """Index every spatialpack.json under ROOT into a local catalog.
+
+    Only manifests whose size or mtime changed since the last run are read.
+    """
+    result = build_catalog(root, catalog_path, rebuild=rebuild)
+
+    for error in result["errors"]:
+        console.print(f"[yellow]Skipped[/yellow] {error['path']}: {error['message']}")
+    if not quiet:
+        console.print(
+            f"[bold green]Indexed[/bold green] {result['packs']} packs "
+            f"([green]{result['added']} added[/green], {result['updated']} updated, "
+            f"{result['removed']} removed, {result['unchanged']} unchanged) "
+            f"in {result['elapsed_ms']:.0f} ms"
+        )
+        console.print(f"[dim]Catalog: {result['catalog']}[/dim]")
+
+
+@click.command()
+@click.argument(
+    "root",
+    default=".",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+)
+@click.option(
+    "--index",
+    "catalog_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Catalog database (default: ROOT/.spatialpack/cache/catalog.sqlite)",
+)
+@click.option("--bbox", callback=parse_bbox, help="Packs intersecting minX,minY,maxX,maxY")
+@click.option("--schema", "schemas", multiple=True, help="Layer schema id (repeatable; any match)")
+@click.option("--theme", help="Pack theme")
+@click.option("--geography", help="Pack geography code")
+@click.option("--license", "license_id", help="License id (e.g. CC-BY-4.0)")
+@click.option("--tenant", help="Tenant identifier")
+@click.option("--created-after", help="Earliest created_at (ISO 8601)")
+@click.option("--created-before", help="Latest created_at (ISO 8601)")
+@click.option("--limit", type=click.IntRange(min=1), help="Maximum results")
+@click.option(
+    "--json",
+    "as_json",
+    is_flag=True,
+    default=False,
+    help="Print results as JSON",
+)
+def search(
+    root: Path,
+    catalog_path: Optional[Path],
+    bbox: Optional[list[float]],
+    schemas: tuple[str, ...],
+    theme: Optional[str],
+    geography: Optional[str],
+    license_id: Optional[str],
+    tenant: Optional[str],
+    created_after: Optional[str],
+    created_before: Optional[str],
+    limit: Optional[int],
+    as_json: bool,
+) -> None:
+    """Search the pack catalog built by 'spatialpack index'."""
+    try:
+        results = search_catalog(
+            catalog_path or default_catalog_path(root),
+            bbox=bbox,
+            schemas=schemas,
+            theme=theme,
+            geography=geography,
+            license_id=license_id,
+            tenant=tenant,
+            created_after=created_after,
+            created_before=created_before,
+            limit=limit,
+        )
+    except CatalogError as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        sys.exit(1)
+
+    if as_json:
+        click.echo(json.dumps(results, indent=2))
+        return
+
+    if not results:
+        console.print("[dim]No packs match[/dim]")
+        return
+
+    table = Table(show_header=True, header_style="bold")
+    table.add_column("Pack")
+    table.add_column("Version")
+    table.add_column("Theme")
+    table.add_column("Geography")
+    table.add_column("License")
+    table.add_column("Path", style="dim")
+    for result in results:
+        table.add_row(
+            result["pack_id"] or "-",
+            result["version"] or "-",
+            result["theme"] or "-",
+            result["geography"] or "-",
+            result["license"] or "-",
+            result["path"],
+        )
+    console.print(table)
+    console.print(f"[dim]{len(results)} packs[/dim]")
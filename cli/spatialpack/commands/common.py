@@ -0,0 +1,46 @@
+"""
+Helpers shared by the spatialpack CLI commands.
+
+Keep this module light: command modules import it at the top, so anything
+it imports is loaded by every subcommand's ``--help``.
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+import click
+from rich.console import Console
+
+console = Console()
+
+
+def format_bytes(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size} B"
+
+
+def parse_bbox(ctx: click.Context, param: click.Parameter, value: Optional[str]) -> Optional[list[float]]:
+    """Click callback for a ``minX,minY,maxX,maxY`` option."""
+    if value is None:
+        return None
+    try:
+        bbox = [float(part) for part in value.split(",")]
+    except ValueError:
+        bbox = []
+    if len(bbox) != 4 or bbox[0] > bbox[2] or bbox[1] > bbox[3]:
+        raise click.BadParameter("expected minX,minY,maxX,maxY with min <= max")
+    return bbox
+
+
+def load_manifest(pack_path: Path) -> dict:
+    """Read ``spatialpack.json`` of a pack directory, exiting 1 on failure."""
+    try:
+        return json.loads((pack_path / "spatialpack.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        console.print(f"[bold red]Cannot read manifest:[/bold red] {e}")
+        sys.exit(1)
@@ -0,0 +1,173 @@
+"""
+Delta commands for spatialpack CLI.
+
+``delta`` compares two versions of a Spatial Pack with content-defined
+chunking and writes a compact delta archive plus the manifest ``deltas``
+entry that describes it. ``apply-delta`` streams such an archive onto a
+local pack in place, falling back to a full refresh when the delta exceeds
+the pack's ``delta_apply_max_bytes`` budget.
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from spatialpack.commands.common import format_bytes
+from spatialpack.delta import DELTA_SUFFIX, DeltaError, apply_delta, create_delta
+
+console = Console()
+
+
+@click.command()
+@click.argument("from_pack", type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.argument("to_pack", type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Delta archive path (default: <pack_id>-<from>-<to>.spdelta)",
+)
+@click.option(
+    "--delta-uri",
+    help="URI recorded as delta_uri in the manifest entry (default: archive file name)",
+)
+@click.option(
+    "--entry",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write the manifest deltas entry to a JSON file",
+)
+@click.option(
+    "--quiet",
+    "-q",
+    is_flag=True,
+    default=False,
+    help="Suppress output except errors",
+)
+def delta(
+    from_pack: Path,
+    to_pack: Path,
+    output: Optional[Path],
+    delta_uri: Optional[str],
+    entry: Optional[Path],
+    quiet: bool,
+) -> None:
+    """Build a delta archive that upgrades FROM_PACK to TO_PACK.
+
+    Unchanged files are carried over; changed and new files are split into
+    content-defined chunks and only chunks missing from FROM_PACK are stored.
+    The manifest deltas entry is printed (and written with --entry).
+    """
+    if output is None:
+        output = Path(_default_name(from_pack, to_pack))
+
+    try:
+        result = create_delta(from_pack, to_pack, output, delta_uri=delta_uri)
+    except DeltaError as e:
+        console.print(f"[bold red]Cannot build delta:[/bold red] {e}")
+        sys.exit(1)
+
+    if entry:
+        entry.write_text(json.dumps(result["entry"], indent=2) + "\n")
+
+    if not quiet:
+        _print_result(output, result)
+        if entry:
+            console.print(f"\n[dim]Manifest entry written to: {entry}[/dim]")
+
+
+@click.command("apply-delta")
+@click.argument("pack_path", type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.argument("delta_path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option(
+    "--max-bytes",
+    type=click.IntRange(min=0),
+    help="Delta size budget (default: client_hints.delta_apply_max_bytes from the pack)",
+)
+@click.option(
+    "--refresh-from",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help="Full copy of the new pack version, used when the delta is over budget",
+)
+@click.option(
+    "--quiet",
+    "-q",
+    is_flag=True,
+    default=False,
+    help="Suppress output except errors",
+)
+def apply_delta_command(
+    pack_path: Path,
+    delta_path: Path,
+    max_bytes: Optional[int],
+    refresh_from: Optional[Path],
+    quiet: bool,
+) -> None:
+    """Upgrade the pack at PACK_PATH in place with the delta DELTA_PATH.
+
+    New file versions are streamed to temp files, verified against the
+    delta and integrity.asset_hashes, then renamed into place; on any
+    failure the pack is left unchanged.
+    """
+    try:
+        result = apply_delta(pack_path, delta_path, max_bytes=max_bytes, refresh_from=refresh_from)
+    except (DeltaError, OSError) as e:
+        console.print(f"[bold red]Cannot apply delta:[/bold red] {e}")
+        sys.exit(1)
+
+    if not quiet:
+        if result["recovered"]:
+            console.print("[yellow]Finished an interrupted update before applying this one[/yellow]")
+        mode = "full refresh" if result["mode"] == "refresh" else "delta"
+        console.print(
+            f"[bold green]Updated[/bold green] {pack_path}: "
+            f"{result['from_version']} -> {result['to_version']} ({mode})"
+        )
+        console.print(
+            f"[dim]{result['files_written']} files written ({format_bytes(result['bytes_written'])}), "
+            f"{result['files_deleted']} deleted; delta {format_bytes(result['delta_bytes'])}"
+            + (f" of {format_bytes(result['budget'])} budget" if result["budget"] is not None else "")
+            + "[/dim]"
+        )
+
+
+def _default_name(from_pack: Path, to_pack: Path) -> str:
+    """``<pack_id>-<from_version>-<to_version>.spdelta`` from the manifests."""
+    def field(pack: Path, key: str) -> str:
+        try:
+            return str(json.loads((pack / "spatialpack.json").read_text(encoding="utf-8")).get(key) or key)
+        except (OSError, ValueError):
+            return key
+
+    return f"{field(to_pack, 'pack_id')}-{field(from_pack, 'version')}-{field(to_pack, 'version')}{DELTA_SUFFIX}"
+
+
+def _print_result(output: Path, result: dict) -> None:
+    """Print a delta summary and the manifest entry."""
+    stats, entry = result["stats"], result["entry"]
+
+    console.print()
+    console.print(f"[bold]Delta:[/bold] {output}")
+    console.print(f"[dim]{entry['from_version']} -> {entry['to_version']}[/dim]")
+    console.print()
+
+    table = Table(show_header=True, header_style="bold")
+    table.add_column("Metric")
+    table.add_column("Value", justify="right")
+    table.add_row("Files kept", str(stats["files_kept"]))
+    table.add_row("Files added", str(stats["files_added"]))
+    table.add_row("Files updated", str(stats["files_updated"]))
+    table.add_row("Files deleted", str(stats["files_deleted"]))
+    table.add_row("Bytes reused from base", format_bytes(stats["copied_bytes"]))
+    table.add_row("New bytes", format_bytes(stats["literal_bytes"]))
+    table.add_row("Delta size", format_bytes(entry["size_bytes"]))
+    if stats["target_bytes"]:
+        table.add_row("Delta / full pack", f"{entry['size_bytes'] / stats['target_bytes']:.2%}")
+    console.print(table)
+
+    console.print("\n[bold]Manifest deltas entry:[/bold]")
+    console.print_json(json.dumps(entry))
@@ -0,0 +1,160 @@
+"""
+H3 index commands for spatialpack CLI.
+
+``h3-index`` builds a sidecar of covering H3 cells per row group for every
+GeoParquet layer that declares ``index.h3_res``; ``h3-lookup`` uses it to
+list only the row groups a cell- or bbox-scoped query has to read.
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from spatialpack.commands.common import format_bytes, load_manifest, parse_bbox
+
+console = Console()
+
+
+@click.command("h3-index")
+@click.argument("pack_path", type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.option("--layer", "layer_ids", multiple=True, help="Only index these layer ids (repeatable)")
+@click.option(
+    "--quiet",
+    "-q",
+    is_flag=True,
+    default=False,
+    help="Suppress output except errors",
+)
+def h3_index(pack_path: Path, layer_ids: tuple[str, ...], quiet: bool) -> None:
+    """Build H3 sidecar indexes for the GeoParquet layers of a pack.
+
+    Every layer with a local parquet file and index.h3_res gets
+    index/<layer_id>.h3idx listing the cells each row group covers.
+    """
+    import duckdb
+
+    from spatialpack.h3index import H3IndexError, build_layer_index, sidecar_path
+
+    manifest = load_manifest(pack_path)
+    layers = [
+        layer for layer in manifest.get("layers", [])
+        if isinstance(layer, dict)
+        and (not layer_ids or layer.get("id") in layer_ids)
+        and isinstance((layer.get("index") or {}).get("h3_res"), int)
+        and str(layer.get("parquet", "")).startswith("./")
+    ]
+    if not layers:
+        console.print("[yellow]No local GeoParquet layers declare index.h3_res[/yellow]")
+        sys.exit(1)
+
+    table = Table(show_header=True, header_style="bold")
+    for column in ("Layer", "Res", "Rows", "Row groups", "Cells", "Coarse", "Sidecar"):
+        table.add_column(column, justify="left" if column == "Layer" else "right")
+
+    failed = False
+    con = duckdb.connect()
+    for layer in layers:
+        try:
+            stats = build_layer_index(
+                pack_path / layer["parquet"][2:],
+                layer["index"]["h3_res"],
+                sidecar_path(pack_path, layer["id"]),
+                layer_id=layer["id"],
+                con=con,
+                root=pack_path,
+            )
+        except (H3IndexError, duckdb.Error, RuntimeError) as e:
+            console.print(f"[bold red]{layer['id']}:[/bold red] {e}")
+            failed = True
+            continue
+        table.add_row(
+            layer["id"],
+            str(layer["index"]["h3_res"]),
+            f"{stats['rows']:,}",
+            str(stats["row_groups"]),
+            f"{stats['cells']:,}",
+            str(stats["coarse_row_groups"]),
+            format_bytes(stats["sidecar_bytes"]),
+        )
+    con.close()
+
+    if not quiet and table.row_count:
+        console.print(table)
+    sys.exit(1 if failed else 0)
+
+
+@click.command("h3-lookup")
+@click.argument("pack_path", type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.argument("layer_id")
+@click.option("--cell", "cells", multiple=True, help="H3 cell at any resolution (repeatable)")
+@click.option("--bbox", callback=parse_bbox, help="Lon/lat bbox minX,minY,maxX,maxY")
+@click.option(
+    "--packet-scope",
+    is_flag=True,
+    default=False,
+    help="Use the cells in the manifest's CSP-1 packet_scope.h3",
+)
+@click.option(
+    "--json",
+    "as_json",
+    is_flag=True,
+    default=False,
+    help="Print the matching row groups as JSON",
+)
+def h3_lookup(
+    pack_path: Path,
+    layer_id: str,
+    cells: tuple[str, ...],
+    bbox: Optional[list[float]],
+    packet_scope: bool,
+    as_json: bool,
+) -> None:
+    """List the row groups of LAYER_ID that a cell or bbox query must read."""
+    from spatialpack.h3index import H3Index, H3IndexError, packet_scope_cells, sidecar_path
+
+    cells = list(cells)
+    if packet_scope:
+        cells.extend(packet_scope_cells(load_manifest(pack_path)))
+    if not cells and bbox is None:
+        raise click.UsageError("Give --cell, --bbox or --packet-scope")
+
+    try:
+        index = H3Index.load(sidecar_path(pack_path, layer_id), root=pack_path)
+        row_groups = index.lookup_cells(cells) if cells else index.lookup_bbox(bbox)
+        if cells and bbox is not None:
+            in_bbox = {id(group) for group in index.lookup_bbox(bbox)}
+            row_groups = [group for group in row_groups if id(group) in in_bbox]
+    except (H3IndexError, RuntimeError, ValueError) as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        sys.exit(1)
+
+    if as_json:
+        click.echo(json.dumps(row_groups, indent=2))
+        return
+
+    if index.stale:
+        console.print("[yellow]Warning:[/yellow] layer changed since the index was built; run h3-index")
+    total = sum(group["bytes"] for group in index.row_groups)
+    selected = sum(group["bytes"] for group in row_groups)
+    table = Table(show_header=True, header_style="bold")
+    for column in ("File", "Row group", "Rows", "Offset", "Bytes"):
+        table.add_column(column, justify="left" if column == "File" else "right")
+    for group in row_groups:
+        table.add_row(
+            Path(group["file"]).name,
+            str(group["row_group"]),
+            f"{group['row_start']:,}+{group['num_rows']:,}",
+            str(group["offset"]),
+            format_bytes(group["bytes"]),
+        )
+    console.print(table)
+    console.print(
+        f"[dim]{len(row_groups)} of {len(index.row_groups)} row groups, "
+        f"{format_bytes(selected)} of {format_bytes(total)} "
+        f"({(1 - selected / total) if total else 0:.0%} pruned)[/dim]"
+    )
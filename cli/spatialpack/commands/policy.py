@@ -0,0 +1,114 @@
+"""
+Policy commands for spatialpack CLI.
+
+``policy check`` compiles a pack's policy.json against its manifest with
+``spatialpack.policy.PolicyEngine`` and prints the resulting access
+decisions.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from spatialpack.policy import ANONYMOUS, OTHER_TENANT, PolicyEngine, PolicyError, parse_principal
+
+console = Console()
+
+
+@click.group()
+def policy() -> None:
+    """Evaluate layer access policies."""
+
+
+@policy.command()
+@click.argument("pack_path", type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.option(
+    "--principal",
+    "-p",
+    "principals",
+    multiple=True,
+    help="tenant:role, or 'anonymous' (repeatable; default: every principal class)",
+)
+@click.option("--layer", "-l", "layer_ids", multiple=True, help="Layer id (repeatable; default: every layer)")
+@click.option(
+    "--json",
+    "as_json",
+    is_flag=True,
+    default=False,
+    help="Print decisions as JSON",
+)
+def check(pack_path: Path, principals: tuple[str, ...], layer_ids: tuple[str, ...], as_json: bool) -> None:
+    """Show which principals may read which layers of PACK_PATH.
+
+    With one --principal and one --layer, prints that decision and its
+    reason, and exits with status 1 if access is denied.
+    """
+    try:
+        for principal in principals:
+            parse_principal(principal)
+        engine = PolicyEngine.from_pack(pack_path)
+    except PolicyError as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        sys.exit(1)
+
+    for layer_id in layer_ids:
+        if layer_id not in engine.layers:
+            console.print(f"[bold red]Unknown layer: {layer_id}[/bold red]")
+            sys.exit(1)
+    matrix = engine.matrix(
+        [None if p == ANONYMOUS else p for p in principals] or None,
+        layer_ids or None,
+    )
+
+    if as_json:
+        payload = {
+            **engine.summary(),
+            "issues": engine.issues,
+            "matrix": {
+                principal: {layer_id: d._asdict() for layer_id, d in row.items()}
+                for principal, row in matrix.items()
+            },
+        }
+        click.echo(json.dumps(payload, indent=2))
+    elif len(principals) == 1 and len(layer_ids) == 1:
+        decision = matrix[principals[0]][layer_ids[0]]
+        verdict = "[green]allow[/green]" if decision.allow else "[red]deny[/red]"
+        rule = f" [dim]({decision.rule})[/dim]" if decision.rule else ""
+        console.print(f"{verdict} {principals[0]} -> {layer_ids[0]}: {decision.reason}{rule}")
+    else:
+        table = Table(show_header=True, header_style="bold")
+        table.add_column("Layer")
+        table.add_column("Visibility")
+        table.add_column("Min role")
+        table.add_column("Allowed")
+        table.add_column("Rule", style="dim")
+        for layer_id in layer_ids or engine.layers:
+            layer = engine.layers[layer_id]
+            allowed = [principal for principal, row in matrix.items() if row[layer_id].allow]
+            if len(allowed) == len(matrix):
+                allowed = ["all"]
+            table.add_row(
+                layer_id,
+                layer["visibility"],
+                layer["min_role"] or "-",
+                ", ".join(allowed) or "[red]none[/red]",
+                layer["source"],
+            )
+        console.print(table)
+        if not principals:
+            console.print(
+                f"[dim]{OTHER_TENANT}:ROLE stands for every tenant the policy and manifest do not name[/dim]"
+            )
+
+    if not as_json:
+        for issue in engine.issues:
+            console.print(f"[yellow]Warning: {issue}[/yellow]")
+        if engine.expired:
+            console.print("[yellow]Warning: policy has expired; every request is denied[/yellow]")
+
+    if len(principals) == 1 and len(layer_ids) == 1 and not matrix[principals[0]][layer_ids[0]].allow:
+        sys.exit(1)
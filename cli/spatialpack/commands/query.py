@@ -0,0 +1,155 @@
+"""
+Query command for spatialpack CLI.
+
+Runs SQL over the GeoParquet layers of a pack, each exposed as a view named
+after its layer ``id``, with optional bbox / H3 scoping that prunes row
+groups before they are read.
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from spatialpack.commands.common import format_bytes, load_manifest, parse_bbox
+
+console = Console()
+err_console = Console(stderr=True)
+
+# spatialpack.query.OUTPUT_FORMATS, spelled out so --help does not load DuckDB
+OUTPUT_FORMATS = ("csv", "parquet", "arrow")
+
+
+def _print_stats(stats: dict) -> None:
+    for layer_id, layer in stats["layers"].items():
+        pruned_by = f" ({', '.join(layer['pruned_by'])})" if layer["pruned_by"] else ""
+        skipped = layer["bytes_skipped"] / layer["bytes"] if layer["bytes"] else 0
+        err_console.print(
+            f"[dim]{layer_id}: {layer['row_groups_read']} of {layer['row_groups']} row groups{pruned_by}, "
+            f"scanned {format_bytes(layer['bytes_scanned'])}, "
+            f"skipped {format_bytes(layer['bytes_skipped'])} ({skipped:.0%})[/dim]"
+        )
+    rows = f"{stats['rows']:,} rows" if stats["rows"] is not None else "done"
+    read = f", read {format_bytes(stats['bytes_read'])}" if stats["bytes_read"] is not None else ""
+    err_console.print(
+        f"[dim]{rows}{read}, skipped {format_bytes(stats['bytes_skipped'])} "
+        f"in {stats['elapsed_ms']:.0f} ms[/dim]"
+    )
+
+
+@click.command()
+@click.argument("pack_path", type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.argument("sql", nargs=-1, required=True)
+@click.option("--bbox", callback=parse_bbox, help="Only rows intersecting lon/lat minX,minY,maxX,maxY")
+@click.option("--cell", "cells", multiple=True, help="Only row groups covering this H3 cell (repeatable)")
+@click.option(
+    "--packet-scope",
+    is_flag=True,
+    default=False,
+    help="Scope to the cells in the manifest's CSP-1 packet_scope.h3",
+)
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(("table",) + OUTPUT_FORMATS),
+    default="table",
+    show_default=True,
+    help="Result format",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write results to this file (required for parquet)",
+)
+@click.option(
+    "--max-rows",
+    type=click.IntRange(min=1),
+    default=20,
+    show_default=True,
+    help="Rows shown in table format",
+)
+@click.option(
+    "--quiet",
+    "-q",
+    is_flag=True,
+    default=False,
+    help="Suppress output except errors",
+)
+def query(
+    pack_path: Path,
+    sql: tuple[str, ...],
+    bbox: Optional[list[float]],
+    cells: tuple[str, ...],
+    packet_scope: bool,
+    fmt: str,
+    output: Optional[Path],
+    max_rows: int,
+    quiet: bool,
+) -> None:
+    """Run SQL over the GeoParquet layers of PACK_PATH.
+
+    Each layer is a view named after its id (quote ids with hyphens, or use
+    the underscore alias). Several SQL arguments run in order on one
+    connection. Scan statistics are printed to stderr.
+    """
+    import duckdb
+
+    from spatialpack.h3index import H3IndexError, packet_scope_cells
+    from spatialpack.query import PackQuery, QueryError
+
+    cells = list(cells)
+    manifest = load_manifest(pack_path)
+    if packet_scope:
+        cells.extend(packet_scope_cells(manifest))
+        if not cells:
+            raise click.UsageError("Manifest has no packet_scope.h3 cells")
+    if output is not None and len(sql) > 1:
+        raise click.UsageError("--output takes a single SQL statement")
+    if fmt == "parquet" and output is None:
+        raise click.UsageError("--format parquet needs --output")
+    if fmt == "csv" and output is None:
+        if os.name != "posix":
+            raise click.UsageError("--format csv needs --output on this platform")
+        output = Path("/dev/stdout")
+
+    try:
+        session = PackQuery(pack_path, manifest)
+    except QueryError as e:
+        err_console.print(f"[bold red]{e}[/bold red]")
+        sys.exit(1)
+
+    warned = 0
+    with session:
+        for statement in sql:
+            try:
+                if fmt == "table":
+                    columns, rows, stats = session.execute(statement, bbox=bbox, cells=cells, max_rows=max_rows + 1)
+                elif fmt == "arrow" and output is None:
+                    stats = session.export(statement, sys.stdout.buffer, fmt, bbox=bbox, cells=cells)
+                else:
+                    sys.stdout.flush()
+                    stats = session.export(statement, output, fmt, bbox=bbox, cells=cells)
+            except (QueryError, H3IndexError, RuntimeError, duckdb.Error) as e:
+                err_console.print(f"[bold red]{e}[/bold red]")
+                sys.exit(1)
+
+            if fmt == "table":
+                table = Table(show_header=True, header_style="bold")
+                for column in columns:
+                    table.add_column(column)
+                for row in rows[:max_rows]:
+                    table.add_row(*("NULL" if value is None else str(value) for value in row))
+                console.print(table)
+                if len(rows) > max_rows:
+                    stats["rows"] = None
+                    err_console.print(f"[dim]Showing the first {max_rows} rows[/dim]")
+            if not quiet:
+                for warning in session.warnings[warned:]:
+                    err_console.print(f"[yellow]Warning:[/yellow] {warning}")
+                warned = len(session.warnings)
+                _print_stats(stats)
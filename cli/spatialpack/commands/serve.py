@@ -0,0 +1,99 @@
+"""
+Serve command for spatialpack CLI.
+
+Runs the validation service in ``spatialpack.server``: ``POST /validate``
+with warm schema, digest and DuckDB caches, plus ``/health`` and
+``/metrics``.
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+import click
+from rich.console import Console
+
+from spatialpack.server import MAX_BODY_BYTES, ValidationServer
+
+console = Console()
+
+
+@click.command()
+@click.option(
+    "--root",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=".",
+    show_default=True,
+    help="Directory that ?pack= paths resolve against; packs outside it are refused",
+)
+@click.option("--host", default="127.0.0.1", show_default=True, help="Address to bind")
+@click.option("--port", type=click.IntRange(0, 65535), default=8750, show_default=True, help="Port to bind")
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Validation processes (default: CPUs, up to 4; 0 = a thread in the server)",
+)
+@click.option(
+    "--max-pending",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Validations queued or running before requests get 503 (default: 4 per worker)",
+)
+@click.option(
+    "--max-body",
+    type=click.IntRange(min=1),
+    default=MAX_BODY_BYTES,
+    show_default=True,
+    help="Largest manifest body accepted, in bytes",
+)
+@click.option(
+    "--quiet",
+    "-q",
+    is_flag=True,
+    default=False,
+    help="Suppress output except errors",
+)
+def serve(
+    root: Path,
+    host: str,
+    port: int,
+    workers: Optional[int],
+    max_pending: Optional[int],
+    max_body: int,
+    quiet: bool,
+) -> None:
+    """Run a long-lived validation service over HTTP.
+
+    POST /validate?pack=DIR validates a pack under --root; POST /validate
+    with a JSON body validates that manifest. Query flags: strict, deep,
+    verify_hashes, cache, max_errors. GET /metrics exposes latency
+    histograms for Prometheus.
+    """
+    if workers is None:
+        workers = min(4, os.cpu_count() or 1)
+    server = ValidationServer(root, workers=workers, max_pending=max_pending, max_body=max_body)
+    try:
+        server.start_pool()
+    except Exception as e:
+        console.print(f"[bold red]Cannot start validation workers: {e}[/bold red]")
+        sys.exit(1)
+
+    if not quiet:
+        pool = f"{workers} worker process(es)" if workers else "an in-process thread"
+        console.print(f"[bold]Serving validation[/bold] on http://{host}:{port} with {pool}")
+        console.print(f"[dim]Root: {server.root}  (POST /validate, GET /health, GET /metrics)[/dim]")
+    try:
+        asyncio.run(server.serve(host, port))
+    except OSError as e:
+        console.print(f"[bold red]Cannot listen on {host}:{port}: {e}[/bold red]")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    if not quiet:
+        console.print("[dim]Stopped[/dim]")
@@ -0,0 +1,118 @@
+"""
+Serve-assets command for spatialpack CLI.
+
+Runs ``spatialpack.assetserver.AssetServer``: range requests over sendfile,
+manifest-hash ETags and ``/<archive>.pmtiles/{z}/{x}/{y}`` tiles, for
+serving packs and the offline demo without Node.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from typing import Optional
+
+import click
+from rich.console import Console
+
+from spatialpack.assetserver import DIRECTORY_CACHE_SIZE, AssetServer
+from spatialpack.commands.common import format_bytes
+from spatialpack.ratelimit import RateLimiter, RateLimitError, default_ledger_path
+
+console = Console()
+
+
+@click.command("serve-assets")
+@click.option(
+    "--root",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=".",
+    show_default=True,
+    help="Directory to serve (packs under it supply ETags and rate limits)",
+)
+@click.option("--host", default="127.0.0.1", show_default=True, help="Address to bind")
+@click.option("--port", type=click.IntRange(0, 65535), default=8751, show_default=True, help="Port to bind")
+@click.option(
+    "--directory-cache",
+    type=click.IntRange(min=1),
+    default=DIRECTORY_CACHE_SIZE,
+    show_default=True,
+    help="PMTiles headers and directories kept in memory",
+)
+@click.option(
+    "--rate-limit",
+    is_flag=True,
+    default=False,
+    help="Enforce each pack's policy.json rate limits per X-Spatialpack-Tenant",
+)
+@click.option(
+    "--ledger",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Usage ledger for --rate-limit (default: ROOT/.spatialpack/usage.sqlite)",
+)
+@click.option("--cors", is_flag=True, default=False, help="Allow cross-origin requests from any site")
+@click.option(
+    "--quiet",
+    "-q",
+    is_flag=True,
+    default=False,
+    help="Suppress output except errors",
+)
+def serve_assets(
+    root: Path,
+    host: str,
+    port: int,
+    directory_cache: int,
+    rate_limit: bool,
+    ledger: Optional[Path],
+    cors: bool,
+    quiet: bool,
+) -> None:
+    """Serve pack files and PMTiles tiles over HTTP with range requests.
+
+    Files under --root are served with byte ranges and ETags (from
+    integrity.asset_hashes where available). GET /<archive>.pmtiles/Z/X/Y
+    returns a single tile.
+    """
+    limiter = None
+    if rate_limit:
+        try:
+            limiter = RateLimiter(ledger or default_ledger_path(root))
+        except RateLimitError as e:
+            console.print(f"[bold red]{e}[/bold red]")
+            sys.exit(1)
+    server = AssetServer(root, directory_cache=directory_cache, limiter=limiter, cors=cors)
+    if limiter is not None:
+        for pack_dir in server.packs:
+            try:
+                limiter.add_pack(pack_dir)
+            except RateLimitError as e:
+                if not quiet:
+                    console.print(f"[yellow]Warning: no rate limits for {pack_dir}: {e}[/yellow]")
+        limiter.start()
+
+    if not quiet:
+        console.print(f"[bold]Serving assets[/bold] on http://{host}:{port}")
+        console.print(
+            f"[dim]Root: {server.root}  ({len(server.packs)} packs, {server.hashed_assets} hashed assets"
+            f"{', rate limited' if limiter else ''})[/dim]"
+        )
+    try:
+        asyncio.run(server.serve(host, port))
+    except OSError as e:
+        console.print(f"[bold red]Cannot listen on {host}:{port}: {e}[/bold red]")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if limiter is not None:
+            limiter.close()
+    if not quiet:
+        stats = server.stats
+        cache = server.directories
+        lookups = cache.hits + cache.misses
+        console.print(
+            f"[dim]Stopped after {stats['requests']} requests, {format_bytes(stats['bytes_sent'])} sent, "
+            f"{stats['tiles']} tiles (directory cache hit rate "
+            f"{cache.hits / lookups if lookups else 0:.0%})[/dim]"
+        )
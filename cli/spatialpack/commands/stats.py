@@ -0,0 +1,193 @@
+"""
+Raster statistics command for spatialpack CLI.
+
+``stats`` streams the COG of every local raster layer and writes exact
+min/max/mean (and optionally a histogram and percentiles) into the layer's
+``raster_stats`` in spatialpack.json.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from spatialpack.commands.common import format_bytes
+
+console = Console()
+
+
+def _parse_percentiles(ctx: click.Context, param: click.Parameter, value: Optional[str]) -> tuple[float, ...]:
+    if not value:
+        return ()
+    try:
+        percentiles = tuple(float(part) for part in value.split(","))
+    except ValueError:
+        raise click.BadParameter("Expected comma-separated numbers, e.g. 2,50,98")
+    if any(not 0 <= p <= 100 for p in percentiles):
+        raise click.BadParameter("Percentiles must be between 0 and 100")
+    return percentiles
+
+
+def _file_nodata(location: Path, overview: int) -> Optional[float]:
+    """GDAL_NODATA of the GeoTIFF, or None (also when it cannot be read yet)."""
+    from spatialpack.validators.cog import TIFFError, read_block_layout
+    from spatialpack.validators.ranges import RangeSource
+
+    try:
+        with RangeSource(location) as source:
+            return read_block_layout(source, overview)["nodata"]
+    except (TIFFError, OSError):
+        return None
+
+
+def _format_value(value: Optional[float]) -> str:
+    if value is None:
+        return "-"
+    return f"{value:,}" if isinstance(value, int) else f"{value:,.6g}"
+
+
+@click.command()
+@click.argument("pack_path", type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.option("--layer", "-l", "layer_ids", multiple=True, help="Only these layer ids (repeatable)")
+@click.option("--band", type=click.IntRange(min=1), default=1, show_default=True, help="Band to summarize")
+@click.option(
+    "--overview",
+    type=click.IntRange(min=0),
+    default=0,
+    help="Read overview N instead of full resolution (approximate; implies --dry-run)",
+)
+@click.option("--nodata", type=float, help="Nodata value (default: GeoTIFF nodata, then raster_stats.nodata)")
+@click.option("--histogram", "histogram_bins", type=click.IntRange(min=1), help="Also compute a BINS-bin histogram")
+@click.option(
+    "--percentiles",
+    callback=_parse_percentiles,
+    help="Also estimate these percentiles, e.g. 2,50,98",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Worker processes per layer (0 = one per CPU)",
+)
+@click.option("--dry-run", is_flag=True, default=False, help="Print statistics without updating spatialpack.json")
+@click.option("--json", "as_json", is_flag=True, default=False, help="Print the statistics as JSON")
+@click.option(
+    "--quiet",
+    "-q",
+    is_flag=True,
+    default=False,
+    help="Suppress output except errors",
+)
+def stats(
+    pack_path: Path,
+    layer_ids: tuple[str, ...],
+    band: int,
+    overview: int,
+    nodata: Optional[float],
+    histogram_bins: Optional[int],
+    percentiles: tuple[float, ...],
+    jobs: int,
+    dry_run: bool,
+    as_json: bool,
+    quiet: bool,
+) -> None:
+    """Compute raster statistics for the COG layers of a pack.
+
+    Each local COG is read one tile at a time, so memory stays flat however
+    large the raster. Results replace min, max and mean (and histogram and
+    percentiles when asked for) in each layer's raster_stats.
+    """
+    # NumPy (when installed) loads with the reader, not with --help
+    from spatialpack.rasterstats import RasterStatsError, compute_raster_stats, raster_stats_entry
+
+    manifest_path = pack_path / "spatialpack.json"
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        console.print(f"[bold red]Cannot read manifest:[/bold red] {e}")
+        sys.exit(1)
+    layers = [
+        layer for layer in manifest.get("layers", [])
+        if isinstance(layer, dict)
+        and (not layer_ids or layer.get("id") in layer_ids)
+        and str(layer.get("cog", "")).startswith("./")
+    ]
+    if not layers:
+        console.print("[yellow]No layers with a local COG[/yellow]")
+        sys.exit(1)
+
+    table = Table(show_header=True, header_style="bold")
+    columns = ["Layer", "Valid pixels", "Min", "Max", "Mean"]
+    columns += [f"p{p:g}" for p in percentiles] + ["Read", "Time"]
+    for column in columns:
+        table.add_column(column, justify="left" if column == "Layer" else "right")
+
+    failed = False
+    results = {}
+    for layer in layers:
+        declared = layer.get("raster_stats") if isinstance(layer.get("raster_stats"), dict) else {}
+        location = pack_path / layer["cog"][2:]
+        layer_nodata = nodata
+        if layer_nodata is None and _file_nodata(location, overview) is None:
+            # The GeoTIFF declares no nodata; fall back to the manifest's
+            declared_nodata = declared.get("nodata")
+            if isinstance(declared_nodata, (int, float)) and not isinstance(declared_nodata, bool):
+                layer_nodata = declared_nodata
+        try:
+            result = compute_raster_stats(
+                location,
+                band=band,
+                overview=overview,
+                nodata=layer_nodata,
+                histogram_bins=histogram_bins,
+                percentiles=percentiles,
+                jobs=jobs,
+            )
+        except RasterStatsError as e:
+            console.print(f"[bold red]{layer['id']}:[/bold red] {e}")
+            failed = True
+            continue
+        results[layer["id"]] = result
+        if not result["valid_pixels"]:
+            console.print(f"[bold red]{layer['id']}:[/bold red] every pixel of band {band} is nodata")
+            failed = True
+            continue
+        if not dry_run and not overview:
+            layer["raster_stats"] = raster_stats_entry(result, declared)
+        table.add_row(
+            layer["id"],
+            f"{result['valid_pixels']:,} / {result['pixels']:,}",
+            _format_value(result["min"]),
+            _format_value(result["max"]),
+            _format_value(result["mean"]),
+            *(_format_value(result["percentiles"][f"p{p:g}"]) for p in percentiles),
+            format_bytes(result["bytes_read"]),
+            f"{result['elapsed_ms'] / 1000:.2f} s",
+        )
+
+    written = bool(table.row_count) and not dry_run and not overview
+    if written:
+        tmp_path = manifest_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            tmp_path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+            os.replace(tmp_path, manifest_path)
+        except OSError as e:
+            console.print(f"[bold red]Cannot write manifest:[/bold red] {e}")
+            sys.exit(1)
+
+    if as_json:
+        click.echo(json.dumps(results, indent=2))
+    elif not quiet and table.row_count:
+        console.print(table)
+        if overview:
+            console.print(f"[dim]Overview {overview} statistics are approximate; manifest not updated[/dim]")
+        elif written:
+            console.print(f"[dim]Updated raster_stats in {manifest_path}[/dim]")
+    sys.exit(1 if failed else 0)
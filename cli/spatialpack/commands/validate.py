@@ -1,30 +1,41 @@
 """
 Validate command for spatialpack CLI.
 
-Validates a Spatial Pack against the JSON Schema and checks for:
+Validates one or more Spatial Packs against the JSON Schema and checks for:
 - Manifest structure and required fields
 - Layer file existence
 - Integrity hash verification (if present)
+
+Many packs can be validated in one run, optionally across a process pool,
+producing a single aggregated conformance report.
 """
 
 import json
+import os
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 from uuid import uuid4
 
 import click
-from rich.console import Console
+from rich.console import Console, Group
 from rich.table import Table
 
-from spatialpack.validators.manifest import ManifestValidator
+from spatialpack import __version__
+from spatialpack.profiling import profile_to
 
 console = Console()
 
 
 @click.command()
-@click.argument("pack_path", type=click.Path(exists=True, path_type=Path))
+@click.argument(
+    "pack_paths",
+    nargs=-1,
+    required=True,
+    type=click.Path(path_type=Path),
+)
 @click.option(
     "--strict",
     is_flag=True,
@@ -44,29 +55,191 @@ console = Console()
     default=False,
     help="Suppress output except errors",
 )
+@click.option(
+    "--verify-hashes",
+    is_flag=True,
+    default=False,
+    help="Hash asset files and check them against integrity.asset_hashes",
+)
+@click.option(
+    "--deep",
+    is_flag=True,
+    default=False,
+    help="Inspect layer files: GeoParquet footers, PMTiles headers and directories, COG IFDs",
+)
+@click.option(
+    "--max-errors",
+    type=click.IntRange(min=0),
+    default=50,
+    show_default=True,
+    help="Maximum schema errors reported per pack (0 = unlimited)",
+)
+@click.option(
+    "--cache/--no-cache",
+    "use_cache",
+    default=False,
+    help="Reuse results for unchanged packs from .spatialpack/cache",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Worker processes for batch validation (0 = one per CPU)",
+)
+@click.option(
+    "--profile",
+    "profile_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write a cProfile (pstats) trace of the run to this file",
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    default=False,
+    help="Re-validate what changed whenever pack files are written",
+)
+@click.option(
+    "--poll",
+    is_flag=True,
+    default=False,
+    help="With --watch, poll file stats instead of using inotify",
+)
+@click.option(
+    "--debounce",
+    type=click.FloatRange(min=0),
+    default=0.3,
+    show_default=True,
+    help="With --watch, seconds of quiet before re-validating a burst of writes",
+)
 def validate(
-    pack_path: Path,
+    pack_paths: tuple[Path, ...],
     strict: bool,
     output: Optional[Path],
     quiet: bool,
+    verify_hashes: bool,
+    deep: bool,
+    max_errors: int,
+    use_cache: bool,
+    jobs: int,
+    profile_path: Optional[Path],
+    watch: bool,
+    poll: bool,
+    debounce: float,
 ) -> None:
-    """Validate a Spatial Pack.
+    """Validate one or more Spatial Packs.
 
-    PACK_PATH is the path to the pack directory containing spatialpack.json.
+    PACK_PATHS are pack directories containing spatialpack.json, .spack
+    archives, directory trees to search for packs, or glob patterns
+    (e.g. 'packs/*').
     """
-    run_id = str(uuid4())[:8]
-    start_time = datetime.utcnow()
+    packs = _discover_packs(pack_paths)
+    if not packs:
+        console.print("[bold red]No packs found[/bold red] (looked for spatialpack.json)")
+        sys.exit(1)
 
-    # Initialize validator
-    validator = ManifestValidator(pack_path)
+    # Keyword arguments passed through to ManifestValidator
+    options = {
+        "verify_hashes": verify_hashes,
+        "deep": deep,
+        "max_errors": max_errors or None,
+        "use_cache": use_cache,
+    }
+
+    if watch:
+        if len(packs) != 1:
+            raise click.UsageError("--watch takes a single pack")
+        if packs[0].is_file():
+            raise click.UsageError("--watch takes a pack directory, not an archive")
+        if profile_path is not None:
+            raise click.UsageError("--watch cannot be combined with --profile")
+        report = _watch(packs[0], strict, quiet, output, options, poll, debounce)
+        sys.exit(1 if report["status"] == "fail" else 0)
+
+    if profile_path is not None and jobs != 1 and len(packs) > 1:
+        # cProfile only sees this process
+        if not quiet:
+            console.print("[dim]--profile runs the batch in a single process[/dim]")
+        jobs = 1
+
+    with profile_to(profile_path):
+        if len(packs) == 1:
+            report = _validate_single(packs[0], strict, quiet, options)
+        else:
+            report = _validate_batch(packs, strict, quiet, jobs, options)
+
+    if profile_path is not None and not quiet:
+        _print_timings(report["timings"]["rules"])
+        console.print(f"[dim]Profile written to: {profile_path} (python -m pstats {profile_path})[/dim]")
+
+    # Write report if requested
+    if output:
+        output.write_text(json.dumps(report, indent=2))
+        if not quiet:
+            console.print(f"\n[dim]Report written to: {output}[/dim]")
+
+    # Exit with appropriate code
+    sys.exit(1 if report["status"] == "fail" else 0)
 
-    if not quiet:
-        console.print(f"[bold]Validating pack:[/bold] {pack_path}")
-        console.print(f"[dim]Run ID: {run_id}[/dim]\n")
+
+def _discover_packs(pack_paths: tuple[Path, ...]) -> list[Path]:
+    """Expand CLI arguments into a sorted, de-duplicated list of pack paths.
+
+    A directory containing spatialpack.json is a pack; any other directory is
+    searched recursively for packs. A ``.spack`` archive named directly (or
+    matched by a glob) is validated in place. Arguments that do not exist are
+    treated as glob patterns relative to the current directory.
+    """
+    from spatialpack.archive import ARCHIVE_SUFFIX
+
+    candidates: list[Path] = []
+    for pack_path in pack_paths:
+        if pack_path.exists():
+            candidates.append(pack_path)
+        elif any(ch in str(pack_path) for ch in "*?["):
+            candidates.extend(sorted(Path().glob(str(pack_path))))
+        else:
+            raise click.BadParameter(
+                f"Path '{pack_path}' does not exist.", param_hint="PACK_PATHS"
+            )
+
+    packs: dict[Path, None] = {}
+    for candidate in candidates:
+        if candidate.is_file() and candidate.name == "spatialpack.json":
+            candidate = candidate.parent
+        if candidate.is_file() and candidate.suffix == ARCHIVE_SUFFIX:
+            packs[candidate] = None
+            continue
+        if not candidate.is_dir():
+            continue
+        if (candidate / "spatialpack.json").exists():
+            packs[candidate] = None
+        else:
+            for manifest in sorted(candidate.rglob("spatialpack.json")):
+                packs[manifest.parent] = None
+
+    # A lone argument that is not a pack still gets validated so the
+    # MANIFEST-001 error is reported against it.
+    if not packs and len(pack_paths) == 1 and pack_paths[0].is_dir():
+        return [pack_paths[0]]
+    return list(packs)
+
+
+def _build_report(pack_path: Path, strict: bool, run_id: str, options: dict) -> dict:
+    """Validate one pack and build its conformance report."""
+    # Deferred so `--help` and argument errors skip jsonschema
+    from spatialpack.validators.manifest import ManifestValidator
+
+    start_ns = time.perf_counter_ns()
 
     # Run validation
-    result = validator.validate()
+    result = ManifestValidator(pack_path, **options).validate()
+    return _make_report(pack_path, strict, run_id, result, start_ns, options)
+
 
+def _make_report(pack_path: Path, strict: bool, run_id: str, result: dict, start_ns: int, options: dict) -> dict:
+    """Conformance report for a validator result."""
     # Calculate totals
     error_count = len(result["errors"])
     warning_count = len(result["warnings"])
@@ -82,14 +255,13 @@ def validate(
     else:
         status = "pass"
 
-    # Build conformance report
     report = {
         "run_id": run_id,
-        "validator": f"spatialpack-cli@0.1.0",
+        "validator": f"spatialpack-cli@{__version__}",
         "pack_path": str(pack_path.absolute()),
         "status": status,
         "checked_at": datetime.utcnow().isoformat() + "Z",
-        "duration_ms": int((datetime.utcnow() - start_time).total_seconds() * 1000),
+        "duration_ms": (time.perf_counter_ns() - start_ns) // 1_000_000,
         "summary": {
             "errors": error_count,
             "warnings": warning_count,
@@ -97,25 +269,234 @@ def validate(
         },
         "errors": result["errors"],
         "warnings": result["warnings"],
+        "timings": result["timings"],
     }
+    if result["asset_details"]:
+        report["assets"] = result["asset_details"]
+    if options.get("use_cache"):
+        report["cache"] = {"reused_groups": result["cached_groups"]}
+    return report
+
+
+def _validate_worker(pack_path: Path, strict: bool, run_id: str, options: dict) -> tuple[dict, float]:
+    """Process-pool entry point: build a report and measure its CPU time."""
+    cpu_start = time.process_time()
+    report = _build_report(pack_path, strict, run_id, options)
+    return report, time.process_time() - cpu_start
+
+
+def _validate_single(pack_path: Path, strict: bool, quiet: bool, options: dict) -> dict:
+    """Validate a single pack and print its results."""
+    run_id = str(uuid4())[:8]
+
+    if not quiet:
+        console.print(f"[bold]Validating pack:[/bold] {pack_path}")
+        console.print(f"[dim]Run ID: {run_id}[/dim]\n")
+
+    report = _build_report(pack_path, strict, run_id, options)
 
-    # Output results
     if not quiet:
         _print_results(report, strict)
+    return report
 
-    # Write report if requested
-    if output:
-        output.write_text(json.dumps(report, indent=2))
-        if not quiet:
-            console.print(f"\n[dim]Report written to: {output}[/dim]")
 
-    # Exit with appropriate code
-    if status == "fail":
-        sys.exit(1)
-    elif status == "warn" and strict:
-        sys.exit(1)
+def _validate_batch(
+    packs: list[Path], strict: bool, quiet: bool, jobs: int, options: dict
+) -> dict:
+    """Validate many packs, optionally across a process pool."""
+    run_id = str(uuid4())[:8]
+    workers = min(jobs or os.cpu_count() or 1, len(packs))
+
+    if not quiet:
+        console.print(f"[bold]Validating {len(packs)} packs[/bold] with {workers} worker(s)")
+        console.print(f"[dim]Run ID: {run_id}[/dim]\n")
+
+    wall_start = time.perf_counter()
+    if workers == 1:
+        results = [_validate_worker(pack, strict, run_id, options) for pack in packs]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(
+                pool.map(
+                    _validate_worker,
+                    packs,
+                    [strict] * len(packs),
+                    [run_id] * len(packs),
+                    [options] * len(packs),
+                    chunksize=max(1, len(packs) // (workers * 4)),
+                )
+            )
+    wall_ms = (time.perf_counter() - wall_start) * 1000
+
+    reports = [report for report, _ in results]
+    cpu_ms = sum(cpu for _, cpu in results) * 1000
+    statuses = [r["status"] for r in reports]
+
+    # Rule timings summed over packs, slowest first
+    rules: dict[str, dict] = {}
+    for pack_report in reports:
+        for name, entry in pack_report["timings"]["rules"].items():
+            total = rules.setdefault(name, {"group": entry["group"], "ms": 0.0, "calls": 0, "bytes_read": 0, "files": 0})
+            for key in ("ms", "calls", "bytes_read", "files"):
+                total[key] += entry[key]
+    rules = dict(sorted(rules.items(), key=lambda item: item[1]["ms"], reverse=True))
+    for entry in rules.values():
+        entry["ms"] = round(entry["ms"], 3)
+
+    report = {
+        "run_id": run_id,
+        "validator": f"spatialpack-cli@{__version__}",
+        "status": "fail" if "fail" in statuses else "warn" if "warn" in statuses else "pass",
+        "checked_at": datetime.utcnow().isoformat() + "Z",
+        "duration_ms": int(wall_ms),
+        "timings": {
+            "total_ms": round(sum(entry["ms"] for entry in rules.values()), 3),
+            "jobs": workers,
+            "wall_ms": round(wall_ms, 3),
+            "cpu_ms": round(cpu_ms, 3),
+            "rules": rules,
+        },
+        "summary": {
+            "packs": len(reports),
+            "passed": statuses.count("pass"),
+            "warned": statuses.count("warn"),
+            "failed": statuses.count("fail"),
+            "errors": sum(r["summary"]["errors"] for r in reports),
+            "warnings": sum(r["summary"]["warnings"] for r in reports),
+            "layers_validated": sum(r["summary"]["layers_validated"] for r in reports),
+        },
+        "packs": reports,
+    }
+
+    if not quiet:
+        _print_batch_results(report)
+    return report
+
+
+def _watch(
+    pack_path: Path,
+    strict: bool,
+    quiet: bool,
+    output: Optional[Path],
+    options: dict,
+    poll: bool,
+    debounce: float,
+) -> dict:
+    """Validate once, then re-run the affected checks on every change until Ctrl+C."""
+    from rich.live import Live
+
+    from spatialpack.integrity import HashCache
+    from spatialpack.validators.manifest import ManifestValidator
+    from spatialpack.watch import EVERYTHING, open_watcher, watch_pack
+
+    # Per-unit results replace the on-disk rule-group cache while watching
+    options = {**options, "use_cache": False}
+    validator = ManifestValidator(pack_path, hash_cache=HashCache.for_pack(pack_path), **options)
+    watcher = open_watcher(pack_path, poll=poll)
+    run_id = str(uuid4())[:8]
+
+    def run(changed: Optional[set[str]]) -> tuple[dict, list[str]]:
+        start_ns = time.perf_counter_ns()
+        result = validator.validate_incremental(changed)
+        report = _make_report(pack_path, strict, run_id, result, start_ns, options)
+        if output:
+            output.write_text(json.dumps(report, indent=2))
+        return report, result["rerun"]
+
+    report, rerun = run(None)
+    seen = _issue_keys(report)
+    live = None
+    if quiet:
+        _print_watch_line(report, rerun)
     else:
-        sys.exit(0)
+        live = Live(
+            _watch_view(report, rerun, set(), 0, pack_path, watcher.name),
+            console=console,
+            auto_refresh=False,
+            vertical_overflow="visible",
+        )
+        live.start(refresh=True)
+    try:
+        for changed in watch_pack(watcher, debounce=debounce):
+            report, rerun = run(None if EVERYTHING in changed else changed)
+            if not rerun:
+                continue
+            current = _issue_keys(report)
+            new, resolved = current - seen, len(seen - current)
+            seen = current
+            if live is None:
+                _print_watch_line(report, rerun)
+            else:
+                live.update(_watch_view(report, rerun, new, resolved, pack_path, watcher.name), refresh=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if live is not None:
+            live.stop()
+    return report
+
+
+def _issue_keys(report: dict) -> set[tuple]:
+    return {
+        (kind, issue.get("rule"), issue.get("message"), issue.get("path"))
+        for kind in ("errors", "warnings")
+        for issue in report[kind]
+    }
+
+
+def _print_watch_line(report: dict, rerun: list[str]) -> None:
+    """Quiet watch output: one line per failing run."""
+    if report["status"] == "fail":
+        summary = report["summary"]
+        console.print(
+            f"[bold red]FAIL[/bold red] {summary['errors']} errors, {summary['warnings']} warnings "
+            f"[dim](re-ran {', '.join(rerun)})[/dim]"
+        )
+
+
+def _watch_view(
+    report: dict, rerun: list[str], new: set[tuple], resolved: int, pack_path: Path, backend: str
+) -> Group:
+    """Renderable for one watch run; issues new since the last run are marked."""
+    status = report["status"]
+    banner = {
+        "pass": "[bold green]PASS[/bold green]",
+        "warn": "[bold yellow]WARN[/bold yellow]",
+        "fail": "[bold red]FAIL[/bold red]",
+    }[status]
+    parts: list = [
+        f"{banner} [dim]{datetime.now():%H:%M:%S} re-ran {', '.join(rerun)} "
+        f"in {report['duration_ms']} ms[/dim]\n"
+    ]
+    for kind, title, color in (("errors", "Errors", "red"), ("warnings", "Warnings", "yellow")):
+        issues = report[kind]
+        if not issues:
+            continue
+        table = Table(title=title, show_header=True, header_style=f"bold {color}")
+        table.add_column("", width=1)
+        table.add_column("Rule", style=color)
+        table.add_column("Message")
+        table.add_column("Path", style="dim")
+        for issue in issues:
+            is_new = (kind, issue.get("rule"), issue.get("message"), issue.get("path")) in new
+            table.add_row(
+                "[bold]+[/bold]" if is_new else "",
+                issue.get("rule", "UNKNOWN"),
+                issue.get("message", ""),
+                issue.get("path", ""),
+                style="bold" if is_new else None,
+            )
+        parts.append(table)
+    summary = report["summary"]
+    changes = f", {len(new)} new, {resolved} resolved" if new or resolved else ""
+    parts.append(
+        f"[bold]Summary:[/bold] {summary['errors']} errors, {summary['warnings']} warnings, "
+        f"{summary['layers_validated']} layers validated{changes}"
+    )
+    parts.append(f"[dim]Watching {pack_path} ({backend}); Ctrl+C to stop[/dim]")
+    return Group(*parts)
 
 
 def _print_results(report: dict, strict: bool) -> None:
@@ -172,3 +553,75 @@ def _print_results(report: dict, strict: bool) -> None:
         f"{summary['warnings']} warnings, "
         f"{summary['layers_validated']} layers validated"
     )
+
+
+def _print_batch_results(report: dict) -> None:
+    """Print aggregated batch validation results to console."""
+    table = Table(title="Packs", show_header=True, header_style="bold")
+    table.add_column("Pack")
+    table.add_column("Status")
+    table.add_column("Errors", justify="right")
+    table.add_column("Warnings", justify="right")
+    table.add_column("Layers", justify="right")
+
+    styles = {"pass": "green", "warn": "yellow", "fail": "red"}
+    for pack in report["packs"]:
+        style = styles[pack["status"]]
+        table.add_row(
+            pack["pack_path"],
+            f"[{style}]{pack['status'].upper()}[/{style}]",
+            str(pack["summary"]["errors"]),
+            str(pack["summary"]["warnings"]),
+            str(pack["summary"]["layers_validated"]),
+        )
+    console.print(table)
+    console.print()
+
+    # Error details for failing packs only; warnings are in the JSON report
+    for pack in report["packs"]:
+        if pack["errors"]:
+            console.print(f"[bold red]{pack['pack_path']}[/bold red]")
+            for error in pack["errors"]:
+                console.print(
+                    f"  [red]{error.get('rule', 'UNKNOWN')}[/red] "
+                    f"{error.get('message', '')} [dim]{error.get('path', '')}[/dim]"
+                )
+            console.print()
+
+    summary = report["summary"]
+    timing = report["timings"]
+    console.print(
+        f"[bold]Summary:[/bold] "
+        f"{summary['packs']} packs "
+        f"({summary['passed']} passed, {summary['warned']} warned, {summary['failed']} failed), "
+        f"{summary['errors']} errors, "
+        f"{summary['warnings']} warnings, "
+        f"{summary['layers_validated']} layers validated"
+    )
+    console.print(
+        f"[dim]Wall {timing['wall_ms']:.0f} ms, CPU {timing['cpu_ms']:.0f} ms "
+        f"across {timing['jobs']} worker(s)[/dim]"
+    )
+
+
+def _print_timings(rules: dict) -> None:
+    """Print per-rule timings, slowest first."""
+    from spatialpack.commands.common import format_bytes
+
+    table = Table(title="Rule timings", show_header=True, header_style="bold")
+    table.add_column("Rule method")
+    table.add_column("Group")
+    table.add_column("Time", justify="right")
+    table.add_column("Calls", justify="right")
+    table.add_column("Read", justify="right")
+    table.add_column("Files", justify="right")
+    for name, entry in rules.items():
+        table.add_row(
+            name,
+            entry["group"],
+            f"{entry['ms']:.1f} ms",
+            str(entry["calls"]),
+            format_bytes(entry["bytes_read"]),
+            str(entry["files"]),
+        )
+    console.print(table)
@@ -0,0 +1,770 @@
+"""
+Content-defined-chunk deltas between Spatial Pack versions.
+
+Files are split with FastCDC (a gear-hash rolling chunker with normalized
+chunk sizes), so an edit only disturbs the chunks around it and every other
+chunk of the new version is found again in the old one. A delta archive
+stores copy instructions for the chunks the old pack already has and
+compressed literals for the rest; a 1% change to a multi-GB layer ships as
+roughly 1% of its bytes.
+
+Archive layout (``.spdelta``)::
+
+    MAGIC | literal data ... | index (zlib JSON) | index_offset u64 | index_length u64 | MAGIC
+
+Literals are written as they are produced and the index goes last, so the
+archive is built in one pass with bounded memory, and a reader fetches the
+footer, then the index, then streams the data section.
+
+Applying a delta streams each new file version to a temp file beside its
+target and verifies it. The set is then committed by renaming each file
+into place. Each rename is atomic on its own, and a commit journal written
+before the first one lets the next apply finish a commit that was cut short.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Iterator, Optional, Union
+
+from spatialpack.cache import CACHE_DIR
+from spatialpack.integrity import HashCache, cached_hash, hash_file, parse_hash
+
+try:
+    from fastcdc.fastcdc_cy import fastcdc_cy
+except ImportError:  # pragma: no cover - optional dependency (full extra)
+    fastcdc_cy = None
+
+MAGIC = b"SPDELTA1"
+FORMAT_VERSION = 1
+DELTA_SUFFIX = ".spdelta"
+
+_FOOTER = struct.Struct("<QQ8s")
+
+# FastCDC chunk size bounds (bytes)
+MIN_CHUNK = 16 * 1024
+AVG_CHUNK = 64 * 1024
+MAX_CHUNK = 256 * 1024
+
+# Normalized chunking: a stricter mask before the average size and a looser
+# one after it pulls chunk sizes towards AVG_CHUNK. Masks use the high bits
+# of the 64-bit gear hash, which depend on the last 64 bytes.
+_AVG_BITS = AVG_CHUNK.bit_length() - 1
+_MASK_64 = (1 << 64) - 1
+_MASK_S = ((1 << (_AVG_BITS + 2)) - 1) << (64 - _AVG_BITS - 2)
+_MASK_L = ((1 << (_AVG_BITS - 2)) - 1) << (64 - _AVG_BITS + 2)
+
+# Deterministic gear table so chunk boundaries are stable across releases
+_GEAR = tuple(
+    int.from_bytes(hashlib.sha256(b"spatialpack-gear" + bytes([i])).digest()[:8], "little")
+    for i in range(256)
+)
+
+# Literal runs are compressed in blocks of at most this many bytes
+MAX_LITERAL_BLOCK = 4 * 1024 * 1024
+
+# Read size when streaming copies and literals during apply
+COPY_BUFFER = 1024 * 1024
+
+# Suffix of new file versions staged beside their targets during apply
+STAGING_SUFFIX = ".spdelta-tmp"
+
+# Commit journal, relative to the pack: present only while renames are in progress
+JOURNAL_PATH = CACHE_DIR.parent / "commit-journal.json"
+
+# Instruction opcodes in the index
+OP_COPY = "c"  # ["c", base_path, offset, length]
+OP_DATA = "d"  # ["d", data_offset, stored_length, length]; stored < length means zlib
+
+
+class DeltaError(ValueError):
+    """Raised for packs that cannot be diffed or archives that cannot be read."""
+
+
+def _cut_point(data: Any, start: int, end: int) -> int:
+    """Return the end offset of the chunk starting at ``start``."""
+    remaining = end - start
+    if remaining <= MIN_CHUNK:
+        return end
+    normal = start + min(remaining, AVG_CHUNK)
+    stop = start + min(remaining, MAX_CHUNK)
+    gear = _GEAR
+    h = 0
+    pos = start + MIN_CHUNK
+    for mask, limit in ((_MASK_S, normal), (_MASK_L, stop)):
+        for byte in data[pos:limit]:
+            h = ((h << 1) + gear[byte]) & _MASK_64
+            pos += 1
+            if not h & mask:
+                return pos
+    return stop
+
+
+def iter_chunks(data: Any) -> Iterator[tuple[int, int]]:
+    """Yield ``(offset, length)`` content-defined chunks of a buffer.
+
+    Uses the compiled ``fastcdc`` chunker when installed (two orders of
+    magnitude faster); the pure-Python chunker below is the fallback. Both
+    sides of a delta are chunked in the same run, so they always agree.
+    """
+    if fastcdc_cy is not None and len(data):
+        for chunk in fastcdc_cy(data, MIN_CHUNK, AVG_CHUNK, MAX_CHUNK):
+            yield chunk.offset, chunk.length
+        return
+    start, end = 0, len(data)
+    while start < end:
+        cut = _cut_point(data, start, end)
+        yield start, cut - start
+        start = cut
+
+
+def _chunk_key(data: Any) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class _MappedFile:
+    """Read-only mmap of a file (empty files map to ``b""``)."""
+
+    def __init__(self, path: Path):
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self.data: Any = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __enter__(self) -> Any:
+        return self.data
+
+    def __exit__(self, *exc: Any) -> None:
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self._file.close()
+
+
+def list_pack_files(pack_path: Path, exclude: Optional[set[Path]] = None) -> dict[str, Path]:
+    """Map POSIX relative path to file for every file in a pack.
+
+    The ``.spatialpack`` cache directory, leftover staging files and any
+    paths in ``exclude`` (e.g. the delta archive being written) are skipped.
+    """
+    pack_path = Path(pack_path)
+    cache_root = CACHE_DIR.parts[0]
+    excluded = {p.resolve() for p in exclude or ()}
+    files = {}
+    for root, dirs, names in os.walk(pack_path):
+        if Path(root) == pack_path and cache_root in dirs:
+            dirs.remove(cache_root)
+        dirs.sort()
+        for name in sorted(names):
+            path = Path(root) / name
+            if path.is_file() and not name.endswith(STAGING_SUFFIX) and path.resolve() not in excluded:
+                files[path.relative_to(pack_path).as_posix()] = path
+    return files
+
+
+def _pack_member(pack_path: Path, rel_path: Any) -> Path:
+    """``pack_path / rel_path`` for a path read from a delta index.
+
+    Raises:
+        DeltaError: if the path is absolute, has a ``..`` component or
+            otherwise resolves outside the pack
+    """
+    if not isinstance(rel_path, str) or not rel_path:
+        raise DeltaError(f"Invalid path in delta index: {rel_path!r}")
+    if Path(rel_path).is_absolute() or ".." in Path(rel_path).parts:
+        raise DeltaError(f"Refusing path outside the pack in delta index: {rel_path!r}")
+    root = Path(pack_path).resolve()
+    target = (root / rel_path).resolve()
+    if not target.is_relative_to(root) or target == root:
+        raise DeltaError(f"Refusing path outside the pack in delta index: {rel_path!r}")
+    return Path(pack_path) / rel_path
+
+
+def _read_manifest(pack_path: Path) -> dict:
+    manifest_path = Path(pack_path) / "spatialpack.json"
+    try:
+        return json.loads(manifest_path.read_text(encoding="utf-8"))
+    except FileNotFoundError as e:
+        raise DeltaError(f"Manifest not found: {manifest_path}") from e
+    except (OSError, ValueError) as e:
+        raise DeltaError(f"Cannot read manifest {manifest_path}: {e}") from e
+
+
+class _DeltaWriter:
+    """Appends literal blocks to the archive's data section."""
+
+    def __init__(self, f: Any):
+        self.f = f
+        self.offset = len(MAGIC)
+        self.literal_bytes = 0
+        self.stored_bytes = 0
+
+    def literal(self, data: Any) -> list:
+        raw = bytes(data)
+        packed = zlib.compress(raw, 6)
+        stored = packed if len(packed) < len(raw) else raw
+        self.f.write(stored)
+        instruction = [OP_DATA, self.offset, len(stored), len(raw)]
+        self.offset += len(stored)
+        self.literal_bytes += len(raw)
+        self.stored_bytes += len(stored)
+        return instruction
+
+
+def _append(ops: list, instruction: list) -> None:
+    """Append an instruction, merging contiguous copies from the same file."""
+    if ops and instruction[0] == OP_COPY and ops[-1][0] == OP_COPY:
+        last = ops[-1]
+        if last[1] == instruction[1] and last[2] + last[3] == instruction[2]:
+            last[3] += instruction[3]
+            return
+    ops.append(instruction)
+
+
+def _encode_file(data: Any, chunk_index: dict[bytes, tuple[str, int, int]], writer: _DeltaWriter) -> tuple[list, int]:
+    """Encode one target file; returns ``(instructions, copied_bytes)``."""
+    ops: list = []
+    copied = 0
+    literal_start = literal_end = 0
+
+    def flush_literal() -> None:
+        for block in range(literal_start, literal_end, MAX_LITERAL_BLOCK):
+            ops.append(writer.literal(data[block:min(block + MAX_LITERAL_BLOCK, literal_end)]))
+
+    for offset, length in iter_chunks(data):
+        source = chunk_index.get(_chunk_key(data[offset:offset + length]))
+        if source is None or source[2] != length:
+            literal_end = offset + length
+            continue
+        flush_literal()
+        literal_start = literal_end = offset + length
+        _append(ops, [OP_COPY, source[0], source[1], length])
+        copied += length
+    flush_literal()
+    return ops, copied
+
+
+def create_delta(
+    from_pack: Path,
+    to_pack: Path,
+    output: Path,
+    delta_uri: Optional[str] = None,
+) -> dict:
+    """Write a delta archive that turns ``from_pack`` into ``to_pack``.
+
+    Files with the same path, size and SHA-256 are kept as-is. Files that
+    changed, and files that are new, are re-chunked and matched against the
+    chunks of every base file that changed or disappeared (so renamed
+    layers are deduplicated too). Neither pack is modified.
+
+    Args:
+        from_pack: Base (old) pack directory
+        to_pack: Target (new) pack directory
+        output: Delta archive path
+        delta_uri: URI recorded in the manifest entry (defaults to the
+            archive file name)
+
+    Returns:
+        dict with the manifest ``entry`` (``from_version``, ``to_version``,
+        ``delta_uri``, ``operations``, ``size_bytes``, ``sha256``) and
+        ``stats``.
+
+    Raises:
+        DeltaError: if the packs are not two versions of the same pack
+    """
+    from_pack, to_pack, output = Path(from_pack), Path(to_pack), Path(output)
+    base_manifest = _read_manifest(from_pack)
+    target_manifest = _read_manifest(to_pack)
+    if base_manifest.get("pack_id") != target_manifest.get("pack_id"):
+        raise DeltaError(
+            f"pack_id differs: {base_manifest.get('pack_id')!r} vs {target_manifest.get('pack_id')!r}"
+        )
+
+    base_files = list_pack_files(from_pack, exclude={output})
+    target_files = list_pack_files(to_pack, exclude={output})
+    # Digests already cached in either pack are reused, but the caches are
+    # never saved: creating a delta must not write into its input packs
+    base_cache, target_cache = HashCache.for_pack(from_pack), HashCache.for_pack(to_pack)
+
+    def sha256(path: Path, cache: HashCache) -> str:
+        return cached_hash(path, "sha256", cache)
+
+    keep, changed = [], []
+    base_hashes: dict[str, str] = {}
+    for rel_path, path in target_files.items():
+        base_path = base_files.get(rel_path)
+        if base_path is not None and base_path.stat().st_size == path.stat().st_size:
+            base_hashes[rel_path] = sha256(base_path, base_cache)
+            if base_hashes[rel_path] == sha256(path, target_cache):
+                keep.append(rel_path)
+                continue
+        changed.append(rel_path)
+    deleted = sorted(set(base_files) - set(target_files))
+
+    # Chunk index over base files whose content is not carried over verbatim
+    kept = set(keep)
+    sources = [rel_path for rel_path in base_files if rel_path not in kept]
+    chunk_index: dict[bytes, tuple[str, int, int]] = {}
+    for rel_path in sources:
+        with _MappedFile(base_files[rel_path]) as data:
+            for offset, length in iter_chunks(data):
+                chunk_index.setdefault(_chunk_key(data[offset:offset + length]), (rel_path, offset, length))
+
+    tmp_output = output.with_name(output.name + ".tmp")
+    entries = []
+    copied_bytes = 0
+    referenced: set[str] = set()
+    try:
+        with open(tmp_output, "wb") as f:
+            f.write(MAGIC)
+            writer = _DeltaWriter(f)
+            for rel_path in changed:
+                path = target_files[rel_path]
+                with _MappedFile(path) as data:
+                    ops, copied = _encode_file(data, chunk_index, writer)
+                    digest = hashlib.sha256(data).hexdigest()
+                    size = len(data)
+                copied_bytes += copied
+                referenced.update(op[1] for op in ops if op[0] == OP_COPY)
+                entries.append({
+                    "path": rel_path,
+                    "op": "update" if rel_path in base_files else "add",
+                    "size": size,
+                    "sha256": digest,
+                    "ops": ops,
+                })
+            entries.extend({"path": rel_path, "op": "delete"} for rel_path in deleted)
+
+            # Base files the instructions read from, so apply can check them first
+            base_refs = {}
+            for rel_path in sorted(referenced):
+                base_refs[rel_path] = {
+                    "size": base_files[rel_path].stat().st_size,
+                    "sha256": base_hashes.get(rel_path) or sha256(base_files[rel_path], base_cache),
+                }
+
+            index = {
+                "format": FORMAT_VERSION,
+                "pack_id": target_manifest.get("pack_id"),
+                "from_version": base_manifest.get("version"),
+                "to_version": target_manifest.get("version"),
+                "chunking": {"algorithm": "fastcdc", "min": MIN_CHUNK, "avg": AVG_CHUNK, "max": MAX_CHUNK},
+                "base": base_refs,
+                "keep": keep,
+                "files": entries,
+            }
+            index_data = zlib.compress(json.dumps(index, separators=(",", ":")).encode("utf-8"), 9)
+            f.write(index_data)
+            f.write(_FOOTER.pack(writer.offset, len(index_data), MAGIC))
+        os.replace(tmp_output, output)
+    finally:
+        if tmp_output.exists():
+            os.remove(tmp_output)
+
+    operations = sorted({entry["op"] for entry in entries})
+    entry = {
+        "from_version": index["from_version"],
+        "to_version": index["to_version"],
+        "delta_uri": delta_uri or output.name,
+        "operations": operations,
+        "size_bytes": output.stat().st_size,
+        "sha256": hash_delta(output),
+    }
+    target_bytes = sum(path.stat().st_size for path in target_files.values())
+    stats = {
+        "files_kept": len(keep),
+        "files_added": sum(1 for e in entries if e["op"] == "add"),
+        "files_updated": sum(1 for e in entries if e["op"] == "update"),
+        "files_deleted": len(deleted),
+        "target_bytes": target_bytes,
+        "copied_bytes": copied_bytes,
+        "literal_bytes": writer.literal_bytes,
+        "stored_literal_bytes": writer.stored_bytes,
+    }
+    return {"entry": entry, "stats": stats}
+
+
+def hash_delta(path: Path) -> str:
+    """SHA-256 of a delta archive, as recorded in the manifest entry."""
+    return hash_file(Path(path), "sha256")
+
+
+def read_delta_index(path: Union[str, Path]) -> tuple[dict, int]:
+    """Read a delta archive's index; returns ``(index, data_end_offset)``.
+
+    Raises:
+        DeltaError: if the file is not a readable delta archive
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < len(MAGIC) + _FOOTER.size:
+            raise DeltaError(f"File too small for a delta archive ({size} bytes)")
+        if f.read(len(MAGIC)) != MAGIC:
+            raise DeltaError("Not a spatialpack delta archive (bad magic)")
+        f.seek(size - _FOOTER.size)
+        index_offset, index_length, magic = _FOOTER.unpack(f.read(_FOOTER.size))
+        if magic != MAGIC or index_offset + index_length + _FOOTER.size != size:
+            raise DeltaError("Delta archive footer is corrupt or the file is truncated")
+        f.seek(index_offset)
+        try:
+            index = json.loads(zlib.decompress(f.read(index_length)))
+        except (zlib.error, ValueError) as e:
+            raise DeltaError(f"Cannot decode delta index: {e}") from e
+    if index.get("format") != FORMAT_VERSION:
+        raise DeltaError(f"Unsupported delta format {index.get('format')!r}")
+    return index, index_offset
+
+
+def delta_apply_budget(manifest: dict) -> Optional[int]:
+    """Return ``client_hints.delta_apply_max_bytes`` from a manifest, if set.
+
+    The CSP-1 hints may sit at the top level or under ``extensions``
+    (directly or inside a named profile object).
+    """
+    candidates = [manifest.get("client_hints")]
+    extensions = manifest.get("extensions")
+    if isinstance(extensions, dict):
+        candidates.append(extensions.get("client_hints"))
+        candidates.extend(value.get("client_hints") for value in extensions.values() if isinstance(value, dict))
+    for hints in candidates:
+        if isinstance(hints, dict) and isinstance(hints.get("delta_apply_max_bytes"), int):
+            return hints["delta_apply_max_bytes"]
+    return None
+
+
+class _Staging:
+    """New file versions written beside their targets, committed by rename.
+
+    Nothing in the pack is modified until :meth:`commit`; until then every
+    base file that delta instructions copy from is still intact.
+    """
+
+    def __init__(self, pack_path: Path):
+        self.pack_path = Path(pack_path)
+        self.staged: dict[str, tuple[Path, str]] = {}
+        self.bytes_written = 0
+
+    def write(self, rel_path: str, produce: Any) -> str:
+        """Stage ``rel_path`` from ``produce(emit)``; returns its SHA-256."""
+        target = _pack_member(self.pack_path, rel_path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(target.name + STAGING_SUFFIX)
+        hasher = hashlib.sha256()
+        with open(tmp_path, "wb") as out:
+            # Register first so abort() cleans up a partially written file
+            self.staged[rel_path] = (tmp_path, "")
+
+            def emit(data: Any) -> None:
+                out.write(data)
+                hasher.update(data)
+                self.bytes_written += len(data)
+
+            produce(emit)
+            out.flush()
+            os.fsync(out.fileno())
+        self.staged[rel_path] = (tmp_path, hasher.hexdigest())
+        return self.staged[rel_path][1]
+
+    def path(self, rel_path: str) -> Path:
+        """Where ``rel_path`` currently lives (staged copy or the pack)."""
+        staged = self.staged.get(rel_path)
+        return staged[0] if staged else self.pack_path / rel_path
+
+    def verify(self, cache: HashCache) -> list[str]:
+        """Check the staged pack against its manifest's ``integrity.asset_hashes``.
+
+        Returns a list of problems (empty when every asset matches).
+        """
+        try:
+            manifest = json.loads(self.path("spatialpack.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            return [f"spatialpack.json: {e}"]
+        asset_hashes = (manifest.get("integrity") or {}).get("asset_hashes") or {}
+
+        problems = []
+        for asset, value in asset_hashes.items():
+            rel_path = asset.removeprefix("./")
+            algorithm, expected = parse_hash(value)
+            path = self.path(rel_path)
+            if not path.is_file():
+                problems.append(f"{asset}: missing")
+                continue
+            if rel_path in self.staged and algorithm == "sha256":
+                actual = self.staged[rel_path][1]
+            else:
+                try:
+                    actual = cached_hash(path, algorithm, None if rel_path in self.staged else cache)
+                except (OSError, RuntimeError, ValueError) as e:
+                    problems.append(f"{asset}: {e}")
+                    continue
+            if actual != expected:
+                problems.append(f"{asset}: hash mismatch (expected {expected[:12]}..., got {actual[:12]}...)")
+        return problems
+
+    def commit(self, deleted: list[str], cache: HashCache) -> None:
+        """Rename staged files into place (manifest last), then delete files.
+
+        The renames and deletions are journaled first, so if the process
+        dies part-way :func:`recover_pack` can finish them.
+        """
+        order = sorted(self.staged, key=lambda rel_path: rel_path == "spatialpack.json")
+        journal = self.pack_path / JOURNAL_PATH
+        journal.parent.mkdir(parents=True, exist_ok=True)
+        tmp_journal = journal.with_name(journal.name + STAGING_SUFFIX)
+        with open(tmp_journal, "w", encoding="utf-8") as f:
+            json.dump({"staged": order, "deleted": deleted}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_journal, journal)
+
+        # The journal now owns the staged files; abort() must leave them
+        staged, self.staged = self.staged, {}
+        for rel_path in order:
+            tmp_path, digest = staged[rel_path]
+            target = _pack_member(self.pack_path, rel_path)
+            os.replace(tmp_path, target)
+            cache.put(target, "sha256", os.stat(target), digest)
+        _delete_members(self.pack_path, deleted)
+        journal.unlink()
+        cache.save()
+
+    def abort(self) -> None:
+        for tmp_path, _ in self.staged.values():
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+        self.staged.clear()
+
+
+def _delete_members(pack_path: Path, rel_paths: list[str]) -> None:
+    for rel_path in rel_paths:
+        try:
+            os.remove(_pack_member(pack_path, rel_path))
+        except FileNotFoundError:
+            pass
+
+
+def recover_pack(pack_path: Path) -> bool:
+    """Finish or discard an apply that was interrupted; True if one was finished.
+
+    With a commit journal present every staged file had been verified, so
+    the remaining renames and deletions are replayed. Without one, staging
+    files are left over from an apply that never reached its commit and are
+    removed.
+
+    Raises:
+        DeltaError: if the journal cannot be read
+    """
+    pack_path = Path(pack_path)
+    journal = pack_path / JOURNAL_PATH
+    try:
+        pending = json.loads(journal.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        pending = None
+    except (OSError, ValueError) as e:
+        raise DeltaError(f"Cannot read commit journal {journal}: {e}") from e
+
+    if pending is None:
+        for root, dirs, names in os.walk(pack_path):
+            for name in names:
+                if name.endswith(STAGING_SUFFIX):
+                    os.remove(Path(root) / name)
+        return False
+
+    for rel_path in pending["staged"]:
+        target = _pack_member(pack_path, rel_path)
+        tmp_path = target.with_name(target.name + STAGING_SUFFIX)
+        if tmp_path.exists():  # otherwise renamed before the interruption
+            os.replace(tmp_path, target)
+    _delete_members(pack_path, pending["deleted"])
+    journal.unlink()
+    return True
+
+
+def _copy_range(path: Path, offset: int, length: int, emit: Any) -> None:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while length > 0:
+            data = f.read(min(COPY_BUFFER, length))
+            if not data:
+                raise DeltaError(f"Base file {path} is shorter than the delta expects")
+            emit(data)
+            length -= len(data)
+
+
+def _emit_literal(archive: Any, instruction: list, emit: Any) -> None:
+    _, offset, stored, length = instruction
+    decompressor = zlib.decompressobj() if stored < length else None
+    archive.seek(offset)
+    remaining = stored
+    while remaining > 0:
+        data = archive.read(min(COPY_BUFFER, remaining))
+        if not data:
+            raise DeltaError("Delta archive data section is truncated")
+        remaining -= len(data)
+        emit(decompressor.decompress(data) if decompressor else data)
+    if decompressor:
+        emit(decompressor.flush())
+
+
+def apply_delta(
+    pack_path: Path,
+    archive_path: Path,
+    max_bytes: Optional[int] = None,
+    refresh_from: Optional[Path] = None,
+) -> dict:
+    """Apply a delta archive to a local pack in place.
+
+    New file versions are streamed to temp files beside their targets (copy
+    ranges and literals in ``COPY_BUFFER`` pieces, so memory stays flat),
+    checked against the per-file SHA-256 in the delta and against the new
+    manifest's ``integrity.asset_hashes``, and only then renamed into place.
+    Any failure before the commit leaves the pack untouched; a commit cut
+    short is finished by :func:`recover_pack` before the delta is read.
+
+    Args:
+        pack_path: Local pack directory at the delta's ``from_version``
+        archive_path: Delta archive
+        max_bytes: Delta size budget; defaults to the pack's
+            ``client_hints.delta_apply_max_bytes``
+        refresh_from: Full copy of the new pack version, used instead of the
+            delta when it exceeds the budget
+
+    Returns:
+        dict with ``mode`` (``delta`` or ``refresh``), ``from_version``,
+        ``to_version``, ``files_written``, ``files_deleted``,
+        ``bytes_written``, ``delta_bytes``, ``budget`` and ``recovered``
+        (an interrupted commit was finished first).
+
+    Raises:
+        DeltaError: if the delta does not match the pack, names a path
+            outside it, exceeds the budget without a refresh source, or the
+            result fails verification
+    """
+    pack_path, archive_path = Path(pack_path), Path(archive_path)
+    recovered = recover_pack(pack_path)
+    manifest = _read_manifest(pack_path)
+    delta_bytes = archive_path.stat().st_size
+    budget = max_bytes if max_bytes is not None else delta_apply_budget(manifest)
+
+    if budget is not None and delta_bytes > budget:
+        if refresh_from is None:
+            raise DeltaError(
+                f"Delta is {delta_bytes} bytes, over the delta_apply_max_bytes budget of {budget}; "
+                "a full refresh is required"
+            )
+        result = refresh_pack(pack_path, refresh_from)
+        result.update(delta_bytes=delta_bytes, budget=budget, recovered=recovered or result["recovered"])
+        return result
+
+    index, _ = read_delta_index(archive_path)
+    if index.get("pack_id") != manifest.get("pack_id"):
+        raise DeltaError(f"Delta is for pack {index.get('pack_id')!r}, not {manifest.get('pack_id')!r}")
+    if index.get("from_version") != manifest.get("version"):
+        raise DeltaError(
+            f"Delta upgrades {index.get('from_version')!r} but the pack is at {manifest.get('version')!r}"
+        )
+
+    # Every path in the index must stay inside the pack; check them all
+    # before anything is written
+    for entry in index["files"]:
+        _pack_member(pack_path, entry["path"])
+        for op in entry.get("ops", []):
+            if op[0] == OP_COPY:
+                _pack_member(pack_path, op[1])
+
+    cache = HashCache.for_pack(pack_path)
+    for rel_path, expected in index.get("base", {}).items():
+        path = _pack_member(pack_path, rel_path)
+        if not path.is_file() or path.stat().st_size != expected["size"] \
+                or cached_hash(path, "sha256", cache) != expected["sha256"]:
+            raise DeltaError(f"Base file {rel_path} is missing or differs from the version the delta was built on")
+
+    staging = _Staging(pack_path)
+    deleted = [entry["path"] for entry in index["files"] if entry["op"] == "delete"]
+    try:
+        with open(archive_path, "rb") as archive:
+            for entry in index["files"]:
+                if entry["op"] == "delete":
+                    continue
+
+                def produce(emit: Any, ops: list = entry["ops"]) -> None:
+                    for op in ops:
+                        if op[0] == OP_COPY:
+                            _copy_range(_pack_member(pack_path, op[1]), op[2], op[3], emit)
+                        else:
+                            _emit_literal(archive, op, emit)
+
+                digest = staging.write(entry["path"], produce)
+                if digest != entry["sha256"]:
+                    raise DeltaError(f"{entry['path']}: rebuilt file does not match the delta's SHA-256")
+
+        problems = staging.verify(cache)
+        if problems:
+            raise DeltaError("Integrity check failed: " + "; ".join(problems))
+        files_written = len(staging.staged)
+        staging.commit(deleted, cache)
+    except BaseException:
+        staging.abort()
+        raise
+
+    return {
+        "mode": "delta",
+        "from_version": index.get("from_version"),
+        "to_version": index.get("to_version"),
+        "files_written": files_written,
+        "files_deleted": len(deleted),
+        "bytes_written": staging.bytes_written,
+        "delta_bytes": delta_bytes,
+        "budget": budget,
+        "recovered": recovered,
+    }
+
+
+def refresh_pack(pack_path: Path, source_pack: Path) -> dict:
+    """Replace a pack with a full copy of another version, in place.
+
+    Files whose content already matches are left alone; the rest are staged,
+    verified and committed exactly as in :func:`apply_delta`.
+    """
+    pack_path, source_pack = Path(pack_path), Path(source_pack)
+    recovered = recover_pack(pack_path)
+    from_version = _read_manifest(pack_path).get("version")
+    to_version = _read_manifest(source_pack).get("version")
+
+    # The source pack's cache is read but never saved, as in create_delta
+    cache, source_cache = HashCache.for_pack(pack_path), HashCache.for_pack(source_pack)
+    current = list_pack_files(pack_path)
+    source = list_pack_files(source_pack)
+    staging = _Staging(pack_path)
+    try:
+        for rel_path, path in source.items():
+            existing = current.get(rel_path)
+            if existing is not None and existing.stat().st_size == path.stat().st_size \
+                    and cached_hash(existing, "sha256", cache) == cached_hash(path, "sha256", source_cache):
+                continue
+            size = path.stat().st_size
+            staging.write(rel_path, lambda emit, path=path, size=size: _copy_range(path, 0, size, emit))
+
+        problems = staging.verify(cache)
+        if problems:
+            raise DeltaError("Integrity check failed: " + "; ".join(problems))
+        files_written = len(staging.staged)
+        deleted = sorted(set(current) - set(source))
+        staging.commit(deleted, cache)
+    except BaseException:
+        staging.abort()
+        raise
+
+    return {
+        "mode": "refresh",
+        "from_version": from_version,
+        "to_version": to_version,
+        "files_written": files_written,
+        "files_deleted": len(deleted),
+        "bytes_written": staging.bytes_written,
+        "recovered": recovered,
+    }
@@ -0,0 +1,485 @@
+"""
+H3 cell sidecar indexes for GeoParquet layers.
+
+For each vector layer that declares ``index.h3_res``, ``build_layer_index``
+reads the geometry (or the GeoParquet 1.1 bbox covering columns) through
+DuckDB one batch at a time and records which H3 cells, at the declared
+resolution, each Parquet row group touches. The sidecar stores a sorted
+array of ``(cell, row_group)`` pairs plus the byte range of every row group.
+
+``H3Index`` answers "which row groups can contain features in these cells /
+this bbox?" with binary searches over that array, so a cell-scoped query
+reads only the row groups it needs instead of scanning the whole layer.
+
+Sidecars are written to ``<pack>/index/<layer_id>.h3idx``::
+
+    MAGIC | header length u32 | header (JSON) | cells u64[n] | row groups u32[n]
+
+Features whose bbox would need more than ``MAX_FEATURE_CELLS`` cells are
+not expanded; their row group is flagged ``coarse`` and matched by bbox.
+"""
+
+import json
+import math
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Iterable, Optional, Sequence, Union
+
+import duckdb
+
+from spatialpack.cache import stat_fingerprint
+from spatialpack.validators.geoparquet import inspect_geoparquet
+
+try:
+    import h3
+except ImportError:  # pragma: no cover - optional dependency (full extra)
+    h3 = None
+
+MAGIC = b"SPH3IDX1"
+FORMAT_VERSION = 1
+INDEX_DIR = "index"
+INDEX_SUFFIX = ".h3idx"
+
+# Rows fetched from DuckDB per batch while building
+BATCH_ROWS = 65536
+
+# Larger features are matched by row-group bbox instead of cells
+MAX_FEATURE_CELLS = 512
+
+# Cells used to cover a query bbox (a coarser resolution is used if needed)
+MAX_QUERY_CELLS = 4096
+
+_EARTH_KM_PER_DEGREE = 111.32
+
+# H3 index bit layout: resolution in bits 52-55, one 3-bit digit per level
+_RES_SHIFT = 52
+_RES_MASK = 0xF << _RES_SHIFT
+
+
+class H3IndexError(ValueError):
+    """Raised when a layer cannot be indexed or a sidecar cannot be read."""
+
+
+def require_h3() -> None:
+    """Raise RuntimeError unless the optional ``h3`` package is installed."""
+    if h3 is None:
+        raise RuntimeError("h3 is not installed (pip install spatialpack[full])")
+
+
+def sidecar_path(pack_path: Path, layer_id: str) -> Path:
+    """Sidecar location for a layer: ``<pack>/index/<layer_id>.h3idx``."""
+    return Path(pack_path) / INDEX_DIR / f"{layer_id}{INDEX_SUFFIX}"
+
+
+def packet_scope_cells(manifest: dict) -> list[str]:
+    """Return CSP-1 ``packet_scope.h3`` cells from a manifest, if any.
+
+    The profile fields may sit at the top level or under ``extensions``
+    (directly or inside a named profile object).
+    """
+    candidates = [manifest.get("packet_scope")]
+    extensions = manifest.get("extensions")
+    if isinstance(extensions, dict):
+        candidates.append(extensions.get("packet_scope"))
+        candidates.extend(value.get("packet_scope") for value in extensions.values() if isinstance(value, dict))
+    for scope in candidates:
+        if isinstance(scope, dict) and isinstance(scope.get("h3"), list):
+            return [cell for cell in scope["h3"] if isinstance(cell, str)]
+    return []
+
+
+# --- WKB envelopes -----------------------------------------------------------
+
+def wkb_envelope(wkb: bytes) -> Optional[tuple[float, float, float, float]]:
+    """Return ``(xmin, ymin, xmax, ymax)`` of a WKB/EWKB geometry, or None if empty."""
+    bounds = [math.inf, math.inf, -math.inf, -math.inf]
+    _wkb_walk(memoryview(wkb), 0, bounds)
+    if bounds[0] == math.inf:
+        return None
+    return bounds[0], bounds[1], bounds[2], bounds[3]
+
+
+def _wkb_walk(data: memoryview, pos: int, bounds: list[float]) -> int:
+    order = "<" if data[pos] == 1 else ">"
+    (code,) = struct.unpack_from(order + "I", data, pos + 1)
+    pos += 5
+    if code & 0x20000000:  # EWKB SRID
+        pos += 4
+    dims = 2 + bool(code & 0x80000000) + bool(code & 0x40000000)
+    code &= 0x0FFFFFFF
+    dims += {1: 1, 2: 1, 3: 2}.get(code // 1000, 0)
+    kind = code % 1000
+
+    def points(pos: int, count: int) -> int:
+        end = pos + 8 * dims * count
+        if count:
+            if order == "<" and sys.byteorder == "little":
+                values = data[pos:end].cast("d")
+            else:
+                values = struct.unpack_from(f"{order}{dims * count}d", data, pos)
+            xs, ys = values[0::dims], values[1::dims]
+            x_min, x_max, y_min, y_max = min(xs), max(xs), min(ys), max(ys)
+            if not math.isnan(x_min) and not math.isnan(y_min):
+                bounds[0] = min(bounds[0], x_min)
+                bounds[1] = min(bounds[1], y_min)
+                bounds[2] = max(bounds[2], x_max)
+                bounds[3] = max(bounds[3], y_max)
+        return end
+
+    if kind == 1:
+        return points(pos, 1)
+    (count,) = struct.unpack_from(order + "I", data, pos)
+    pos += 4
+    if kind == 2:
+        return points(pos, count)
+    if kind == 3:
+        for _ in range(count):
+            (ring,) = struct.unpack_from(order + "I", data, pos)
+            pos = points(pos + 4, ring)
+        return pos
+    if kind in (4, 5, 6, 7):
+        for _ in range(count):
+            pos = _wkb_walk(data, pos, bounds)
+        return pos
+    raise H3IndexError(f"Unsupported WKB geometry type {code}")
+
+
+# --- Cell covers -------------------------------------------------------------
+
+def _bbox_area_km2(bbox: Sequence[float]) -> float:
+    mid_lat = math.radians((bbox[1] + bbox[3]) / 2)
+    width = (bbox[2] - bbox[0]) * _EARTH_KM_PER_DEGREE * max(math.cos(mid_lat), 0.01)
+    height = (bbox[3] - bbox[1]) * _EARTH_KM_PER_DEGREE
+    return width * height
+
+
+def estimate_cells(bbox: Sequence[float], res: int) -> float:
+    """Rough number of cells at ``res`` needed to cover a bbox."""
+    return _bbox_area_km2(bbox) / h3.average_hexagon_area(res, "km^2") + 1
+
+
+def bbox_cells(bbox: Sequence[float], res: int) -> set[int]:
+    """All cells at ``res`` overlapping a lon/lat bbox (as integers)."""
+    xmin, ymin, xmax, ymax = bbox
+    if xmin == xmax and ymin == ymax:
+        return {h3.str_to_int(h3.latlng_to_cell(ymin, xmin, res))}
+    corners = [(ymin, xmin), (ymin, xmax), (ymax, xmax), (ymax, xmin)]
+    cells = set(h3.h3shape_to_cells_experimental(h3.LatLngPoly(corners), res, "overlap"))
+    # Corner cells guard degenerate (line-like) boxes that overlap no cell area
+    cells.update(h3.latlng_to_cell(lat, lng, res) for lat, lng in corners)
+    return {h3.str_to_int(cell) for cell in cells}
+
+
+def cell_bbox(cell: Union[int, str]) -> list[float]:
+    """Lon/lat bbox ``[minX, minY, maxX, maxY]`` of a cell's boundary."""
+    boundary = h3.cell_to_boundary(cell if isinstance(cell, str) else h3.int_to_str(cell))
+    lats, lngs = [p[0] for p in boundary], [p[1] for p in boundary]
+    return [min(lngs), min(lats), max(lngs), max(lats)]
+
+
+def _descendant_range(cell: int, res: int) -> tuple[int, int]:
+    """Smallest and largest possible descendants of ``cell`` at ``res``."""
+    cell_res = (cell & _RES_MASK) >> _RES_SHIFT
+    lo = (cell & ~_RES_MASK) | (res << _RES_SHIFT)
+    hi = lo
+    for level in range(cell_res + 1, res + 1):
+        shift = 3 * (15 - level)
+        lo &= ~(7 << shift)
+        hi = (hi & ~(7 << shift)) | (6 << shift)
+    return lo, hi
+
+
+def bboxes_intersect(a: Sequence[float], b: Sequence[float]) -> bool:
+    """Whether two ``(xmin, ymin, xmax, ymax)`` boxes overlap (touching counts)."""
+    return a[0] <= b[2] and a[2] >= b[0] and a[1] <= b[3] and a[3] >= b[1]
+
+
+# --- Building ----------------------------------------------------------------
+
+def quote_identifier(name: str) -> str:
+    """Quote a column or view name for DuckDB SQL."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def read_row_groups(con: duckdb.DuckDBPyConnection, path: str) -> list[dict]:
+    """Row-group layout (file, row range, byte range) from Parquet footers."""
+    rows = con.execute(
+        "SELECT file_name, row_group_id, any_value(row_group_num_rows), "
+        "min(coalesce(dictionary_page_offset, data_page_offset)), sum(total_compressed_size) "
+        "FROM parquet_metadata(?) GROUP BY file_name, row_group_id ORDER BY file_name, row_group_id",
+        [path],
+    ).fetchall()
+    groups = []
+    row_start: dict[str, int] = {}
+    for file_name, row_group, num_rows, offset, size in rows:
+        start = row_start.get(file_name, 0)
+        groups.append({
+            "file": file_name,
+            "row_group": row_group,
+            "row_start": start,
+            "num_rows": num_rows,
+            "offset": offset,
+            "bytes": size,
+        })
+        row_start[file_name] = start + num_rows
+    return groups
+
+
+def _bbox_source(geo: Optional[dict]) -> tuple[str, str]:
+    """Return ``(kind, sql)`` selecting each row's bbox inputs."""
+    if not isinstance(geo, dict):
+        raise H3IndexError("Layer has no GeoParquet 'geo' metadata")
+    primary = geo.get("primary_column")
+    column = (geo.get("columns") or {}).get(primary) or {}
+    covering = (column.get("covering") or {}).get("bbox")
+    if covering:
+        try:
+            parts = [".".join(quote_identifier(p) for p in covering[key]) for key in ("xmin", "ymin", "xmax", "ymax")]
+        except (KeyError, TypeError) as e:
+            raise H3IndexError("Invalid covering.bbox in GeoParquet metadata") from e
+        return "bbox", ", ".join(parts)
+    encoding = str(column.get("encoding", "WKB")).lower()
+    if encoding == "wkb":
+        return "wkb", quote_identifier(primary)
+    if encoding == "point":
+        point = quote_identifier(primary)
+        return "bbox", f"{point}.x, {point}.y, {point}.x, {point}.y"
+    raise H3IndexError(f"Unsupported GeoParquet geometry encoding: {column.get('encoding')}")
+
+
+def build_layer_index(
+    parquet_path: Union[str, Path],
+    res: int,
+    output: Path,
+    layer_id: Optional[str] = None,
+    con: Optional[duckdb.DuckDBPyConnection] = None,
+    root: Optional[Path] = None,
+) -> dict:
+    """Build an H3 sidecar for a GeoParquet file (or glob).
+
+    Args:
+        parquet_path: GeoParquet file path or glob pattern
+        res: H3 resolution (the layer's ``index.h3_res``)
+        output: Sidecar path to write
+        layer_id: Layer id recorded in the sidecar header
+        con: Optional DuckDB connection to reuse
+        root: Directory that file paths in the sidecar are relative to
+            (normally the pack; defaults to the sidecar's directory)
+
+    Returns:
+        dict with ``rows``, ``row_groups``, ``cells`` (distinct), ``entries``
+        (cell/row-group pairs), ``coarse_row_groups`` and ``sidecar_bytes``.
+
+    Raises:
+        H3IndexError: if the layer lacks usable GeoParquet geometry
+    """
+    require_h3()
+    if not 0 <= res <= 15:
+        raise H3IndexError(f"Invalid H3 resolution {res}")
+    path = str(parquet_path)
+    con = con or duckdb.connect()
+    con.execute("SET enable_progress_bar = false")
+    try:
+        # Keep WKB as BLOB even when the spatial extension is loaded
+        con.execute("SET enable_geoparquet_conversion = false")
+    except duckdb.Error:
+        pass
+
+    info = inspect_geoparquet(path, con)
+    kind, select = _bbox_source(info["geo"])
+    groups = read_row_groups(con, path)
+    group_of = {(g["file"], g["row_group"]): i for i, g in enumerate(groups)}
+    starts: dict[str, list[tuple[int, int]]] = {}
+    for i, group in enumerate(groups):
+        starts.setdefault(group["file"], []).append((group["row_start"], i))
+
+    group_cells: list[set[int]] = [set() for _ in groups]
+    group_bbox: list[list[float]] = [[math.inf, math.inf, -math.inf, -math.inf] for _ in groups]
+    coarse = [False] * len(groups)
+    max_area = MAX_FEATURE_CELLS * h3.average_hexagon_area(res, "km^2")
+
+    result = con.execute(
+        f"SELECT filename, file_row_number, {select} "
+        "FROM read_parquet(?, filename = true, file_row_number = true)",
+        [path],
+    )
+    rows = 0
+    current: tuple[str, int, int] = ("", -1, -1)  # file, first row, last row of the cached group
+    group = 0
+    while batch := result.fetchmany(BATCH_ROWS):
+        for file_name, row_number, *values in batch:
+            rows += 1
+            if not (file_name == current[0] and current[1] <= row_number <= current[2]):
+                file_starts = starts[file_name]
+                position = bisect_right(file_starts, (row_number, len(groups))) - 1
+                group = file_starts[position][1]
+                first = groups[group]["row_start"]
+                current = (file_name, first, first + groups[group]["num_rows"] - 1)
+
+            if kind == "wkb":
+                bbox = wkb_envelope(values[0]) if values[0] is not None else None
+            else:
+                bbox = None if any(v is None for v in values) else values
+            if bbox is None:
+                continue
+
+            rg_bbox = group_bbox[group]
+            rg_bbox[0] = min(rg_bbox[0], bbox[0])
+            rg_bbox[1] = min(rg_bbox[1], bbox[1])
+            rg_bbox[2] = max(rg_bbox[2], bbox[2])
+            rg_bbox[3] = max(rg_bbox[3], bbox[3])
+            if coarse[group]:
+                continue
+            if _bbox_area_km2(bbox) > max_area:
+                coarse[group] = True
+                continue
+            group_cells[group].update(bbox_cells(bbox, res))
+
+    pairs = sorted((cell, i) for i, cells in enumerate(group_cells) for cell in cells)
+    cells = array("Q", (cell for cell, _ in pairs))
+    owners = array("I", (i for _, i in pairs))
+
+    output = Path(output)
+    root = Path(root) if root is not None else output.parent
+    relative = {f: Path(os.path.relpath(os.path.abspath(f), os.path.abspath(root))).as_posix() for f in starts}
+
+    # Size and mtime of each source file, to detect stale sidecars
+    fingerprints = {relative[f]: stat_fingerprint(Path(f)) for f in starts}
+    header = {
+        "format": FORMAT_VERSION,
+        "layer_id": layer_id,
+        "res": res,
+        "files": {f: fp[:2] if fp else None for f, fp in sorted(fingerprints.items())},
+        "row_groups": [
+            {
+                **g,
+                "file": relative[g["file"]],
+                "bbox": group_bbox[i] if group_bbox[i][0] != math.inf else None,
+                "coarse": coarse[i],
+            }
+            for i, g in enumerate(groups)
+        ],
+    }
+    header_data = json.dumps(header, separators=(",", ":")).encode("utf-8")
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_output = output.with_name(output.name + ".tmp")
+    with open(tmp_output, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_data)))
+        f.write(header_data)
+        f.write(struct.pack("<Q", len(cells)))
+        if sys.byteorder != "little":
+            cells.byteswap()
+            owners.byteswap()
+        cells.tofile(f)
+        owners.tofile(f)
+    tmp_output.replace(output)
+
+    return {
+        "rows": rows,
+        "row_groups": len(groups),
+        "cells": len(set(cells)),
+        "entries": len(cells),
+        "coarse_row_groups": sum(coarse),
+        "sidecar_bytes": output.stat().st_size,
+    }
+
+
+# --- Lookup ------------------------------------------------------------------
+
+class H3Index:
+    """A loaded H3 sidecar: maps cells or bboxes to the row groups to read."""
+
+    def __init__(self, header: dict, cells: array, owners: array, root: Path):
+        self.header = header
+        self.root = Path(root)
+        self.res: int = header["res"]
+        self.row_groups: list[dict] = header["row_groups"]
+        self.cells = cells
+        self.owners = owners
+
+    @classmethod
+    def load(cls, path: Path, root: Optional[Path] = None) -> "H3Index":
+        """Read a sidecar written by :func:`build_layer_index`.
+
+        ``root`` must match the one used to build it (default: the sidecar's
+        directory).
+        """
+        try:
+            with open(path, "rb") as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    raise H3IndexError(f"Not an H3 sidecar: {path}")
+                (header_length,) = struct.unpack("<I", f.read(4))
+                header = json.loads(f.read(header_length))
+                (count,) = struct.unpack("<Q", f.read(8))
+                cells, owners = array("Q"), array("I")
+                cells.fromfile(f, count)
+                owners.fromfile(f, count)
+        except (OSError, EOFError, ValueError, struct.error) as e:
+            if isinstance(e, H3IndexError):
+                raise
+            raise H3IndexError(f"Cannot read H3 sidecar {path}: {e}") from e
+        if header.get("format") != FORMAT_VERSION:
+            raise H3IndexError(f"Unsupported H3 sidecar format {header.get('format')!r}")
+        if sys.byteorder != "little":
+            cells.byteswap()
+            owners.byteswap()
+        return cls(header, cells, owners, root if root is not None else Path(path).parent)
+
+    @property
+    def stale(self) -> bool:
+        """True if any indexed Parquet file changed size or mtime since the build."""
+        for file_name, fingerprint in self.header.get("files", {}).items():
+            current = stat_fingerprint(self.root / file_name)
+            if current is None or current[:2] != fingerprint:
+                return True
+        return False
+
+    def _owners_in_range(self, lo: int, hi: int) -> set[int]:
+        start, end = bisect_left(self.cells, lo), bisect_right(self.cells, hi)
+        return set(self.owners[start:end])
+
+    def _match_cells(self, cells: Iterable[Union[int, str]]) -> set[int]:
+        require_h3()
+        matched: set[int] = set()
+        for cell in cells:
+            value = h3.str_to_int(cell) if isinstance(cell, str) else int(cell)
+            cell_res = h3.get_resolution(h3.int_to_str(value))
+            if cell_res >= self.res:
+                parent = h3.str_to_int(h3.cell_to_parent(h3.int_to_str(value), self.res))
+                matched |= self._owners_in_range(parent, parent)
+            else:
+                matched |= self._owners_in_range(*_descendant_range(value, self.res))
+        return matched
+
+    def _coarse_matching(self, bbox: Sequence[float]) -> set[int]:
+        return {
+            i for i, group in enumerate(self.row_groups)
+            if group["coarse"] and group["bbox"] and bboxes_intersect(group["bbox"], bbox)
+        }
+
+    def lookup_cells(self, cells: Iterable[Union[int, str]]) -> list[dict]:
+        """Row groups that may contain features in any of ``cells`` (any resolution)."""
+        require_h3()
+        cells = list(cells)
+        matched = self._match_cells(cells)
+        for cell in cells:
+            matched |= self._coarse_matching(cell_bbox(cell))
+        return [self.row_groups[i] for i in sorted(matched)]
+
+    def lookup_bbox(self, bbox: Sequence[float]) -> list[dict]:
+        """Row groups that may contain features intersecting a lon/lat bbox."""
+        require_h3()
+        res = self.res
+        while res > 0 and estimate_cells(bbox, res) > MAX_QUERY_CELLS:
+            res -= 1
+        matched = self._match_cells(bbox_cells(bbox, res)) | self._coarse_matching(bbox)
+        return [
+            self.row_groups[i] for i in sorted(matched)
+            if self.row_groups[i]["bbox"] and bboxes_intersect(self.row_groups[i]["bbox"], bbox)
+        ]
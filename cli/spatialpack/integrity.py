@@ -0,0 +1,195 @@
+"""
+Streaming asset hashing for Spatial Pack integrity verification.
+
+Hashes pack assets (parquet, pmtiles, cog, copc) in large chunks, memory
+mapping files where possible, across a thread pool. Digests are kept in a
+persistent cache keyed by (path, size, mtime, inode) so unchanged assets are
+never re-read.
+
+Hash values in ``integrity.asset_hashes`` may be prefixed with the algorithm
+(``sha256:<hex>`` or ``blake3:<hex>``); bare hex digests are treated as SHA-256.
+"""
+
+import contextvars
+import hashlib
+import mmap
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Optional
+
+from spatialpack.cache import CACHE_DIR, read_json, write_json_atomic
+from spatialpack.profiling import record_read
+
+try:
+    import blake3
+except ImportError:  # pragma: no cover - optional dependency (full extra)
+    blake3 = None
+
+# Chunk size for streaming reads and mmap slices
+CHUNK_SIZE = 8 * 1024 * 1024
+
+HASH_CACHE_FILE = "hashes.json"
+
+SUPPORTED_ALGORITHMS = ("sha256", "blake3")
+
+
+def parse_hash(value: str) -> tuple[str, str]:
+    """Split a manifest hash value into ``(algorithm, hex_digest)``."""
+    algorithm, sep, digest = value.partition(":")
+    if not sep:
+        return "sha256", value.lower()
+    return algorithm.lower(), digest.lower()
+
+
+def _new_hasher(algorithm: str) -> Any:
+    if algorithm == "sha256":
+        return hashlib.sha256()
+    if algorithm == "blake3":
+        if blake3 is None:
+            raise RuntimeError("blake3 is not installed (pip install spatialpack[full])")
+        return blake3.blake3()
+    raise ValueError(f"Unsupported hash algorithm: {algorithm}")
+
+
+def hash_file(path: Path, algorithm: str = "sha256") -> str:
+    """Hash a file, streaming it via mmap (or buffered reads as a fallback).
+
+    Memory use is bounded by the page cache, not by file size.
+    """
+    hasher = _new_hasher(algorithm)
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        # Only mapping may fall back; errors while hashing propagate, so the
+        # buffered path never continues a partly-updated hasher
+        mapped = None
+        if size:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                pass
+        if mapped is None:
+            while chunk := f.read(CHUNK_SIZE):
+                hasher.update(chunk)
+        else:
+            with mapped, memoryview(mapped) as view:
+                for offset in range(0, size, CHUNK_SIZE):
+                    hasher.update(view[offset:offset + CHUNK_SIZE])
+    record_read(size, files=1)
+    return hasher.hexdigest()
+
+
+class HashCache:
+    """Persistent digest cache keyed by (path, size, mtime, inode).
+
+    Stored as JSON under ``<pack>/.spatialpack/cache/hashes.json``. A cache
+    that cannot be read or written is treated as empty; it never causes a
+    validation failure.
+    """
+
+    def __init__(self, cache_path: Path):
+        self.cache_path = Path(cache_path)
+        self._entries: dict[str, dict] = read_json(self.cache_path)
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_pack(cls, pack_path: Path) -> "HashCache":
+        return cls(Path(pack_path) / CACHE_DIR / HASH_CACHE_FILE)
+
+    @staticmethod
+    def _key(path: Path, algorithm: str) -> str:
+        return f"{algorithm}:{Path(path).absolute()}"
+
+    @staticmethod
+    def _fingerprint(stat: os.stat_result) -> list[int]:
+        return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+    def get(self, path: Path, algorithm: str, stat: os.stat_result) -> Optional[str]:
+        """Return the cached digest if the file is unchanged, else None."""
+        entry = self._entries.get(self._key(path, algorithm))
+        if entry and entry["fingerprint"] == self._fingerprint(stat):
+            return entry["digest"]
+        return None
+
+    def put(self, path: Path, algorithm: str, stat: os.stat_result, digest: str) -> None:
+        with self._lock:
+            self._entries[self._key(path, algorithm)] = {
+                "fingerprint": self._fingerprint(stat),
+                "digest": digest,
+            }
+            self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache atomically if it changed."""
+        if self._dirty and write_json_atomic(self.cache_path, self._entries):
+            self._dirty = False
+
+
+def cached_hash(path: Path, algorithm: str, cache: Optional[HashCache]) -> str:
+    """Hash a file, consulting and updating the cache."""
+    stat = os.stat(path)
+    if cache is not None:
+        digest = cache.get(path, algorithm, stat)
+        if digest is not None:
+            return digest
+    digest = hash_file(path, algorithm)
+    if cache is not None:
+        cache.put(path, algorithm, stat, digest)
+    return digest
+
+
+def verify_assets(
+    pack_path: Path,
+    asset_hashes: dict[str, str],
+    cache: Optional[HashCache] = None,
+    max_workers: Optional[int] = None,
+) -> dict[str, dict]:
+    """Verify asset files against their expected hashes in parallel.
+
+    Args:
+        pack_path: Pack directory that asset paths are relative to
+        asset_hashes: Map of relative asset path to expected hash value
+        cache: Optional persistent digest cache
+        max_workers: Hashing threads (defaults to min(8, CPU count))
+
+    Returns:
+        Map of asset path to ``{"status", "algorithm", "expected", "actual"}``
+        where status is one of ``ok``, ``mismatch``, ``missing``,
+        ``unsupported`` or ``error``.
+    """
+    pack_path = Path(pack_path)
+
+    def check(asset: str, expected_value: str) -> dict:
+        algorithm, expected = parse_hash(expected_value)
+        result = {"status": "ok", "algorithm": algorithm, "expected": expected, "actual": None}
+        if algorithm not in SUPPORTED_ALGORITHMS or (algorithm == "blake3" and blake3 is None):
+            result["status"] = "unsupported"
+            return result
+        full_path = pack_path / asset.removeprefix("./")
+        if not full_path.is_file():
+            result["status"] = "missing"
+            return result
+        try:
+            result["actual"] = cached_hash(full_path, algorithm, cache)
+        except OSError as e:
+            result["status"] = "error"
+            result["actual"] = str(e)
+            return result
+        if result["actual"] != expected:
+            result["status"] = "mismatch"
+        return result
+
+    workers = max_workers or min(8, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Each task runs in a copy of this context so its reads charge the calling rule
+        futures = {
+            asset: pool.submit(contextvars.copy_context().run, check, asset, value)
+            for asset, value in asset_hashes.items()
+        }
+        results = {asset: future.result() for asset, future in futures.items()}
+
+    if cache is not None:
+        cache.save()
+    return results
@@ -0,0 +1,344 @@
+"""
+Layer access decisions from a pack's ``policy.json``.
+
+``PolicyEngine`` compiles the policy and the manifest into a decision
+table: for every principal class and layer id, allow or deny. Glob
+``layer_pattern`` matching, role ranks and visibility lists are resolved
+once, so ``allowed`` is an expiry check and two dict lookups and the tile
+gateway can call it on every request.
+
+Principals are ``tenant:role`` strings, as in a layer's
+``security.visibility`` list, or None for anonymous requests. For each
+layer, the first ``layer_policies`` entry whose pattern matches sets its
+``visibility`` and ``min_role``. ``access_constraints``, the older name for
+that list, is read the same way. Otherwise the layer's
+``security.classification`` applies, then ``access.default_visibility``.
+
+- ``public``: everyone, including anonymous requests unless
+  ``access.authentication_required`` is set
+- ``internal``: the pack's tenant, or a principal on the layer's
+  ``security.visibility`` list
+- ``restricted``: only principals on the layer's ``security.visibility`` list
+
+A ``min_role`` excludes lower roles (``viewer`` < ``analyst`` < ``admin``)
+and anonymous requests. A ``security.visibility`` entry ``tenant:role``
+admits that tenant's role and the roles above it. An expired policy denies
+everything.
+"""
+
+import json
+import math
+import time
+from datetime import date, datetime, timedelta
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple, Optional, Union
+
+POLICY_FILE = "policy.json"
+
+# Roles in ascending order of privilege
+ROLE_ORDER = ("viewer", "analyst", "admin")
+ROLE_RANK = {role: rank for rank, role in enumerate(ROLE_ORDER)}
+
+VISIBILITIES = ("public", "internal", "restricted")
+
+# Tenant standing for every tenant the policy and manifest do not name
+OTHER_TENANT = "*"
+
+# Unseen principals whose rows are cached by allowed()
+MAX_CACHED_PRINCIPALS = 100_000
+
+ANONYMOUS = "anonymous"
+
+
+class PolicyError(ValueError):
+    """Raised when a policy or manifest cannot be compiled."""
+
+
+class Decision(NamedTuple):
+    """One access decision and the rule that produced it."""
+
+    allow: bool
+    reason: str
+    rule: Optional[str]
+
+
+def parse_principal(principal: Optional[str]) -> Optional[tuple[str, str]]:
+    """Split ``tenant:role`` (None or ``anonymous`` for anonymous requests)."""
+    if principal is None or principal == ANONYMOUS:
+        return None
+    tenant, sep, role = principal.partition(":")
+    if not sep or not tenant or not role:
+        raise PolicyError(f"Principal must be tenant:role, got {principal!r}")
+    return tenant, role
+
+
+def load_policy(pack_path: Path) -> tuple[dict, dict]:
+    """Read ``(policy, manifest)`` for a pack directory."""
+    pack_path = Path(pack_path)
+    documents = []
+    for name in (POLICY_FILE, "spatialpack.json"):
+        path = pack_path / name
+        try:
+            documents.append(json.loads(path.read_text(encoding="utf-8")))
+        except FileNotFoundError:
+            raise PolicyError(f"{name} not found in {pack_path}") from None
+        except (OSError, ValueError) as e:
+            raise PolicyError(f"Cannot read {path}: {e}") from e
+        if not isinstance(documents[-1], dict):
+            raise PolicyError(f"{path} must contain a JSON object")
+    return documents[0], documents[1]
+
+
+class PolicyEngine:
+    """Precomputed (principal, layer) access decisions for one pack."""
+
+    def __init__(self, policy: dict, manifest: dict, today: Optional[date] = None):
+        """Compile ``policy`` against the layers of ``manifest``.
+
+        Args:
+            policy: Parsed policy.json
+            manifest: Parsed spatialpack.json
+            today: Date checked against the policy ``expiry`` (default: the
+                current date, re-read when the local day rolls over)
+
+        Raises:
+            PolicyError: if the policy is malformed
+        """
+        self.policy_id = policy.get("policy_id")
+        self.pack_id = manifest.get("pack_id")
+        self.tenant = manifest.get("tenant")
+        self.issues: list[str] = []
+        access = policy.get("access") or {}
+        self.authentication_required = bool(access.get("authentication_required", False))
+        self.default_visibility = access.get("default_visibility") or "internal"
+        if self.default_visibility not in VISIBILITIES:
+            raise PolicyError(f"Unknown access.default_visibility: {self.default_visibility!r}")
+        self.expiry = self._parse_expiry(policy.get("expiry"))
+        self._today = today
+        self._expired = False
+        self._recheck_at = -math.inf  # time.time() at which the date is next read
+
+        rules = self._rules(policy)
+        self.layers = {}
+        for layer in manifest.get("layers") or []:
+            if isinstance(layer, dict) and isinstance(layer.get("id"), str):
+                self.layers[layer["id"]] = self._layer_rule(layer, rules)
+        for rule in rules:
+            if not any(fnmatchcase(layer_id, rule["layer_pattern"]) for layer_id in self.layers):
+                self.issues.append(f"layer_policies[{rule['index']}] pattern {rule['layer_pattern']!r} matches no layer")
+
+        # Every tenant named anywhere gets its own rows; the rest share OTHER_TENANT's
+        tenants = {OTHER_TENANT}
+        if self.tenant:
+            tenants.add(self.tenant)
+        for layer in self.layers.values():
+            tenants.update(tenant for tenant, _ in layer["allow_list"])
+        self.principals: list[Optional[str]] = [None] + [
+            f"{tenant}:{role}" for tenant in sorted(tenants) for role in ROLE_ORDER
+        ]
+
+        self._decisions: dict[tuple[Optional[str], str], Decision] = {}
+        self._rows: dict[Optional[str], frozenset[str]] = {}
+        for principal in self.principals:
+            allowed = set()
+            for layer_id in self.layers:
+                decision = self._evaluate_rules(principal, layer_id)
+                self._decisions[principal, layer_id] = decision
+                if decision.allow:
+                    allowed.add(layer_id)
+            self._rows[principal] = frozenset(allowed)
+        self._rows[ANONYMOUS] = self._rows[None]
+
+    @classmethod
+    def from_pack(cls, pack_path: Path, today: Optional[date] = None) -> "PolicyEngine":
+        """Compile the policy.json and spatialpack.json of a pack."""
+        policy, manifest = load_policy(pack_path)
+        return cls(policy, manifest, today=today)
+
+    @staticmethod
+    def _parse_expiry(expiry: Any) -> Optional[date]:
+        if not expiry:
+            return None
+        try:
+            return date.fromisoformat(str(expiry)[:10])
+        except ValueError:
+            raise PolicyError(f"Invalid policy expiry: {expiry!r}") from None
+
+    @property
+    def expired(self) -> bool:
+        """Whether the policy ``expiry`` has passed.
+
+        The decision table is compiled without expiry, so a long-running
+        gateway starts denying the day after ``expiry`` without a reload.
+        The answer is kept until the next local midnight, so a decision
+        costs a clock read rather than a ``date.today()``.
+        """
+        if self.expiry is None:
+            return False
+        if self._today is not None:
+            return self.expiry < self._today
+        if time.time() >= self._recheck_at:
+            today = date.today()
+            self._expired = self.expiry < today
+            if self._expired:
+                self._recheck_at = math.inf
+            else:
+                self._recheck_at = datetime.combine(today + timedelta(days=1), datetime.min.time()).timestamp()
+        return self._expired
+
+    def _rules(self, policy: dict) -> list[dict]:
+        rules = policy.get("layer_policies")
+        if rules is None:
+            rules = policy.get("access_constraints") or []
+        if not isinstance(rules, list):
+            raise PolicyError("layer_policies must be a list")
+        checked = []
+        for index, rule in enumerate(rules):
+            if not isinstance(rule, dict) or not isinstance(rule.get("layer_pattern"), str):
+                raise PolicyError(f"layer_policies[{index}] needs a layer_pattern string")
+            visibility = rule.get("visibility")
+            if visibility is not None and visibility not in VISIBILITIES:
+                raise PolicyError(f"layer_policies[{index}]: unknown visibility {visibility!r}")
+            min_role = rule.get("min_role")
+            if min_role is not None and min_role not in ROLE_RANK:
+                raise PolicyError(f"layer_policies[{index}]: unknown min_role {min_role!r}")
+            checked.append({**rule, "index": index})
+        return checked
+
+    def _layer_rule(self, layer: dict, rules: list[dict]) -> dict:
+        """Resolve the pattern, visibility, min_role and allow list of one layer."""
+        security = layer.get("security") or {}
+        allow_list = []
+        for entry in security.get("visibility") or []:
+            tenant, sep, role = str(entry).partition(":")
+            if sep and role in ROLE_RANK:
+                allow_list.append((tenant, role))
+            else:
+                self.issues.append(f"{layer['id']}: ignoring visibility entry {entry!r}")
+        rule = next((r for r in rules if fnmatchcase(layer["id"], r["layer_pattern"])), None)
+        if rule is not None:
+            visibility = rule.get("visibility") or security.get("classification") or self.default_visibility
+            source = f"layer_policies[{rule['index']}] ({rule['layer_pattern']})"
+        elif security.get("classification") in VISIBILITIES:
+            visibility = security["classification"]
+            source = "security.classification"
+        else:
+            visibility = self.default_visibility
+            source = "access.default_visibility"
+        if visibility not in VISIBILITIES:
+            # e.g. a "mixed" classification on a layer
+            self.issues.append(f"{layer['id']}: unknown visibility {visibility!r}, treated as restricted")
+            visibility = "restricted"
+        return {
+            "visibility": visibility,
+            "min_role": rule.get("min_role") if rule else None,
+            "allow_list": allow_list,
+            "source": source,
+        }
+
+    def _evaluate(self, principal: Optional[str], layer_id: str) -> Decision:
+        """Full evaluation, expiry included; for principals outside the table."""
+        if layer_id in self.layers and self.expired:
+            return Decision(False, "policy expired", "expiry")
+        return self._evaluate_rules(principal, layer_id)
+
+    def _evaluate_rules(self, principal: Optional[str], layer_id: str) -> Decision:
+        """Rule evaluation without expiry; used to build the decision table."""
+        layer = self.layers.get(layer_id)
+        if layer is None:
+            return Decision(False, "unknown layer", None)
+        rule = layer["source"]
+        parsed = parse_principal(principal)
+        if parsed is None:
+            if self.authentication_required:
+                return Decision(False, "authentication required", "access.authentication_required")
+            if layer["min_role"] is not None:
+                return Decision(False, f"requires role {layer['min_role']}", rule)
+            if layer["visibility"] != "public":
+                return Decision(False, f"{layer['visibility']} layer", rule)
+            return Decision(True, "public layer", rule)
+
+        tenant, role = parsed
+        if role not in ROLE_RANK:
+            return Decision(False, f"unknown role {role!r}", None)
+        rank = ROLE_RANK[role]
+        if layer["min_role"] is not None and rank < ROLE_RANK[layer["min_role"]]:
+            return Decision(False, f"requires role {layer['min_role']}", rule)
+        if layer["visibility"] == "public":
+            return Decision(True, "public layer", rule)
+        listed = any(t == tenant and rank >= ROLE_RANK[r] for t, r in layer["allow_list"])
+        if listed:
+            return Decision(True, "on security.visibility", f"{layer_id}.security.visibility")
+        if layer["visibility"] == "internal" and tenant == self.tenant:
+            return Decision(True, "pack tenant", rule)
+        return Decision(False, f"{layer['visibility']} layer", rule)
+
+    def _class_of(self, principal: Optional[str]) -> Optional[str]:
+        """The compiled principal whose decisions ``principal`` shares."""
+        parsed = parse_principal(principal)
+        if parsed is None or principal in self._rows:
+            return principal
+        return f"{OTHER_TENANT}:{parsed[1]}"
+
+    def allowed(self, principal: Optional[str], layer_id: str) -> bool:
+        """Whether ``principal`` (``tenant:role`` or None) may read ``layer_id``."""
+        if self.expired:
+            return False
+        row = self._rows.get(principal)
+        if row is None:
+            row = self._row_for(principal)
+        return layer_id in row
+
+    def _row_for(self, principal: Optional[str]) -> frozenset[str]:
+        try:
+            principal_class = self._class_of(principal)
+        except PolicyError:
+            return frozenset()
+        row = self._rows.get(principal_class, frozenset())  # unknown role: deny
+        if len(self._rows) < MAX_CACHED_PRINCIPALS:
+            self._rows[principal] = row
+        return row
+
+    def allowed_layers(self, principal: Optional[str]) -> frozenset[str]:
+        """Every layer id ``principal`` may read."""
+        if self.expired:
+            return frozenset()
+        row = self._rows.get(principal)
+        return row if row is not None else self._row_for(principal)
+
+    def decide(self, principal: Optional[str], layer_id: str) -> Decision:
+        """Decision with its reason (slower than ``allowed``; for audit and tooling)."""
+        try:
+            principal_class = self._class_of(principal)
+        except PolicyError as e:
+            return Decision(False, str(e), None)
+        decision = self._decisions.get((principal_class, layer_id))
+        if decision is None or self.expired:
+            return self._evaluate(principal_class, layer_id)
+        return decision
+
+    def matrix(
+        self,
+        principals: Optional[Iterable[Optional[str]]] = None,
+        layer_ids: Optional[Iterable[str]] = None,
+    ) -> dict[str, dict[str, Decision]]:
+        """``{principal label: {layer_id: Decision}}`` for reporting."""
+        principals = self.principals if principals is None else list(principals)
+        layer_ids = list(self.layers) if layer_ids is None else list(layer_ids)
+        return {
+            principal or ANONYMOUS: {layer_id: self.decide(principal, layer_id) for layer_id in layer_ids}
+            for principal in principals
+        }
+
+    def summary(self) -> dict[str, Union[str, int, bool, None]]:
+        return {
+            "policy_id": self.policy_id,
+            "pack_id": self.pack_id,
+            "tenant": self.tenant,
+            "layers": len(self.layers),
+            "principal_classes": len(self.principals),
+            "decisions": len(self._decisions),
+            "authentication_required": self.authentication_required,
+            "expired": self.expired,
+        }
@@ -0,0 +1,90 @@
+"""
+Per-rule timing and I/O accounting for validation.
+
+``RuleTimer.measure`` wraps each rule method with ``perf_counter_ns`` and
+makes its entry current, so readers deep in the call stack (range reads,
+asset hashing, manifest and footer reads) can charge the bytes and files
+they read to it with ``record_read``. Reads made outside a measured rule are
+ignored. The current entry is a context variable, so validations running in
+different threads or tasks never charge each other; pools that do work for a
+rule submit it with ``contextvars.copy_context().run``.
+
+``profile_to`` runs a block under cProfile and writes pstats output that
+``python -m pstats``, snakeviz or flameprof can load.
+"""
+
+import contextvars
+import cProfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+_lock = threading.Lock()
+
+# Entry of the rule being measured in this context
+_current: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("spatialpack_rule", default=None)
+
+
+def record_read(nbytes: int, files: int = 0) -> None:
+    """Charge ``nbytes`` read from ``files`` newly opened files to the current rule."""
+    entry = _current.get()
+    if entry is None:
+        return
+    with _lock:
+        entry["bytes_read"] += nbytes
+        entry["files"] += files
+
+
+class RuleTimer:
+    """Accumulates wall time, bytes read and files touched per rule method."""
+
+    def __init__(self) -> None:
+        self.rules: dict[str, dict] = {}
+
+    @contextmanager
+    def measure(self, name: str, group: str) -> Iterator[dict]:
+        entry = self.rules.setdefault(
+            name, {"group": group, "calls": 0, "ns": 0, "bytes_read": 0, "files": 0}
+        )
+        token = _current.set(entry)
+        start = time.perf_counter_ns()
+        try:
+            yield entry
+        finally:
+            entry["ns"] += time.perf_counter_ns() - start
+            entry["calls"] += 1
+            _current.reset(token)
+
+    def report(self) -> dict:
+        """JSON-ready timings, slowest rule first."""
+        rules = sorted(self.rules.items(), key=lambda item: item[1]["ns"], reverse=True)
+        return {
+            "total_ms": round(sum(entry["ns"] for _, entry in rules) / 1e6, 3),
+            "rules": {
+                name: {
+                    "group": entry["group"],
+                    "ms": round(entry["ns"] / 1e6, 3),
+                    "calls": entry["calls"],
+                    "bytes_read": entry["bytes_read"],
+                    "files": entry["files"],
+                }
+                for name, entry in rules
+            },
+        }
+
+
+@contextmanager
+def profile_to(path: Optional[Path]) -> Iterator[Optional[cProfile.Profile]]:
+    """Profile the block with cProfile and dump pstats to ``path`` (no-op if None)."""
+    if path is None:
+        yield None
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(str(path))
@@ -0,0 +1,458 @@
+"""
+Local SQL over the GeoParquet layers of a pack.
+
+``PackQuery`` opens one DuckDB connection for a pack and exposes every local
+``parquet`` layer as a view named after the layer ``id``. Queries can be
+scoped to a lon/lat bbox and/or H3 cells: the row groups that cannot match
+are dropped before DuckDB reads them, using the layer's H3 sidecar (see
+``spatialpack.h3index``) and the row-group statistics of the GeoParquet 1.1
+``covering.bbox`` columns. The surviving row groups are selected with
+``file_row_number`` ranges, which DuckDB pushes into the Parquet scan, and
+rows are then filtered to the bbox.
+
+Bytes skipped are the compressed sizes of the pruned row groups, taken from
+the Parquet footers. Bytes read are measured from the process I/O counters
+(``/proc/self/io``) where the platform has them.
+"""
+
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Optional, Sequence, Union
+
+import duckdb
+
+from spatialpack.h3index import (
+    H3Index,
+    H3IndexError,
+    bboxes_intersect,
+    cell_bbox,
+    h3,
+    quote_identifier,
+    read_row_groups,
+    require_h3,
+    sidecar_path,
+    wkb_envelope,
+)
+from spatialpack.validators.geoparquet import inspect_geoparquet
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # pragma: no cover - optional dependency (full extra)
+    pyarrow = None
+
+OUTPUT_FORMATS = ("csv", "parquet", "arrow")
+
+# Rows per Arrow record batch when streaming results
+BATCH_ROWS = 65536
+
+_WKB_UDF = "_spatialpack_wkb_intersects"
+
+
+class QueryError(ValueError):
+    """Raised when a pack cannot be opened for querying or a query scope is invalid."""
+
+
+def _io_bytes_read() -> Optional[int]:
+    """Bytes this process has read so far (Linux ``rchar``), or None."""
+    try:
+        with open("/proc/self/io", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _bbox_wkb(bbox: Sequence[float]) -> bytes:
+    xmin, ymin, xmax, ymax = bbox
+    ring = [(xmin, ymin), (xmax, ymin), (xmax, ymax), (xmin, ymax), (xmin, ymin)]
+    return struct.pack("<BIII", 1, 3, 1, len(ring)) + b"".join(struct.pack("<dd", x, y) for x, y in ring)
+
+
+def _intersection(a: Optional[Sequence[float]], b: Optional[Sequence[float]]) -> Optional[list[float]]:
+    if a is None:
+        return list(b) if b is not None else None
+    if b is None:
+        return list(a)
+    return [max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3])]
+
+
+def _wkb_intersects(wkb: Optional[bytes], xmin: float, ymin: float, xmax: float, ymax: float) -> bool:
+    if wkb is None:
+        return False
+    envelope = wkb_envelope(wkb)
+    return envelope is not None and bboxes_intersect(envelope, (xmin, ymin, xmax, ymax))
+
+
+class PackQuery:
+    """A DuckDB session over the GeoParquet layers of one pack.
+
+    The connection and the layer metadata (footers, sidecars) are loaded
+    once and reused by every query in the session.
+    """
+
+    def __init__(self, pack_path: Union[str, Path], manifest: dict, con: Optional[duckdb.DuckDBPyConnection] = None):
+        self.root = Path(pack_path)
+        self.con = con or duckdb.connect()
+        self.con.execute("SET enable_progress_bar = false")
+        self.warnings: list[str] = []
+        functions = {
+            row[0] for row in self.con.execute(
+                "SELECT function_name FROM duckdb_functions() "
+                "WHERE function_name IN ('st_intersects_extent', 'st_geomfromwkb')"
+            ).fetchall()
+        }
+        self._native_extent = len(functions) == 2
+        self._wkb_udf: Optional[bool] = None
+        self._parser: Optional[duckdb.DuckDBPyConnection] = None
+        self.layers: dict[str, dict] = {}
+        for layer in manifest.get("layers", []):
+            if isinstance(layer, dict) and isinstance(layer.get("id"), str) \
+                    and str(layer.get("parquet", "")).startswith("./"):
+                self.layers[layer["id"]] = self._load_layer(layer)
+        if not self.layers:
+            raise QueryError("Pack has no local GeoParquet layers")
+        self._scope: Any = ()
+        self._plans: dict = {}
+        self._create_views(None, ())
+
+    def __enter__(self) -> "PackQuery":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.con.close()
+        if self._parser is not None:
+            self._parser.close()
+
+    # --- Layers ------------------------------------------------------------
+
+    def _load_layer(self, layer: dict) -> dict:
+        path = os.path.abspath(self.root / layer["parquet"][2:])
+        try:
+            info = inspect_geoparquet(path, self.con)
+            groups = read_row_groups(self.con, path)
+            types = dict(
+                (row[0], row[1]) for row in self.con.execute("DESCRIBE SELECT * FROM read_parquet(?)", [path]).fetchall()
+            )
+        except duckdb.Error as e:
+            raise QueryError(f"Cannot read layer '{layer['id']}': {e}") from e
+
+        geo = info["geo"] if isinstance(info["geo"], dict) else {}
+        primary = geo.get("primary_column")
+        column = (geo.get("columns") or {}).get(primary) or {}
+        covering = (column.get("covering") or {}).get("bbox")
+        encoding = str(column.get("encoding", "WKB")).lower()
+        paths = None
+        if isinstance(covering, dict):
+            try:
+                paths = [list(covering[key]) for key in ("xmin", "ymin", "xmax", "ymax")]
+            except (KeyError, TypeError):
+                paths = None
+        elif primary and encoding == "point":
+            paths = [[primary, "x"], [primary, "y"], [primary, "x"], [primary, "y"]]
+        if paths:
+            self._add_stats_bboxes(path, groups, paths)
+
+        entry = {
+            "id": layer["id"],
+            "path": path,
+            "files": sorted({group["file"] for group in groups}),
+            "row_groups": groups,
+            "geometry": primary if primary in types else None,
+            "geometry_type": types.get(primary, ""),
+            "bbox_paths": paths,
+            "sidecar": None,
+        }
+        entry["filter"] = "covering" if paths else "wkb" if entry["geometry"] and encoding == "wkb" else None
+
+        sidecar = sidecar_path(self.root, layer["id"])
+        if sidecar.exists() and h3 is not None:
+            try:
+                index = H3Index.load(sidecar, root=self.root)
+            except H3IndexError as e:
+                self.warnings.append(f"{layer['id']}: {e}")
+            else:
+                if index.stale:
+                    self.warnings.append(f"{layer['id']}: H3 index is stale and was ignored; run h3-index")
+                else:
+                    entry["sidecar"] = index
+        return entry
+
+    def _add_stats_bboxes(self, path: str, groups: list[dict], paths: list[list[str]]) -> None:
+        """Attach each row group's bbox from the covering column statistics."""
+        names = [", ".join(parts) for parts in paths]
+        rows = self.con.execute(
+            "SELECT file_name, row_group_id, path_in_schema, "
+            "TRY_CAST(stats_min_value AS DOUBLE), TRY_CAST(stats_max_value AS DOUBLE) "
+            "FROM parquet_metadata(?) WHERE path_in_schema IN (?, ?, ?, ?)",
+            [path, *names],
+        ).fetchall()
+        stats = {(row[0], row[1], row[2]): (row[3], row[4]) for row in rows}
+        for group in groups:
+            key = (group["file"], group["row_group"])
+            try:
+                bbox = [
+                    stats[(*key, names[0])][0],
+                    stats[(*key, names[1])][0],
+                    stats[(*key, names[2])][1],
+                    stats[(*key, names[3])][1],
+                ]
+            except KeyError:
+                continue
+            if not any(value is None for value in bbox):
+                group["stats_bbox"] = bbox
+
+    # --- Scoping -----------------------------------------------------------
+
+    def plan(self, bbox: Optional[Sequence[float]] = None, cells: Sequence[Union[int, str]] = ()) -> dict:
+        """Row groups each layer must read for a bbox and/or cell scope.
+
+        Returns:
+            dict of layer id to ``{"row_groups", "pruned_by", "bbox"}`` where
+            ``row_groups`` lists indexes into the layer's row groups and
+            ``bbox`` is the row-level filter (None for no filter).
+        """
+        cells = list(cells)
+        if cells:
+            require_h3()
+            try:
+                cells_bbox = [cell_bbox(cell) for cell in cells]
+            except (ValueError, TypeError) as e:
+                raise QueryError(f"Invalid H3 cell: {e}") from e
+            row_bbox = _intersection(bbox, [
+                min(b[0] for b in cells_bbox), min(b[1] for b in cells_bbox),
+                max(b[2] for b in cells_bbox), max(b[3] for b in cells_bbox),
+            ])
+        else:
+            row_bbox = list(bbox) if bbox is not None else None
+
+        plans = {}
+        for layer_id, layer in self.layers.items():
+            groups = layer["row_groups"]
+            selected = set(range(len(groups)))
+            pruned_by = []
+            if row_bbox is None:
+                plans[layer_id] = {"row_groups": sorted(selected), "pruned_by": pruned_by, "bbox": None}
+                continue
+            if row_bbox[0] > row_bbox[2] or row_bbox[1] > row_bbox[3]:
+                plans[layer_id] = {"row_groups": [], "pruned_by": ["bbox"], "bbox": row_bbox}
+                continue
+
+            index: Optional[H3Index] = layer["sidecar"]
+            if index is not None:
+                matches = index.lookup_cells(cells) if cells else index.lookup_bbox(row_bbox)
+                if cells and bbox is not None:
+                    in_bbox = {id(group) for group in index.lookup_bbox(bbox)}
+                    matches = [group for group in matches if id(group) in in_bbox]
+                keys = {(os.path.abspath(self.root / group["file"]), group["row_group"]) for group in matches}
+                selected &= {
+                    i for i, group in enumerate(groups)
+                    if (os.path.abspath(group["file"]), group["row_group"]) in keys
+                }
+                pruned_by.append("h3")
+            if any("stats_bbox" in group for group in groups):
+                selected &= {
+                    i for i, group in enumerate(groups)
+                    if "stats_bbox" not in group or bboxes_intersect(group["stats_bbox"], row_bbox)
+                }
+                pruned_by.append("stats")
+            plans[layer_id] = {
+                "row_groups": sorted(selected),
+                "pruned_by": pruned_by,
+                "bbox": row_bbox if layer["filter"] else None,
+            }
+        return plans
+
+    def _row_filter(self, layer: dict, bbox: Sequence[float]) -> Optional[str]:
+        """SQL predicate keeping rows whose bbox intersects ``bbox``, if one can be built."""
+        xmin, ymin, xmax, ymax = (repr(float(v)) for v in bbox)
+        if layer["filter"] == "covering":
+            exprs = [".".join(quote_identifier(part) for part in parts) for parts in layer["bbox_paths"]]
+            return f"{exprs[0]} <= {xmax} AND {exprs[2]} >= {xmin} AND {exprs[1]} <= {ymax} AND {exprs[3]} >= {ymin}"
+        column = quote_identifier(layer["geometry"])
+        if self._native_extent:
+            if not layer["geometry_type"].upper().startswith("GEOMETRY"):
+                column = f"st_geomfromwkb({column})"
+            return f"st_intersects_extent({column}, st_geomfromwkb(from_hex('{_bbox_wkb(bbox).hex()}')))"
+        if self._wkb_udf is None:
+            # Older DuckDB: envelope check in Python (DuckDB needs numpy for UDFs)
+            try:
+                self.con.create_function(
+                    _WKB_UDF, _wkb_intersects,
+                    ["BLOB", "DOUBLE", "DOUBLE", "DOUBLE", "DOUBLE"], "BOOLEAN",
+                    null_handling="special",
+                )
+                self._wkb_udf = True
+            except duckdb.Error as e:
+                self._wkb_udf = False
+                self.warnings.append(f"WKB rows are not filtered to the bbox, only row groups: {e}")
+        if not self._wkb_udf:
+            return None
+        return f"{_WKB_UDF}({column}, {xmin}, {ymin}, {xmax}, {ymax})"
+
+    def _layer_sql(self, layer: dict, plan: Optional[dict]) -> str:
+        source = _literal(layer["path"])
+        if plan is None:
+            return f"SELECT * FROM read_parquet({source})"
+        groups = layer["row_groups"]
+        multi_file = len(layer["files"]) > 1
+        by_file: dict[str, list[list[int]]] = {}
+        for i in plan["row_groups"]:
+            group = groups[i]
+            ranges = by_file.setdefault(group["file"], [])
+            first, last = group["row_start"], group["row_start"] + group["num_rows"] - 1
+            if ranges and ranges[-1][1] + 1 == first:
+                ranges[-1][1] = last
+            else:
+                ranges.append([first, last])
+
+        clauses = []
+        for file_name, ranges in by_file.items():
+            rows = " OR ".join(f"file_row_number BETWEEN {first} AND {last}" for first, last in ranges)
+            clauses.append(f"(filename = {_literal(file_name)} AND ({rows}))" if multi_file else f"({rows})")
+        where = " OR ".join(clauses) or "false"
+        row_filter = self._row_filter(layer, plan["bbox"]) if plan["bbox"] is not None and clauses else None
+        if row_filter:
+            where = f"({where}) AND {row_filter}"
+        extra = ", filename = true" if multi_file else ""
+        exclude = "file_row_number, filename" if multi_file else "file_row_number"
+        return (
+            f"SELECT * EXCLUDE ({exclude}) FROM read_parquet({source}, file_row_number = true{extra}) "
+            f"WHERE {where}"
+        )
+
+    def _create_views(self, bbox: Optional[Sequence[float]], cells: Sequence[Union[int, str]]) -> dict:
+        scope = (tuple(bbox) if bbox is not None else None, tuple(cells))
+        if scope == self._scope:
+            return self._plans
+        plans = self.plan(bbox, cells) if scope != (None, ()) else {}
+        for layer_id, layer in self.layers.items():
+            sql = self._layer_sql(layer, plans.get(layer_id))
+            for name in self.view_names(layer_id):
+                self.con.execute(f"CREATE OR REPLACE VIEW {quote_identifier(name)} AS {sql}")
+        self._scope, self._plans = scope, plans
+        return plans
+
+    @staticmethod
+    def view_names(layer_id: str) -> list[str]:
+        """The layer id, plus an identifier-friendly alias if it differs."""
+        alias = "".join(c if c.isalnum() or c == "_" else "_" for c in layer_id)
+        return [layer_id] if alias == layer_id else [layer_id, alias]
+
+    # --- Execution ---------------------------------------------------------
+
+    def _referenced_layers(self, sql: str) -> list[str]:
+        # A bare connection, so the views are not expanded into their sources
+        if self._parser is None:
+            self._parser = duckdb.connect()
+        try:
+            names = {name.lower() for name in self._parser.get_table_names(sql)}
+        except (AttributeError, duckdb.Error):
+            return list(self.layers)
+        return [
+            layer_id for layer_id in self.layers
+            if any(view.lower() in names for view in self.view_names(layer_id))
+        ]
+
+    def _stats(self, sql: str, plans: dict, read_before: Optional[int], started: float) -> dict:
+        read_after = _io_bytes_read()
+        layers = {}
+        for layer_id in self._referenced_layers(sql):
+            groups = self.layers[layer_id]["row_groups"]
+            plan = plans.get(layer_id)
+            selected = plan["row_groups"] if plan else range(len(groups))
+            total = sum(group["bytes"] for group in groups)
+            scanned = sum(groups[i]["bytes"] for i in selected)
+            layers[layer_id] = {
+                "row_groups": len(groups),
+                "row_groups_read": len(selected),
+                "bytes": total,
+                "bytes_scanned": scanned,
+                "bytes_skipped": total - scanned,
+                "pruned_by": plan["pruned_by"] if plan else [],
+            }
+        return {
+            "layers": layers,
+            "bytes_skipped": sum(layer["bytes_skipped"] for layer in layers.values()),
+            "bytes_read": read_after - read_before if read_before is not None and read_after is not None else None,
+            "elapsed_ms": (time.perf_counter() - started) * 1000,
+        }
+
+    def execute(
+        self,
+        sql: str,
+        bbox: Optional[Sequence[float]] = None,
+        cells: Sequence[Union[int, str]] = (),
+        max_rows: Optional[int] = None,
+    ) -> tuple[list[str], list[tuple], dict]:
+        """Run a query and fetch up to ``max_rows`` rows (all if None).
+
+        Returns:
+            ``(columns, rows, stats)``; ``stats`` has per-layer row groups
+            and bytes scanned/skipped, ``bytes_read`` and ``elapsed_ms``.
+        """
+        started = time.perf_counter()
+        plans = self._create_views(bbox, cells)
+        read_before = _io_bytes_read()
+        result = self.con.execute(sql)
+        columns = [column[0] for column in result.description or []]
+        rows = result.fetchall() if max_rows is None else result.fetchmany(max_rows)
+        stats = self._stats(sql, plans, read_before, started)
+        stats["rows"] = len(rows)
+        return columns, rows, stats
+
+    def export(
+        self,
+        sql: str,
+        output: Union[str, Path, BinaryIO],
+        fmt: str,
+        bbox: Optional[Sequence[float]] = None,
+        cells: Sequence[Union[int, str]] = (),
+    ) -> dict:
+        """Stream a query's results to ``output`` as CSV, Parquet or Arrow IPC.
+
+        CSV and Parquet are written by DuckDB ``COPY`` and need a path;
+        Arrow streams record batches to a path or binary file object and
+        needs pyarrow.
+        """
+        if fmt not in OUTPUT_FORMATS:
+            raise QueryError(f"Unknown output format '{fmt}'")
+        started = time.perf_counter()
+        plans = self._create_views(bbox, cells)
+        read_before = _io_bytes_read()
+        rows = None
+        if fmt == "arrow":
+            if pyarrow is None:
+                raise RuntimeError("pyarrow is not installed (pip install spatialpack[full])")
+            reader = self.con.execute(sql).fetch_record_batch(BATCH_ROWS)
+            sink = open(output, "wb") if isinstance(output, (str, Path)) else output
+            try:
+                rows = 0
+                with pyarrow.ipc.new_stream(sink, reader.schema) as writer:
+                    for batch in reader:
+                        writer.write_batch(batch)
+                        rows += batch.num_rows
+            finally:
+                if sink is not output:
+                    sink.close()
+        else:
+            if not isinstance(output, (str, Path)):
+                raise QueryError(f"{fmt} output needs a file path")
+            options = "FORMAT csv, HEADER true" if fmt == "csv" else "FORMAT parquet, COMPRESSION zstd"
+            result = self.con.execute(f"COPY ({sql}) TO {_literal(str(output))} ({options})").fetchone()
+            rows = result[0] if result else None
+        stats = self._stats(sql, plans, read_before, started)
+        stats["rows"] = rows
+        return stats
+
@@ -0,0 +1,643 @@
+"""
+Streaming statistics for raster (COG) layers.
+
+``compute_raster_stats`` reads a GeoTIFF one tile (or strip) at a time and
+reduces each block as it is decoded. Memory therefore stays at a few
+blocks per worker, however large the raster. Runs of consecutive blocks are
+handed to a process pool. Each run returns a small partial:
+
+- valid pixel count, min, max and sum
+- for 8- and 16-bit integer data, exact value counts
+
+The parent merges the partials as they arrive.
+
+- min, max and the valid pixel count are exact. The mean divides an exact
+  integer sum (integer data), or a ``math.fsum`` of per-block totals
+  (float data; float32 blocks are summed in float64), by the count.
+- Nodata pixels (GDAL_NODATA, or an explicit ``nodata``) and NaNs are not
+  counted.
+- Histograms and percentiles are exact for 8- and 16-bit integer data,
+  which come from the value counts. Other data take a second pass that bins
+  values into ``PERCENTILE_BINS`` equal bins between the exact min and max.
+  Each order statistic is placed within its bin, so percentiles are off by
+  at most one bin width (reported as ``percentile_error``).
+
+NumPy (``full`` extra) vectorizes decoding and reductions. Without it the
+same steps run on ``array.array`` through C-level builtins (``min``,
+``max``, ``sum``, ``sorted``, ``Counter``, ``accumulate``). Blocks may be
+uncompressed, LZW, Deflate or LZMA, with the horizontal (2) or
+floating-point (3) predictor.
+"""
+
+import lzma
+import math
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from itertools import accumulate, filterfalse
+from pathlib import Path
+from typing import Any, Iterator, Optional, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency (full extra)
+    np = None
+
+from spatialpack.validators.cog import COMPRESSION, TIFFError, read_block_layout
+from spatialpack.validators.ranges import RangeSource
+
+# Equal-width bins used for percentiles of data without exact value counts
+PERCENTILE_BINS = 4096
+
+# Integer data up to this width keeps exact value counts (at most 65536 keys)
+EXACT_COUNT_BITS = 16
+
+# (TIFF SampleFormat, BitsPerSample) -> array/NumPy type code
+_TYPECODES = {
+    (1, 8): "B", (1, 16): "H", (1, 32): "I", (1, 64): "Q",
+    (2, 8): "b", (2, 16): "h", (2, 32): "i", (2, 64): "q",
+    (3, 32): "f", (3, 64): "d",
+}
+_UNSIGNED = {"b": "B", "h": "H", "i": "I", "q": "Q"}
+DTYPE_NAMES = {
+    "B": "uint8", "H": "uint16", "I": "uint32", "Q": "uint64",
+    "b": "int8", "h": "int16", "i": "int32", "q": "int64",
+    "f": "float32", "d": "float64",
+}
+
+_NATIVE_ORDER = "<" if sys.byteorder == "little" else ">"
+_LZW_BASE = [bytes((i,)) for i in range(256)] + [b"", b""]
+_LOW_BYTE = (255).__and__
+
+
+class RasterStatsError(ValueError):
+    """Raised when raster statistics cannot be computed."""
+
+
+def _lzw_decode(data: bytes) -> bytes:
+    """Decode TIFF LZW (MSB-first codes, early change)."""
+    out = bytearray()
+    table: list[bytes] = []
+    prev = b""
+    bits = 9
+    pos = 0
+    end = len(data) * 8
+    padded = bytes(data) + b"\0\0\0"
+    while pos + bits <= end:
+        byte = pos >> 3
+        chunk = (padded[byte] << 16) | (padded[byte + 1] << 8) | padded[byte + 2]
+        code = (chunk >> (24 - (pos & 7) - bits)) & ((1 << bits) - 1)
+        pos += bits
+        if code == 256:
+            table, bits, prev = list(_LZW_BASE), 9, b""
+            continue
+        if code == 257:
+            break
+        if code < len(table):
+            entry = table[code]
+            if prev:
+                table.append(prev + entry[:1])
+        elif code == len(table) and prev:
+            entry = prev + prev[:1]
+            table.append(entry)
+        else:
+            raise RasterStatsError("Corrupt LZW block")
+        out += entry
+        prev = entry
+        if len(table) + 1 >= 1 << bits and bits < 12:
+            bits += 1
+    return bytes(out)
+
+
+def _decompress(raw: bytes, compression: int) -> bytes:
+    try:
+        if compression == 1:
+            return raw
+        if compression in (8, 32946):
+            return zlib.decompress(raw)
+        if compression == 5:
+            return _lzw_decode(raw)
+        if compression == 34925:
+            return lzma.decompress(raw)
+    except (zlib.error, lzma.LZMAError) as e:
+        raise RasterStatsError(f"Corrupt {COMPRESSION[compression]} block: {e}") from e
+    raise RasterStatsError(f"Unsupported compression '{COMPRESSION.get(compression, compression)}'")
+
+
+def _undo_horizontal_predictor(values: array, row_values: int, samples: int) -> array:
+    """Undo TIFF predictor 2 in place of each row (integer data)."""
+    typecode = values.typecode
+    unsigned = _UNSIGNED.get(typecode, typecode)
+    work = values
+    if unsigned != typecode:
+        work = array(unsigned)
+        work.frombytes(values.tobytes())
+    wrap = ((1 << (8 * work.itemsize)) - 1).__and__
+    for start in range(0, len(work) - row_values + 1, row_values):
+        for lane in range(samples):
+            row = slice(start + lane, start + row_values, samples)
+            work[row] = array(unsigned, map(wrap, accumulate(work[row])))
+    if work is values:
+        return values
+    out = array(typecode)
+    out.frombytes(work.tobytes())
+    return out
+
+
+def _undo_float_predictor(data: bytes, row_values: int, samples: int, itemsize: int) -> bytes:
+    """Undo TIFF predictor 3; returns native-order sample bytes."""
+    row_bytes = row_values * itemsize
+    out = bytearray(len(data) - len(data) % row_bytes)
+    for start in range(0, len(out), row_bytes):
+        row = bytearray(data[start:start + row_bytes])
+        for lane in range(samples):
+            row[lane::samples] = bytes(map(_LOW_BYTE, accumulate(row[lane::samples])))
+        # Byte planes are stored most significant first
+        for plane in range(itemsize):
+            position = itemsize - 1 - plane if _NATIVE_ORDER == "<" else plane
+            out[start + position:start + row_bytes:itemsize] = row[plane * row_values:(plane + 1) * row_values]
+    return bytes(out)
+
+
+class _Scanner:
+    """Reads, decodes and reduces the blocks of one band of one image."""
+
+    def __init__(self, location: Union[str, Path], layout: dict, band: int, nodata: Optional[float]):
+        self.source = RangeSource(location)
+        self.layout = layout
+        self.typecode = _TYPECODES[(layout["sample_format"], layout["bits"])]
+        self.itemsize = layout["bits"] // 8
+        self.is_float = layout["sample_format"] == 3
+        self.exact_counts = not self.is_float and layout["bits"] <= EXACT_COUNT_BITS
+        # A float, so that ``nodata.__ne__`` compares with any sample type
+        self.nodata = None if nodata is None else float(nodata)
+        self.across = -(-layout["width"] // layout["block_width"])
+        self.blocks = self.across * -(-layout["height"] // layout["block_height"])
+        planar = layout["planar"] == 2 and layout["samples"] > 1
+        # Values per decoded row, and where the band sits in each row
+        self.row_values = layout["block_width"] * (1 if planar else layout["samples"])
+        self.step = 1 if planar else layout["samples"]
+        self.lane = 0 if planar else band - 1
+        self.plane_offset = (band - 1) * self.blocks if planar else 0
+        self.bytes_read = 0
+
+    def close(self) -> None:
+        self.source.close()
+
+    def _decode(self, data: bytes) -> Any:
+        """Decompressed block bytes -> native-order values (array or ndarray)."""
+        layout = self.layout
+        predictor = layout["predictor"]
+        swap = layout["byte_order"] != _NATIVE_ORDER and self.itemsize > 1
+        if predictor == 2 and self.is_float:
+            raise RasterStatsError("Horizontal predictor on floating-point data is not valid TIFF")
+        if np is not None:
+            rows = len(data) // (self.row_values * self.itemsize)
+            if predictor == 3:
+                planes = np.frombuffer(data, np.uint8)[:rows * self.row_values * self.itemsize]
+                planes = planes.reshape(rows, -1, self.step).cumsum(axis=1, dtype=np.uint8)
+                planes = planes.reshape(rows, self.itemsize, self.row_values).transpose(0, 2, 1)
+                if _NATIVE_ORDER == "<":
+                    planes = planes[..., ::-1]
+                return np.ascontiguousarray(planes).view(self.typecode).reshape(-1)
+            dtype = np.dtype(self.typecode).newbyteorder(layout["byte_order"])
+            values = np.frombuffer(data, dtype, count=rows * self.row_values).astype(self.typecode)
+            if predictor == 2:
+                values = values.reshape(rows, -1, self.step).cumsum(axis=1, dtype=self.typecode).reshape(-1)
+            return values
+        if predictor == 3:
+            data = _undo_float_predictor(data, self.row_values, self.step, self.itemsize)
+            swap = False
+        values = array(self.typecode)
+        values.frombytes(data[:len(data) - len(data) % self.itemsize])
+        if swap:
+            values.byteswap()
+        if predictor == 2:
+            values = _undo_horizontal_predictor(values, self.row_values, self.step)
+        return values
+
+    def values(self, block: int, filtered: bool = True) -> tuple[Any, int]:
+        """``(values, pixel count)`` of one block, cropped to the image.
+
+        Nodata and NaN values are dropped unless ``filtered`` is false.
+        """
+        layout = self.layout
+        row, col = divmod(block, self.across)
+        rows = min(layout["block_height"], layout["height"] - row * layout["block_height"])
+        cols = min(layout["block_width"], layout["width"] - col * layout["block_width"])
+        index = self.plane_offset + block
+        length = layout["byte_counts"][index]
+        if not length:
+            # Sparse block (GDAL SPARSE_OK): all nodata, or zero without nodata
+            if self.nodata is not None:
+                return (np.empty(0, self.typecode) if np is not None else array(self.typecode)), rows * cols
+            data = bytes(rows * self.row_values * self.itemsize)
+        else:
+            raw = self.source.read(layout["offsets"][index], length)
+            if len(raw) != length:
+                raise RasterStatsError(f"Block {index} is truncated ({len(raw)} of {length} bytes)")
+            self.bytes_read += length
+            data = _decompress(raw, layout["compression"])
+        values = self._decode(data)
+        if len(values) < rows * self.row_values:
+            raise RasterStatsError(f"Block {index} decodes to {len(values)} values, expected {rows * self.row_values}")
+
+        if np is not None:
+            values = values[:rows * self.row_values].reshape(rows, self.row_values)
+            values = values[:, self.lane:cols * self.step:self.step].reshape(-1)
+            if not filtered:
+                return values, rows * cols
+            keep = None
+            if self.nodata is not None:
+                keep = values != self.nodata
+            if self.is_float:
+                keep = ~np.isnan(values) if keep is None else keep & ~np.isnan(values)
+            if keep is not None and not keep.all():
+                values = values[keep]
+            return values, rows * cols
+
+        if cols * self.step != self.row_values or self.lane or self.step != 1:
+            cropped = array(self.typecode)
+            for start in range(0, rows * self.row_values, self.row_values):
+                cropped.extend(values[start + self.lane:start + cols * self.step:self.step])
+            values = cropped
+        else:
+            del values[rows * self.row_values:]
+        if not filtered:
+            return values, rows * cols
+        if self.nodata is not None and values.count(self.nodata):
+            values = array(self.typecode, filter(self.nodata.__ne__, values))
+        if self.is_float:
+            total = sum(values)
+            if total != total:  # NaN present (or +inf and -inf)
+                values = array(self.typecode, filterfalse(math.isnan, values))
+        return values, rows * cols
+
+    def summarize(self, start: int, stop: int) -> dict:
+        """Partial statistics over blocks ``[start, stop)``."""
+        if self.exact_counts:
+            return self._summarize_counts(start, stop)
+        partial = {"pixels": 0, "valid": 0, "min": None, "max": None, "sum": 0, "counts": None, "bytes": 0}
+        sums = []
+        before = self.bytes_read
+        for block in range(start, stop):
+            values, pixels = self.values(block)
+            partial["pixels"] += pixels
+            if not len(values):
+                continue
+            partial["valid"] += len(values)
+            if np is not None:
+                low, high = values.min().item(), values.max().item()
+                if self.typecode == "f":
+                    # float32 values are exact in float64, so this is only pairwise rounding
+                    sums.append(float(values.sum(dtype=np.float64)))
+                elif self.is_float:
+                    sums.append(math.fsum(values.tolist()))
+                elif self.itemsize < 8:
+                    sums.append(int(values.sum(dtype=np.int64)))
+                else:
+                    sums.append(sum(values.tolist()))
+            else:
+                low, high = min(values), max(values)
+                sums.append(math.fsum(values) if self.is_float else sum(values))
+            partial["min"] = low if partial["min"] is None else min(partial["min"], low)
+            partial["max"] = high if partial["max"] is None else max(partial["max"], high)
+        partial["sum"] = math.fsum(sums) if self.is_float else sum(sums)
+        partial["bytes"] = self.bytes_read - before
+        return partial
+
+    def _summarize_counts(self, start: int, stop: int) -> dict:
+        """``summarize`` for 8- and 16-bit integers: everything follows from the value counts."""
+        partial = {"pixels": 0, "valid": 0, "min": None, "max": None, "sum": 0, "counts": None, "bytes": 0}
+        before = self.bytes_read
+        counts: Counter = Counter()
+        if np is not None:
+            # bincount over every possible value, shifted to start at zero
+            bias = 1 << (self.itemsize * 8 - 1) if self.typecode in "bh" else 0
+            tally = np.zeros(1 << (self.itemsize * 8), np.int64)
+            for block in range(start, stop):
+                values, pixels = self.values(block, filtered=False)
+                partial["pixels"] += pixels
+                if len(values):
+                    tally += np.bincount(values.astype(np.int32) + bias, minlength=len(tally))
+            keys = np.flatnonzero(tally)
+            counts.update(dict(zip((keys - bias).tolist(), tally[keys].tolist())))
+        else:
+            for block in range(start, stop):
+                values, pixels = self.values(block, filtered=False)
+                partial["pixels"] += pixels
+                counts.update(values)
+        if self.nodata is not None:
+            counts.pop(self.nodata, None)
+        if counts:
+            partial["valid"] = sum(counts.values())
+            partial["min"], partial["max"] = min(counts), max(counts)
+            partial["sum"] = sum(value * count for value, count in counts.items())
+        partial["counts"] = counts
+        partial["bytes"] = self.bytes_read - before
+        return partial
+
+    def bin(self, start: int, stop: int, low: float, high: float, bins: Sequence[int]) -> dict:
+        """Counts of valid values in equal bins over ``[low, high]``, per entry of ``bins``."""
+        totals = [[0] * n for n in bins]
+        edges = [_inner_edges(low, high, n) for n in bins]
+        before = self.bytes_read
+        for block in range(start, stop):
+            values, _ = self.values(block)
+            if not len(values):
+                continue
+            ordered = sorted(values) if np is None and high != low else None
+            for i, n in enumerate(bins):
+                if high == low:
+                    counts = [len(values)] + [0] * (n - 1)
+                elif np is not None:
+                    # float64 range: otherwise float32 data get float32 bin edges
+                    counts = np.histogram(values, bins=n, range=(np.float64(low), np.float64(high)))[0].tolist()
+                else:
+                    cuts = [0] + [bisect_left(ordered, edge) for edge in edges[i]] + [len(ordered)]
+                    counts = [cuts[j + 1] - cuts[j] for j in range(n)]
+                totals[i] = [a + b for a, b in zip(totals[i], counts)]
+        return {"counts": totals, "bytes": self.bytes_read - before}
+
+
+# Per-process scanner for pool workers, opened by _init_worker
+_scanner: Optional[_Scanner] = None
+
+
+def _init_worker(location: str, layout: dict, band: int, nodata: Optional[float]) -> None:
+    global _scanner
+    _scanner = _Scanner(location, layout, band, nodata)
+
+
+def _worker_summarize(start: int, stop: int) -> dict:
+    return _scanner.summarize(start, stop)
+
+
+def _worker_bin(start: int, stop: int, low: float, high: float, bins: Sequence[int]) -> dict:
+    return _scanner.bin(start, stop, low, high, bins)
+
+
+def _run(
+    pool: Optional[Executor], scanner: _Scanner, window: int, method: str, runs: list[tuple[int, int]], *args: Any
+) -> Iterator[Any]:
+    """Results of ``scanner.<method>(start, stop, *args)`` per run, in completion order.
+
+    At most ``window`` runs are in flight, so results never pile up.
+    """
+    if pool is None:
+        for start, stop in runs:
+            yield getattr(scanner, method)(start, stop, *args)
+        return
+    worker = _worker_summarize if method == "summarize" else _worker_bin
+    pending: set = set()
+    queue = iter(runs)
+    while True:
+        for start, stop in queue:
+            pending.add(pool.submit(worker, start, stop, *args))
+            if len(pending) >= window:
+                break
+        if not pending:
+            return
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+
+
+def _tidy(value: Any, typecode: str) -> Any:
+    """Shortest decimal that round-trips ``value`` as a float32 (float32 data)."""
+    if typecode != "f" or not isinstance(value, float) or not math.isfinite(value):
+        return value
+    packed = struct.pack("f", value)
+    for digits in range(6, 10):
+        candidate = float(f"{value:.{digits}g}")
+        if struct.pack("f", candidate) == packed:
+            return candidate
+    return value
+
+
+def _inner_edges(low: float, high: float, bins: int) -> list[float]:
+    """Edges between ``bins`` equal bins, computed as ``numpy.histogram`` does."""
+    step = (high - low) / bins
+    return [low + i * step for i in range(1, bins)]
+
+
+def _percentile_key(p: float) -> str:
+    return f"p{p:g}"
+
+
+def _exact_distribution(
+    counts: Counter, low: Any, high: Any, bins: Optional[int], percentiles: Sequence[float]
+) -> tuple[Optional[list[int]], dict]:
+    """Histogram and percentiles from exact value counts."""
+    items = sorted(counts.items())
+    values = [value for value, _ in items]
+    cumulative = list(accumulate(count for _, count in items))
+    total = cumulative[-1]
+
+    def order_statistic(k: int) -> Any:
+        return values[bisect_right(cumulative, k)]
+
+    result = {}
+    for p in percentiles:
+        rank = p / 100 * (total - 1)
+        below = math.floor(rank)
+        value = order_statistic(below)
+        if rank > below:
+            value = value + (rank - below) * (order_statistic(below + 1) - value)
+        result[_percentile_key(p)] = value
+
+    histogram = None
+    if bins:
+        histogram = [0] * bins
+        edges = _inner_edges(low, high, bins)
+        for value, count in items:
+            histogram[bisect_right(edges, value)] += count
+    return histogram, result
+
+
+def _binned_percentiles(totals: list[int], low: float, high: float, percentiles: Sequence[float]) -> dict:
+    """Percentiles from equal-width bins.
+
+    Order statistics are placed evenly within their bin (the extremes at the
+    exact min and max) and interpolated as in ``_exact_distribution``, so each
+    estimate is within one bin width however sparse the bins are.
+    """
+    width = (high - low) / len(totals)
+    cumulative = list(accumulate(totals))
+    total = cumulative[-1]
+
+    def order_statistic(k: int) -> float:
+        if k == 0:
+            return low
+        if k == total - 1:
+            return high
+        index = bisect_right(cumulative, k)
+        before = cumulative[index - 1] if index else 0
+        return low + width * (index + (k - before + 0.5) / totals[index])
+
+    result = {}
+    for p in percentiles:
+        rank = p / 100 * (total - 1)
+        below = math.floor(rank)
+        value = order_statistic(below)
+        if rank > below:
+            value = value + (rank - below) * (order_statistic(below + 1) - value)
+        result[_percentile_key(p)] = min(max(value, low), high)
+    return result
+
+
+def compute_raster_stats(
+    location: Union[str, Path],
+    band: int = 1,
+    overview: int = 0,
+    nodata: Optional[float] = None,
+    histogram_bins: Optional[int] = None,
+    percentiles: Sequence[float] = (),
+    jobs: int = 1,
+    blocks_per_task: Optional[int] = None,
+) -> dict:
+    """Compute statistics of one band of a GeoTIFF by streaming its blocks.
+
+    Args:
+        location: Local path or http(s) URL of the GeoTIFF
+        band: 1-based band number
+        overview: 0 for full resolution, 1.. for an overview (faster, approximate)
+        nodata: Value to exclude (defaults to the file's GDAL_NODATA)
+        histogram_bins: Equal-width bins over ``[min, max]`` (None for no histogram)
+        percentiles: Percentiles to estimate, each in ``[0, 100]``
+        jobs: Worker processes (0 = one per CPU, 1 = in this process)
+        blocks_per_task: Blocks per pool task (default: about eight tasks per worker)
+
+    Returns:
+        dict with ``min``, ``max``, ``mean``, ``nodata``, ``pixels``,
+        ``valid_pixels``, ``histogram`` (``{"bins", "min", "max", "counts"}``
+        or None), ``percentiles`` (``{"p50": ...}``), ``percentile_error``
+        (0.0 when exact), ``dtype``, ``width``, ``height``, ``blocks``,
+        ``engine``, ``workers``, ``passes``, ``bytes_read`` and ``elapsed_ms``.
+        Statistics are None when every pixel is nodata.
+
+    Raises:
+        RasterStatsError: if the file cannot be read or decoded
+    """
+    start_time = time.perf_counter()
+    location = str(location)
+    if any(not 0 <= p <= 100 for p in percentiles):
+        raise RasterStatsError("Percentiles must be between 0 and 100")
+    try:
+        with RangeSource(location) as source:
+            layout = read_block_layout(source, overview)
+    except (TIFFError, OSError) as e:
+        raise RasterStatsError(f"Cannot read {location}: {e}") from e
+    if (layout["sample_format"], layout["bits"]) not in _TYPECODES:
+        raise RasterStatsError(
+            f"Unsupported sample type (SampleFormat {layout['sample_format']}, {layout['bits']} bits)"
+        )
+    if layout["compression"] not in (1, 5, 8, 32946, 34925):
+        _decompress(b"", layout["compression"])  # raises with the codec name
+    if not 1 <= band <= layout["samples"]:
+        raise RasterStatsError(f"Band {band} does not exist (image has {layout['samples']})")
+    if nodata is None:
+        nodata = layout["nodata"]
+    if nodata is not None and math.isnan(nodata):
+        nodata = None  # NaNs are always excluded
+
+    scanner = _Scanner(location, layout, band, nodata)
+    workers = min(jobs or os.cpu_count() or 1, scanner.blocks)
+    size = blocks_per_task or max(1, min(64, -(-scanner.blocks // (workers * 8))))
+    runs = [(first, min(first + size, scanner.blocks)) for first in range(0, scanner.blocks, size)]
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(location, layout, band, nodata),
+        )
+    try:
+        pixels = valid = bytes_read = 0
+        low = high = None
+        sums = []
+        counts: Optional[Counter] = Counter() if scanner.exact_counts else None
+        for partial in _run(pool, scanner, workers * 2, "summarize", runs):
+            pixels += partial["pixels"]
+            valid += partial["valid"]
+            bytes_read += partial["bytes"]
+            sums.append(partial["sum"])
+            if partial["valid"]:
+                low = partial["min"] if low is None else min(low, partial["min"])
+                high = partial["max"] if high is None else max(high, partial["max"])
+            if counts is not None:
+                counts.update(partial["counts"])
+        total = math.fsum(sums) if scanner.is_float else sum(sums)
+
+        passes = 1
+        histogram, estimates, error = None, {}, 0.0
+        wanted = valid and (histogram_bins or percentiles) and math.isfinite(low) and math.isfinite(high)
+        if wanted and counts is not None:
+            histogram, estimates = _exact_distribution(counts, low, high, histogram_bins, percentiles)
+        elif wanted:
+            # Second pass: equal-width bins between the exact min and max,
+            # for the histogram and (finer) for percentiles
+            passes = 2
+            bins = ([histogram_bins] if histogram_bins else []) + ([PERCENTILE_BINS] if percentiles else [])
+            totals = [[0] * n for n in bins]
+            for part in _run(pool, scanner, workers * 2, "bin", runs, low, high, bins):
+                totals = [[a + b for a, b in zip(mine, theirs)] for mine, theirs in zip(totals, part["counts"])]
+                bytes_read += part["bytes"]
+            if histogram_bins:
+                histogram = totals[0]
+            if percentiles:
+                estimates = _binned_percentiles(totals[-1], low, high, percentiles)
+                error = (high - low) / PERCENTILE_BINS
+    finally:
+        scanner.close()
+        if pool is not None:
+            pool.shutdown()
+
+    tc = scanner.typecode
+    return {
+        "min": _tidy(low, tc),
+        "max": _tidy(high, tc),
+        "mean": total / valid if valid else None,
+        "nodata": nodata,
+        "pixels": pixels,
+        "valid_pixels": valid,
+        "histogram": (
+            {"bins": histogram_bins, "min": _tidy(low, tc), "max": _tidy(high, tc), "counts": histogram}
+            if histogram is not None else None
+        ),
+        "percentiles": {key: _tidy(value, tc) for key, value in estimates.items()},
+        "percentile_error": error,
+        "dtype": DTYPE_NAMES[tc],
+        "width": layout["width"],
+        "height": layout["height"],
+        "blocks": scanner.blocks,
+        "overview": overview,
+        "engine": "numpy" if np is not None else "python",
+        "workers": workers,
+        "passes": passes,
+        "bytes_read": bytes_read,
+        "elapsed_ms": round((time.perf_counter() - start_time) * 1000, 1),
+    }
+
+
+def raster_stats_entry(result: dict, existing: Optional[dict] = None) -> dict:
+    """Manifest ``raster_stats`` for a ``compute_raster_stats`` result.
+
+    Keys in ``existing`` that were not recomputed are kept.
+    """
+    entry = dict(existing or {})
+    entry.update({"min": result["min"], "max": result["max"], "mean": result["mean"]})
+    if result["nodata"] is not None:
+        nodata = result["nodata"]
+        entry["nodata"] = int(nodata) if float(nodata).is_integer() else nodata
+    if result["histogram"] is not None:
+        entry["histogram"] = result["histogram"]
+    if result["percentiles"]:
+        entry["percentiles"] = result["percentiles"]
+    return entry
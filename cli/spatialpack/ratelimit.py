@@ -0,0 +1,338 @@
+"""
+Request rate limits and bandwidth metering for pack serving.
+
+``RateLimiter`` enforces ``access.rate_limits`` from a pack's policy.json
+for each (tenant, pack_id). ``requests_per_minute`` is a token bucket that
+allows bursts of up to one minute's allowance. ``bandwidth_mb_per_day`` is
+a byte quota per UTC day, in decimal megabytes.
+
+``acquire`` is O(1) and touches only memory. Bucket state is split across
+shards, each a dict behind its own lock, so threads serving different
+tenants rarely wait on each other. Request, byte and rejection counts
+collect in memory. They are written to an SQLite ledger in batches, one
+upsert transaction per ``flush``, from a background thread started with
+``start``. On start-up the limiter reads today's byte totals back from the
+ledger, so daily quotas survive restarts.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, NamedTuple, Optional
+
+from spatialpack.cache import CACHE_DIR
+from spatialpack.policy import load_policy
+
+LEDGER_FILE = "usage.sqlite"
+
+SECONDS_PER_DAY = 86_400
+BYTES_PER_MB = 1_000_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    tenant TEXT NOT NULL,
+    pack_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    requests INTEGER NOT NULL DEFAULT 0,
+    bytes INTEGER NOT NULL DEFAULT 0,
+    rejected INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (tenant, pack_id, day)
+);
+"""
+
+_UPSERT = """
+INSERT INTO usage (tenant, pack_id, day, requests, bytes, rejected) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (tenant, pack_id, day) DO UPDATE SET
+    requests = requests + excluded.requests,
+    bytes = bytes + excluded.bytes,
+    rejected = rejected + excluded.rejected
+"""
+
+
+class RateLimitError(ValueError):
+    """Raised when rate limits or the usage ledger cannot be loaded."""
+
+
+class RateLimits(NamedTuple):
+    """Limits for one pack; None means unlimited."""
+
+    requests_per_minute: Optional[float] = None
+    bytes_per_day: Optional[int] = None
+
+    @classmethod
+    def from_policy(cls, policy: dict) -> "RateLimits":
+        """Read ``access.rate_limits`` from a parsed policy.json."""
+        limits = (policy.get("access") or {}).get("rate_limits") or {}
+        rpm = limits.get("requests_per_minute")
+        mb_per_day = limits.get("bandwidth_mb_per_day")
+        for name, value in (("requests_per_minute", rpm), ("bandwidth_mb_per_day", mb_per_day)):
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0):
+                raise RateLimitError(f"access.rate_limits.{name} must be a positive number, got {value!r}")
+        return cls(
+            float(rpm) if rpm is not None else None,
+            int(mb_per_day * BYTES_PER_MB) if mb_per_day is not None else None,
+        )
+
+
+UNLIMITED = RateLimits()
+
+
+def default_ledger_path(root: Path) -> Path:
+    """Ledger location for a tree: ``<root>/.spatialpack/usage.sqlite``.
+
+    Usage is not a cache, so it sits beside the cache folder rather than in it.
+    """
+    return Path(root) / CACHE_DIR.parent / LEDGER_FILE
+
+
+def _day_label(day: int) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(day * SECONDS_PER_DAY))
+
+
+class _Bucket:
+    __slots__ = ("key", "tokens", "stamp", "day", "day_bytes", "requests", "bytes", "rejected", "dirty")
+
+    def __init__(self, key: tuple[str, str], tokens: float, now: float, day: int, day_bytes: int):
+        self.key = key
+        self.tokens = tokens
+        self.stamp = now
+        self.day = day
+        self.day_bytes = day_bytes
+        # Counts not yet written to the ledger, all for self.day
+        self.requests = 0
+        self.bytes = 0
+        self.rejected = 0
+        self.dirty = False
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets", "dirty", "carry")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets: dict[tuple[str, str], _Bucket] = {}
+        self.dirty: list[_Bucket] = []
+        # Ledger rows for days that ended before they were flushed
+        self.carry: list[tuple] = []
+
+
+class RateLimiter:
+    """Per-(tenant, pack_id) request and bandwidth limits with a usage ledger."""
+
+    def __init__(
+        self,
+        ledger_path: Optional[Path] = None,
+        shards: int = 16,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            ledger_path: SQLite usage ledger (None keeps counts in memory only)
+            shards: Lock shards for bucket state (rounded up to a power of two)
+            clock: Wall-clock seconds; UTC days are derived from it
+
+        Raises:
+            RateLimitError: if the ledger cannot be opened
+        """
+        self.limits: dict[str, RateLimits] = {}
+        count = 1
+        while count < max(1, shards):
+            count *= 2
+        self._shards = [_Shard() for _ in range(count)]
+        self._mask = count - 1
+        self._clock = clock
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.ledger_path = Path(ledger_path) if ledger_path else None
+        self._con: Optional[sqlite3.Connection] = None
+        self._restored: dict[tuple[str, str], int] = {}
+        self._restored_day = int(clock() // SECONDS_PER_DAY)
+        if self.ledger_path:
+            try:
+                self.ledger_path.parent.mkdir(parents=True, exist_ok=True)
+                # Written only under _flush_lock, from whichever thread flushes
+                self._con = sqlite3.connect(self.ledger_path, check_same_thread=False)
+                self._con.executescript(_SCHEMA)
+                self._restored = {
+                    (tenant, pack_id): nbytes
+                    for tenant, pack_id, nbytes in self._con.execute(
+                        "SELECT tenant, pack_id, bytes FROM usage WHERE day = ?",
+                        (_day_label(self._restored_day),),
+                    )
+                }
+            except (OSError, sqlite3.Error) as e:
+                raise RateLimitError(f"Cannot open usage ledger {self.ledger_path}: {e}") from e
+
+    def set_limits(self, pack_id: str, limits: RateLimits) -> None:
+        """Limit requests to ``pack_id``; packs without limits are only metered."""
+        self.limits[pack_id] = limits
+
+    def add_pack(self, pack_path: Path) -> str:
+        """Load ``access.rate_limits`` from a pack's policy.json; returns its pack_id."""
+        try:
+            policy, manifest = load_policy(pack_path)
+        except ValueError as e:
+            raise RateLimitError(str(e)) from e
+        pack_id = manifest.get("pack_id") or policy.get("pack_id")
+        if not isinstance(pack_id, str):
+            raise RateLimitError(f"{pack_path} has no pack_id")
+        self.set_limits(pack_id, RateLimits.from_policy(policy))
+        return pack_id
+
+    def _bucket(self, key: tuple[str, str], limits: RateLimits, now: float, day: int) -> _Bucket:
+        day_bytes = self._restored.pop(key, 0) if day == self._restored_day else 0
+        return _Bucket(key, limits.requests_per_minute or 0.0, now, day, day_bytes)
+
+    def acquire(self, tenant: str, pack_id: str, nbytes: int = 0) -> float:
+        """Count one request for ``nbytes`` bytes against the limits.
+
+        A request is admitted only if its ``nbytes`` fit in what is left of
+        the day's quota.
+
+        Returns:
+            0.0 if the request may proceed, otherwise the seconds until it
+            could (the request is counted as rejected and uses no quota)
+        """
+        now = self._clock()
+        day = int(now // SECONDS_PER_DAY)
+        key = (tenant, pack_id)
+        limits = self.limits.get(pack_id, UNLIMITED)
+        shard = self._shards[hash(key) & self._mask]
+        with shard.lock:
+            bucket = shard.buckets.get(key)
+            if bucket is None:
+                bucket = shard.buckets[key] = self._bucket(key, limits, now, day)
+            if bucket.day != day:
+                self._roll_over(shard, bucket, day)
+            if not bucket.dirty:
+                bucket.dirty = True
+                shard.dirty.append(bucket)
+
+            rpm = limits.requests_per_minute
+            if rpm is not None:
+                tokens = bucket.tokens + max(0.0, now - bucket.stamp) * rpm / 60
+                if tokens > rpm:
+                    tokens = rpm
+                bucket.stamp = now
+                bucket.tokens = tokens
+                if tokens < 1:
+                    bucket.rejected += 1
+                    return (1 - tokens) * 60 / rpm
+            quota = limits.bytes_per_day
+            if quota is not None and bucket.day_bytes + nbytes > quota:
+                bucket.rejected += 1
+                return (day + 1) * SECONDS_PER_DAY - now
+            if rpm is not None:
+                bucket.tokens -= 1
+            bucket.requests += 1
+            bucket.bytes += nbytes
+            bucket.day_bytes += nbytes
+        return 0.0
+
+    def record(self, tenant: str, pack_id: str, nbytes: int) -> None:
+        """Meter bytes sent for an already admitted request (e.g. once a stream ends)."""
+        now = self._clock()
+        day = int(now // SECONDS_PER_DAY)
+        key = (tenant, pack_id)
+        shard = self._shards[hash(key) & self._mask]
+        with shard.lock:
+            bucket = shard.buckets.get(key)
+            if bucket is None:
+                bucket = shard.buckets[key] = self._bucket(key, self.limits.get(pack_id, UNLIMITED), now, day)
+            if bucket.day != day:
+                self._roll_over(shard, bucket, day)
+            if not bucket.dirty:
+                bucket.dirty = True
+                shard.dirty.append(bucket)
+            bucket.bytes += nbytes
+            bucket.day_bytes += nbytes
+
+    @staticmethod
+    def _roll_over(shard: _Shard, bucket: _Bucket, day: int) -> None:
+        # Called with shard.lock held; keeps the old day's counts for the ledger
+        if bucket.requests or bucket.bytes or bucket.rejected:
+            shard.carry.append((*bucket.key, _day_label(bucket.day), bucket.requests, bucket.bytes, bucket.rejected))
+        bucket.requests = bucket.bytes = bucket.rejected = 0
+        bucket.day = day
+        bucket.day_bytes = 0
+
+    def flush(self) -> int:
+        """Write pending counts to the ledger in one transaction; returns rows written."""
+        rows = []
+        for shard in self._shards:
+            with shard.lock:
+                dirty, shard.dirty = shard.dirty, []
+                rows.extend(shard.carry)
+                shard.carry = []
+                for bucket in dirty:
+                    bucket.dirty = False
+                    if bucket.requests or bucket.bytes or bucket.rejected:
+                        rows.append(
+                            (*bucket.key, _day_label(bucket.day), bucket.requests, bucket.bytes, bucket.rejected)
+                        )
+                        bucket.requests = bucket.bytes = bucket.rejected = 0
+        if not rows or self._con is None:
+            return 0
+        with self._flush_lock:
+            try:
+                with self._con:
+                    self._con.executemany(_UPSERT, rows)
+            except sqlite3.Error as e:
+                # Keep the counts for the next flush
+                with self._shards[0].lock:
+                    self._shards[0].carry[:0] = rows
+                raise RateLimitError(f"Cannot write usage ledger {self.ledger_path}: {e}") from e
+        return len(rows)
+
+    def usage(self, day: Optional[str] = None) -> list[dict[str, Any]]:
+        """Ledger rows for ``day`` (YYYY-MM-DD, default: today UTC), after a flush."""
+        if self._con is None:
+            raise RateLimitError("Rate limiter has no usage ledger")
+        self.flush()
+        day = day or _day_label(int(self._clock() // SECONDS_PER_DAY))
+        with self._flush_lock:
+            cursor = self._con.execute(
+                "SELECT tenant, pack_id, day, requests, bytes, rejected FROM usage WHERE day = ? "
+                "ORDER BY tenant, pack_id",
+                (day,),
+            )
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def start(self, interval: float = 1.0) -> None:
+        """Flush the ledger every ``interval`` seconds from a daemon thread."""
+        if self._thread is not None:
+            return
+
+        def run() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    self.flush()
+                except RateLimitError:
+                    pass  # rows were put back; the next flush retries them
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name="spatialpack-ledger", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop the flush thread, write pending counts and close the ledger."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        try:
+            self.flush()
+        finally:
+            if self._con is not None:
+                self._con.close()
+                self._con = None
+
+    def __enter__(self) -> "RateLimiter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
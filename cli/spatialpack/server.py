@@ -0,0 +1,495 @@
+"""
+Long-running validation service.
+
+Serves ``ManifestValidator`` over HTTP/1.1 on asyncio streams, so the Pack
+Service can validate on every upload without spawning a CLI process:
+
+- ``POST /validate?pack=<dir>`` validates a pack under the service root
+- ``POST /validate`` with a JSON body validates that manifest document
+  (rules that need the pack's files are skipped)
+- ``GET /health`` reports liveness and queue depth
+- ``GET /metrics`` exposes request and validation latency histograms in
+  the Prometheus text format
+
+Options are query parameters: ``strict``, ``deep``, ``verify_hashes``,
+``cache`` and ``max_errors``. Responses are the conformance report that
+``spatialpack validate --output`` writes.
+
+Validation runs in a bounded process pool. Each worker keeps the compiled
+schema, the digest caches of recently validated packs and one DuckDB
+connection (with the Parquet metadata cache on) across requests. Requests
+beyond ``max_pending`` are rejected with 503 rather than queued without
+bound. A validation that raises is answered with a JSON error: 422 for a
+manifest body, 500 for a pack.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Hashable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from spatialpack import __version__
+
+# Latency histogram bucket upper bounds, in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_HEADERS = 100
+KEEPALIVE_TIMEOUT = 15.0
+
+# Packs whose digest caches a worker keeps open
+HASH_CACHE_PACKS = 64
+
+ROUTES = {"/validate": ("POST",), "/health": ("GET", "HEAD"), "/metrics": ("GET", "HEAD")}
+
+# Query flag values; a bare ``?deep`` counts as true
+_TRUE = {"1", "true", "yes", "on", ""}
+_FALSE = {"0", "false", "no", "off"}
+
+
+class ServerError(ValueError):
+    """Request error, returned to the client with an HTTP status."""
+
+    def __init__(self, status: HTTPStatus, message: str, headers: Optional[dict] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class Histogram:
+    """Cumulative latency histogram per label set (Prometheus style)."""
+
+    def __init__(self, name: str, help_text: str, buckets: tuple[float, ...] = BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, seconds: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        series = self._series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                series[0][i] += 1
+        series[1] += seconds
+        series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in sorted(self._series.items()):
+            labels = ",".join(f'{k}="{v}"' for k, v in key)
+            prefix = labels + "," if labels else ""
+            suffix = f"{{{labels}}}" if labels else ""
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound:g}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{suffix} {total:.6f}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+class LRUCache:
+    """Least-recently-used mapping with a fixed number of entries."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        """Cached value for ``key``, calling ``load`` on a miss."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            value = self._data[key] = load()
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return value
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Per-worker state, kept warm across requests
+_worker: dict[str, Any] = {}
+
+
+def _init_worker(root: str) -> None:
+    """Pool initializer: compile the schema and open DuckDB once per worker."""
+    from spatialpack.validators.manifest import ManifestValidator
+
+    _worker.update(root=Path(root), con=None, hash_caches=LRUCache(HASH_CACHE_PACKS))
+    # The schema is looked up beside the pack's parent directory
+    ManifestValidator(Path(root) / "_")
+    _connection()
+
+
+def _connection() -> Any:
+    if _worker.get("con") is None:
+        import duckdb
+
+        con = duckdb.connect()
+        con.execute("SET parquet_metadata_cache = true")
+        _worker["con"] = con
+    return _worker["con"]
+
+
+def _report(result: dict, strict: bool, start_ns: int, **fields: Any) -> dict:
+    """Conformance report in the shape ``spatialpack validate`` writes."""
+    errors, warnings = result["errors"], result["warnings"]
+    if errors or (warnings and strict):
+        status = "fail"
+    elif warnings:
+        status = "warn"
+    else:
+        status = "pass"
+    report = {
+        "validator": f"spatialpack-cli@{__version__}",
+        **fields,
+        "status": status,
+        "checked_at": datetime.utcnow().isoformat() + "Z",
+        "duration_ms": (time.perf_counter_ns() - start_ns) // 1_000_000,
+        "summary": {
+            "errors": len(errors),
+            "warnings": len(warnings),
+            "layers_validated": result.get("layers_validated", 0),
+        },
+        "errors": errors,
+        "warnings": warnings,
+        "timings": result["timings"],
+    }
+    if result["asset_details"]:
+        report["assets"] = result["asset_details"]
+    if result["cached_groups"]:
+        report["cache"] = {"reused_groups": result["cached_groups"]}
+    return report
+
+
+def validate_pack_job(pack_path: str, strict: bool, options: dict) -> dict:
+    """Worker entry point: validate a pack directory."""
+    from spatialpack.integrity import HashCache
+    from spatialpack.validators.manifest import ManifestValidator
+
+    start_ns = time.perf_counter_ns()
+    pack = Path(pack_path)
+    hash_caches = _worker.setdefault("hash_caches", LRUCache(HASH_CACHE_PACKS))
+    validator = ManifestValidator(
+        pack,
+        con=_connection() if options.get("deep") else None,
+        hash_cache=hash_caches.get(pack, lambda: HashCache.for_pack(pack)),
+        **options,
+    )
+    return _report(validator.validate(), strict, start_ns, pack_path=str(pack))
+
+
+def validate_document_job(data: bytes, strict: bool, options: dict) -> dict:
+    """Worker entry point: validate a manifest document."""
+    from spatialpack.validators.manifest import ManifestValidator
+
+    start_ns = time.perf_counter_ns()
+    root = _worker.get("root", Path.cwd())
+    validator = ManifestValidator(root / "_", max_errors=options.get("max_errors", 50))
+    return _report(validator.validate_document(data), strict, start_ns, pack_path=None)
+
+
+def _flag(query: dict, name: str) -> bool:
+    value = query.get(name, ["false"])[-1].lower()
+    if value in _TRUE:
+        return True
+    if value in _FALSE:
+        return False
+    raise ServerError(HTTPStatus.BAD_REQUEST, f"Invalid value for {name}: {value!r}")
+
+
+async def read_request_head(reader: asyncio.StreamReader, request_line: bytes) -> tuple[str, str, str, dict]:
+    """Parse a request line and headers into ``(method, target, version, headers)``.
+
+    Header names are lower-cased.
+    """
+    try:
+        method, target, version = request_line.decode("latin-1").split()
+    except ValueError:
+        raise ServerError(HTTPStatus.BAD_REQUEST, "Malformed request line") from None
+    headers: dict[str, str] = {}
+    while True:
+        try:
+            line = await reader.readline()
+        except ValueError:
+            raise ServerError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Header line too long") from None
+        if line in (b"\r\n", b"\n", b""):
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise ServerError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Too many headers")
+        name, sep, value = line.decode("latin-1").partition(":")
+        if not sep:
+            raise ServerError(HTTPStatus.BAD_REQUEST, "Malformed header line")
+        headers[name.strip().lower()] = value.strip()
+    return method.upper(), target, version.upper(), headers
+
+
+def keep_alive(version: str, headers: dict) -> bool:
+    """Whether the connection stays open after this request."""
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        return connection == "keep-alive"
+    return connection != "close"
+
+
+async def run_server(handle: Callable[..., Awaitable[None]], host: str, port: int) -> None:
+    """Run ``asyncio.start_server(handle)`` until cancelled, SIGINT or SIGTERM."""
+    server = await asyncio.start_server(handle, host, port)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, server.close)
+        except (NotImplementedError, RuntimeError):  # Windows, or not the main thread
+            pass
+    async with server:
+        try:
+            await server.serve_forever()
+        except asyncio.CancelledError:
+            if server.is_serving():
+                raise
+
+
+class ValidationServer:
+    """Asyncio HTTP front end over a bounded validation pool."""
+
+    def __init__(
+        self,
+        root: Path,
+        workers: int = 2,
+        max_pending: Optional[int] = None,
+        max_body: int = MAX_BODY_BYTES,
+    ):
+        """Configure the server; ``start_pool`` starts the workers.
+
+        Args:
+            root: Directory that ``?pack=`` paths are resolved against;
+                packs outside it are refused
+            workers: Validation processes (0 validates on a thread in the
+                server process)
+            max_pending: Validations queued or running before 503s
+                (default: four per worker)
+            max_body: Largest accepted request body in bytes
+        """
+        self.root = Path(root).resolve()
+        self.workers = workers
+        self.max_pending = max_pending or 4 * max(1, workers)
+        self.max_body = max_body
+        self.pending = 0
+        self.started = time.time()
+        self.requests = Histogram(
+            "spatialpack_http_request_duration_seconds", "HTTP request latency by route and status code."
+        )
+        self.validations = Histogram(
+            "spatialpack_validation_duration_seconds", "Validation latency by mode and result status."
+        )
+        self.rejected = 0
+        self._pool: Optional[Executor] = None
+
+    def start_pool(self) -> None:
+        """Start and warm the validation pool."""
+        if self.workers == 0:
+            self._pool = ThreadPoolExecutor(max_workers=1, initializer=_init_worker, initargs=(str(self.root),))
+        else:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(str(self.root),),
+            )
+        # Start every worker now so the first request does not pay for it
+        for future in [self._pool.submit(os.getpid) for _ in range(max(1, self.workers))]:
+            future.result()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def serve(self, host: str, port: int) -> None:
+        """Serve until cancelled, SIGINT or SIGTERM."""
+        await run_server(self.handle, host, port)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve HTTP/1.1 requests on one connection (keep-alive aware)."""
+        try:
+            while True:
+                too_long = False
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEPALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                except ValueError:
+                    # Longer than the reader's limit; answered below, then closed
+                    request_line, too_long = b"", True
+                if not request_line and not too_long:
+                    break
+                start = time.perf_counter()
+                route, persistent = "other", False
+                try:
+                    if too_long:
+                        raise ServerError(HTTPStatus.REQUEST_URI_TOO_LONG, "Request line too long")
+                    method, target, version, headers = await read_request_head(reader, request_line)
+                    persistent = keep_alive(version, headers)
+                    url = urlsplit(target)
+                    route = url.path if url.path in ROUTES else "other"
+                    body = await self._read_body(reader, method, headers)
+                    status, content_type, payload, extra = await self._dispatch(
+                        method, url.path, parse_qs(url.query, keep_blank_values=True), body
+                    )
+                except ServerError as e:
+                    status, content_type, extra = e.status, "application/json", e.headers
+                    payload = json.dumps({"error": str(e)}).encode("utf-8")
+                    if e.status in (HTTPStatus.BAD_REQUEST, HTTPStatus.REQUEST_ENTITY_TOO_LARGE):
+                        persistent = False
+                await self._respond(writer, status, content_type, payload, persistent, extra,
+                                    head=request_line.startswith(b"HEAD "))
+                self.requests.observe(time.perf_counter() - start, route=route, code=str(status.value))
+                if not persistent:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_body(self, reader: asyncio.StreamReader, method: str, headers: dict) -> bytes:
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise ServerError(HTTPStatus.LENGTH_REQUIRED, "Chunked bodies are not supported; send Content-Length")
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise ServerError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length") from None
+        if length < 0:
+            raise ServerError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length > self.max_body:
+            raise ServerError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Body exceeds {self.max_body} bytes")
+        return await reader.readexactly(length) if length else b""
+
+    async def _dispatch(self, method: str, path: str, query: dict, body: bytes) -> tuple:
+        if path not in ROUTES:
+            raise ServerError(HTTPStatus.NOT_FOUND, f"No route for {path}")
+        if method not in ROUTES[path]:
+            raise ServerError(
+                HTTPStatus.METHOD_NOT_ALLOWED,
+                f"{method} not allowed on {path}",
+                {"Allow": ", ".join(ROUTES[path])},
+            )
+        if path == "/health":
+            payload = {
+                "status": "ok",
+                "version": __version__,
+                "workers": self.workers,
+                "pending": self.pending,
+                "max_pending": self.max_pending,
+                "uptime_s": round(time.time() - self.started, 1),
+            }
+            return HTTPStatus.OK, "application/json", json.dumps(payload).encode("utf-8"), {}
+        if path == "/metrics":
+            return HTTPStatus.OK, "text/plain; version=0.0.4", self.metrics().encode("utf-8"), {}
+        report = await self.validate(query, body)
+        return HTTPStatus.OK, "application/json", json.dumps(report).encode("utf-8"), {}
+
+    def _resolve_pack(self, pack: str) -> Path:
+        path = (self.root / pack).resolve()
+        if path != self.root and self.root not in path.parents:
+            raise ServerError(HTTPStatus.FORBIDDEN, f"Pack path is outside the service root: {pack}")
+        if not path.is_dir():
+            raise ServerError(HTTPStatus.NOT_FOUND, f"Pack directory not found: {pack}")
+        return path
+
+    async def validate(self, query: dict, body: bytes) -> dict:
+        """Run one validation on the pool (``?pack=`` or a manifest body)."""
+        strict = _flag(query, "strict")
+        options = {
+            "deep": _flag(query, "deep"),
+            "verify_hashes": _flag(query, "verify_hashes"),
+            "use_cache": _flag(query, "cache"),
+        }
+        try:
+            max_errors = int(query.get("max_errors", ["50"])[-1])
+        except ValueError:
+            raise ServerError(HTTPStatus.BAD_REQUEST, "max_errors must be an integer") from None
+        if max_errors < 0:
+            raise ServerError(HTTPStatus.BAD_REQUEST, "max_errors must be >= 0")
+        options["max_errors"] = max_errors or None
+
+        if "pack" in query:
+            mode, job = "pack", (validate_pack_job, str(self._resolve_pack(query["pack"][-1])), strict, options)
+        elif body:
+            mode, job = "manifest", (validate_document_job, body, strict, options)
+        else:
+            raise ServerError(HTTPStatus.BAD_REQUEST, "Send ?pack=<dir> or a manifest JSON body")
+
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise ServerError(HTTPStatus.SERVICE_UNAVAILABLE, "Validation queue is full", {"Retry-After": "1"})
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            report = await asyncio.get_running_loop().run_in_executor(self._pool, *job)
+        except Exception as e:
+            # A crashed job must still get a response; a body that broke a
+            # rule is the client's problem, anything else is ours
+            self.validations.observe(time.perf_counter() - start, mode=mode, status="error")
+            status = HTTPStatus.UNPROCESSABLE_ENTITY if mode == "manifest" else HTTPStatus.INTERNAL_SERVER_ERROR
+            raise ServerError(status, f"Validation failed: {type(e).__name__}: {e}") from e
+        finally:
+            self.pending -= 1
+        self.validations.observe(time.perf_counter() - start, mode=mode, status=report["status"])
+        return report
+
+    def metrics(self) -> str:
+        """Prometheus text exposition of the service metrics."""
+        lines = self.requests.render() + self.validations.render()
+        lines += [
+            "# HELP spatialpack_validations_pending Validations queued or running.",
+            "# TYPE spatialpack_validations_pending gauge",
+            f"spatialpack_validations_pending {self.pending}",
+            "# HELP spatialpack_validations_rejected_total Validations refused because the queue was full.",
+            "# TYPE spatialpack_validations_rejected_total counter",
+            f"spatialpack_validations_rejected_total {self.rejected}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    async def _respond(
+        writer: asyncio.StreamWriter,
+        status: HTTPStatus,
+        content_type: str,
+        payload: bytes,
+        keep_alive: bool,
+        extra: dict,
+        head: bool = False,
+    ) -> None:
+        headers = {
+            "Content-Type": content_type,
+            "Content-Length": str(len(payload)),
+            "Connection": "keep-alive" if keep_alive else "close",
+            "Server": f"spatialpack/{__version__}",
+            **extra,
+        }
+        head_block = f"HTTP/1.1 {status.value} {status.phrase}\r\n" + "".join(
+            f"{name}: {value}\r\n" for name, value in headers.items()
+        )
+        writer.write(head_block.encode("latin-1") + b"\r\n" + (b"" if head else payload))
+        await writer.drain()
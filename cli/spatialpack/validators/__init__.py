@@ -1,5 +1,35 @@
-"""Spatialpack validators."""
+"""Spatialpack validators.
 
-from spatialpack.validators.manifest import ManifestValidator
+Exports are resolved on first access, so importing one validator module
+(e.g. ``validators.geoparquet``) does not pull in the others.
+"""
 
-__all__ = ["ManifestValidator"]
+import importlib
+from typing import Any
+
+_EXPORTS = {
+    "ManifestValidator": "spatialpack.validators.manifest",
+    "PMTilesError": "spatialpack.validators.pmtiles",
+    "TIFFError": "spatialpack.validators.cog",
+    "get_compiled_schema": "spatialpack.validators.manifest",
+    "inspect_cog": "spatialpack.validators.cog",
+    "inspect_geoparquet": "spatialpack.validators.geoparquet",
+    "inspect_pmtiles": "spatialpack.validators.pmtiles",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    "ManifestValidator",
+    "PMTilesError",
+    "TIFFError",
+    "get_compiled_schema",
+    "inspect_cog",
+    "inspect_geoparquet",
+    "inspect_pmtiles",
+]
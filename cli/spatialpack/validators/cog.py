@@ -0,0 +1,350 @@
+"""
+Cloud Optimized GeoTIFF structure inspection from header reads.
+
+A pure-Python TIFF/BigTIFF IFD parser that reads only the file header, the
+GDAL ghost area and the IFD chain (plus the first entry of each tile offset
+array). Pixel data is never read, so a continent-scale COG is inspected with
+a handful of small range reads. ``read_block_layout`` reads one image's full
+tile offset arrays for readers of pixel data (``spatialpack.rasterstats``).
+
+COG layout reference: https://docs.ogc.org/is/21-026/21-026.html
+"""
+
+import re
+import struct
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from spatialpack.validators.ranges import RangeSource
+
+# Bytes fetched up front; GDAL COGs keep the header and all IFDs here
+HEAD_SIZE = 16384
+
+# Guard against malformed files with cyclic or runaway IFD chains
+MAX_IFDS = 64
+
+TAG_NEW_SUBFILE_TYPE = 254
+TAG_IMAGE_WIDTH = 256
+TAG_IMAGE_LENGTH = 257
+TAG_BITS_PER_SAMPLE = 258
+TAG_COMPRESSION = 259
+TAG_STRIP_OFFSETS = 273
+TAG_SAMPLES_PER_PIXEL = 277
+TAG_ROWS_PER_STRIP = 278
+TAG_STRIP_BYTE_COUNTS = 279
+TAG_PLANAR_CONFIGURATION = 284
+TAG_PREDICTOR = 317
+TAG_TILE_WIDTH = 322
+TAG_TILE_LENGTH = 323
+TAG_TILE_OFFSETS = 324
+TAG_TILE_BYTE_COUNTS = 325
+TAG_SAMPLE_FORMAT = 339
+TAG_GDAL_METADATA = 42112
+TAG_GDAL_NODATA = 42113
+
+# NewSubfileType bits
+SUBFILE_REDUCED = 0x1
+SUBFILE_MASK = 0x4
+
+COMPRESSION = {
+    1: "none", 5: "lzw", 7: "jpeg", 8: "deflate", 32946: "deflate",
+    34887: "lerc", 50000: "zstd", 50001: "webp", 34925: "lzma",
+}
+
+# TIFF field type -> (struct code, size)
+_FIELD_TYPES = {
+    1: ("B", 1), 2: ("c", 1), 3: ("H", 2), 4: ("I", 4), 5: ("II", 8),
+    6: ("b", 1), 7: ("B", 1), 8: ("h", 2), 9: ("i", 4), 10: ("ii", 8),
+    11: ("f", 4), 12: ("d", 8), 16: ("Q", 8), 17: ("q", 8), 18: ("Q", 8),
+}
+
+# Tags whose arrays can be huge; only their first value is read
+_FIRST_VALUE_ONLY = {TAG_TILE_OFFSETS, TAG_TILE_BYTE_COUNTS, TAG_STRIP_OFFSETS, TAG_STRIP_BYTE_COUNTS}
+
+_STAT_KEYS = {"MINIMUM": "min", "MAXIMUM": "max", "MEAN": "mean"}
+_STAT_PATTERN = re.compile(r'<Item name="STATISTICS_(MINIMUM|MAXIMUM|MEAN)"[^>]*>([^<]+)</Item>')
+
+
+class TIFFError(ValueError):
+    """Raised when a file is not a readable TIFF."""
+
+
+class _HeadReader:
+    """Serves reads from the prefetched head, falling back to range reads."""
+
+    def __init__(self, source: RangeSource):
+        self.source = source
+        self.head = source.read(0, HEAD_SIZE)
+
+    def read(self, offset: int, length: int) -> bytes:
+        if offset + length <= len(self.head):
+            return self.head[offset:offset + length]
+        return self.source.read(offset, length)
+
+
+def _read_ifd(
+    reader: _HeadReader, offset: int, order: str, bigtiff: bool, full_arrays: bool = False
+) -> tuple[dict, int]:
+    """Read one IFD; returns ``(tags, next_ifd_offset)``.
+
+    Tile and strip offset arrays are read as ``(first value, count)`` unless
+    ``full_arrays`` is set, when they are read whole as tuples.
+    """
+    first_value_only = set() if full_arrays else _FIRST_VALUE_ONLY
+    count_fmt, entry_size, value_size, ptr_fmt = ("Q", 20, 8, "Q") if bigtiff else ("H", 12, 4, "I")
+    count_size = struct.calcsize(count_fmt)
+    (count,) = struct.unpack(order + count_fmt, reader.read(offset, count_size))
+    if count > 4096:
+        raise TIFFError(f"Implausible IFD entry count {count} at offset {offset}")
+
+    block = reader.read(offset + count_size, count * entry_size + value_size)
+    tags: dict[int, Any] = {}
+    for i in range(count):
+        entry = block[i * entry_size:(i + 1) * entry_size]
+        if bigtiff:
+            tag, field_type, n = struct.unpack(order + "HHQ", entry[:12])
+        else:
+            tag, field_type, n = struct.unpack(order + "HHI", entry[:8])
+        raw_value = entry[entry_size - value_size:]
+        if field_type not in _FIELD_TYPES:
+            continue
+        code, size = _FIELD_TYPES[field_type]
+        read_n = min(n, 1) if tag in first_value_only else n
+        total = size * n
+        if total <= value_size:
+            data = raw_value[:size * read_n]
+        else:
+            (pointer,) = struct.unpack(order + ptr_fmt, raw_value)
+            data = reader.read(pointer, size * read_n)
+
+        if field_type == 2:
+            tags[tag] = data.split(b"\0", 1)[0].decode("latin-1")
+        else:
+            values = struct.unpack(order + code * read_n, data)
+            if field_type in (5, 10):
+                values = tuple(values[j] / values[j + 1] if values[j + 1] else 0.0 for j in range(0, len(values), 2))
+            if tag in first_value_only:
+                # (first value, total count)
+                tags[tag] = (values[0] if values else None, n)
+            elif tag in _FIRST_VALUE_ONLY:
+                tags[tag] = values
+            else:
+                tags[tag] = values[0] if len(values) == 1 else values
+
+    (next_offset,) = struct.unpack(order + ptr_fmt, block[count * entry_size:count * entry_size + value_size])
+    return tags, next_offset
+
+
+def _parse_header(head: bytes) -> tuple[str, bool, int, int]:
+    """``(byte order, bigtiff, header size, first IFD offset)`` of a TIFF."""
+    if len(head) < 16:
+        raise TIFFError(f"File too small for a TIFF header ({len(head)} bytes)")
+    if head[:2] == b"II":
+        order = "<"
+    elif head[:2] == b"MM":
+        order = ">"
+    else:
+        raise TIFFError("Not a TIFF file (bad byte order mark)")
+
+    (magic,) = struct.unpack(order + "H", head[2:4])
+    if magic == 42:
+        (ifd_offset,) = struct.unpack(order + "I", head[4:8])
+        return order, False, 8, ifd_offset
+    if magic == 43:
+        (ifd_offset,) = struct.unpack(order + "Q", head[8:16])
+        return order, True, 16, ifd_offset
+    raise TIFFError(f"Not a TIFF file (magic {magic})")
+
+
+def _parse_nodata(tags: dict) -> Optional[float]:
+    """GDAL_NODATA as a float (``nan`` included), or None."""
+    if TAG_GDAL_NODATA not in tags:
+        return None
+    try:
+        return float(str(tags[TAG_GDAL_NODATA]).strip())
+    except ValueError:
+        return None
+
+
+def parse_ghost_area(head: bytes, header_size: int) -> Optional[dict]:
+    """Parse GDAL's ``GDAL_STRUCTURAL_METADATA`` ghost area, if present."""
+    marker = b"GDAL_STRUCTURAL_METADATA_SIZE="
+    if not head[header_size:].startswith(marker):
+        return None
+    start = header_size + len(marker)
+    try:
+        size = int(head[start:start + 6])
+    except ValueError:
+        return None
+    body_start = head.find(b"\n", start) + 1
+    if not body_start:
+        return None
+    body = head[body_start:body_start + size].decode("ascii", "replace")
+    return dict(line.split("=", 1) for line in body.splitlines() if "=" in line)
+
+
+def parse_gdal_statistics(gdal_metadata: str) -> dict:
+    """Extract STATISTICS_* items from GDAL_METADATA XML."""
+    stats = {}
+    for name, value in _STAT_PATTERN.findall(gdal_metadata or ""):
+        try:
+            stats[_STAT_KEYS[name]] = float(value)
+        except ValueError:
+            continue
+    return stats
+
+
+def inspect_cog(location: Union[str, Path, RangeSource]) -> dict:
+    """Inspect a (Cloud Optimized) GeoTIFF using header reads only.
+
+    Args:
+        location: Local path, http(s) URL or an open ``RangeSource``
+            (which is closed on return)
+
+    Returns:
+        dict with ``bigtiff``, ``ghost_area`` (GDAL structural metadata or
+        None), ``images`` (one dict per full-resolution/overview IFD with
+        ``width``, ``height``, ``tiled``, ``tile_size``, ``compression``,
+        ``overview``, ``mask``, ``ifd_offset``, ``first_data_offset``),
+        ``overviews``, ``ifds_before_data``, ``overviews_before_full_res``,
+        ``nodata``, ``statistics`` (from GDAL_METADATA), ``bytes_read`` and
+        ``requests``.
+
+    Raises:
+        TIFFError: if the file is not a TIFF/BigTIFF
+    """
+    with location if isinstance(location, RangeSource) else RangeSource(location) as source:
+        reader = _HeadReader(source)
+        head = reader.head
+        order, bigtiff, header_size, ifd_offset = _parse_header(head)
+
+        images = []
+        seen = set()
+        first_tags: dict = {}
+        while ifd_offset and len(images) < MAX_IFDS:
+            if ifd_offset in seen:
+                raise TIFFError("Cyclic IFD chain")
+            seen.add(ifd_offset)
+            try:
+                tags, next_offset = _read_ifd(reader, ifd_offset, order, bigtiff)
+            except struct.error as e:
+                raise TIFFError(f"Truncated IFD at offset {ifd_offset}") from e
+            if not images:
+                first_tags = tags
+            subfile = tags.get(TAG_NEW_SUBFILE_TYPE, 0)
+            tiled = TAG_TILE_WIDTH in tags
+            data_offset = (tags.get(TAG_TILE_OFFSETS) or tags.get(TAG_STRIP_OFFSETS) or (None, 0))[0]
+            images.append({
+                "width": tags.get(TAG_IMAGE_WIDTH),
+                "height": tags.get(TAG_IMAGE_LENGTH),
+                "tiled": tiled,
+                "tile_size": [tags.get(TAG_TILE_WIDTH), tags.get(TAG_TILE_LENGTH)] if tiled else None,
+                "compression": COMPRESSION.get(tags.get(TAG_COMPRESSION, 1), str(tags.get(TAG_COMPRESSION))),
+                "overview": bool(subfile & SUBFILE_REDUCED),
+                "mask": bool(subfile & SUBFILE_MASK),
+                "ifd_offset": ifd_offset,
+                "first_data_offset": data_offset,
+            })
+            ifd_offset = next_offset
+
+        if not images:
+            raise TIFFError("TIFF has no image file directories")
+
+        data_offsets = [img["first_data_offset"] for img in images if img["first_data_offset"]]
+        last_ifd = max(img["ifd_offset"] for img in images)
+        resolutions = [img for img in images if not img["mask"]]
+
+        # COG ordering: IFDs first, then overview data (smallest first), then
+        # full-resolution data last
+        overview_order = [img["first_data_offset"] or 0 for img in reversed(resolutions)]
+
+        return {
+            "bigtiff": bigtiff,
+            "ghost_area": parse_ghost_area(head, header_size),
+            "images": images,
+            "overviews": sum(1 for img in resolutions if img["overview"]),
+            "ifds_before_data": not data_offsets or last_ifd < min(data_offsets),
+            "overviews_before_full_res": overview_order == sorted(overview_order),
+            "nodata": _parse_nodata(first_tags),
+            "statistics": parse_gdal_statistics(first_tags.get(TAG_GDAL_METADATA, "")),
+            "bytes_read": source.bytes_read,
+            "requests": source.requests,
+        }
+
+
+def read_block_layout(source: RangeSource, image: int = 0) -> dict:
+    """Everything needed to read the pixel blocks of one image in a TIFF.
+
+    Args:
+        source: Open range reader over the TIFF (left open)
+        image: 0 for full resolution, 1.. for successive overviews (mask
+            images are skipped)
+
+    Returns:
+        dict with ``width``, ``height``, ``block_width``, ``block_height``
+        (tile size, or image width and rows per strip), ``tiled``,
+        ``offsets`` and ``byte_counts`` (one per block, band planes in turn
+        when ``planar`` is 2), ``bits``, ``sample_format`` (1 unsigned, 2
+        signed, 3 float), ``samples``, ``planar``, ``predictor``,
+        ``compression`` (TIFF code), ``byte_order`` (``<`` or ``>``),
+        ``nodata`` (from GDAL_NODATA of the first image) and ``images``
+        (count of non-mask images).
+
+    Raises:
+        TIFFError: if the file is not a TIFF or has no such image
+    """
+    reader = _HeadReader(source)
+    order, bigtiff, _, ifd_offset = _parse_header(reader.head)
+    found: list[int] = []
+    first_tags: dict = {}
+    seen = set()
+    while ifd_offset and len(seen) < MAX_IFDS:
+        if ifd_offset in seen:
+            raise TIFFError("Cyclic IFD chain")
+        seen.add(ifd_offset)
+        try:
+            tags, next_offset = _read_ifd(reader, ifd_offset, order, bigtiff)
+        except struct.error as e:
+            raise TIFFError(f"Truncated IFD at offset {ifd_offset}") from e
+        if len(seen) == 1:
+            first_tags = tags
+        if not tags.get(TAG_NEW_SUBFILE_TYPE, 0) & SUBFILE_MASK:
+            found.append(ifd_offset)
+        ifd_offset = next_offset
+    if image >= len(found):
+        raise TIFFError(f"TIFF has {len(found)} images; image {image} does not exist")
+
+    try:
+        tags, _ = _read_ifd(reader, found[image], order, bigtiff, full_arrays=True)
+    except struct.error as e:
+        raise TIFFError(f"Truncated IFD at offset {found[image]}") from e
+    width, height = tags.get(TAG_IMAGE_WIDTH), tags.get(TAG_IMAGE_LENGTH)
+    if not width or not height:
+        raise TIFFError("Image has no width or height")
+    tiled = TAG_TILE_WIDTH in tags
+    offsets = tags.get(TAG_TILE_OFFSETS if tiled else TAG_STRIP_OFFSETS)
+    byte_counts = tags.get(TAG_TILE_BYTE_COUNTS if tiled else TAG_STRIP_BYTE_COUNTS)
+    if not offsets or not byte_counts or len(offsets) != len(byte_counts):
+        raise TIFFError("Image has no readable tile or strip offsets")
+
+    def first(value: Any) -> Any:
+        return value[0] if isinstance(value, tuple) else value
+
+    return {
+        "width": width,
+        "height": height,
+        "block_width": tags[TAG_TILE_WIDTH] if tiled else width,
+        "block_height": tags.get(TAG_TILE_LENGTH) if tiled else min(tags.get(TAG_ROWS_PER_STRIP, height), height),
+        "tiled": tiled,
+        "offsets": tuple(offsets),
+        "byte_counts": tuple(byte_counts),
+        "bits": first(tags.get(TAG_BITS_PER_SAMPLE, 1)),
+        "sample_format": first(tags.get(TAG_SAMPLE_FORMAT, 1)),
+        "samples": tags.get(TAG_SAMPLES_PER_PIXEL, 1),
+        "planar": tags.get(TAG_PLANAR_CONFIGURATION, 1),
+        "predictor": tags.get(TAG_PREDICTOR, 1),
+        "compression": tags.get(TAG_COMPRESSION, 1),
+        "byte_order": order,
+        "nodata": _parse_nodata(first_tags),
+        "images": len(found),
+    }
@@ -0,0 +1,145 @@
+"""
+GeoParquet footer inspection for deep layer validation.
+
+Reads only Parquet footers through DuckDB's ``parquet_metadata``,
+``parquet_file_metadata`` and ``parquet_kv_metadata`` table functions, so
+inspecting a layer costs a few KB of I/O and constant memory regardless of
+feature count. No data pages are scanned.
+"""
+
+import json
+from typing import Any, Optional
+
+import duckdb
+
+# GeoParquet default CRS when the column's "crs" key is absent
+DEFAULT_CRS = "OGC:CRS84"
+
+# CRS identifiers treated as equivalent (lon/lat WGS 84)
+WGS84_ALIASES = {"OGC:CRS84", "EPSG:4326"}
+
+
+def crs_identifier(crs: Any) -> Optional[str]:
+    """Return an ``AUTHORITY:CODE`` identifier for a GeoParquet column CRS.
+
+    Absent CRS means the GeoParquet default (OGC:CRS84); an explicit null
+    means the CRS is undefined and None is returned.
+    """
+    if isinstance(crs, dict):
+        crs_id = crs.get("id")
+        if isinstance(crs_id, dict) and crs_id.get("authority") and crs_id.get("code") is not None:
+            return f"{crs_id['authority']}:{crs_id['code']}".upper()
+        return None
+    if isinstance(crs, str):
+        return crs.upper()
+    return None
+
+
+def crs_matches(manifest_crs: str, parquet_crs: Optional[str]) -> bool:
+    """Compare a manifest CRS with a GeoParquet CRS identifier."""
+    if parquet_crs is None:
+        return False
+    manifest_crs = manifest_crs.upper()
+    if manifest_crs == parquet_crs:
+        return True
+    return manifest_crs in WGS84_ALIASES and parquet_crs in WGS84_ALIASES
+
+
+def inspect_geoparquet(path: str, con: Optional[duckdb.DuckDBPyConnection] = None) -> dict:
+    """Inspect GeoParquet file(s) by reading footers only.
+
+    Args:
+        path: Parquet file path or glob pattern
+        con: Optional DuckDB connection to reuse
+
+    Returns:
+        dict with ``files``, ``num_rows``, ``num_row_groups``, ``file_bytes``,
+        ``footer_bytes`` (None if DuckDB cannot report it), ``columns``
+        (top-level names), ``geo`` (parsed ``geo`` metadata of the first
+        file, or None), ``files_missing_geo`` and ``row_group_bbox`` (bbox
+        aggregated from row-group statistics of the primary geometry's
+        covering columns, or None).
+    """
+    con = con or duckdb.connect()
+
+    file_rows = con.execute(
+        "SELECT file_name, num_rows, num_row_groups, file_size_bytes "
+        "FROM parquet_file_metadata(?) ORDER BY file_name",
+        [path],
+    ).fetchall()
+
+    kv_rows = con.execute(
+        "SELECT file_name, value FROM parquet_kv_metadata(?) "
+        "WHERE decode(key) = 'geo' ORDER BY file_name",
+        [path],
+    ).fetchall()
+    geo_by_file = {}
+    for file_name, value in kv_rows:
+        try:
+            geo_by_file[file_name] = json.loads(bytes(value).decode("utf-8"))
+        except (ValueError, UnicodeDecodeError):
+            geo_by_file[file_name] = None
+
+    # DESCRIBE binds the schema from the footer without reading pages
+    columns = [row[0] for row in con.execute("DESCRIBE SELECT * FROM read_parquet(?)", [path]).fetchall()]
+
+    # Footer plus its 8-byte trailer per file (footer_size needs DuckDB >= 1.2)
+    try:
+        footer_bytes = con.execute(
+            "SELECT sum(footer_size + 8) FROM parquet_file_metadata(?)", [path]
+        ).fetchone()[0]
+    except duckdb.Error:
+        footer_bytes = None
+
+    first_file = file_rows[0][0] if file_rows else None
+    geo = geo_by_file.get(first_file)
+
+    return {
+        "files": len(file_rows),
+        "num_rows": sum(row[1] for row in file_rows),
+        "num_row_groups": sum(row[2] for row in file_rows),
+        "file_bytes": sum(row[3] for row in file_rows),
+        "footer_bytes": int(footer_bytes) if footer_bytes is not None else None,
+        "columns": columns,
+        "geo": geo,
+        "files_missing_geo": [row[0] for row in file_rows if not geo_by_file.get(row[0])],
+        "row_group_bbox": _row_group_bbox(con, path, geo),
+    }
+
+
+def _row_group_bbox(con: duckdb.DuckDBPyConnection, path: str, geo: Optional[dict]) -> Optional[list[float]]:
+    """Aggregate the primary geometry's bbox from row-group statistics.
+
+    Uses the GeoParquet 1.1 ``covering.bbox`` columns when declared.
+    """
+    if not isinstance(geo, dict):
+        return None
+    primary, columns = geo.get("primary_column"), geo.get("columns")
+    column_meta = columns.get(primary) if isinstance(primary, str) and isinstance(columns, dict) else None
+    covering = column_meta.get("covering") if isinstance(column_meta, dict) else None
+    covering = covering.get("bbox") if isinstance(covering, dict) else None
+    if not isinstance(covering, dict):
+        return None
+
+    try:
+        paths = {part: ", ".join(covering[part]) for part in ("xmin", "ymin", "xmax", "ymax")}
+    except (KeyError, TypeError):
+        return None
+
+    rows = con.execute(
+        "SELECT path_in_schema, "
+        "min(TRY_CAST(stats_min_value AS DOUBLE)), max(TRY_CAST(stats_max_value AS DOUBLE)) "
+        "FROM parquet_metadata(?) WHERE path_in_schema IN (?, ?, ?, ?) GROUP BY path_in_schema",
+        [path, paths["xmin"], paths["ymin"], paths["xmax"], paths["ymax"]],
+    ).fetchall()
+    stats = {row[0]: (row[1], row[2]) for row in rows}
+    try:
+        bbox = [
+            stats[paths["xmin"]][0],
+            stats[paths["ymin"]][0],
+            stats[paths["xmax"]][1],
+            stats[paths["ymax"]][1],
+        ]
+    except KeyError:
+        return None
+    return None if any(v is None for v in bbox) else bbox
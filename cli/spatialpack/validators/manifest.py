@@ -2,7 +2,9 @@
 Manifest validator for Spatial Packs.
 
 Validates spatialpack.json against the JSON Schema and performs
-additional structural and content checks.
+additional structural and content checks. ``pack_path`` may also be a
+single-file ``.spack`` archive (see ``spatialpack.archive``), whose
+members are checked in place.
 
 Validation Rules:
 - MANIFEST-001: spatialpack.json exists and is valid JSON
@@ -12,17 +14,160 @@ Validation Rules:
 - MANIFEST-005: created_at is valid ISO 8601
 - LAYER-001: Each layer in manifest has corresponding file
 - LAYER-002: Layer files are accessible
+- LAYER-003: GeoParquet metadata and declared columns are present (--deep)
+- LAYER-004: GeoParquet CRS matches manifest crs (--deep)
+- LAYER-005: Row-group bbox statistics fall within manifest bbox (--deep)
+- LAYER-006: Parquet row count matches stats.features (--deep)
+- LAYER-007: PMTiles header and directories are readable (--deep)
+- LAYER-008: PMTiles tile type, zoom range and bounds match the manifest (--deep)
+- LAYER-009: PMTiles archive is clustered with a compact root directory (--deep)
+- RASTER-001: COG header and IFDs are readable (--deep)
+- RASTER-002: COG is tiled, compressed and has internal overviews (--deep)
+- RASTER-003: COG IFDs and overviews precede full-resolution data (--deep)
+- RASTER-004: COG nodata and statistics match raster_stats (--deep)
 - INTEGRITY-001: If integrity.json exists, hashes are present
+- INTEGRITY-002: Asset files match their integrity hashes (--verify-hashes)
 - STRUCTURE-001: Required folders exist
 """
 
 import json
 import re
 from datetime import datetime
+from fnmatch import fnmatchcase
+from itertools import islice
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
 
 import jsonschema
+from referencing import Registry, Resource
+
+from spatialpack import __version__
+from spatialpack.cache import ValidationCache, digest, stat_fingerprint
+from spatialpack.integrity import HashCache, verify_assets
+from spatialpack.profiling import RuleTimer, record_read
+
+# Minimal inline schema used when no schema file can be found
+FALLBACK_SCHEMA = {
+    "type": "object",
+    "required": ["pack_id", "version", "created_at", "geography", "theme", "bbox", "crs", "layers"],
+}
+
+# Compiled validators and schema digests keyed by the schema path and the
+# (name, mtime_ns, size) of every *.schema.json beside it; None keys the fallback
+_SCHEMA_CACHE: dict[tuple | None, tuple[dict, Any, jsonschema.SchemaError | None, str]] = {}
+
+# Resolved schema file per candidate search directory
+_SCHEMA_PATH_CACHE: dict[Path, Path | None] = {}
+
+
+def _error_path(path: Iterable) -> str:
+    """Format a jsonschema error path like the rule paths, e.g. ``layers[3].type``."""
+    parts = []
+    for part in path:
+        if isinstance(part, int):
+            parts.append(f"[{part}]")
+        else:
+            parts.append(f".{part}" if parts else str(part))
+    return "".join(parts) or "(root)"
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _as_bbox(value: Any) -> list | None:
+    """``value`` if it is a list of four numbers, else None."""
+    if isinstance(value, list) and len(value) == 4 and all(_is_number(v) for v in value):
+        return value
+    return None
+
+
+def _as_dict(value: Any) -> dict:
+    """``value`` if it is a JSON object, else an empty dict."""
+    return value if isinstance(value, dict) else {}
+
+
+def _local_ref(layer: dict, ref: str) -> str | None:
+    """A layer's ./relative file reference, or None."""
+    value = layer.get(ref)
+    return value if isinstance(value, str) and value.startswith("./") else None
+
+
+def _bbox_within(inner: list, outer: list, tolerance: float = 1e-9) -> bool:
+    """Whether bbox ``inner`` lies within ``outer`` (both [minX, minY, maxX, maxY])."""
+    return (
+        inner[0] >= outer[0] - tolerance
+        and inner[1] >= outer[1] - tolerance
+        and inner[2] <= outer[2] + tolerance
+        and inner[3] <= outer[3] + tolerance
+    )
+
+
+def _schema_resources(schema_dir: Path) -> dict[str, dict]:
+    """Contents of every *.schema.json beside the manifest schema, by $id."""
+    resources = {}
+    for path in sorted(schema_dir.glob("*.schema.json")):
+        contents = json.loads(path.read_text(encoding="utf-8"))
+        if "$id" in contents:
+            resources[contents["$id"]] = contents
+    return resources
+
+
+def _schema_registry(resources: dict[str, dict]) -> Registry:
+    """Build a $ref registry from schema resources.
+
+    Resources are registered under their $id, so references such as
+    ``layer.schema.json`` resolve relative to the manifest schema's $id.
+    """
+    return Registry().with_resources(
+        (uri, Resource.from_contents(contents)) for uri, contents in resources.items()
+    ).crawl()
+
+
+def _schema_file_stamp(path: Path) -> tuple[str, int, int]:
+    stat = path.stat()
+    return path.name, stat.st_mtime_ns, stat.st_size
+
+
+def _compile_schema(schema_path: Path | None) -> tuple[dict, Any, jsonschema.SchemaError | None, str]:
+    """``get_compiled_schema`` plus a digest of the schema and every $ref'd resource."""
+    if schema_path is None:
+        key = None
+    else:
+        paths = sorted({schema_path, *schema_path.parent.glob("*.schema.json")})
+        key = (str(schema_path), tuple(_schema_file_stamp(path) for path in paths))
+
+    cached = _SCHEMA_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    if schema_path is None:
+        schema, resources = FALLBACK_SCHEMA, {}
+    else:
+        schema = json.loads(schema_path.read_text(encoding="utf-8"))
+        resources = _schema_resources(schema_path.parent)
+
+    cls = jsonschema.validators.validator_for(schema, default=jsonschema.Draft202012Validator)
+    schema_digest = digest(schema, resources)
+    try:
+        cls.check_schema(schema)
+        compiled = (schema, cls(schema, registry=_schema_registry(resources)), None, schema_digest)
+    except jsonschema.SchemaError as e:
+        compiled = (schema, None, e, schema_digest)
+
+    _SCHEMA_CACHE[key] = compiled
+    return compiled
+
+
+def get_compiled_schema(schema_path: Path | None) -> tuple[dict, Any, jsonschema.SchemaError | None]:
+    """Return ``(schema, validator, schema_error)`` for a schema file.
+
+    The schema is parsed, checked against its metaschema and compiled into a
+    ``Draft202012Validator`` once per process; the entry is rebuilt when the
+    file or any *.schema.json beside it changes. ``validator`` is None if the
+    schema is invalid.
+    """
+    return _compile_schema(schema_path)[:3]
 
 
 class ManifestValidator:
@@ -37,47 +182,109 @@ class ManifestValidator:
         "MANIFEST-005": "created_at is valid ISO 8601",
         "LAYER-001": "Each layer has corresponding file reference",
         "LAYER-002": "Layer files are accessible",
+        "LAYER-003": "GeoParquet metadata and declared columns are present",
+        "LAYER-004": "GeoParquet CRS matches manifest crs",
+        "LAYER-005": "Row-group bbox statistics fall within manifest bbox",
+        "LAYER-006": "Parquet row count matches stats.features",
+        "LAYER-007": "PMTiles header and directories are readable",
+        "LAYER-008": "PMTiles tile type, zoom range and bounds match the manifest",
+        "LAYER-009": "PMTiles archive is clustered with a compact root directory",
+        "RASTER-001": "COG header and IFDs are readable",
+        "RASTER-002": "COG is tiled, compressed and has internal overviews",
+        "RASTER-003": "COG IFDs and overviews precede full-resolution data",
+        "RASTER-004": "COG nodata and statistics match raster_stats",
         "INTEGRITY-001": "Integrity hashes are present if integrity.json exists",
+        "INTEGRITY-002": "Asset files match their integrity hashes",
         "STRUCTURE-001": "Pack structure is valid",
     }
 
     # pack_id pattern: {authority}:{geography}:{theme}:v{version}
     PACK_ID_PATTERN = re.compile(r"^[a-z0-9.-]+:[a-z]{2,3}:[a-z0-9-]+:v[0-9]+$")
 
-    def __init__(self, pack_path: Path):
+    # Layer keys that reference asset files
+    FILE_REFS = ["parquet", "pmtiles", "cog", "copc"]
+
+    # Rule methods grouped by the inputs they depend on, in run order. Each
+    # group is cached and re-run independently when caching is enabled.
+    RULE_GROUPS = {
+        "manifest": [
+            "_validate_manifest_schema",
+            "_validate_pack_id",
+            "_validate_bbox",
+            "_validate_created_at",
+        ],
+        "layers": ["_validate_layers"],
+        "structure": ["_validate_structure"],
+        "integrity": ["_validate_integrity"],
+    }
+
+    def __init__(
+        self,
+        pack_path: Path,
+        verify_hashes: bool = False,
+        max_errors: int | None = 50,
+        use_cache: bool = False,
+        deep: bool = False,
+        con: Any = None,
+        hash_cache: HashCache | None = None,
+    ):
         """Initialize validator with pack path.
 
         Args:
-            pack_path: Path to the pack directory
+            pack_path: Path to the pack directory or a ``.spack`` archive
+            verify_hashes: Hash asset files and compare with integrity.asset_hashes
+            max_errors: Cap on reported schema errors (None for unlimited)
+            use_cache: Reuse rule-group results from .spatialpack/cache when
+                their inputs are unchanged (ignored for archives)
+            deep: Inspect GeoParquet footers, PMTiles headers and COG IFDs of
+                layer files
+            con: DuckDB connection to reuse for deep GeoParquet checks
+            hash_cache: Digest cache to reuse for --verify-hashes (defaults
+                to the pack's on-disk cache)
         """
         self.pack_path = Path(pack_path)
-        self.manifest_path = self.pack_path / "spatialpack.json"
+        self.verify_hashes = verify_hashes
+        self.max_errors = max_errors
+        self.deep = deep
+        self.is_archive = self.pack_path.is_file()
+        self.use_cache = use_cache and not self.is_archive
+        self.manifest_path = (
+            self.pack_path if self.is_archive else self.pack_path / "spatialpack.json"
+        )
+        self._archive: Any = None  # ArchiveReader, open for the duration of validate()
         self.manifest: dict = {}
+        self.cached_groups: list[str] = []
+        self.asset_details: dict[str, dict] = {}
+        self.timer = RuleTimer()
+        self._duckdb: Any = con  # DuckDB connection, opened by the first deep GeoParquet check
+        self._hash_cache = hash_cache
+        self._check_files = True
+        # Per-unit results kept by validate_incremental, in report order
+        self._units: dict[tuple, dict] = {}
+        self._manifest_bytes = b""
         self.errors: list[dict] = []
         self.warnings: list[dict] = []
         self.layers_validated = 0
 
-        # Load schema from package or default location
-        self._schema = self._load_schema()
-
-    def _load_schema(self) -> dict:
-        """Load the JSON Schema for validation."""
-        # Try to load from schemas directory relative to repo root
-        schema_locations = [
-            self.pack_path.parent / "schemas" / "spatialpack.schema.json",
-            self.pack_path.parent.parent / "schemas" / "spatialpack.schema.json",
-            Path(__file__).parent.parent.parent.parent / "schemas" / "spatialpack.schema.json",
-        ]
+        # Load schema from package or default location (compiled once per process)
+        self._schema, self._schema_validator, self._schema_error, self._schema_digest = self._load_schema()
 
-        for schema_path in schema_locations:
-            if schema_path.exists():
-                return json.loads(schema_path.read_text(encoding="utf-8"))
+    def _load_schema(self) -> tuple[dict, Any, jsonschema.SchemaError | None, str]:
+        """Load the compiled JSON Schema validator for this pack."""
+        search_dir = self.pack_path.absolute().parent
+        if search_dir not in _SCHEMA_PATH_CACHE:
+            # Try to load from schemas directory relative to repo root
+            schema_locations = [
+                search_dir / "schemas" / "spatialpack.schema.json",
+                search_dir.parent / "schemas" / "spatialpack.schema.json",
+                Path(__file__).parent.parent.parent.parent / "schemas" / "spatialpack.schema.json",
+            ]
+            _SCHEMA_PATH_CACHE[search_dir] = next(
+                (path for path in schema_locations if path.exists()), None
+            )
 
-        # Return minimal inline schema if none found
-        return {
-            "type": "object",
-            "required": ["pack_id", "version", "created_at", "geography", "theme", "bbox", "crs", "layers"],
-        }
+        # Fall back to the minimal inline schema if none found
+        return _compile_schema(_SCHEMA_PATH_CACHE[search_dir])
 
     def _add_error(self, rule: str, message: str, path: str = "") -> None:
         """Add an error to the results."""
@@ -97,34 +304,300 @@ class ManifestValidator:
         self.errors = []
         self.warnings = []
         self.layers_validated = 0
+        self.cached_groups = []
+        self.asset_details = {}
+        self.timer = RuleTimer()
+
+        try:
+            return self._validate_all()
+        finally:
+            self._close_archive()
 
+    def _validate_all(self) -> dict:
         # Run validations in order
-        if not self._validate_manifest_exists():
+        with self.timer.measure("_validate_manifest_exists", "manifest"):
+            exists = self._validate_manifest_exists()
+        if not exists:
             return self._get_result()
 
-        if not self._validate_manifest_json():
+        with self.timer.measure("_validate_manifest_json", "manifest"):
+            loaded = self._validate_manifest_json()
+        if not loaded:
             return self._get_result()
 
-        self._validate_manifest_schema()
-        self._validate_pack_id()
-        self._validate_bbox()
-        self._validate_created_at()
-        self._validate_layers()
-        self._validate_structure()
-        self._validate_integrity()
+        cache = ValidationCache.for_pack(self.pack_path) if self.use_cache else None
+        base_key = self._base_cache_key() if cache else ""
+
+        for group, methods in self.RULE_GROUPS.items():
+            if cache is not None:
+                key = digest(base_key, self._group_inputs(group))
+                cached = cache.get(group, key)
+                if cached is not None:
+                    self.errors.extend(cached["errors"])
+                    self.warnings.extend(cached["warnings"])
+                    self.layers_validated += cached["layers_validated"]
+                    self.asset_details.update(cached.get("asset_details", {}))
+                    self.cached_groups.append(group)
+                    continue
+
+            error_start, warning_start = len(self.errors), len(self.warnings)
+            layers_start = self.layers_validated
+            assets_before = set(self.asset_details)
+            for method in methods:
+                with self.timer.measure(method, group):
+                    getattr(self, method)()
+
+            if cache is not None:
+                cache.put(
+                    group,
+                    key,
+                    self.errors[error_start:],
+                    self.warnings[warning_start:],
+                    self.layers_validated - layers_start,
+                    {k: v for k, v in self.asset_details.items() if k not in assets_before},
+                )
+
+        if cache is not None:
+            cache.save()
 
         return self._get_result()
 
+    def validate_document(self, data: bytes) -> dict:
+        """Validate a manifest document that has no pack on disk.
+
+        Runs the manifest rules, layer definition checks and the integrity
+        block checks. Rules that need the pack's files (LAYER-002, deep
+        checks, STRUCTURE-001, INTEGRITY-002) are skipped.
+
+        Returns:
+            dict with errors, warnings, and layers_validated count
+        """
+        self.errors = []
+        self.warnings = []
+        self.layers_validated = 0
+        self.cached_groups = []
+        self.asset_details = {}
+        self.timer = RuleTimer()
+
+        with self.timer.measure("_validate_manifest_json", "manifest"):
+            try:
+                self._manifest_bytes = data
+                self.manifest = json.loads(data.decode("utf-8"))
+                loaded = isinstance(self.manifest, dict)
+                if not loaded:
+                    self._add_error("MANIFEST-001", "Manifest must be a JSON object", "(root)")
+            except (UnicodeDecodeError, json.JSONDecodeError) as e:
+                message = f"{e.msg} at line {e.lineno}" if isinstance(e, json.JSONDecodeError) else str(e)
+                self._add_error("MANIFEST-001", f"Invalid JSON: {message}", "(root)")
+                loaded = False
+        if not loaded:
+            return self._get_result()
+
+        check_files, verify_hashes = self._check_files, self.verify_hashes
+        self._check_files, self.verify_hashes = False, False
+        try:
+            for group in ("manifest", "layers", "integrity"):
+                for method in self.RULE_GROUPS[group]:
+                    with self.timer.measure(method, group):
+                        getattr(self, method)()
+        finally:
+            self._check_files, self.verify_hashes = check_files, verify_hashes
+        return self._get_result()
+
+    def validate_incremental(self, changed: Iterable[str] | None = None) -> dict:
+        """Validate, re-running only the checks that ``changed`` files feed.
+
+        ``changed`` holds pack-relative POSIX paths modified since the last
+        call. The first call, ``changed=None`` or a change to spatialpack.json
+        runs everything. Later calls re-run only the affected units and reuse
+        the other results:
+
+        - a layer's checks, when one of its local files changes
+        - the integrity checks, for integrity.json or a hashed asset
+        - the structure check, for the top-level folders
+
+        Returns:
+            The ``validate`` result plus ``rerun``, the labels of the units run
+        """
+        changed = None if changed is None else set(changed)
+        self.timer = RuleTimer()
+        if changed is None or not self._units or "spatialpack.json" in changed:
+            self._units = {}
+            self.errors, self.warnings, self.asset_details = [], [], {}
+            self.layers_validated, self.cached_groups = 0, []
+            with self.timer.measure("_validate_manifest_exists", "manifest"):
+                exists = self._validate_manifest_exists()
+            if exists:
+                with self.timer.measure("_validate_manifest_json", "manifest"):
+                    exists = self._validate_manifest_json()
+            if not exists:
+                return {**self._get_result(), "rerun": ["manifest"]}
+            units = self._unit_keys()
+        else:
+            units = self._units_for(changed)
+
+        for unit in units:
+            self._units[unit] = self._run_unit(unit)
+
+        self.errors = [e for result in self._units.values() for e in result["errors"]]
+        self.warnings = [w for result in self._units.values() for w in result["warnings"]]
+        self.layers_validated = sum(result["layers_validated"] for result in self._units.values())
+        self.asset_details = {k: v for result in self._units.values() for k, v in result["asset_details"].items()}
+        return {**self._get_result(), "rerun": [self._unit_label(unit) for unit in units]}
+
+    def _unit_keys(self) -> list[tuple]:
+        """Independently re-runnable rule units, in report order."""
+        layers = self.manifest.get("layers")
+        if layers and isinstance(layers, list) and all(isinstance(layer, dict) for layer in layers):
+            layer_units = [("layer", i) for i in range(len(layers))]
+        else:
+            layer_units = [("layers",)]
+        return [("manifest",), *layer_units, ("structure",), ("integrity",)]
+
+    def _unit_label(self, unit: tuple) -> str:
+        if unit[0] == "layer":
+            layer = self.manifest["layers"][unit[1]]
+            return f"layers[{unit[1]}] ({layer.get('id', '?')})"
+        return unit[0]
+
+    def _units_for(self, changed: set[str]) -> list[tuple]:
+        """Units whose inputs include any of the changed paths."""
+        affected = set()
+        hashed = set()
+        if self.verify_hashes:
+            asset_hashes = _as_dict(_as_dict(self.manifest.get("integrity")).get("asset_hashes"))
+            hashed = {asset.removeprefix("./") for asset in asset_hashes}
+        for path in changed:
+            if path in ("layers", "metadata"):
+                affected.add(("structure",))
+            if path == "integrity.json" or path in hashed:
+                affected.add(("integrity",))
+            for unit in self._units:
+                if unit[0] != "layer":
+                    continue
+                layer = self.manifest["layers"][unit[1]]
+                for ref in self.FILE_REFS:
+                    value = _local_ref(layer, ref)
+                    if value is None:
+                        continue
+                    ref_path = value[2:]
+                    if fnmatchcase(path, ref_path) or ref_path.startswith(path + "/"):
+                        affected.add(unit)
+        return [unit for unit in self._units if unit in affected]
+
+    def _run_unit(self, unit: tuple) -> dict:
+        """Run one unit's rules and return only its results."""
+        self.errors, self.warnings, self.asset_details = [], [], {}
+        self.layers_validated = 0
+        if unit[0] == "layer":
+            layer = self.manifest["layers"][unit[1]]
+            with self.timer.measure("_validate_layer", "layers"):
+                self._validate_layer(layer, layer.get("id", f"layer[{unit[1]}]"), unit[1])
+            self.layers_validated = 1
+        else:
+            for method in self.RULE_GROUPS[unit[0]]:
+                with self.timer.measure(method, unit[0]):
+                    getattr(self, method)()
+        return {
+            "errors": self.errors,
+            "warnings": self.warnings,
+            "layers_validated": self.layers_validated,
+            "asset_details": self.asset_details,
+        }
+
+    def _base_cache_key(self) -> str:
+        """Cache key shared by all rule groups: manifest, schemas, validator, options."""
+        return digest(
+            self._manifest_bytes,
+            self._schema_digest,
+            __version__,
+            {"verify_hashes": self.verify_hashes, "max_errors": self.max_errors, "deep": self.deep},
+        )
+
+    def _local_ref_fingerprints(self, ref_path: str) -> list:
+        """Stat fingerprints for a ./relative file reference (globs expanded)."""
+        full_path = self.pack_path / ref_path[2:]
+        if full_path.exists():
+            return [[ref_path, stat_fingerprint(full_path)]]
+        return [
+            [str(match), stat_fingerprint(match)]
+            for match in sorted(full_path.parent.glob(full_path.name))
+        ]
+
+    def _group_inputs(self, group: str) -> Any:
+        """On-disk inputs (beyond the manifest) that a rule group depends on."""
+        if group == "layers":
+            layers = self.manifest.get("layers")
+            return [
+                self._local_ref_fingerprints(layer[ref])
+                for layer in (layers if isinstance(layers, list) else [])
+                if isinstance(layer, dict)
+                for ref in self.FILE_REFS
+                if _local_ref(layer, ref)
+            ]
+        if group == "structure":
+            return [(self.pack_path / folder).exists() for folder in ("layers", "metadata")]
+        if group == "integrity" and self.verify_hashes:
+            asset_hashes = _as_dict(_as_dict(self.manifest.get("integrity")).get("asset_hashes"))
+            return [
+                [asset, stat_fingerprint(self.pack_path / asset.removeprefix("./"))]
+                for asset in sorted(asset_hashes)
+            ] + self._group_inputs("layers")
+        return None
+
     def _get_result(self) -> dict:
         """Get validation result dict."""
         return {
             "errors": self.errors,
             "warnings": self.warnings,
             "layers_validated": self.layers_validated,
+            "cached_groups": self.cached_groups,
+            "asset_details": self.asset_details,
+            "timings": self.timer.report(),
         }
 
+    def _close_archive(self) -> None:
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+    def _exists(self, rel_path: str) -> bool:
+        """Whether a pack-relative file, folder or glob matches anything."""
+        if self._archive is not None:
+            return rel_path in self._archive or self._archive.is_dir(rel_path) or bool(self._archive.glob(rel_path))
+        full_path = self.pack_path / rel_path
+        return full_path.exists() or any(full_path.parent.glob(full_path.name))
+
+    def _is_file(self, rel_path: str) -> bool:
+        if self._archive is not None:
+            return rel_path in self._archive
+        return (self.pack_path / rel_path).is_file()
+
+    def _range_location(self, rel_path: str) -> Any:
+        """What the COG/PMTiles inspectors read: a path, or an archive member."""
+        if self._archive is not None:
+            return self._archive.range_source(rel_path)
+        return self.pack_path / rel_path
+
     def _validate_manifest_exists(self) -> bool:
         """Check that spatialpack.json exists."""
+        if self.is_archive:
+            from spatialpack.archive import ArchiveError, ArchiveReader
+
+            self._close_archive()
+            try:
+                self._archive = ArchiveReader(self.pack_path)
+            except ArchiveError as e:
+                self._add_error("MANIFEST-001", str(e), str(self.pack_path))
+                return False
+            if "spatialpack.json" not in self._archive:
+                self._add_error(
+                    "MANIFEST-001",
+                    f"spatialpack.json not found in archive {self.pack_path}",
+                    str(self.pack_path),
+                )
+                return False
+            return True
         if not self.manifest_path.exists():
             self._add_error(
                 "MANIFEST-001",
@@ -137,38 +610,63 @@ class ManifestValidator:
     def _validate_manifest_json(self) -> bool:
         """Check that spatialpack.json is valid JSON."""
         try:
-            self.manifest = json.loads(
-                self.manifest_path.read_text(encoding="utf-8")
-            )
-            return True
-        except json.JSONDecodeError as e:
-            self._add_error(
-                "MANIFEST-001",
-                f"Invalid JSON: {e.msg} at line {e.lineno}",
-                str(self.manifest_path),
-            )
+            if self._archive is not None:
+                self._manifest_bytes = self._archive.read("spatialpack.json")
+            else:
+                self._manifest_bytes = self.manifest_path.read_bytes()
+            record_read(len(self._manifest_bytes), files=1)
+            self.manifest = json.loads(self._manifest_bytes.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            message = f"{e.msg} at line {e.lineno}" if isinstance(e, json.JSONDecodeError) else str(e)
+            self._add_error("MANIFEST-001", f"Invalid JSON: {message}", str(self.manifest_path))
+            return False
+        if not isinstance(self.manifest, dict):
+            self._add_error("MANIFEST-001", "Manifest must be a JSON object", str(self.manifest_path))
+            self.manifest = {}
             return False
+        return True
 
     def _validate_manifest_schema(self) -> None:
         """Validate manifest against JSON Schema."""
-        try:
-            jsonschema.validate(self.manifest, self._schema)
-        except jsonschema.ValidationError as e:
-            path = ".".join(str(p) for p in e.absolute_path) if e.absolute_path else "(root)"
+        if self._schema_error is not None:
+            self._add_warning(
+                "MANIFEST-002",
+                f"Schema error (validation skipped): {self._schema_error.message}",
+            )
+            return
+
+        # Collect every error in one pass; islice keeps huge manifests bounded
+        limit = None if self.max_errors is None else self.max_errors + 1
+        errors = list(islice(self._schema_validator.iter_errors(self.manifest), limit))
+        truncated = self.max_errors is not None and len(errors) > self.max_errors
+        if truncated:
+            errors = errors[:self.max_errors]
+
+        # Best match first, the rest in validation order; best_match also
+        # descends into anyOf/oneOf context for the most specific message
+        if errors:
+            best = max(errors, key=jsonschema.exceptions.relevance)
+            errors.remove(best)
+            errors.insert(0, best)
+        for error in errors:
+            error = jsonschema.exceptions.best_match([error])
             self._add_error(
                 "MANIFEST-002",
-                f"Schema validation failed: {e.message}",
-                path,
+                f"Schema validation failed: {error.message}",
+                _error_path(error.absolute_path),
             )
-        except jsonschema.SchemaError as e:
+
+        if truncated:
             self._add_warning(
                 "MANIFEST-002",
-                f"Schema error (validation skipped): {e.message}",
+                f"Schema error limit reached; only the first {self.max_errors} errors are reported",
             )
 
     def _validate_pack_id(self) -> None:
         """Validate pack_id follows naming convention."""
         pack_id = self.manifest.get("pack_id", "")
+        if not isinstance(pack_id, str):
+            return  # MANIFEST-002 reports the type
         if not self.PACK_ID_PATTERN.match(pack_id):
             self._add_warning(
                 "MANIFEST-003",
@@ -179,6 +677,8 @@ class ManifestValidator:
     def _validate_bbox(self) -> None:
         """Validate bbox is valid."""
         bbox = self.manifest.get("bbox", [])
+        if not isinstance(bbox, list) or not all(_is_number(v) for v in bbox):
+            return  # MANIFEST-002 reports the types
         if len(bbox) != 4:
             self._add_error(
                 "MANIFEST-004",
@@ -204,6 +704,8 @@ class ManifestValidator:
     def _validate_created_at(self) -> None:
         """Validate created_at is valid ISO 8601."""
         created_at = self.manifest.get("created_at", "")
+        if not isinstance(created_at, str):
+            return  # MANIFEST-002 reports the type
         try:
             # Try parsing ISO 8601 format
             if created_at.endswith("Z"):
@@ -220,11 +722,15 @@ class ManifestValidator:
     def _validate_layers(self) -> None:
         """Validate layer definitions and file references."""
         layers = self.manifest.get("layers", [])
+        if not isinstance(layers, list):
+            return  # MANIFEST-002 reports the type
         if not layers:
             self._add_error("LAYER-001", "No layers defined in manifest", "layers")
             return
 
         for i, layer in enumerate(layers):
+            if not isinstance(layer, dict):
+                continue  # MANIFEST-002 reports the type
             layer_id = layer.get("id", f"layer[{i}]")
             self._validate_layer(layer, layer_id, i)
             self.layers_validated += 1
@@ -241,18 +747,263 @@ class ManifestValidator:
         if not layer.get("title"):
             self._add_warning("LAYER-001", "Layer missing 'title' field", f"{path_prefix}.title")
 
+        if not self._check_files:
+            return
+
         # Check file references exist (for local files)
-        file_refs = ["parquet", "pmtiles", "cog", "copc"]
-        for ref in file_refs:
+        for ref in self.FILE_REFS:
             file_path = layer.get(ref)
-            if file_path and file_path.startswith("./"):
-                full_path = self.pack_path / file_path[2:]
-                if not full_path.exists() and not any(full_path.parent.glob(full_path.name)):
+            if not isinstance(file_path, str):
+                continue
+            if file_path.startswith("./"):
+                rel_path = file_path[2:]
+                if not self._exists(rel_path):
                     self._add_warning(
                         "LAYER-002",
                         f"Layer file not found: {file_path}",
                         f"{path_prefix}.{ref}",
                     )
+                elif self.deep and ref == "parquet":
+                    if self._archive is not None:
+                        # DuckDB reads Parquet from paths only, not from a member window
+                        self._add_warning(
+                            "LAYER-003",
+                            f"GeoParquet footers are not checked inside an archive; unbundle to check {file_path}",
+                            f"{path_prefix}.parquet",
+                        )
+                    else:
+                        self._validate_geoparquet(layer, self.pack_path / rel_path, path_prefix)
+                elif self.deep and ref == "pmtiles" and self._is_file(rel_path):
+                    self._validate_pmtiles(layer, self._range_location(rel_path), path_prefix)
+                elif self.deep and ref == "cog" and self._is_file(rel_path):
+                    self._validate_cog(layer, self._range_location(rel_path), path_prefix)
+            elif self.deep and file_path.startswith(("http://", "https://")):
+                if ref == "pmtiles":
+                    self._validate_pmtiles(layer, file_path, path_prefix)
+                elif ref == "cog":
+                    self._validate_cog(layer, file_path, path_prefix)
+
+    def _validate_cog(self, layer: dict, location: Any, path_prefix: str) -> None:
+        """Check COG tiling, overviews, layout and declared stats (deep mode)."""
+        from spatialpack.validators.cog import TIFFError, inspect_cog
+
+        path = f"{path_prefix}.cog"
+        try:
+            info = inspect_cog(location)
+        except (TIFFError, OSError) as e:
+            self._add_error("RASTER-001", f"Cannot read GeoTIFF: {e}", path)
+            return
+
+        full_res = info["images"][0]
+        self.asset_details[str(layer.get("cog"))] = {
+            "format": "cog",
+            "size": [full_res["width"], full_res["height"]],
+            "tile_size": full_res["tile_size"],
+            "compression": full_res["compression"],
+            "overviews": info["overviews"],
+            "bigtiff": info["bigtiff"],
+            "bytes_read": info["bytes_read"],
+        }
+
+        # Tiling, compression and overviews
+        if not full_res["tiled"]:
+            self._add_error("RASTER-002", "GeoTIFF is striped, not tiled; range reads cannot fetch blocks", path)
+        else:
+            tile_width, tile_height = full_res["tile_size"]
+            if tile_width % 16 or tile_height % 16 or not 128 <= tile_width <= 1024:
+                self._add_warning(
+                    "RASTER-002",
+                    f"Unusual tile size {tile_width}x{tile_height}; use 256 or 512",
+                    path,
+                )
+            if info["overviews"] == 0 and max(full_res["width"], full_res["height"]) > max(tile_width, tile_height):
+                self._add_warning("RASTER-002", "GeoTIFF has no internal overviews", path)
+        if full_res["compression"] == "none":
+            self._add_warning("RASTER-002", "GeoTIFF tiles are uncompressed", path)
+
+        # Cloud-optimized layout
+        if not info["ifds_before_data"]:
+            self._add_error(
+                "RASTER-003",
+                "IFDs are not at the start of the file; clients need extra range requests to find tiles",
+                path,
+            )
+        elif not info["overviews_before_full_res"]:
+            self._add_warning("RASTER-003", "Overview data is not stored before full-resolution data", path)
+        if info["ghost_area"] is None:
+            self._add_warning("RASTER-003", "No GDAL COG ghost area (not written by the COG driver)", path)
+        elif info["ghost_area"].get("LAYOUT") != "IFDS_BEFORE_DATA":
+            self._add_warning("RASTER-003", "Ghost area does not declare LAYOUT=IFDS_BEFORE_DATA", path)
+
+        # Declared raster_stats
+        raster_stats = _as_dict(layer.get("raster_stats"))
+        declared_nodata = raster_stats.get("nodata")
+        if _is_number(declared_nodata) and info["nodata"] != declared_nodata:
+            self._add_warning(
+                "RASTER-004",
+                f"raster_stats.nodata is {declared_nodata} but GeoTIFF nodata is {info['nodata']}",
+                f"{path_prefix}.raster_stats.nodata",
+            )
+        for key in ("min", "max", "mean"):
+            declared, actual = raster_stats.get(key), info["statistics"].get(key)
+            if _is_number(declared) and actual is not None and abs(declared - actual) > 1e-6 * max(1.0, abs(actual)):
+                self._add_warning(
+                    "RASTER-004",
+                    f"raster_stats.{key} is {declared} but GeoTIFF statistics report {actual}",
+                    f"{path_prefix}.raster_stats.{key}",
+                )
+
+    def _validate_pmtiles(self, layer: dict, location: Any, path_prefix: str) -> None:
+        """Check a PMTiles archive's header and directories (deep mode)."""
+        from spatialpack.validators.pmtiles import LAYER_TILE_TYPES, MAX_ROOT_BYTES, PMTilesError, inspect_pmtiles
+
+        path = f"{path_prefix}.pmtiles"
+        try:
+            info = inspect_pmtiles(location)
+        except (PMTilesError, OSError) as e:
+            self._add_error("LAYER-007", f"Cannot read PMTiles archive: {e}", path)
+            return
+
+        header = info["header"]
+        self.asset_details[str(layer.get("pmtiles"))] = {
+            "format": "pmtiles",
+            "tile_type": header["tile_type"],
+            "zoom": [header["min_zoom"], header["max_zoom"]],
+            "clustered": header["clustered"],
+            "root_dir_bytes": info["root_bytes"],
+            "leaf_dir_bytes": info["leaf_bytes"],
+            "tile_entries": header["tile_entries"],
+            "bytes_read": info["bytes_read"],
+        }
+        if info["out_of_bounds"]:
+            self._add_error(
+                "LAYER-007",
+                f"{info['out_of_bounds']} of {info['sampled']} sampled tile entries point outside the tile data section",
+                path,
+            )
+
+        layer_type = layer.get("type")
+        expected_types = LAYER_TILE_TYPES.get(layer_type) if isinstance(layer_type, str) else None
+        if expected_types and header["tile_type"] not in expected_types:
+            self._add_error(
+                "LAYER-008",
+                f"PMTiles tile type '{header['tile_type']}' does not match {layer['type']} layer",
+                path,
+            )
+        if header["min_zoom"] > header["max_zoom"]:
+            self._add_error(
+                "LAYER-008",
+                f"PMTiles min_zoom {header['min_zoom']} exceeds max_zoom {header['max_zoom']}",
+                path,
+            )
+        bbox = _as_bbox(self.manifest.get("bbox"))
+        if bbox is not None and not _bbox_within(header["bounds"], bbox, tolerance=1e-6):
+            self._add_warning(
+                "LAYER-008",
+                f"PMTiles bounds {header['bounds']} extend beyond manifest bbox {bbox}",
+                path,
+            )
+
+        if not header["clustered"]:
+            self._add_warning(
+                "LAYER-009",
+                "PMTiles archive is not clustered; tile reads will not be sequential",
+                path,
+            )
+        if info["root_bytes"] > MAX_ROOT_BYTES:
+            self._add_warning(
+                "LAYER-009",
+                f"PMTiles root directory is {info['root_bytes']} bytes; "
+                f"keep it under {MAX_ROOT_BYTES} so header and root fit one request",
+                path,
+            )
+
+    def _validate_geoparquet(self, layer: dict, full_path: Path, path_prefix: str) -> None:
+        """Check GeoParquet footers against the layer and manifest (deep mode)."""
+        import duckdb
+
+        from spatialpack.validators.geoparquet import DEFAULT_CRS, crs_identifier, crs_matches, inspect_geoparquet
+
+        if self._duckdb is None:
+            self._duckdb = duckdb.connect()
+        try:
+            info = inspect_geoparquet(str(full_path), self._duckdb)
+        except duckdb.Error as e:
+            self._add_error("LAYER-003", f"Cannot read Parquet footer: {e}", f"{path_prefix}.parquet")
+            return
+        record_read(info["footer_bytes"] or 0, files=info["files"])
+
+        self.asset_details[str(layer.get("parquet"))] = {
+            "format": "geoparquet",
+            "files": info["files"],
+            "rows": info["num_rows"],
+            "row_groups": info["num_row_groups"],
+            "file_bytes": info["file_bytes"],
+            "bytes_read": info["footer_bytes"],
+        }
+
+        geo = info["geo"]
+        if not isinstance(geo, dict):
+            self._add_error("LAYER-003", "Parquet file has no valid GeoParquet 'geo' metadata", f"{path_prefix}.parquet")
+            return
+        for file_name in info["files_missing_geo"]:
+            self._add_error("LAYER-003", f"GeoParquet 'geo' metadata missing in {file_name}", f"{path_prefix}.parquet")
+
+        primary = geo.get("primary_column")
+        columns = geo.get("columns")
+        column_meta = columns.get(primary) if isinstance(primary, str) and isinstance(columns, dict) else None
+        if primary not in info["columns"] or not isinstance(column_meta, dict):
+            self._add_error(
+                "LAYER-003",
+                f"GeoParquet primary_column '{primary}' is not a column in the file",
+                f"{path_prefix}.parquet",
+            )
+            return
+
+        # Declared attributes (stats.attribute_completeness) must be columns
+        declared = _as_dict(_as_dict(layer.get("stats")).get("attribute_completeness"))
+        missing = sorted(set(declared) - set(info["columns"]))
+        if missing:
+            self._add_warning(
+                "LAYER-003",
+                f"Declared attributes missing from Parquet columns: {', '.join(missing)}",
+                f"{path_prefix}.stats.attribute_completeness",
+            )
+
+        # CRS
+        manifest_crs = self.manifest.get("crs", "")
+        if not isinstance(manifest_crs, str):
+            manifest_crs = ""  # MANIFEST-002 reports the type
+        parquet_crs = crs_identifier(column_meta["crs"]) if "crs" in column_meta else DEFAULT_CRS
+        if manifest_crs and not crs_matches(manifest_crs, parquet_crs):
+            self._add_error(
+                "LAYER-004",
+                f"GeoParquet CRS {parquet_crs or 'undefined'} does not match manifest crs {manifest_crs}",
+                f"{path_prefix}.parquet",
+            )
+
+        # Extent: declared column bbox and row-group covering statistics
+        bbox = _as_bbox(self.manifest.get("bbox"))
+        if bbox is not None:
+            for source, extent in (
+                ("GeoParquet column bbox", column_meta.get("bbox")),
+                ("Row-group bbox statistics", info["row_group_bbox"]),
+            ):
+                if isinstance(extent, list) and len(extent) >= 4 and not _bbox_within(extent, bbox):
+                    self._add_warning(
+                        "LAYER-005",
+                        f"{source} {extent[:4]} extends beyond manifest bbox {bbox}",
+                        f"{path_prefix}.parquet",
+                    )
+
+        # Feature count
+        features = _as_dict(layer.get("stats")).get("features")
+        if features is not None and features != info["num_rows"]:
+            self._add_warning(
+                "LAYER-006",
+                f"stats.features is {features} but Parquet footer reports {info['num_rows']} rows",
+                f"{path_prefix}.stats.features",
+            )
 
     def _validate_structure(self) -> None:
         """Validate pack folder structure."""
@@ -260,13 +1011,14 @@ class ManifestValidator:
         expected_folders = ["layers", "metadata"]
         for folder in expected_folders:
             folder_path = self.pack_path / folder
-            if not folder_path.exists():
+            if not self._exists(folder):
                 # Only warn if there are file references that suggest the folder should exist
-                layers = self.manifest.get("layers", [])
+                layers = self.manifest.get("layers")
                 has_local_refs = any(
-                    layer.get("parquet", "").startswith("./layers/") or
-                    layer.get("pmtiles", "").startswith("./layers/")
-                    for layer in layers
+                    (_local_ref(layer, "parquet") or "").startswith("./layers/") or
+                    (_local_ref(layer, "pmtiles") or "").startswith("./layers/")
+                    for layer in (layers if isinstance(layers, list) else [])
+                    if isinstance(layer, dict)
                 )
                 if has_local_refs and folder == "layers":
                     self._add_warning(
@@ -278,6 +1030,8 @@ class ManifestValidator:
     def _validate_integrity(self) -> None:
         """Validate integrity hashes if present."""
         integrity = self.manifest.get("integrity", {})
+        if not isinstance(integrity, dict):
+            return  # MANIFEST-002 reports the type
         if not integrity:
             self._add_warning(
                 "INTEGRITY-001",
@@ -286,7 +1040,7 @@ class ManifestValidator:
             )
             return
 
-        asset_hashes = integrity.get("asset_hashes", {})
+        asset_hashes = _as_dict(integrity.get("asset_hashes"))
         if not asset_hashes:
             self._add_warning(
                 "INTEGRITY-001",
@@ -295,6 +1049,7 @@ class ManifestValidator:
             )
 
         # Check for placeholder hashes
+        asset_hashes = {asset: value for asset, value in asset_hashes.items() if isinstance(value, str)}
         for asset, hash_value in asset_hashes.items():
             if "PLACEHOLDER" in hash_value.upper():
                 self._add_warning(
@@ -302,3 +1057,58 @@ class ManifestValidator:
                     f"Placeholder hash found for {asset}",
                     f"integrity.asset_hashes.{asset}",
                 )
+
+        if self.verify_hashes:
+            self._verify_asset_hashes(asset_hashes)
+
+    def _verify_asset_hashes(self, asset_hashes: dict) -> None:
+        """Hash local asset files and compare with integrity.asset_hashes."""
+        # Local layer files with no recorded hash cannot be verified
+        hashed = {asset.removeprefix("./") for asset in asset_hashes}
+        layers = self.manifest.get("layers")
+        for i, layer in enumerate(layers if isinstance(layers, list) else []):
+            if not isinstance(layer, dict):
+                continue
+            for ref in self.FILE_REFS:
+                file_path = _local_ref(layer, ref)
+                if (
+                    file_path
+                    and self._is_file(file_path[2:])
+                    and file_path[2:] not in hashed
+                ):
+                    self._add_warning(
+                        "INTEGRITY-002",
+                        f"No integrity hash for layer file: {file_path}",
+                        f"layers[{i}].{ref}",
+                    )
+
+        to_verify = {
+            asset: value for asset, value in asset_hashes.items()
+            if "PLACEHOLDER" not in value.upper()
+        }
+        if not to_verify:
+            return
+
+        if self._archive is not None:
+            results = self._archive.verify_assets(to_verify)
+        else:
+            cache = self._hash_cache or HashCache.for_pack(self.pack_path)
+            results = verify_assets(self.pack_path, to_verify, cache)
+        for asset, result in results.items():
+            path = f"integrity.asset_hashes.{asset}"
+            if result["status"] == "mismatch":
+                self._add_error(
+                    "INTEGRITY-002",
+                    f"{result['algorithm']} mismatch for {asset}: expected {result['expected']}, got {result['actual']}",
+                    path,
+                )
+            elif result["status"] == "missing":
+                self._add_warning("INTEGRITY-002", f"Asset file not found, hash not verified: {asset}", path)
+            elif result["status"] == "unsupported":
+                self._add_warning(
+                    "INTEGRITY-002",
+                    f"Cannot verify {asset}: hash algorithm '{result['algorithm']}' unavailable",
+                    path,
+                )
+            elif result["status"] == "error":
+                self._add_error("INTEGRITY-002", f"Failed to read {asset}: {result['actual']}", path)
@@ -0,0 +1,246 @@
+"""
+PMTiles v3 archive inspection using range reads only.
+
+Reads the fixed 127-byte header, the root directory and a bounded sample of
+leaf directories; tile data is never read. Local files are memory mapped and
+remote archives are read with HTTP Range requests, so inspecting a
+multi-GB archive costs a few KB of I/O.
+
+Spec: https://github.com/protomaps/PMTiles/blob/main/spec/v3/spec.md
+"""
+
+import gzip
+import struct
+import zlib
+from bisect import bisect_right
+from pathlib import Path
+from typing import Optional, Sequence, Union
+
+from spatialpack.validators.ranges import RangeSource
+
+HEADER_SIZE = 127
+
+# Spec guidance: header + root directory should fit in the first 16 KiB so
+# clients can fetch both with one request
+MAX_ROOT_BYTES = 16384 - HEADER_SIZE
+
+COMPRESSION = {0: "unknown", 1: "none", 2: "gzip", 3: "brotli", 4: "zstd"}
+TILE_TYPES = {0: "unknown", 1: "mvt", 2: "png", 3: "jpeg", 4: "webp", 5: "avif"}
+
+# Tile types expected for each manifest layer type
+LAYER_TILE_TYPES = {
+    "vector": {"mvt"},
+    "raster": {"png", "jpeg", "webp", "avif"},
+}
+
+_HEADER_STRUCT = struct.Struct("<7sB11Q6B4iB2i")
+
+
+class PMTilesError(ValueError):
+    """Raised when an archive is not a readable PMTiles v3 file."""
+
+
+def parse_header(data: bytes) -> dict:
+    """Parse the 127-byte PMTiles v3 header."""
+    if len(data) < HEADER_SIZE:
+        raise PMTilesError(f"File too small for a PMTiles header ({len(data)} bytes)")
+    (
+        magic, version,
+        root_offset, root_length, metadata_offset, metadata_length,
+        leaf_offset, leaf_length, data_offset, data_length,
+        addressed_tiles, tile_entries, tile_contents,
+        clustered, internal_compression, tile_compression, tile_type, min_zoom, max_zoom,
+        min_lon_e7, min_lat_e7, max_lon_e7, max_lat_e7,
+        center_zoom, center_lon_e7, center_lat_e7,
+    ) = _HEADER_STRUCT.unpack(data[:HEADER_SIZE])
+    if magic != b"PMTiles":
+        raise PMTilesError("Missing PMTiles magic number")
+    if version != 3:
+        raise PMTilesError(f"Unsupported PMTiles version {version} (expected 3)")
+    return {
+        "version": version,
+        "root_offset": root_offset,
+        "root_length": root_length,
+        "metadata_offset": metadata_offset,
+        "metadata_length": metadata_length,
+        "leaf_offset": leaf_offset,
+        "leaf_length": leaf_length,
+        "data_offset": data_offset,
+        "data_length": data_length,
+        "addressed_tiles": addressed_tiles,
+        "tile_entries": tile_entries,
+        "tile_contents": tile_contents,
+        "clustered": bool(clustered),
+        "internal_compression": COMPRESSION.get(internal_compression, str(internal_compression)),
+        "tile_compression": COMPRESSION.get(tile_compression, str(tile_compression)),
+        "tile_type": TILE_TYPES.get(tile_type, str(tile_type)),
+        "min_zoom": min_zoom,
+        "max_zoom": max_zoom,
+        "bounds": [min_lon_e7 / 1e7, min_lat_e7 / 1e7, max_lon_e7 / 1e7, max_lat_e7 / 1e7],
+        "center": [center_lon_e7 / 1e7, center_lat_e7 / 1e7, center_zoom],
+    }
+
+
+def _decompress(data: bytes, compression: str) -> bytes:
+    """Decompress a directory; corrupt data raises ``PMTilesError``."""
+    if compression in ("none", "unknown"):
+        return data
+    if compression == "gzip":
+        decompress, errors = gzip.decompress, (OSError, EOFError, zlib.error)
+    elif compression == "brotli":
+        try:
+            import brotli
+        except ImportError as e:
+            raise PMTilesError("Brotli-compressed directories require the 'brotli' package") from e
+        decompress, errors = brotli.decompress, (brotli.error,)
+    elif compression == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise PMTilesError("Zstd-compressed directories require the 'zstandard' package") from e
+        decompress, errors = zstandard.ZstdDecompressor().decompress, (zstandard.ZstdError,)
+    else:
+        raise PMTilesError(f"Unknown internal compression: {compression}")
+    try:
+        return decompress(data)
+    except errors as e:
+        raise PMTilesError(f"Corrupt {compression} directory: {e}") from e
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    result = shift = 0
+    while True:
+        if pos >= len(data):
+            raise PMTilesError("Truncated varint in directory")
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def parse_directory(data: bytes) -> list[tuple[int, int, int, int]]:
+    """Decode a (decompressed) directory into ``(tile_id, offset, length, run_length)``."""
+    count, pos = _read_varint(data, 0)
+    tile_ids, run_lengths, lengths, offsets = [], [], [], []
+
+    last_id = 0
+    for _ in range(count):
+        delta, pos = _read_varint(data, pos)
+        last_id += delta
+        tile_ids.append(last_id)
+    for _ in range(count):
+        value, pos = _read_varint(data, pos)
+        run_lengths.append(value)
+    for _ in range(count):
+        value, pos = _read_varint(data, pos)
+        lengths.append(value)
+    for i in range(count):
+        value, pos = _read_varint(data, pos)
+        if value == 0 and i > 0:
+            offsets.append(offsets[i - 1] + lengths[i - 1])
+        else:
+            offsets.append(value - 1)
+
+    return list(zip(tile_ids, offsets, lengths, run_lengths))
+
+
+def zxy_to_tile_id(z: int, x: int, y: int) -> int:
+    """Tile id of ``z/x/y``: tiles of lower zooms, then the Hilbert index within ``z``."""
+    if not 0 <= z <= 31:
+        raise PMTilesError(f"Zoom {z} out of range (0-31)")
+    n = 1 << z
+    if not (0 <= x < n and 0 <= y < n):
+        raise PMTilesError(f"Tile {z}/{x}/{y} is outside the zoom level")
+    tile_id = (n * n - 1) // 3
+    s = n >> 1
+    while s:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        tile_id += s * s * ((3 * rx) ^ ry)
+        if not ry:
+            if rx:
+                x, y = n - 1 - x, n - 1 - y
+            x, y = y, x
+        s >>= 1
+    return tile_id
+
+
+def find_entry(
+    tile_ids: Sequence[int], entries: Sequence[tuple[int, int, int, int]], tile_id: int
+) -> Optional[tuple[int, int, int, int]]:
+    """Directory entry covering ``tile_id``: a tile run, a leaf pointer or None.
+
+    ``tile_ids`` holds the first element of each entry, for bisection.
+    """
+    index = bisect_right(tile_ids, tile_id) - 1
+    if index < 0:
+        return None
+    entry = entries[index]
+    if entry[3] == 0 or tile_id - entry[0] < entry[3]:
+        return entry
+    return None
+
+
+def inspect_pmtiles(location: Union[str, Path, RangeSource], sample_size: int = 64, max_leaves: int = 8) -> dict:
+    """Inspect a PMTiles archive without reading tile data.
+
+    Args:
+        location: Local path, http(s) URL or an open ``RangeSource``
+            (which is closed on return)
+        sample_size: Tile entries to spot-check against the data section
+        max_leaves: Maximum leaf directories to fetch for the sample
+
+    Returns:
+        dict with the parsed ``header`` and ``root_entries``, ``leaf_entries``
+        (sampled leaves only), ``root_bytes``, ``leaf_bytes``, ``sampled``,
+        ``out_of_bounds`` (sampled entries outside the tile data section),
+        ``bytes_read`` and ``requests``.
+
+    Raises:
+        PMTilesError: if the archive is not a valid PMTiles v3 file
+    """
+    with location if isinstance(location, RangeSource) else RangeSource(location) as source:
+        # Header and root directory usually share the first 16 KiB
+        head = source.read(0, 16384)
+        header = parse_header(head)
+
+        root_end = header["root_offset"] + header["root_length"]
+        if root_end <= len(head):
+            root_raw = head[header["root_offset"]:root_end]
+        else:
+            root_raw = source.read(header["root_offset"], header["root_length"])
+        root = parse_directory(_decompress(root_raw, header["internal_compression"]))
+
+        tile_entries = [entry for entry in root if entry[3] > 0]
+        leaf_pointers = [entry for entry in root if entry[3] == 0]
+
+        # Sample leaf directories evenly across the archive
+        leaf_entries: list[tuple[int, int, int, int]] = []
+        if leaf_pointers and max_leaves > 0:
+            step = max(1, len(leaf_pointers) // max_leaves)
+            for _, offset, length, _ in leaf_pointers[::step][:max_leaves]:
+                raw = source.read(header["leaf_offset"] + offset, length)
+                leaf_entries.extend(parse_directory(_decompress(raw, header["internal_compression"])))
+            tile_entries.extend(entry for entry in leaf_entries if entry[3] > 0)
+
+        tile_entries.sort()
+        step = max(1, len(tile_entries) // sample_size) if sample_size > 0 else len(tile_entries) + 1
+        sample = tile_entries[::step][:sample_size]
+
+        out_of_bounds = sum(
+            1 for _, offset, length, _ in sample if offset + length > header["data_length"]
+        )
+
+        return {
+            "header": header,
+            "root_entries": len(root),
+            "leaf_entries": len(leaf_entries),
+            "root_bytes": header["root_length"],
+            "leaf_bytes": header["leaf_length"],
+            "sampled": len(sample),
+            "out_of_bounds": out_of_bounds,
+            "bytes_read": source.bytes_read,
+            "requests": source.requests,
+        }
@@ -0,0 +1,87 @@
+"""
+Byte-range readers shared by the archive inspectors.
+
+Local files are memory mapped; remote http(s) URLs are read with HTTP Range
+requests; a ``buffer`` (such as a member of a ``.spack`` archive) is read in
+place. Bytes read and request counts are tracked so inspectors can report
+their I/O cost.
+"""
+
+import mmap
+import urllib.request
+from pathlib import Path
+from typing import Optional, Union
+
+from spatialpack.profiling import record_read
+
+
+class RangeReadError(OSError):
+    """Raised when a byte range cannot be read from the source."""
+
+
+class RangeSource:
+    """Byte-range reader over a local file (mmap), an HTTP(S) URL or a buffer.
+
+    With ``buffer``, reads come from it and ``location`` only names the
+    source in messages.
+    """
+
+    def __init__(
+        self,
+        location: Union[str, Path],
+        timeout: float = 30.0,
+        buffer: Union[bytes, memoryview, None] = None,
+    ):
+        self.location = str(location)
+        self.timeout = timeout
+        self.bytes_read = 0
+        self.requests = 0
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._buffer = None if buffer is None else memoryview(buffer)
+        if self._buffer is None and not self.is_remote:
+            self._file = open(location, "rb")
+            try:
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                self._mmap = None
+        record_read(0, files=1)
+
+    @property
+    def is_remote(self) -> bool:
+        return self._buffer is None and self.location.startswith(("http://", "https://"))
+
+    def read(self, offset: int, length: int) -> bytes:
+        self.requests += 1
+        if self.is_remote:
+            request = urllib.request.Request(
+                self.location, headers={"Range": f"bytes={offset}-{offset + length - 1}"}
+            )
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                if response.status != 206 and offset > 0:
+                    raise RangeReadError(f"Server does not support range requests: {self.location}")
+                data = response.read(length)
+        elif self._buffer is not None:
+            data = bytes(self._buffer[offset:offset + length])
+        elif self._mmap is None:
+            data = b""
+        else:
+            data = self._mmap[offset:offset + length]
+        self.bytes_read += len(data)
+        record_read(len(data))
+        return data
+
+    def close(self) -> None:
+        if self._buffer is not None:
+            self._buffer.release()
+            self._buffer = None
+        if self._mmap is not None:
+            self._mmap.close()
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self) -> "RangeSource":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,224 @@
+"""
+File watching for ``validate --watch``.
+
+``watch_pack`` yields the set of pack-relative paths that changed, one set
+per burst of writes: events are collected until the pack has been quiet for
+``debounce`` seconds. ``open_watcher`` uses inotify through libc on Linux
+(no extra dependency). Elsewhere, or when inotify is unavailable or out of
+watches, it polls stat fingerprints.
+
+The ``.spatialpack`` cache folder is never watched, so the validator's own
+cache writes do not trigger re-runs.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from spatialpack.cache import CACHE_DIR
+
+# Yielded alone when changes were lost (inotify queue overflow)
+EVERYTHING = "."
+
+# Top-level folder excluded from watching (the validator's own caches)
+IGNORED_DIR = Path(CACHE_DIR).parts[0]
+
+# inotify event masks (<sys/inotify.h>)
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (
+    IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+)
+
+_EVENT = struct.Struct("iIII")
+
+
+class WatchError(OSError):
+    """Raised when a watch backend cannot be started."""
+
+
+class InotifyWatcher:
+    """Recursive inotify watch over a directory tree."""
+
+    name = "inotify"
+
+    def __init__(self, root: Path):
+        if not sys.platform.startswith("linux"):
+            raise WatchError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise WatchError("libc has no inotify support")
+        self._libc = libc
+        self.root = Path(root)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise WatchError(ctypes.get_errno(), f"inotify_init1: {os.strerror(ctypes.get_errno())}")
+        self._dirs: dict[int, str] = {}
+        try:
+            self._add_tree("")
+        except WatchError:
+            self.close()
+            raise
+
+    def _add(self, rel: str) -> None:
+        path = os.fsencode(self.root / rel) if rel else os.fsencode(self.root)
+        wd = self._libc.inotify_add_watch(self.fd, path, WATCH_MASK | IN_ONLYDIR)
+        if wd < 0:
+            code = ctypes.get_errno()
+            if code in (errno.ENOENT, errno.ENOTDIR):  # removed while walking
+                return
+            raise WatchError(code, f"inotify_add_watch {rel or '.'}: {os.strerror(code)}")
+        self._dirs[wd] = rel
+
+    def _add_tree(self, rel: str) -> set[str]:
+        """Watch ``rel`` and its subdirectories; return the paths already inside it.
+
+        Entries created before the watch was added produce no events of their own.
+        """
+        self._add(rel)
+        found = set()
+        base = self.root / rel
+        for dirpath, dirnames, filenames in os.walk(base):
+            if Path(dirpath) == self.root:
+                dirnames[:] = [d for d in dirnames if d != IGNORED_DIR]
+            for name in dirnames:
+                sub = Path(dirpath, name).relative_to(self.root).as_posix()
+                self._add(sub)
+                found.add(sub)
+            found.update(Path(dirpath, name).relative_to(self.root).as_posix() for name in filenames)
+        return found
+
+    def read(self, timeout: Optional[float]) -> set[str]:
+        """Changed paths from events available within ``timeout`` seconds."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed = set()
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                return {EVERYTHING}
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            parent = self._dirs.get(wd)
+            if parent is None:
+                continue
+            rel = "/".join(p for p in (parent, os.fsdecode(name)) if p)
+            if not rel or rel.split("/")[0] == IGNORED_DIR:
+                continue
+            changed.add(rel)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                try:
+                    changed |= self._add_tree(rel)
+                except WatchError:
+                    return {EVERYTHING}
+        return changed
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """Detects changes by comparing stat fingerprints every ``interval`` seconds."""
+
+    name = "polling"
+
+    def __init__(self, root: Path, interval: float = 0.5):
+        self.root = Path(root)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict[str, tuple]:
+        snapshot = {}
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            if Path(dirpath) == self.root:
+                dirnames[:] = [d for d in dirnames if d != IGNORED_DIR]
+            for name in dirnames + filenames:
+                path = Path(dirpath, name)
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                is_dir = name in dirnames
+                rel = path.relative_to(self.root).as_posix()
+                snapshot[rel] = (is_dir,) if is_dir else (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+        return snapshot
+
+    def read(self, timeout: Optional[float]) -> set[str]:
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        snapshot = self._scan()
+        changed = {
+            rel for rel in snapshot.keys() | self._snapshot.keys()
+            if snapshot.get(rel) != self._snapshot.get(rel)
+        }
+        self._snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+def open_watcher(root: Path, poll: bool = False, interval: float = 0.5) -> Union[InotifyWatcher, PollingWatcher]:
+    """inotify watcher for ``root``, or a polling one if ``poll`` or inotify fails."""
+    if not poll:
+        try:
+            return InotifyWatcher(root)
+        except (WatchError, OSError):
+            pass
+    return PollingWatcher(root, interval)
+
+
+def watch_pack(
+    watcher: Union[InotifyWatcher, PollingWatcher],
+    debounce: float = 0.3,
+    max_wait: float = 5.0,
+) -> Iterator[set[str]]:
+    """Yield sets of changed pack-relative paths, one per burst of writes.
+
+    A burst ends once no event arrives for ``debounce`` seconds, or after
+    ``max_wait`` seconds of continuous writes. The watcher is closed when
+    the generator is.
+    """
+    try:
+        while True:
+            changed = watcher.read(None)
+            if not changed:
+                continue
+            deadline = time.monotonic() + max_wait
+            while time.monotonic() < deadline:
+                more = watcher.read(debounce)
+                if not more:
+                    break
+                changed |= more
+            yield {EVERYTHING} if EVERYTHING in changed else changed
+    finally:
+        watcher.close()
@@ -0,0 +1,58 @@
+import copy
+import hashlib
+import json
+from pathlib import Path
+from typing import Callable, Optional
+
+import pytest
+
+# Contents of the one asset VALID_MANIFEST declares; pass as
+# ``make_pack(..., files=ASSETS)`` for packs that should pass every rule
+ASSETS = {"layers/roads.parquet": b"roads layer bytes"}
+
+# Smallest manifest that passes the repository's spatialpack.schema.json
+# with no errors or warnings
+VALID_MANIFEST = {
+    "pack_id": "test:au:roads:v1",
+    "version": "1.0.0",
+    "created_at": "2025-01-03T00:00:00Z",
+    "geography": "au",
+    "theme": "roads",
+    "bbox": [115.0, -35.0, 129.0, -20.0],
+    "crs": "EPSG:4326",
+    "layers": [
+        {"id": "roads", "type": "vector", "title": "Roads", "parquet": "./layers/roads.parquet"},
+    ],
+    "integrity": {
+        "asset_hashes": {
+            path: "sha256:" + hashlib.sha256(data).hexdigest() for path, data in ASSETS.items()
+        },
+    },
+}
+
+
+@pytest.fixture
+def manifest() -> Callable[..., dict]:
+    """``manifest(**fields)``: a schema-valid manifest with ``fields`` replaced."""
+
+    def make(**fields) -> dict:
+        return {**copy.deepcopy(VALID_MANIFEST), **fields}
+
+    return make
+
+
+@pytest.fixture
+def make_pack(tmp_path: Path) -> Callable[..., Path]:
+    """Write a pack directory: ``make_pack(name, manifest, files={rel_path: bytes})``."""
+
+    def make(name: str, manifest: dict, files: Optional[dict[str, bytes]] = None) -> Path:
+        pack = tmp_path / name
+        pack.mkdir(parents=True)
+        (pack / "spatialpack.json").write_text(json.dumps(manifest), encoding="utf-8")
+        for rel_path, data in (files or {}).items():
+            path = pack / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        return pack
+
+    return make
@@ -0,0 +1,118 @@
+import json
+import zlib
+
+import pytest
+
+from conftest import ASSETS
+from spatialpack.archive import (
+    _HEADER,
+    HEADER_SIZE,
+    ArchiveError,
+    ArchiveReader,
+    bundle_pack,
+    unbundle,
+)
+from spatialpack.validators.manifest import ManifestValidator
+
+FILES = {
+    "data/ok.bin": bytes(range(256)) * 40,
+    "layers/roads.parquet": b"PAR1" + b"\x01" * 5000 + b"PAR1",
+    "layers/empty.txt": b"",
+    ".hidden": b"not bundled",
+    ".spatialpack/cache/hashes.json": b"{}",
+}
+
+
+@pytest.fixture
+def pack(make_pack):
+    return make_pack("pack", {"pack_id": "test:au:roads:v1", "version": "1.0.0"}, FILES)
+
+
+def test_round_trip(pack, tmp_path):
+    archive = tmp_path / "pack.spack"
+    result = bundle_pack(pack, archive, alignment=512)
+    assert result["members"] == 4
+    assert result["bytes"] == archive.stat().st_size
+
+    with ArchiveReader(archive) as reader:
+        assert reader.pack_id == "test:au:roads:v1"
+        assert sorted(reader.names()) == ["data/ok.bin", "layers/empty.txt", "layers/roads.parquet", "spatialpack.json"]
+        assert all(member.offset % 512 == 0 for member in reader.members.values())
+        assert reader.read("layers/roads.parquet", 0, 4) == b"PAR1"
+        assert bytes(reader.view("data/ok.bin")) == FILES["data/ok.bin"]
+        assert reader.is_dir("layers") and not reader.is_dir("data/ok.bin")
+        assert all(reader.verify().values())
+
+    out = tmp_path / "out"
+    assert unbundle(archive, out)["members"] == 4
+    for name, data in FILES.items():
+        if not name.startswith("."):
+            assert (out / name).read_bytes() == data
+    assert json.loads((out / "spatialpack.json").read_text())["version"] == "1.0.0"
+    assert not (out / ".hidden").exists()
+
+
+def test_rejects_bad_alignment(pack, tmp_path):
+    with pytest.raises(ArchiveError, match="power of two"):
+        bundle_pack(pack, tmp_path / "pack.spack", alignment=1000)
+
+
+def test_damaged_member(pack, tmp_path):
+    archive = tmp_path / "pack.spack"
+    bundle_pack(pack, archive)
+    with ArchiveReader(archive) as reader:
+        offset = reader.member("data/ok.bin").offset
+    data = bytearray(archive.read_bytes())
+    data[offset] ^= 0xFF
+    archive.write_bytes(bytes(data))
+
+    with ArchiveReader(archive) as reader:
+        assert reader.verify()["data/ok.bin"] is False
+    with pytest.raises(ArchiveError, match="damaged"):
+        unbundle(archive, tmp_path / "out")
+
+
+def test_truncated(pack, tmp_path):
+    archive = tmp_path / "pack.spack"
+    bundle_pack(pack, archive)
+    archive.write_bytes(archive.read_bytes()[:-10])
+    with pytest.raises(ArchiveError, match="truncated"):
+        ArchiveReader(archive)
+
+
+def test_not_an_archive(tmp_path):
+    path = tmp_path / "bogus.spack"
+    path.write_bytes(b"x" * HEADER_SIZE)
+    with pytest.raises(ArchiveError, match="not a spatialpack archive"):
+        ArchiveReader(path)
+
+
+def test_extract_rejects_paths_outside_dest(pack, tmp_path):
+    archive = tmp_path / "pack.spack"
+    bundle_pack(pack, archive)
+    data = bytearray(archive.read_bytes())
+    fields = list(_HEADER.unpack(data[:HEADER_SIZE]))
+    index_offset, index_length = fields[4], fields[5]
+    # Same length, so every offset stays valid; the CRC is recomputed
+    index = bytes(data[index_offset:index_offset + index_length]).replace(b'"data/ok.bin"', b'"../evil.bin"')
+    data[index_offset:index_offset + index_length] = index
+    fields[8] = zlib.crc32(index)
+    data[:HEADER_SIZE] = _HEADER.pack(*fields)
+    archive.write_bytes(bytes(data))
+
+    with pytest.raises(ArchiveError, match="outside"):
+        unbundle(archive, tmp_path / "out")
+    assert not (tmp_path / "evil.bin").exists()
+
+
+def test_validate_archive_in_place(make_pack, manifest, tmp_path):
+    pack = make_pack("valid", manifest(), ASSETS)
+    archive = tmp_path / "valid.spack"
+    bundle_pack(pack, archive)
+    result = ManifestValidator(archive, verify_hashes=True).validate()
+    assert (result["errors"], result["warnings"]) == ([], [])
+
+    tampered = make_pack("tampered", manifest(), {"layers/roads.parquet": b"not the hashed bytes"})
+    bundle_pack(tampered, archive)
+    result = ManifestValidator(archive, verify_hashes=True).validate()
+    assert [error["rule"] for error in result["errors"]] == ["INTEGRITY-002"]
@@ -0,0 +1,180 @@
+import asyncio
+import hashlib
+
+import pytest
+
+from conftest import ASSETS
+from spatialpack.assetserver import AssetServer, parse_range
+from spatialpack.server import ServerError
+from test_pmtiles import build_pmtiles
+
+ROADS = ASSETS["layers/roads.parquet"]
+TILES = [b"tile zero", b"tile one!"]
+
+
+def exchange(server: AssetServer, data: bytes) -> bytes:
+    """Send raw bytes on one connection; return everything received until it closes."""
+
+    async def run() -> bytes:
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(data)
+            await writer.drain()
+            received = await asyncio.wait_for(reader.read(), 10)
+            writer.close()
+            return received
+
+    return asyncio.run(run())
+
+
+def request(server: AssetServer, target: str, method: str = "GET", **headers: str) -> tuple[int, dict, bytes]:
+    lines = [f"{method} {target} HTTP/1.1", "Host: test", "Connection: close"]
+    lines += [f"{name.replace('_', '-')}: {value}" for name, value in headers.items()]
+    head, _, body = exchange(server, ("\r\n".join(lines) + "\r\n\r\n").encode()).partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    return (
+        int(status_line.split()[1]),
+        {name.lower(): value for name, _, value in (line.partition(": ") for line in header_lines)},
+        body,
+    )
+
+
+@pytest.fixture
+def server(tmp_path, make_pack, manifest):
+    pack = make_pack("pack", manifest(), {**ASSETS, "notes.txt": b"not in the manifest"})
+    (pack / "tiles.pmtiles").write_bytes(build_pmtiles(TILES))
+    (pack / ".spatialpack").mkdir()
+    (pack / ".spatialpack" / "usage.sqlite").write_bytes(b"ledger")
+    (tmp_path / "outside.txt").write_bytes(b"secret")
+    (pack / "escape.txt").symlink_to(tmp_path / "outside.txt")
+    return AssetServer(pack)
+
+
+@pytest.mark.parametrize(
+    "value, span",
+    [
+        ("bytes=0-9", (0, 9)),
+        ("bytes=90-", (90, 99)),
+        ("bytes=-10", (90, 99)),
+        ("bytes=95-200", (95, 99)),
+        ("bytes=-200", (0, 99)),
+        ("items=0-9", None),
+        ("bytes=0-1,5-6", None),
+        ("bytes=a-b", None),
+        ("bytes=5", None),
+    ],
+)
+def test_parse_range(value, span):
+    assert parse_range(value, 100) == span
+
+
+@pytest.mark.parametrize("value", ["bytes=100-", "bytes=9-5", "bytes=-0"])
+def test_unsatisfiable_range(value):
+    with pytest.raises(ServerError) as e:
+        parse_range(value, 100)
+    assert e.value.status == 416
+    assert e.value.headers["Content-Range"] == "bytes */100"
+
+
+def test_manifest_hash_is_a_strong_etag(server):
+    status, headers, body = request(server, "/layers/roads.parquet")
+    assert status == 200
+    assert body == ROADS
+    assert headers["etag"] == f'"sha256-{hashlib.sha256(ROADS).hexdigest()}"'
+    assert headers["cache-control"] == "public, max-age=86400"
+    assert headers["accept-ranges"] == "bytes"
+    assert server.hashed_assets == 1
+
+    _, headers, _ = request(server, "/notes.txt")
+    assert headers["etag"].startswith('W/"')
+    assert headers["cache-control"] == "no-cache"
+
+
+def test_changed_asset_falls_back_to_a_weak_etag(server):
+    (server.root / "layers" / "roads.parquet").write_bytes(b"rewritten after start-up")
+    _, headers, _ = request(server, "/layers/roads.parquet")
+    assert headers["etag"].startswith('W/"')
+
+
+def test_range_requests(server):
+    status, headers, body = request(server, "/layers/roads.parquet", Range="bytes=6-10")
+    assert status == 206
+    assert body == ROADS[6:11]
+    assert headers["content-range"] == f"bytes 6-10/{len(ROADS)}"
+    assert headers["content-length"] == "5"
+
+    status, headers, body = request(server, "/layers/roads.parquet", Range="bytes=-5")
+    assert (status, body) == (206, ROADS[-5:])
+
+    status, headers, _ = request(server, "/layers/roads.parquet", Range=f"bytes={len(ROADS)}-")
+    assert status == 416
+    assert headers["content-range"] == f"bytes */{len(ROADS)}"
+
+
+def test_if_range(server):
+    _, headers, _ = request(server, "/layers/roads.parquet")
+    etag = headers["etag"]
+    assert request(server, "/layers/roads.parquet", Range="bytes=0-4", If_Range=etag)[0] == 206
+    status, _, body = request(server, "/layers/roads.parquet", Range="bytes=0-4", If_Range='"stale"')
+    assert (status, body) == (200, ROADS)
+
+    # Weak ETags never satisfy If-Range
+    _, headers, _ = request(server, "/notes.txt")
+    assert request(server, "/notes.txt", Range="bytes=0-4", If_Range=headers["etag"])[0] == 200
+
+
+def test_if_none_match(server):
+    _, headers, _ = request(server, "/layers/roads.parquet")
+    etag = headers["etag"]
+    status, headers, body = request(server, "/layers/roads.parquet", If_None_Match=f'"other", W/{etag}')
+    assert (status, headers["etag"], body) == (304, etag, b"")
+    assert "content-length" not in headers
+    assert request(server, "/layers/roads.parquet", If_None_Match='"other"')[0] == 200
+    assert server.stats["not_modified"] == 1
+
+
+def test_head(server):
+    status, headers, body = request(server, "/layers/roads.parquet", method="HEAD")
+    assert status == 200
+    assert headers["content-length"] == str(len(ROADS))
+    assert body == b""
+    assert server.stats["bytes_sent"] == 0
+
+
+def test_tiles(server):
+    status, headers, body = request(server, "/tiles.pmtiles/1/0/0")
+    assert (status, body) == (200, TILES[1])
+    assert headers["content-type"] == "application/vnd.mapbox-vector-tile"
+    assert headers["content-encoding"] == "gzip"
+    assert headers["etag"].endswith('-1-0-0"')
+    assert request(server, "/tiles.pmtiles/0/0/0")[2] == TILES[0]
+    assert request(server, "/tiles.pmtiles/1/1/1")[0] == 204
+    assert server.stats["tiles"] == 3
+
+
+@pytest.mark.parametrize(
+    "target, expected",
+    [
+        ("/.spatialpack/usage.sqlite", 404),
+        ("/layers/../.spatialpack/usage.sqlite", 404),
+        ("/%2e%2e/outside.txt", 404),
+        ("/escape.txt", 403),
+        ("/missing.parquet", 404),
+    ],
+)
+def test_paths_outside_the_served_files(server, target, expected):
+    status, _, body = request(server, target)
+    assert status == expected
+    assert b"secret" not in body and b"ledger" not in body
+
+
+def test_request_errors(server):
+    status, headers, _ = request(server, "/notes.txt", method="POST")
+    assert status == 405
+    assert headers["allow"] == "GET, HEAD"
+
+    received = exchange(server, b"GET /" + b"a" * 70_000 + b" HTTP/1.1\r\n\r\n")
+    assert received.startswith(b"HTTP/1.1 414 ")
+    assert b"Connection: close" in received
@@ -0,0 +1,65 @@
+import json
+
+from conftest import ASSETS
+from spatialpack.cache import CACHE_DIR, VALIDATION_CACHE_FILE
+from spatialpack.validators.manifest import ManifestValidator
+
+ALL_GROUPS = list(ManifestValidator.RULE_GROUPS)
+
+
+def run(pack, **options) -> dict:
+    return ManifestValidator(pack, use_cache=True, **options).validate()
+
+
+def outcome(result: dict) -> tuple:
+    return result["errors"], result["warnings"], result["layers_validated"]
+
+
+def test_unchanged_pack_is_served_from_cache(make_pack, manifest):
+    pack = make_pack("pack", manifest(bbox=[1, 0, 0, 1]), ASSETS)
+    first = run(pack)
+    assert first["cached_groups"] == []
+    assert (pack / CACHE_DIR / VALIDATION_CACHE_FILE).is_file()
+
+    second = run(pack)
+    assert second["cached_groups"] == ALL_GROUPS
+    assert outcome(second) == outcome(first)
+
+
+def test_changed_layer_file_reruns_only_dependent_groups(make_pack, manifest):
+    pack = make_pack("pack", manifest(), ASSETS)
+    run(pack, verify_hashes=True)
+
+    (pack / "layers" / "roads.parquet").write_bytes(b"a different layer")
+    result = run(pack, verify_hashes=True)
+    assert result["cached_groups"] == ["manifest", "structure"]
+    assert [error["rule"] for error in result["errors"]] == ["INTEGRITY-002"]
+
+    # Without --verify-hashes the integrity group does not read the files
+    run(pack)
+    (pack / "layers" / "roads.parquet").write_bytes(b"yet another layer body")
+    assert run(pack)["cached_groups"] == ["manifest", "structure", "integrity"]
+
+
+def test_manifest_and_options_invalidate_every_group(make_pack, manifest):
+    pack = make_pack("pack", manifest(), ASSETS)
+    run(pack)
+    assert run(pack, max_errors=5)["cached_groups"] == []
+
+    (pack / "spatialpack.json").write_text(json.dumps(manifest(theme="rail")))
+    assert run(pack, max_errors=5)["cached_groups"] == []
+    assert run(pack, max_errors=5)["cached_groups"] == ALL_GROUPS
+
+
+def test_cache_is_opt_in_and_advisory(make_pack, manifest):
+    pack = make_pack("pack", manifest(), ASSETS)
+    ManifestValidator(pack).validate()
+    assert not (pack / CACHE_DIR).exists()
+
+    cache_file = pack / CACHE_DIR / VALIDATION_CACHE_FILE
+    cache_file.parent.mkdir(parents=True)
+    cache_file.write_text("[not a cache")
+    result = run(pack)
+    assert result["cached_groups"] == []
+    assert result["errors"] == []
+    assert run(pack)["cached_groups"] == ALL_GROUPS
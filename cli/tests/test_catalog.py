@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from spatialpack.catalog import build_catalog, search_catalog
+
+
+def manifest(pack_id: str, bbox, theme: str = "transport", schema: str = "roads-v1", **facets) -> dict:
+    return {
+        "pack_id": pack_id,
+        "version": "1.0.0",
+        "geography": "au",
+        "theme": theme,
+        "bbox": bbox,
+        "created_at": "2024-01-15T00:00:00Z",
+        "license": {"id": "CC-BY-4.0"},
+        "layers": [{"id": "main", "type": "vector", "schema": schema}],
+        **facets,
+    }
+
+
+@pytest.fixture
+def catalog(make_pack, tmp_path):
+    make_pack("packs/perth", manifest("wa:perth:roads:v1", [115.6, -32.5, 116.4, -31.6]))
+    make_pack("packs/sydney", manifest("nsw:sydney:roads:v1", [150.5, -34.2, 151.4, -33.5]))
+    make_pack(
+        "packs/nsw-water",
+        manifest("nsw:state:water:v1", [141.0, -37.5, 153.6, -28.2], theme="hydro", schema="water-v2", tenant="nsw"),
+    )
+    make_pack("packs/fiji", manifest("fj:fiji:roads:v1", [177.0, -19.2, 180.0, -16.0]))
+    make_pack("packs/no-bbox", manifest("xx:none:roads:v1", None))
+    path = tmp_path / "catalog.sqlite"
+    build_catalog(tmp_path / "packs", path)
+    return path
+
+
+def ids(results: list[dict]) -> list[str]:
+    return [result["pack_id"] for result in results]
+
+
+def test_bbox_search(catalog):
+    # Sydney region: the Sydney pack and the state-wide pack overlap it
+    assert ids(search_catalog(catalog, bbox=[150.0, -34.5, 151.0, -33.0])) == [
+        "nsw:state:water:v1",
+        "nsw:sydney:roads:v1",
+    ]
+    assert ids(search_catalog(catalog, bbox=[115.0, -33.0, 116.0, -32.0])) == ["wa:perth:roads:v1"]
+    assert search_catalog(catalog, bbox=[0.0, 0.0, 10.0, 10.0]) == []
+
+
+def test_bbox_search_touching_edges(catalog):
+    # Bboxes that only share an edge still intersect
+    assert ids(search_catalog(catalog, bbox=[116.4, -31.6, 117.0, -31.0])) == ["wa:perth:roads:v1"]
+    # The R*Tree rounds outwards; the exact bounds decide
+    assert search_catalog(catalog, bbox=[116.400001, -31.0, 117.0, -30.0]) == []
+
+
+def test_bbox_and_facets(catalog):
+    results = search_catalog(catalog, bbox=[150.0, -34.5, 151.0, -33.0], theme="transport")
+    assert ids(results) == ["nsw:sydney:roads:v1"]
+    assert results[0]["bbox"] == [150.5, -34.2, 151.4, -33.5]
+    assert results[0]["schemas"] == ["roads-v1"]
+    assert results[0]["path"].endswith("sydney")
+
+    assert ids(search_catalog(catalog, schemas=["water-v2"])) == ["nsw:state:water:v1"]
+    assert ids(search_catalog(catalog, tenant="nsw")) == ["nsw:state:water:v1"]
+    assert len(search_catalog(catalog, license_id="CC-BY-4.0")) == 5
+    assert len(search_catalog(catalog, limit=2)) == 2
+
+
+def test_rescan_is_incremental(catalog, tmp_path):
+    result = build_catalog(tmp_path / "packs", catalog)
+    assert (result["unchanged"], result["added"], result["updated"]) == (5, 0, 0)
+
+    manifest_path = tmp_path / "packs" / "perth" / "spatialpack.json"
+    moved = manifest("wa:perth:roads:v1", [0.0, 0.0, 1.0, 1.0], version="1.1.0")
+    manifest_path.write_text(json.dumps(moved))
+    (tmp_path / "packs" / "no-bbox" / "spatialpack.json").unlink()
+    result = build_catalog(tmp_path / "packs", catalog)
+    assert (result["updated"], result["removed"]) == (1, 1)
+    assert ids(search_catalog(catalog, bbox=[0.5, 0.5, 0.6, 0.6])) == ["wa:perth:roads:v1"]
+    assert search_catalog(catalog, bbox=[115.0, -33.0, 116.0, -32.0]) == []
@@ -0,0 +1,155 @@
+import struct
+from typing import Optional
+
+import pytest
+
+from spatialpack.validators.cog import TIFFError, inspect_cog, read_block_layout
+from spatialpack.validators.ranges import RangeSource
+
+TILE = 16
+TILE_BYTES = 32
+
+
+def build_tiff(
+    sizes: list[tuple[int, int]],
+    order: str = "<",
+    nodata: Optional[str] = None,
+    metadata: Optional[str] = None,
+    data_first: bool = False,
+) -> bytes:
+    """Classic TIFF with one tiled image per size (the first full resolution,
+    the rest overviews). IFDs come first and overview tiles precede the
+    full-resolution tiles, as in a COG; ``data_first`` puts tiles first."""
+    tile_counts = [-(-w // TILE) * -(-h // TILE) for w, h in sizes]
+
+    def ifd_tags(index: int, offsets: list[int]) -> list[tuple[int, int, list]]:
+        width, height = sizes[index]
+        tags = [
+            (254, 4, [1 if index else 0]), (256, 4, [width]), (257, 4, [height]),
+            (258, 3, [8]), (259, 3, [8]), (262, 3, [1]), (277, 3, [1]),
+            (322, 3, [TILE]), (323, 3, [TILE]),
+            (324, 4, offsets), (325, 4, [TILE_BYTES] * len(offsets)),
+        ]
+        if index == 0 and metadata is not None:
+            tags.append((42112, 2, list(metadata.encode() + b"\0")))
+        if index == 0 and nodata is not None:
+            tags.append((42113, 2, list(nodata.encode() + b"\0")))
+        return tags
+
+    def encode_ifd(start: int, tags: list, next_ifd: int) -> bytes:
+        external_start = start + 2 + 12 * len(tags) + 4
+        entries, external = b"", b""
+        for tag, field_type, values in tags:
+            code = {2: "B", 3: "H", 4: "I"}[field_type]
+            payload = struct.pack(order + code * len(values), *values)
+            if len(payload) <= 4:
+                value = payload.ljust(4, b"\0")
+            else:
+                value = struct.pack(order + "I", external_start + len(external))
+                external += payload + b"\0" * (len(payload) % 2)
+            entries += struct.pack(order + "HHI", tag, field_type, len(values)) + value
+        return struct.pack(order + "H", len(tags)) + entries + struct.pack(order + "I", next_ifd) + external
+
+    # Layout pass: IFD sizes do not depend on the offsets they hold
+    ifd_sizes = [len(encode_ifd(0, ifd_tags(i, [0] * n), 0)) for i, n in enumerate(tile_counts)]
+    ifd_bytes = sum(ifd_sizes)
+    data_bytes = sum(tile_counts) * TILE_BYTES
+    ifd_base = 8 + (data_bytes if data_first else 0)
+    data_base = 8 if data_first else 8 + ifd_bytes
+
+    # Tile data: smallest overview first, full resolution last
+    offsets: list[list[int]] = [[] for _ in sizes]
+    position = data_base
+    for index in reversed(range(len(sizes))):
+        offsets[index] = [position + k * TILE_BYTES for k in range(tile_counts[index])]
+        position += tile_counts[index] * TILE_BYTES
+
+    ifds, position = b"", ifd_base
+    for index, size in enumerate(ifd_sizes):
+        next_ifd = position + size if index + 1 < len(sizes) else 0
+        ifds += encode_ifd(position, ifd_tags(index, offsets[index]), next_ifd)
+        position += size
+
+    header = (b"II" if order == "<" else b"MM") + struct.pack(order + "HI", 42, ifd_base)
+    data = bytes(data_bytes)
+    return header + (data + ifds if data_first else ifds + data)
+
+
+@pytest.mark.parametrize("order", ["<", ">"])
+def test_inspect_cog(tmp_path, order):
+    path = tmp_path / "raster.tif"
+    path.write_bytes(build_tiff([(64, 48), (32, 24), (16, 12)], order=order, nodata="-9999"))
+    info = inspect_cog(path)
+    assert info["bigtiff"] is False
+    assert [(image["width"], image["height"]) for image in info["images"]] == [(64, 48), (32, 24), (16, 12)]
+    assert info["images"][0]["tiled"] and info["images"][0]["tile_size"] == [TILE, TILE]
+    assert info["images"][0]["compression"] == "deflate"
+    assert [image["overview"] for image in info["images"]] == [False, True, True]
+    assert info["overviews"] == 2
+    assert info["ifds_before_data"] is True
+    assert info["overviews_before_full_res"] is True
+    assert info["nodata"] == -9999.0
+
+
+def test_inspect_cog_statistics(tmp_path):
+    path = tmp_path / "raster.tif"
+    metadata = (
+        '<GDALMetadata><Item name="STATISTICS_MINIMUM" sample="0">1</Item>'
+        '<Item name="STATISTICS_MAXIMUM" sample="0">250</Item>'
+        '<Item name="STATISTICS_MEAN" sample="0">97.5</Item></GDALMetadata>'
+    )
+    path.write_bytes(build_tiff([(32, 32)], metadata=metadata))
+    assert inspect_cog(path)["statistics"] == {"min": 1.0, "max": 250.0, "mean": 97.5}
+
+
+def test_inspect_cog_data_before_ifds(tmp_path):
+    path = tmp_path / "data_first.tif"
+    path.write_bytes(build_tiff([(32, 32), (16, 16)], data_first=True))
+    info = inspect_cog(path)
+    assert info["ifds_before_data"] is False
+    assert info["overviews"] == 1
+
+
+def test_read_block_layout(tmp_path):
+    path = tmp_path / "raster.tif"
+    path.write_bytes(build_tiff([(40, 20), (20, 10)], nodata="nan"))
+    with RangeSource(path) as source:
+        layout = read_block_layout(source)
+        overview = read_block_layout(source, 1)
+        with pytest.raises(TIFFError, match="image 2 does not exist"):
+            read_block_layout(source, 2)
+    assert (layout["width"], layout["height"]) == (40, 20)
+    assert (layout["block_width"], layout["block_height"]) == (TILE, TILE)
+    assert len(layout["offsets"]) == 3 * 2
+    assert layout["byte_counts"] == (TILE_BYTES,) * 6
+    assert layout["images"] == 2
+    assert layout["byte_order"] == "<"
+    assert layout["nodata"] != layout["nodata"]  # nan
+    assert len(overview["offsets"]) == 2
+    assert overview["offsets"][-1] < layout["offsets"][0]
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        (b"II*\0", "too small"),
+        (b"XX" + bytes(30), "bad byte order mark"),
+        (b"II" + struct.pack("<HI", 41, 8) + bytes(30), "magic 41"),
+    ],
+)
+def test_inspect_cog_rejects(tmp_path, data, message):
+    path = tmp_path / "bad.tif"
+    path.write_bytes(data)
+    with pytest.raises(TIFFError, match=message):
+        inspect_cog(path)
+
+
+def test_inspect_cog_cyclic_ifd_chain(tmp_path):
+    data = bytearray(build_tiff([(32, 32)]))
+    # Point the only IFD's next pointer back at itself
+    (count,) = struct.unpack("<H", data[8:10])
+    data[10 + 12 * count:14 + 12 * count] = struct.pack("<I", 8)
+    path = tmp_path / "cyclic.tif"
+    path.write_bytes(bytes(data))
+    with pytest.raises(TIFFError, match="Cyclic"):
+        inspect_cog(path)
@@ -0,0 +1,231 @@
+import json
+import os
+import random
+import zlib
+from pathlib import Path
+
+import pytest
+
+from spatialpack import delta
+from spatialpack.delta import (
+    _FOOTER,
+    JOURNAL_PATH,
+    MAGIC,
+    OP_COPY,
+    STAGING_SUFFIX,
+    DeltaError,
+    apply_delta,
+    create_delta,
+    hash_delta,
+    read_delta_index,
+)
+
+PACK_ID = "test:au:roads:v1"
+
+
+def manifest(version: str) -> dict:
+    return {"pack_id": PACK_ID, "version": version}
+
+
+def tree(pack, caches: bool = False) -> dict[str, bytes]:
+    """Every file of a pack, optionally including the local caches."""
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(pack):
+        dirnames[:] = [name for name in dirnames if caches or name != ".spatialpack"]
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            files[os.path.relpath(path, pack)] = open(path, "rb").read()
+    return files
+
+
+@pytest.fixture
+def versions(make_pack):
+    """Two versions of a pack: an edited, a renamed, a deleted and a new file."""
+    rng = random.Random(7)
+    roads = rng.randbytes(2_000_000)
+    edited = bytearray(roads)
+    edited[1_000_000:1_000_100] = rng.randbytes(100)
+    rivers = rng.randbytes(50_000)
+    old = make_pack("1.0.0", manifest("1.0.0"), {
+        "layers/roads.parquet": roads,
+        "layers/rivers.parquet": rivers,
+        "layers/old.parquet": b"obsolete",
+    })
+    new = make_pack("1.1.0", manifest("1.1.0"), {
+        "layers/roads.parquet": bytes(edited),
+        "layers/waterways.parquet": rivers,
+        "layers/new.parquet": rng.randbytes(1_000),
+    })
+    return old, new
+
+
+def test_create_delta(versions, tmp_path):
+    old, new = versions
+    delta_path = tmp_path / "update.spdelta"
+    result = create_delta(old, new, delta_path, delta_uri="deltas/update.spdelta")
+    entry = result["entry"]
+    assert (entry["from_version"], entry["to_version"]) == ("1.0.0", "1.1.0")
+    assert entry["delta_uri"] == "deltas/update.spdelta"
+    assert entry["operations"] == ["add", "delete", "update"]
+    assert entry["sha256"] == hash_delta(delta_path)
+    # The rename and the unedited chunks are copied from the base; at most
+    # two MAX_CHUNK chunks around the edit and the new file travel
+    assert entry["size_bytes"] == delta_path.stat().st_size < 600_000
+
+    stats = result["stats"]
+    assert (stats["files_added"], stats["files_updated"], stats["files_deleted"]) == (2, 2, 2)
+    assert stats["copied_bytes"] > 1_500_000
+
+    index, _ = read_delta_index(delta_path)
+    files = {entry["path"]: entry for entry in index["files"]}
+    assert files["layers/waterways.parquet"]["ops"] == [[OP_COPY, "layers/rivers.parquet", 0, 50_000]]
+    assert sorted(index["base"]) == ["layers/rivers.parquet", "layers/roads.parquet"]
+
+
+def test_unchanged_files_are_kept(make_pack, tmp_path):
+    old = make_pack("1.0.0", manifest("1.0.0"), {"layers/roads.parquet": b"roads"})
+    new = make_pack("1.1.0", manifest("1.1.0"), {"layers/roads.parquet": b"roads"})
+    create_delta(old, new, tmp_path / "update.spdelta")
+    index, _ = read_delta_index(tmp_path / "update.spdelta")
+    assert index["keep"] == ["layers/roads.parquet"]
+    assert [entry["path"] for entry in index["files"]] == ["spatialpack.json"]
+
+
+def test_create_leaves_the_packs_untouched(versions, tmp_path):
+    old, new = versions
+    before = tree(old, caches=True), tree(new, caches=True)
+    create_delta(old, new, tmp_path / "update.spdelta")
+    assert (tree(old, caches=True), tree(new, caches=True)) == before
+    assert not (old / ".spatialpack").exists()
+
+
+def test_pack_id_must_match(make_pack, tmp_path):
+    old = make_pack("1.0.0", manifest("1.0.0"))
+    new = make_pack("other", {"pack_id": "test:au:rail:v1", "version": "1.1.0"})
+    with pytest.raises(DeltaError, match="pack_id differs"):
+        create_delta(old, new, tmp_path / "update.spdelta")
+    assert not (tmp_path / "update.spdelta").exists()
+
+
+def test_round_trip(versions, tmp_path):
+    old, new = versions
+    delta_path = tmp_path / "update.spdelta"
+    create_delta(old, new, delta_path)
+    applied = apply_delta(old, delta_path)
+    assert applied["mode"] == "delta"
+    assert applied["to_version"] == "1.1.0"
+    assert applied["files_deleted"] == 2
+    assert not applied["recovered"]
+    assert tree(old) == tree(new)
+    assert not (old / JOURNAL_PATH).exists()
+
+
+def test_refresh_when_over_budget(versions, tmp_path):
+    old, new = versions
+    delta_path = tmp_path / "update.spdelta"
+    create_delta(old, new, delta_path)
+    applied = apply_delta(old, delta_path, max_bytes=10, refresh_from=new)
+    assert applied["mode"] == "refresh"
+    assert applied["budget"] == 10
+    assert tree(old) == tree(new)
+    assert not (new / ".spatialpack").exists()
+
+
+def test_interrupted_commit_is_finished(versions, tmp_path, monkeypatch):
+    old, new = versions
+    delta_path = tmp_path / "update.spdelta"
+    create_delta(old, new, delta_path)
+
+    real_replace = os.replace
+    renames = []
+
+    def crash_after_first_file(src, dst):
+        if str(src).endswith(STAGING_SUFFIX) and not str(dst).endswith(".json"):
+            if renames:
+                raise KeyboardInterrupt
+            renames.append(dst)
+        real_replace(src, dst)
+
+    monkeypatch.setattr(delta.os, "replace", crash_after_first_file)
+    with pytest.raises(KeyboardInterrupt):
+        apply_delta(old, delta_path)
+    monkeypatch.setattr(delta.os, "replace", real_replace)
+    assert (old / JOURNAL_PATH).exists()
+
+    # The next run finishes the commit; the delta then no longer applies
+    with pytest.raises(DeltaError, match="pack is at '1.1.0'"):
+        apply_delta(old, delta_path)
+    assert tree(old) == tree(new)
+    assert not (old / JOURNAL_PATH).exists()
+
+
+def test_leftover_staging_files_are_removed(versions, tmp_path):
+    old, new = versions
+    delta_path = tmp_path / "update.spdelta"
+    create_delta(old, new, delta_path)
+    (old / "layers" / f"roads.parquet{STAGING_SUFFIX}").write_bytes(b"half written")
+    assert not apply_delta(old, delta_path)["recovered"]
+    assert tree(old) == tree(new)
+
+
+def test_wrong_base_version(versions, tmp_path):
+    old, new = versions
+    delta_path = tmp_path / "update.spdelta"
+    create_delta(old, new, delta_path)
+    with pytest.raises(DeltaError, match="pack is at '1.1.0'"):
+        apply_delta(new, delta_path)
+
+
+def test_budget_requires_refresh(versions, tmp_path):
+    old, new = versions
+    delta_path = tmp_path / "update.spdelta"
+    create_delta(old, new, delta_path)
+    with pytest.raises(DeltaError, match="full refresh is required"):
+        apply_delta(old, delta_path, max_bytes=10)
+
+
+def test_not_a_delta(tmp_path):
+    path = tmp_path / "bogus.spdelta"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(DeltaError, match="bad magic"):
+        read_delta_index(path)
+
+
+def rewrite_index(delta_path, mutate) -> None:
+    """Rewrite the index of a delta archive in place."""
+    index, end = read_delta_index(delta_path)
+    mutate(index)
+    blob = zlib.compress(json.dumps(index).encode())
+    data = delta_path.read_bytes()[:end]
+    delta_path.write_bytes(data + blob + _FOOTER.pack(end, len(blob), MAGIC))
+
+
+def escape_file(index: dict, outside: Path) -> None:
+    next(entry for entry in index["files"] if entry["op"] != "delete")["path"] = "../evil.txt"
+
+
+def escape_delete(index: dict, outside: Path) -> None:
+    index["files"].append({"path": "../1.1.0/spatialpack.json", "op": "delete"})
+
+
+def escape_copy(index: dict, outside: Path) -> None:
+    entry = next(entry for entry in index["files"] if entry["op"] != "delete")
+    entry["ops"].insert(0, [OP_COPY, "../1.1.0/spatialpack.json", 0, 1])
+
+
+def absolute_file(index: dict, outside: Path) -> None:
+    next(entry for entry in index["files"] if entry["op"] != "delete")["path"] = str(outside)
+
+
+@pytest.mark.parametrize("mutate", [escape_file, escape_delete, escape_copy, absolute_file])
+def test_rejects_paths_outside_the_pack(versions, tmp_path, mutate):
+    old, new = versions
+    delta_path = tmp_path / "evil.spdelta"
+    create_delta(old, new, delta_path)
+    rewrite_index(delta_path, lambda index: mutate(index, tmp_path / "evil.txt"))
+    before = tree(old)
+    with pytest.raises(DeltaError, match="outside the pack"):
+        apply_delta(old, delta_path)
+    assert tree(old) == before
+    assert not (tmp_path / "evil.txt").exists()
+    assert (new / "spatialpack.json").exists()
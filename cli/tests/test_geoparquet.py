@@ -0,0 +1,115 @@
+import json
+
+import pytest
+
+duckdb = pytest.importorskip("duckdb")
+
+from conftest import ASSETS  # noqa: E402
+from spatialpack.validators.geoparquet import crs_identifier, inspect_geoparquet  # noqa: E402
+from spatialpack.validators.manifest import ManifestValidator  # noqa: E402
+
+COVERING = {part: ["bbox", part] for part in ("xmin", "ymin", "xmax", "ymax")}
+
+GEO = {
+    "version": "1.1.0",
+    "primary_column": "geometry",
+    "columns": {"geometry": {"encoding": "WKB", "geometry_types": ["Point"], "covering": {"bbox": COVERING}}},
+}
+
+
+def write_parquet(path, geo, rows=10, x0=116.0):
+    """Points along y=-30 from x0 eastwards, with a GeoParquet 1.1 bbox covering column."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    kv = "" if geo is None else ", KV_METADATA {geo: '%s'}" % json.dumps(geo).replace("'", "''")
+    duckdb.connect().execute(
+        f"COPY (SELECT i AS id, '\\x01'::BLOB AS geometry, "
+        f"{{'xmin': {x0} + i, 'ymin': -30.0, 'xmax': {x0} + i, 'ymax': -30.0}} AS bbox "
+        f"FROM range({rows}) t(i)) TO '{path}' (FORMAT PARQUET{kv})"
+    )
+
+
+@pytest.fixture
+def deep_pack(make_pack, manifest):
+    def make(geo=GEO, stats=None, **parquet_options):
+        layer = {**manifest()["layers"][0], "stats": stats or {"features": 10}}
+        pack = make_pack("pack", manifest(layers=[layer], integrity={"asset_hashes": {}}), ASSETS)
+        write_parquet(pack / "layers" / "roads.parquet", geo, **parquet_options)
+        return ManifestValidator(pack, deep=True).validate()
+
+    return make
+
+
+def rules(result: dict) -> list[str]:
+    return sorted(issue["rule"] for issue in result["errors"] + result["warnings"] if issue["rule"] != "INTEGRITY-001")
+
+
+def test_inspect_reads_footer_only(tmp_path):
+    path = tmp_path / "roads.parquet"
+    write_parquet(path, GEO)
+    info = inspect_geoparquet(str(path))
+    assert info["num_rows"] == 10
+    assert info["columns"] == ["id", "geometry", "bbox"]
+    assert info["geo"] == GEO
+    assert info["row_group_bbox"] == [116.0, -30.0, 125.0, -30.0]
+    assert info["footer_bytes"] < info["file_bytes"]
+
+
+def test_valid_layer(deep_pack):
+    result = deep_pack()
+    assert rules(result) == []
+    assert result["asset_details"]["./layers/roads.parquet"]["rows"] == 10
+
+
+def test_missing_geo_metadata(deep_pack):
+    assert rules(deep_pack(geo=None)) == ["LAYER-003"]
+
+
+def test_crs_mismatch(deep_pack):
+    geo = json.loads(json.dumps(GEO))
+    geo["columns"]["geometry"]["crs"] = {"id": {"authority": "EPSG", "code": 3857}}
+    assert rules(deep_pack(geo=geo)) == ["LAYER-004"]
+
+
+def test_row_groups_outside_manifest_bbox(deep_pack):
+    assert rules(deep_pack(x0=170.0)) == ["LAYER-005"]
+
+
+def test_feature_count_mismatch(deep_pack):
+    assert rules(deep_pack(stats={"features": 11})) == ["LAYER-006"]
+
+
+def geo_with(primary="geometry", **column) -> dict:
+    """GeoParquet metadata DuckDB accepts, with odd values where it does not look."""
+    return {
+        "version": "1.1.0",
+        "primary_column": primary,
+        "columns": {"geometry": {"encoding": "WKB", "geometry_types": ["Point"], **column}},
+    }
+
+
+@pytest.mark.parametrize("primary", ["geom", ["geometry"], None])
+def test_primary_column_must_name_a_column(deep_pack, primary):
+    assert rules(deep_pack(geo=geo_with(primary))) == ["LAYER-003"]
+
+
+@pytest.mark.parametrize(
+    "column",
+    [
+        {"covering": []},
+        {"covering": {"bbox": []}},
+        {"covering": {"bbox": ["xmin"]}},
+        {"covering": {"bbox": {"xmin": 1}}},
+        {"crs": {"id": "EPSG:4326"}},
+    ],
+)
+def test_malformed_column_metadata_is_reported_not_raised(deep_pack, column):
+    # Without usable covering columns only the row-group extent check is skipped
+    result = deep_pack(geo=geo_with(**column))
+    assert set(rules(result)) <= {"LAYER-004"}
+
+
+def test_crs_identifier():
+    assert crs_identifier({"id": {"authority": "epsg", "code": 4326}}) == "EPSG:4326"
+    assert crs_identifier("ogc:crs84") == "OGC:CRS84"
+    assert crs_identifier({"id": "EPSG:4326"}) is None
+    assert crs_identifier(None) is None
@@ -0,0 +1,35 @@
+import pytest
+
+h3 = pytest.importorskip("h3")
+
+from spatialpack.h3index import _descendant_range  # noqa: E402
+
+
+def cell_at(lat: float, lng: float, res: int) -> int:
+    return h3.str_to_int(h3.latlng_to_cell(lat, lng, res))
+
+
+def children(cell: int, res: int) -> list[int]:
+    return [h3.str_to_int(child) for child in h3.cell_to_children(h3.int_to_str(cell), res)]
+
+
+@pytest.mark.parametrize("res, child_res", [(0, 2), (5, 8), (9, 9), (12, 15)])
+def test_descendant_range_is_tight(res, child_res):
+    cell = cell_at(-33.86, 151.21, res)
+    lo, hi = _descendant_range(cell, child_res)
+    descendants = children(cell, child_res)
+    assert (lo, hi) == (min(descendants), max(descendants))
+
+
+def test_descendant_range_of_a_pentagon_covers_its_children():
+    pentagon = h3.str_to_int(h3.get_pentagons(3)[0])
+    lo, hi = _descendant_range(pentagon, 6)
+    assert all(lo <= child <= hi for child in children(pentagon, 6))
+
+
+def test_descendant_range_excludes_other_cells():
+    cell = cell_at(-33.86, 151.21, 5)
+    lo, hi = _descendant_range(cell, 8)
+    neighbours = [h3.str_to_int(ring) for ring in h3.grid_ring(h3.int_to_str(cell), 1)]
+    for neighbour in neighbours:
+        assert not any(lo <= child <= hi for child in children(neighbour, 8))
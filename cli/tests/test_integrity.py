@@ -0,0 +1,103 @@
+import hashlib
+import json
+import mmap
+
+import pytest
+from click.testing import CliRunner
+
+from conftest import ASSETS
+from spatialpack import integrity
+from spatialpack.commands.validate import validate
+from spatialpack.integrity import HashCache, hash_file, parse_hash, verify_assets
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(integrity, "CHUNK_SIZE", 7)
+
+
+@pytest.mark.parametrize("data", [b"", b"abc", bytes(range(256)) * 5])
+def test_hash_file(tmp_path, small_chunks, data):
+    path = tmp_path / "asset.bin"
+    path.write_bytes(data)
+    assert hash_file(path) == sha256(data)
+
+
+def test_hash_file_without_mmap(tmp_path, small_chunks, monkeypatch):
+    def refuse(*args, **kwargs):
+        raise OSError("mmap unavailable")
+
+    monkeypatch.setattr(mmap, "mmap", refuse)
+    path = tmp_path / "asset.bin"
+    path.write_bytes(bytes(range(256)) * 5)
+    assert hash_file(path) == sha256(path.read_bytes())
+
+
+def test_parse_hash():
+    assert parse_hash("SHA256:ABC") == ("sha256", "abc")
+    assert parse_hash("abc") == ("sha256", "abc")
+    assert parse_hash("blake3:ff") == ("blake3", "ff")
+
+
+def test_verify_assets_statuses(tmp_path):
+    (tmp_path / "good.bin").write_bytes(b"good")
+    (tmp_path / "bad.bin").write_bytes(b"bad")
+    results = verify_assets(tmp_path, {
+        "./good.bin": f"sha256:{sha256(b'good')}",
+        "bad.bin": sha256(b"something else"),
+        "gone.bin": sha256(b"gone"),
+        "odd.bin": "md5:00",
+    })
+    assert {asset: result["status"] for asset, result in results.items()} == {
+        "./good.bin": "ok", "bad.bin": "mismatch", "gone.bin": "missing", "odd.bin": "unsupported",
+    }
+    assert results["bad.bin"]["actual"] == sha256(b"bad")
+
+
+def test_hash_cache_skips_unchanged_files(tmp_path, monkeypatch):
+    asset = tmp_path / "asset.bin"
+    asset.write_bytes(b"first")
+    hashes = {"asset.bin": sha256(b"first")}
+    verify_assets(tmp_path, hashes, HashCache.for_pack(tmp_path))
+
+    calls = []
+    real_hash_file = integrity.hash_file
+    monkeypatch.setattr(integrity, "hash_file", lambda *a: calls.append(a) or real_hash_file(*a))
+
+    # A fresh cache object reads the persisted digests
+    assert verify_assets(tmp_path, hashes, HashCache.for_pack(tmp_path))["asset.bin"]["status"] == "ok"
+    assert calls == []
+
+    asset.write_bytes(b"second, longer")
+    result = verify_assets(tmp_path, hashes, HashCache.for_pack(tmp_path))["asset.bin"]
+    assert result["status"] == "mismatch"
+    assert len(calls) == 1
+
+
+def test_unreadable_cache_is_empty(tmp_path):
+    cache_path = tmp_path / "hashes.json"
+    cache_path.write_text("{not json")
+    cache = HashCache(cache_path)
+    (tmp_path / "a.bin").write_bytes(b"a")
+    assert verify_assets(tmp_path, {"a.bin": sha256(b"a")}, cache)["a.bin"]["status"] == "ok"
+    assert json.loads(cache_path.read_text())
+
+
+def test_validate_verify_hashes(make_pack, manifest, tmp_path):
+    pack = make_pack("pack", manifest(), ASSETS)
+    report_path = tmp_path / "report.json"
+    args = [str(pack), "--verify-hashes", "-q", "-o", str(report_path)]
+    assert CliRunner().invoke(validate, args).exit_code == 0
+
+    (pack / "layers" / "roads.parquet").write_bytes(b"tampered")
+    assert CliRunner().invoke(validate, args).exit_code == 1
+    [error] = json.loads(report_path.read_text())["errors"]
+    assert error["rule"] == "INTEGRITY-002"
+    assert error["path"] == "integrity.asset_hashes.layers/roads.parquet"
+
+    # Hashes are only read with --verify-hashes
+    assert CliRunner().invoke(validate, args[:1] + ["-q"]).exit_code == 0
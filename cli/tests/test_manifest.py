@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from spatialpack.validators.manifest import ManifestValidator
+
+
+@pytest.fixture
+def validator(tmp_path):
+    return ManifestValidator(tmp_path / "_", use_cache=False)
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        {"bbox": 5},
+        {"bbox": [0, "a", 1, 2]},
+        {"layers": [1]},
+        {"layers": {"id": "roads"}},
+        {"layers": [{"id": "roads", "parquet": 7, "cog": ["./a.tif"], "stats": "many"}]},
+        {"pack_id": 3, "created_at": 4, "integrity": {"asset_hashes": ["x"]}},
+    ],
+)
+def test_wrong_json_types_are_reported_not_raised(validator, document):
+    result = validator.validate_document(json.dumps(document).encode())
+    assert any(error["rule"] == "MANIFEST-002" for error in result["errors"])
+
+
+@pytest.mark.parametrize("data", [b"[]", b"\xff\xfe", b"{"])
+def test_unreadable_documents(validator, data):
+    [error] = validator.validate_document(data)["errors"]
+    assert error["rule"] == "MANIFEST-001"
+
+
+def test_schema_errors_use_rule_paths(validator):
+    document = {"bbox": [0, 0, 1, 1], "layers": [{"id": "roads", "type": 7}]}
+    paths = {error["path"] for error in validator.validate_document(json.dumps(document).encode())["errors"]}
+    assert "layers[0].type" in paths
+    assert "(root)" in paths  # missing required properties
+    assert not any(path.startswith("/") for path in paths)
+
@@ -0,0 +1,132 @@
+import gzip
+import struct
+from typing import Optional
+
+import pytest
+
+from spatialpack.validators.pmtiles import (
+    HEADER_SIZE,
+    PMTilesError,
+    find_entry,
+    inspect_pmtiles,
+    parse_directory,
+    parse_header,
+    zxy_to_tile_id,
+)
+
+_HEADER = struct.Struct("<7sB11Q6B4iB2i")
+
+
+def varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte, value = value & 0x7F, value >> 7
+        if not value:
+            out.append(byte)
+            return bytes(out)
+        out.append(byte | 0x80)
+
+
+def encode_directory(entries: list[tuple[int, int, int, int]]) -> bytes:
+    """PMTiles v3 directory for ``(tile_id, offset, length, run_length)`` entries."""
+    data = varint(len(entries))
+    last_id = 0
+    for tile_id, *_ in entries:
+        data += varint(tile_id - last_id)
+        last_id = tile_id
+    data += b"".join(varint(entry[3]) for entry in entries)
+    data += b"".join(varint(entry[2]) for entry in entries)
+    for i, (_, offset, _, _) in enumerate(entries):
+        contiguous = i > 0 and offset == entries[i - 1][1] + entries[i - 1][2]
+        data += varint(0 if contiguous else offset + 1)
+    return data
+
+
+def build_pmtiles(tiles: list[bytes], root: Optional[bytes] = None, version: int = 3) -> bytes:
+    """A clustered, gzip-directory archive with one tile per tile id from 0."""
+    entries, offset = [], 0
+    for tile_id, tile in enumerate(tiles):
+        entries.append((tile_id, offset, len(tile), 1))
+        offset += len(tile)
+    if root is None:
+        root = gzip.compress(encode_directory(entries))
+    data = b"".join(tiles)
+    data_offset = HEADER_SIZE + len(root)
+    header = _HEADER.pack(
+        b"PMTiles", version,
+        HEADER_SIZE, len(root), data_offset, 0, data_offset, 0, data_offset, len(data),
+        len(tiles), len(tiles), len(tiles),
+        1, 2, 2, 1, 0, 14,
+        1_150_000_000, -350_000_000, 1_290_000_000, -200_000_000,
+        0, 0, 0,
+    )
+    return header + root + data
+
+
+def test_parse_header():
+    header = parse_header(build_pmtiles([b"a", b"bb"]))
+    assert header["version"] == 3
+    assert header["root_offset"] == HEADER_SIZE
+    assert header["tile_entries"] == 2
+    assert header["clustered"] is True
+    assert header["internal_compression"] == "gzip"
+    assert header["tile_type"] == "mvt"
+    assert (header["min_zoom"], header["max_zoom"]) == (0, 14)
+    assert header["bounds"] == [115.0, -35.0, 129.0, -20.0]
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        (b"PMTiles", "too small"),
+        (b"NotPMTs" + bytes(HEADER_SIZE), "magic"),
+        (build_pmtiles([b"a"], version=2), "version 2"),
+    ],
+)
+def test_parse_header_rejects(data, message):
+    with pytest.raises(PMTilesError, match=message):
+        parse_header(data)
+
+
+def test_parse_directory_round_trip():
+    entries = [(0, 0, 10, 1), (1, 10, 5, 1), (5, 100, 7, 3), (9, 0, 64, 0)]
+    assert parse_directory(encode_directory(entries)) == entries
+
+
+def test_parse_directory_truncated():
+    with pytest.raises(PMTilesError, match="Truncated varint"):
+        parse_directory(encode_directory([(0, 0, 10, 1), (1, 10, 5, 1)])[:-1])
+
+
+def test_zxy_to_tile_id():
+    assert zxy_to_tile_id(0, 0, 0) == 0
+    # Hilbert order within zoom 1
+    assert [zxy_to_tile_id(1, x, y) for x, y in ((0, 0), (0, 1), (1, 1), (1, 0))] == [1, 2, 3, 4]
+    assert zxy_to_tile_id(2, 0, 0) == 5
+    with pytest.raises(PMTilesError):
+        zxy_to_tile_id(1, 2, 0)
+
+
+def test_find_entry():
+    entries = [(0, 0, 10, 1), (5, 10, 5, 3), (20, 0, 64, 0)]
+    tile_ids = [entry[0] for entry in entries]
+    assert find_entry(tile_ids, entries, 0) == entries[0]
+    assert find_entry(tile_ids, entries, 7) == entries[1]  # inside the run
+    assert find_entry(tile_ids, entries, 8) is None  # past the run
+    assert find_entry(tile_ids, entries, 25) == entries[2]  # leaf pointer
+
+
+def test_inspect_pmtiles(tmp_path):
+    path = tmp_path / "tiles.pmtiles"
+    path.write_bytes(build_pmtiles([bytes(10 + i % 7) for i in range(100)]))
+    info = inspect_pmtiles(path)
+    assert info["header"]["addressed_tiles"] == 100
+    assert info["root_entries"] == 100
+    assert info["out_of_bounds"] == 0
+
+
+def test_inspect_pmtiles_corrupt_directory(tmp_path):
+    path = tmp_path / "corrupt.pmtiles"
+    path.write_bytes(build_pmtiles([b"a", b"b"], root=b"\x1f\x8b\x08\x00garbage"))
+    with pytest.raises(PMTilesError, match="Corrupt gzip directory"):
+        inspect_pmtiles(path)
@@ -0,0 +1,120 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+
+from spatialpack.policy import PolicyEngine, PolicyError
+
+MANIFEST = {
+    "pack_id": "acme:au:roads:v1",
+    "tenant": "acme",
+    "layers": [
+        {"id": "roads", "security": {"classification": "public"}},
+        {"id": "parcels", "security": {"classification": "internal"}},
+        {"id": "assets", "security": {"classification": "restricted", "visibility": ["partner:analyst"]}},
+        {"id": "admin_roads"},
+    ],
+}
+
+POLICY = {
+    "policy_id": "acme-default",
+    "access": {"default_visibility": "internal"},
+    "layer_policies": [{"layer_pattern": "admin_*", "visibility": "internal", "min_role": "admin"}],
+}
+
+
+@pytest.fixture
+def engine():
+    return PolicyEngine(POLICY, MANIFEST)
+
+
+@pytest.mark.parametrize(
+    "principal, layer_id, allowed",
+    [
+        (None, "roads", True),
+        ("anonymous", "parcels", False),
+        ("acme:viewer", "parcels", True),
+        ("other:admin", "parcels", False),
+        ("acme:admin", "assets", False),
+        ("partner:viewer", "assets", False),
+        ("partner:analyst", "assets", True),
+        ("partner:admin", "assets", True),
+        ("acme:analyst", "admin_roads", False),
+        ("acme:admin", "admin_roads", True),
+        ("acme:viewer", "missing", False),
+        ("acme:superuser", "roads", False),
+        ("not-a-principal", "roads", False),
+    ],
+)
+def test_allowed(engine, principal, layer_id, allowed):
+    assert engine.allowed(principal, layer_id) is allowed
+    assert engine.decide(principal, layer_id).allow is allowed
+
+
+def test_unseen_tenant_shares_the_other_tenant_row(engine):
+    assert engine.allowed_layers("newco:viewer") == frozenset({"roads"})
+    assert engine.allowed_layers("acme:admin") == frozenset({"roads", "parcels", "admin_roads"})
+
+
+def test_decision_names_the_rule(engine):
+    decision = engine.decide("acme:analyst", "admin_roads")
+    assert decision.reason == "requires role admin"
+    assert decision.rule == "layer_policies[0] (admin_*)"
+    assert engine.decide("partner:analyst", "assets").rule == "assets.security.visibility"
+
+
+def test_authentication_required():
+    policy = {**POLICY, "access": {"authentication_required": True}}
+    engine = PolicyEngine(policy, MANIFEST)
+    assert not engine.allowed(None, "roads")
+    assert engine.allowed("newco:viewer", "roads")
+
+
+def test_expired_policy_denies_everything():
+    engine = PolicyEngine({**POLICY, "expiry": "2024-06-30"}, MANIFEST, today=date(2024, 7, 1))
+    assert engine.expired
+    assert not engine.allowed(None, "roads")
+    assert engine.allowed_layers("acme:admin") == frozenset()
+    assert engine.decide("acme:admin", "parcels").reason == "policy expired"
+
+
+def test_expiry_is_checked_at_decision_time(monkeypatch):
+    class Today(date):
+        current = date(2024, 6, 30)
+        calls = 0
+
+        @classmethod
+        def today(cls):
+            cls.calls += 1
+            return cls.current
+
+    clock = SimpleNamespace(now=datetime(2024, 6, 30, 12).timestamp())
+    monkeypatch.setattr("spatialpack.policy.date", Today)
+    monkeypatch.setattr("spatialpack.policy.time", SimpleNamespace(time=lambda: clock.now))
+    engine = PolicyEngine({**POLICY, "expiry": "2024-06-30"}, MANIFEST)
+    assert engine.allowed("acme:viewer", "parcels")
+    assert engine.allowed_layers("acme:viewer")
+    assert engine.decide("acme:viewer", "parcels").allow
+    assert Today.calls == 1  # the date is read once per day, not per decision
+
+    # A long-lived engine starts denying once the expiry date has passed
+    Today.current = date(2024, 7, 1)
+    clock.now = datetime(2024, 7, 1, 0, 0, 1).timestamp()
+    assert engine.expired
+    assert not engine.allowed("acme:viewer", "parcels")
+    assert engine.decide("acme:viewer", "parcels").rule == "expiry"
+    assert Today.calls == 2
+
+
+@pytest.mark.parametrize(
+    "policy, message",
+    [
+        ({"access": {"default_visibility": "secret"}}, "default_visibility"),
+        ({"expiry": "someday"}, "Invalid policy expiry"),
+        ({"layer_policies": [{"visibility": "public"}]}, "layer_pattern"),
+        ({"layer_policies": [{"layer_pattern": "*", "min_role": "owner"}]}, "unknown min_role"),
+    ],
+)
+def test_malformed_policy(policy, message):
+    with pytest.raises(PolicyError, match=message):
+        PolicyEngine(policy, MANIFEST)
@@ -0,0 +1,108 @@
+import importlib
+import json
+
+import pytest
+
+duckdb = pytest.importorskip("duckdb")
+
+from spatialpack.query import PackQuery, QueryError  # noqa: E402
+
+ROWS = 8192
+GROUP_ROWS = 2048
+
+GEO = {
+    "version": "1.1.0",
+    "primary_column": "geometry",
+    "columns": {
+        "geometry": {
+            "encoding": "WKB",
+            "geometry_types": ["Point"],
+            "covering": {"bbox": {part: ["bbox", part] for part in ("xmin", "ymin", "xmax", "ymax")}},
+        },
+    },
+}
+
+
+@pytest.fixture
+def pack(make_pack, manifest):
+    """One layer of points along y=-30, x rising with the row number, in four row groups."""
+    layer = {"id": "roads", "type": "vector", "title": "Roads", "parquet": "./layers/roads.parquet"}
+    pack = make_pack("pack", manifest(layers=[layer]))
+    (pack / "layers").mkdir()
+    x = f"115.0 + i * {10.0 / ROWS}"
+    duckdb.connect().execute(
+        f"COPY (SELECT i AS id, '\\x01'::BLOB AS geometry, "
+        f"{{'xmin': {x}, 'ymin': -30.0, 'xmax': {x}, 'ymax': -30.0}} AS bbox "
+        f"FROM range({ROWS}) t(i) ORDER BY i) TO '{pack / 'layers' / 'roads.parquet'}' "
+        f"(FORMAT PARQUET, ROW_GROUP_SIZE {GROUP_ROWS}, KV_METADATA {{geo: '{json.dumps(GEO)}'}})"
+    )
+    return pack
+
+
+@pytest.fixture
+def query(pack):
+    with PackQuery(pack, json.loads((pack / "spatialpack.json").read_text())) as session:
+        yield session
+
+
+def count(query, bbox=None):
+    _, rows, stats = query.execute("SELECT count(*) FROM roads", bbox=bbox)
+    return rows[0][0], stats
+
+
+def test_unscoped_query_reads_everything(query):
+    rows, stats = count(query)
+    assert rows == ROWS
+    layer = stats["layers"]["roads"]
+    assert layer["row_groups"] == layer["row_groups_read"] == ROWS // GROUP_ROWS
+    assert stats["bytes_skipped"] == 0
+
+
+def test_bbox_prunes_row_groups(query):
+    # Rows 0-1023 only: half of the first row group
+    bbox = [114.0, -31.0, 115.0 + 1023.5 * 10.0 / ROWS, -29.0]
+    rows, stats = count(query, bbox)
+    assert rows == 1024
+
+    layer = stats["layers"]["roads"]
+    assert layer["pruned_by"] == ["stats"]
+    assert layer["row_groups_read"] == 1
+    groups = query.layers["roads"]["row_groups"]
+    assert layer["bytes_scanned"] == groups[0]["bytes"]
+    assert layer["bytes_skipped"] == sum(group["bytes"] for group in groups[1:])
+    assert stats["bytes_skipped"] == layer["bytes_skipped"] == layer["bytes"] - layer["bytes_scanned"]
+
+
+def test_results_match_an_unpruned_scan(query, pack):
+    bbox = [117.0, -31.0, 121.0, -29.0]
+    _, rows, _ = query.execute("SELECT id FROM roads ORDER BY id", bbox=bbox)
+    expected = duckdb.connect().execute(
+        "SELECT id FROM read_parquet(?) WHERE bbox.xmax >= 117.0 AND bbox.xmin <= 121.0 ORDER BY id",
+        [str(pack / "layers" / "roads.parquet")],
+    ).fetchall()
+    assert rows == expected
+
+
+def test_bbox_outside_the_layer(query):
+    rows, stats = count(query, [0.0, 0.0, 1.0, 1.0])
+    assert rows == 0
+    assert stats["layers"]["roads"]["bytes_scanned"] == 0
+
+
+def test_scope_changes_are_applied(query):
+    assert count(query, [114.0, -31.0, 116.0, -29.0])[0] < ROWS
+    assert count(query)[0] == ROWS
+
+
+def test_pack_without_parquet_layers(make_pack, manifest):
+    pack = make_pack("empty", manifest(layers=[{"id": "a", "type": "raster", "title": "A"}]))
+    with pytest.raises(QueryError, match="no local GeoParquet layers"):
+        PackQuery(pack, manifest(layers=[{"id": "a", "type": "raster", "title": "A"}]))
+
+
+def test_cli_output_formats_match():
+    from spatialpack.query import OUTPUT_FORMATS
+
+    # The command module, not the click command spatialpack.commands.query names
+    command_module = importlib.import_module("spatialpack.commands.query")
+    assert command_module.OUTPUT_FORMATS == OUTPUT_FORMATS
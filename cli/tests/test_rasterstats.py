@@ -0,0 +1,314 @@
+import json
+import lzma
+import math
+import random
+import struct
+import sys
+import zlib
+from array import array
+from typing import Optional
+
+import pytest
+from click.testing import CliRunner
+
+from spatialpack.commands.stats import stats
+from spatialpack.rasterstats import RasterStatsError, compute_raster_stats, raster_stats_entry
+
+# Padding for the parts of edge tiles outside the image, outside every data range
+FILL = {"B": 255, "H": 65535, "h": 32767, "i": 2**31 - 1, "f": 3e38, "d": 1e300}
+SAMPLE_FORMATS = {"B": (1, 8), "H": (1, 16), "h": (2, 16), "i": (2, 32), "f": (3, 32), "d": (3, 64)}
+NATIVE = "<" if sys.byteorder == "little" else ">"
+
+
+def lzw_encode(data: bytes) -> bytes:
+    """TIFF LZW (MSB-first codes, early change), without table resets."""
+    table = {bytes((i,)): i for i in range(256)}
+    size, bits = 258, 9
+    codes = [(256, bits)]
+    prefix = b""
+    for byte in data:
+        candidate = prefix + bytes((byte,))
+        if candidate in table:
+            prefix = candidate
+            continue
+        codes.append((table[prefix], bits))
+        table[candidate] = size
+        size += 1
+        if size >= 1 << bits:
+            bits += 1
+        prefix = bytes((byte,))
+    if prefix:
+        codes.append((table[prefix], bits))
+    codes.append((257, bits))
+    assert size < 4094, "no table resets; keep blocks small"
+    stream, length = 0, 0
+    for code, width in codes:
+        stream, length = (stream << width) | code, length + width
+    pad = -length % 8
+    return (stream << pad).to_bytes((length + pad) // 8, "big")
+
+
+def encode_block(values: list, typecode: str, row_values: int, samples: int, predictor: int, order: str) -> bytes:
+    if predictor == 3:
+        # Byte planes, most significant first, then byte differences along the row
+        itemsize = array(typecode).itemsize
+        out = bytearray()
+        for start in range(0, len(values), row_values):
+            raw = struct.pack(f">{row_values}{typecode}", *values[start:start + row_values])
+            row = bytearray(b"".join(raw[plane::itemsize] for plane in range(itemsize)))
+            for i in range(len(row) - 1, samples - 1, -1):
+                row[i] = (row[i] - row[i - samples]) & 255
+            out += row
+        return bytes(out)
+    block = array(typecode, values)
+    if predictor == 2:
+        unsigned = array(typecode.upper())
+        unsigned.frombytes(block.tobytes())
+        mask = (1 << (8 * unsigned.itemsize)) - 1
+        for start in range(0, len(unsigned), row_values):
+            for i in range(start + row_values - 1, start + samples - 1, -1):
+                unsigned[i] = (unsigned[i] - unsigned[i - samples]) & mask
+        block = array(typecode)
+        block.frombytes(unsigned.tobytes())
+    if order != NATIVE and block.itemsize > 1:
+        block.byteswap()
+    return block.tobytes()
+
+
+COMPRESS = {1: bytes, 5: lzw_encode, 8: zlib.compress, 34925: lzma.compress}
+
+
+def build_geotiff(
+    bands: list[list[list]],
+    typecode: str,
+    block: int = 16,
+    tiled: bool = True,
+    compression: int = 1,
+    predictor: int = 1,
+    nodata: Optional[str] = None,
+    order: str = "<",
+) -> bytes:
+    """Single-image GeoTIFF whose blocks hold ``bands`` (pixel-interleaved).
+
+    Tiles are ``block`` pixels square; strips are ``block`` rows high.
+    """
+    height, width, samples = len(bands[0]), len(bands[0][0]), len(bands)
+    block_width = block if tiled else width
+    blocks = []
+    for top in range(0, height, block):
+        rows = block if tiled else min(block, height - top)
+        for left in range(0, width, block_width):
+            values = [
+                band[y][x] if y < height and x < width else FILL[typecode]
+                for y in range(top, top + rows)
+                for x in range(left, left + block_width)
+                for band in bands
+            ]
+            raw = encode_block(values, typecode, block_width * samples, samples, predictor, order)
+            blocks.append(COMPRESS[compression](raw))
+
+    sample_format, bits = SAMPLE_FORMATS[typecode]
+    tags = [
+        (256, 4, [width]), (257, 4, [height]), (258, 3, [bits] * samples), (259, 3, [compression]),
+        (262, 3, [1]), (277, 3, [samples]), (284, 3, [1]), (317, 3, [predictor]),
+        (339, 3, [sample_format] * samples),
+    ]
+    if tiled:
+        tags += [(322, 3, [block]), (323, 3, [block])]
+        offsets_tag, counts_tag = 324, 325
+    else:
+        tags += [(278, 4, [block])]
+        offsets_tag, counts_tag = 273, 279
+    if nodata is not None:
+        tags.append((42113, 2, list(nodata.encode() + b"\0")))
+    tags += [(offsets_tag, 4, [0] * len(blocks)), (counts_tag, 4, [len(data) for data in blocks])]
+
+    def encode_ifd(tags: list) -> bytes:
+        external_start = 8 + 2 + 12 * len(tags) + 4
+        entries, external = b"", b""
+        for tag, field_type, values in sorted(tags):
+            payload = struct.pack(order + {2: "B", 3: "H", 4: "I"}[field_type] * len(values), *values)
+            if len(payload) <= 4:
+                value = payload.ljust(4, b"\0")
+            else:
+                value = struct.pack(order + "I", external_start + len(external))
+                external += payload + b"\0" * (len(payload) % 2)
+            entries += struct.pack(order + "HHI", tag, field_type, len(values)) + value
+        return struct.pack(order + "H", len(tags)) + entries + struct.pack(order + "I", 0) + external
+
+    # Offsets do not change the IFD's size, so lay it out once to place the data
+    data_start = 8 + len(encode_ifd(tags))
+    offsets = [data_start + sum(len(data) for data in blocks[:i]) for i in range(len(blocks))]
+    tags[-2] = (offsets_tag, 4, offsets)
+    header = (b"II" if order == "<" else b"MM") + struct.pack(order + "HI", 42, 8)
+    return header + encode_ifd(tags) + b"".join(blocks)
+
+
+def f32(value: float) -> float:
+    return struct.unpack("f", struct.pack("f", value))[0]
+
+
+def make_grid(typecode: str, width: int, height: int, low, high, seed: int, nodata=None, nans: int = 0) -> list:
+    rng = random.Random(seed)
+    if typecode in "fd":
+        convert = f32 if typecode == "f" else float
+        grid = [[convert(rng.uniform(low, high)) for _ in range(width)] for _ in range(height)]
+    else:
+        grid = [[rng.randint(low, high) for _ in range(width)] for _ in range(height)]
+    cells = rng.sample(range(width * height), 20 + nans)
+    for i, cell in enumerate(cells):
+        y, x = divmod(cell, width)
+        if i < nans:
+            grid[y][x] = math.nan
+        elif nodata is not None and i % 2:
+            grid[y][x] = nodata
+    return grid
+
+
+def brute_force(grid: list, nodata, bins: Optional[int], percentiles) -> dict:
+    """Statistics straight from the pixel grid, one value at a time."""
+    values = sorted(v for row in grid for v in row if v == v and v != nodata)
+    low, high = values[0], values[-1]
+    expected = {
+        "min": low,
+        "max": high,
+        "mean": math.fsum(values) / len(values),
+        "valid_pixels": len(values),
+        "pixels": len(grid) * len(grid[0]),
+        "histogram": None,
+        "percentiles": {},
+    }
+    if bins:
+        step = (high - low) / bins
+        edges = [low + i * step for i in range(bins)] + [math.inf]
+        expected["histogram"] = [sum(edges[i] <= v < edges[i + 1] for v in values) for i in range(bins)]
+    for p in percentiles:
+        rank = p / 100 * (len(values) - 1)
+        below = math.floor(rank)
+        value = values[below]
+        if rank > below:
+            value += (rank - below) * (values[below + 1] - value)
+        expected["percentiles"][f"p{p:g}"] = value
+    return expected
+
+
+PERCENTILES = (0, 2, 50, 97.5, 100)
+
+CASES = {
+    "uint16-tiled-lzw-predictor": dict(
+        typecode="H", grid=dict(low=1, high=60_000, nodata=0), nodata="0", compression=5, predictor=2,
+    ),
+    "int16-strips-lzma-predictor-bigendian": dict(
+        typecode="h", grid=dict(low=-3000, high=3000, nodata=-9999), nodata="-9999", compression=34925,
+        predictor=2, tiled=False, block=5, order=">",
+    ),
+    "uint8-deflate-no-nodata": dict(typecode="B", grid=dict(low=3, high=200), compression=8),
+    "int32-deflate": dict(
+        typecode="i", grid=dict(low=-(10**9), high=10**9, nodata=-1), nodata="-1", compression=8,
+    ),
+    "float32-float-predictor-nans": dict(
+        typecode="f", grid=dict(low=-120.5, high=4380.25, nodata=-9999.0, nans=5), nodata="-9999",
+        compression=8, predictor=3, order=">",
+    ),
+    "float64-strips-uncompressed": dict(
+        typecode="d", grid=dict(low=-1e6, high=1e6, nans=3), tiled=False, block=7,
+    ),
+}
+
+
+@pytest.fixture(params=list(CASES))
+def raster(request, tmp_path):
+    """``(path, grid, nodata, exact)`` for one synthetic 37x29 raster."""
+    case = dict(CASES[request.param])
+    typecode, grid_options = case.pop("typecode"), case.pop("grid")
+    grid = make_grid(typecode, 37, 29, seed=len(request.param), **grid_options)
+    path = tmp_path / "raster.tif"
+    path.write_bytes(build_geotiff([grid], typecode, **case))
+    exact = typecode in "BHh"
+    return path, grid, grid_options.get("nodata"), exact
+
+
+def test_matches_brute_force(raster):
+    path, grid, nodata, exact = raster
+    result = compute_raster_stats(path, histogram_bins=7, percentiles=PERCENTILES)
+    expected = brute_force(grid, nodata, 7, PERCENTILES)
+
+    assert (result["pixels"], result["valid_pixels"]) == (expected["pixels"], expected["valid_pixels"])
+    if result["dtype"] == "float32":
+        assert (f32(result["min"]), f32(result["max"])) == (expected["min"], expected["max"])
+    else:
+        assert (result["min"], result["max"]) == (expected["min"], expected["max"])
+    assert result["mean"] == pytest.approx(expected["mean"], rel=1e-12)
+    assert result["histogram"]["counts"] == expected["histogram"]
+    if exact:
+        assert result["percentile_error"] == 0.0
+        assert result["percentiles"] == pytest.approx(expected["percentiles"], rel=1e-12)
+    else:
+        error = result["percentile_error"]
+        assert error == (expected["max"] - expected["min"]) / 4096
+        for key, value in expected["percentiles"].items():
+            assert abs(result["percentiles"][key] - value) <= error * (1 + 1e-9), key
+
+
+def test_process_pool_matches_a_single_process(raster):
+    path = raster[0]
+    options = dict(histogram_bins=5, percentiles=(10, 90))
+    single = compute_raster_stats(path, **options)
+    pooled = compute_raster_stats(path, jobs=2, blocks_per_task=1, **options)
+    assert pooled["workers"] == 2
+    assert pooled["mean"] == pytest.approx(single["mean"], rel=1e-12)
+    for key in ("min", "max", "valid_pixels", "histogram", "percentiles", "bytes_read"):
+        assert pooled[key] == single[key], key
+
+
+def test_band_selection(tmp_path):
+    first = make_grid("B", 20, 18, 0, 100, seed=1)
+    second = make_grid("B", 20, 18, 101, 250, seed=2)
+    path = tmp_path / "bands.tif"
+    path.write_bytes(build_geotiff([first, second], "B", compression=8, predictor=2))
+    for band, grid in ((1, first), (2, second)):
+        result = compute_raster_stats(path, band=band)
+        expected = brute_force(grid, None, None, ())
+        assert (result["min"], result["max"], result["mean"]) == (expected["min"], expected["max"], expected["mean"])
+    with pytest.raises(RasterStatsError, match="Band 3 does not exist"):
+        compute_raster_stats(path, band=3)
+
+
+def test_nodata_override_and_all_nodata(tmp_path):
+    grid = [[7] * 10 for _ in range(10)]
+    grid[3][4] = 9
+    path = tmp_path / "flat.tif"
+    path.write_bytes(build_geotiff([grid], "H"))
+    assert compute_raster_stats(path)["valid_pixels"] == 100
+    result = compute_raster_stats(path, nodata=7)
+    assert (result["valid_pixels"], result["min"], result["max"]) == (1, 9, 9)
+
+    path.write_bytes(build_geotiff([[[7] * 10 for _ in range(10)]], "H", nodata="7"))
+    result = compute_raster_stats(path, histogram_bins=4, percentiles=(50,))
+    assert (result["valid_pixels"], result["min"], result["mean"], result["histogram"]) == (0, None, None, None)
+
+
+def test_stats_command_writes_raster_stats(make_pack, manifest, tmp_path):
+    grid = make_grid("h", 37, 29, -400, 2200, seed=3, nodata=-9999)
+    layer = {"id": "dem", "type": "raster", "title": "DEM", "cog": "./rasters/dem.tif",
+             "raster_stats": {"min": 0, "max": 0, "mean": 0, "units": "m"}}
+    pack = make_pack("pack", manifest(layers=[layer]))
+    (pack / "rasters").mkdir()
+    (pack / "rasters" / "dem.tif").write_bytes(build_geotiff([grid], "h", compression=8, nodata="-9999"))
+
+    result = CliRunner().invoke(stats, [str(pack), "--percentiles", "50", "-q"])
+    assert result.exit_code == 0, result.output
+    written = json.loads((pack / "spatialpack.json").read_text())["layers"][0]["raster_stats"]
+    expected = brute_force(grid, -9999, None, (50,))
+    assert written.pop("mean") == pytest.approx(expected["mean"], rel=1e-12)
+    assert written == {
+        "min": expected["min"], "max": expected["max"], "units": "m", "nodata": -9999,
+        "percentiles": expected["percentiles"],
+    }
+
+
+def test_raster_stats_entry_keeps_other_keys():
+    result = {"min": 1, "max": 5, "mean": 2.5, "nodata": -9999.0, "histogram": None, "percentiles": {}}
+    assert raster_stats_entry(result, {"units": "m", "min": 0}) == {
+        "units": "m", "min": 1, "max": 5, "mean": 2.5, "nodata": -9999,
+    }
@@ -0,0 +1,122 @@
+import pytest
+
+from spatialpack.ratelimit import SECONDS_PER_DAY, RateLimiter, RateLimitError, RateLimits
+
+PACK = "acme:au:roads:v1"
+
+# Noon UTC on some day, so a few minutes either way stay on that day
+NOON = 20_000 * SECONDS_PER_DAY + SECONDS_PER_DAY / 2
+
+
+class Clock:
+    def __init__(self, now: float = NOON):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_refills():
+    clock = Clock()
+    limiter = RateLimiter(clock=clock)
+    limiter.set_limits(PACK, RateLimits(requests_per_minute=60))
+
+    # A full minute's allowance can be spent at once
+    assert all(limiter.acquire("acme", PACK) == 0 for _ in range(60))
+    wait = limiter.acquire("acme", PACK)
+    assert wait == pytest.approx(1.0)
+
+    # One token per second comes back, up to the burst
+    clock.now += 1
+    assert limiter.acquire("acme", PACK) == 0
+    assert limiter.acquire("acme", PACK) > 0
+    clock.now += 3600
+    assert sum(limiter.acquire("acme", PACK) == 0 for _ in range(100)) == 60
+
+
+def test_tenants_have_separate_buckets():
+    limiter = RateLimiter(clock=Clock())
+    limiter.set_limits(PACK, RateLimits(requests_per_minute=1))
+    assert limiter.acquire("acme", PACK) == 0
+    assert limiter.acquire("acme", PACK) > 0
+    assert limiter.acquire("other", PACK) == 0
+    # Packs without limits are only metered
+    assert all(limiter.acquire("acme", "unlimited:pack") == 0 for _ in range(100))
+
+
+def test_daily_quota():
+    clock = Clock()
+    limiter = RateLimiter(clock=clock)
+    limiter.set_limits(PACK, RateLimits(bytes_per_day=1_000))
+    assert limiter.acquire("acme", PACK, 600) == 0
+    # A request that would overrun the quota is refused; a smaller one still fits
+    wait = limiter.acquire("acme", PACK, 600)
+    assert wait == pytest.approx(SECONDS_PER_DAY / 2)
+    assert limiter.acquire("acme", PACK, 400) == 0
+    assert limiter.acquire("acme", PACK, 1) == wait
+
+    # The quota resets at midnight UTC
+    clock.now += wait
+    assert limiter.acquire("acme", PACK, 600) == 0
+
+
+def test_record_counts_against_the_quota():
+    limiter = RateLimiter(clock=Clock())
+    limiter.set_limits(PACK, RateLimits(bytes_per_day=1_000))
+    assert limiter.acquire("acme", PACK) == 0
+    limiter.record("acme", PACK, 5_000)
+    assert limiter.acquire("acme", PACK) > 0
+
+
+def test_ledger_restores_daily_bytes_after_restart(tmp_path):
+    ledger = tmp_path / "usage.sqlite"
+    clock = Clock()
+    limits = RateLimits(bytes_per_day=1_000)
+
+    limiter = RateLimiter(ledger, clock=clock)
+    limiter.set_limits(PACK, limits)
+    assert limiter.acquire("acme", PACK, 900) == 0
+    assert limiter.acquire("acme", PACK, 100) == 0
+    assert limiter.acquire("acme", PACK, 1) > 0
+    limiter.close()
+
+    restarted = RateLimiter(ledger, clock=clock)
+    restarted.set_limits(PACK, limits)
+    assert restarted.acquire("acme", PACK, 1) > 0
+    assert restarted.acquire("other", PACK, 1) == 0
+    [acme, other] = restarted.usage()
+    assert (acme["tenant"], acme["requests"], acme["bytes"], acme["rejected"]) == ("acme", 2, 1_000, 2)
+    assert (other["tenant"], other["requests"], other["bytes"]) == ("other", 1, 1)
+    restarted.close()
+
+    # Yesterday's bytes do not count against a new day
+    clock.now += SECONDS_PER_DAY
+    next_day = RateLimiter(ledger, clock=clock)
+    next_day.set_limits(PACK, limits)
+    assert next_day.acquire("acme", PACK, 1) == 0
+    next_day.close()
+
+
+def test_flush_batches_counts(tmp_path):
+    limiter = RateLimiter(tmp_path / "usage.sqlite", clock=Clock())
+    for _ in range(10):
+        limiter.acquire("acme", PACK, 10)
+    assert limiter.flush() == 1
+    assert limiter.flush() == 0
+    assert limiter.usage()[0]["requests"] == 10
+    limiter.close()
+
+
+@pytest.mark.parametrize(
+    "rate_limits",
+    [{"requests_per_minute": 0}, {"bandwidth_mb_per_day": "lots"}, {"requests_per_minute": True}],
+)
+def test_invalid_limits(rate_limits):
+    with pytest.raises(RateLimitError):
+        RateLimits.from_policy({"access": {"rate_limits": rate_limits}})
+
+
+def test_limits_from_policy():
+    limits = RateLimits.from_policy({"access": {"rate_limits": {"requests_per_minute": 120, "bandwidth_mb_per_day": 1.5}}})
+    assert limits == RateLimits(120.0, 1_500_000)
+    assert RateLimits.from_policy({}) == RateLimits()
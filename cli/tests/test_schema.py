@@ -0,0 +1,55 @@
+import json
+
+from spatialpack.validators.manifest import ManifestValidator, _compile_schema
+
+# Four independent schema violations
+BROKEN = {
+    "pack_id": 3,
+    "created_at": "yesterday",
+    "bbox": [0, 0, 1, 1],
+    "layers": [{"id": "roads", "type": "mesh", "title": "Roads"}, {"id": "rivers"}],
+}
+
+
+def schema_errors(result: dict) -> list[dict]:
+    return [error for error in result["errors"] if error["rule"] == "MANIFEST-002"]
+
+
+def test_all_schema_errors_are_reported(tmp_path):
+    validator = ManifestValidator(tmp_path / "_", use_cache=False)
+    errors = schema_errors(validator.validate_document(json.dumps(BROKEN).encode()))
+    assert len(errors) >= 4
+    paths = {error["path"] for error in errors}
+    assert {"pack_id", "layers[0].type", "layers[1]"} <= paths
+
+
+def test_max_errors_caps_the_report(tmp_path):
+    validator = ManifestValidator(tmp_path / "_", max_errors=2, use_cache=False)
+    result = validator.validate_document(json.dumps(BROKEN).encode())
+    assert len(schema_errors(result)) == 2
+    assert any("error limit reached" in warning["message"] for warning in result["warnings"])
+
+
+def test_schema_digest_covers_referenced_schemas(tmp_path):
+    manifest_schema = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "$id": "https://example.test/spatialpack.schema.json",
+        "type": "object",
+        "properties": {"layers": {"type": "array", "items": {"$ref": "layer.schema.json"}}},
+    }
+    layer_schema = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "$id": "https://example.test/layer.schema.json",
+        "type": "object",
+    }
+    schema_path = tmp_path / "spatialpack.schema.json"
+    layer_path = tmp_path / "layer.schema.json"
+    schema_path.write_text(json.dumps(manifest_schema))
+    layer_path.write_text(json.dumps(layer_schema))
+    _, validator, _, before = _compile_schema(schema_path)
+    assert validator.is_valid({"layers": [{}]})
+
+    layer_path.write_text(json.dumps({**layer_schema, "required": ["id"]}))
+    _, validator, _, after = _compile_schema(schema_path)
+    assert after != before
+    assert not validator.is_valid({"layers": [{}]})
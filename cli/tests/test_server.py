@@ -0,0 +1,139 @@
+import asyncio
+import json
+
+import pytest
+
+from conftest import ASSETS
+from spatialpack import server as server_module
+from spatialpack.server import ValidationServer, validate_pack_job
+
+
+def exchange(server: ValidationServer, data: bytes) -> list[tuple[int, dict, bytes]]:
+    """Send raw bytes on one connection; return every ``(status, headers, body)`` until it closes."""
+
+    async def run() -> bytes:
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(data)
+            await writer.drain()
+            received = await asyncio.wait_for(reader.read(), 10)
+            writer.close()
+            return received
+
+    received = asyncio.run(run())
+    responses = []
+    while received:
+        head, _, rest = received.partition(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        headers = {name.lower(): value for name, _, value in (line.partition(": ") for line in header_lines)}
+        length = int(headers["content-length"])
+        responses.append((int(status_line.split()[1]), headers, rest[:length]))
+        received = rest[length:]
+    return responses
+
+
+def request(server: ValidationServer, method: str, target: str, body: bytes = b"", **headers: str) -> tuple:
+    lines = [f"{method} {target} HTTP/1.1", "Host: test", "Connection: close", f"Content-Length: {len(body)}"]
+    lines += [f"{name.replace('_', '-')}: {value}" for name, value in headers.items()]
+    [response] = exchange(server, ("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+    return response
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = ValidationServer(tmp_path, workers=0, max_body=4096)
+    server.start_pool()
+    yield server
+    server.close()
+
+
+def test_health(server):
+    status, headers, body = request(server, "GET", "/health")
+    assert status == 200
+    assert headers["connection"] == "close"
+    assert json.loads(body)["status"] == "ok"
+
+
+def test_validate_pack(server, make_pack, manifest):
+    make_pack("packs/roads", manifest(), ASSETS)
+    status, _, body = request(server, "POST", "/validate?pack=packs/roads&verify_hashes")
+    assert status == 200
+    report = json.loads(body)
+    assert report["status"] == "pass"
+    assert report["pack_path"].endswith("roads")
+
+
+def test_validate_document(server, manifest):
+    status, _, body = request(server, "POST", "/validate?strict=1", json.dumps(manifest(bbox=[1, 0, 0, 1])).encode())
+    assert status == 200
+    report = json.loads(body)
+    assert report["status"] == "fail"
+    assert [error["rule"] for error in report["errors"]] == ["MANIFEST-004"]
+
+
+@pytest.mark.parametrize(
+    "method, target, body, expected",
+    [
+        ("GET", "/nowhere", b"", 404),
+        ("GET", "/validate", b"", 405),
+        ("POST", "/validate", b"", 400),
+        ("POST", "/validate?deep=maybe", b"{}", 400),
+        ("POST", "/validate?max_errors=-1", b"{}", 400),
+        ("POST", "/validate?pack=../..", b"", 403),
+        ("POST", "/validate?pack=missing", b"", 404),
+        ("POST", "/validate", b"x" * 5000, 413),
+    ],
+)
+def test_request_errors(server, method, target, body, expected):
+    status, headers, payload = request(server, method, target, body)
+    assert status == expected
+    assert "error" in json.loads(payload)
+    if expected == 405:
+        assert headers["allow"] == "POST"
+
+
+def test_oversized_request_line_and_headers(server):
+    [(status, headers, _)] = exchange(server, b"GET /" + b"a" * 70_000 + b" HTTP/1.1\r\n\r\n")
+    assert status == 414
+    assert headers["connection"] == "close"
+
+    [(status, _, _)] = exchange(server, b"GET /health HTTP/1.1\r\nX-Big: " + b"a" * 70_000 + b"\r\n\r\n")
+    assert status == 431
+
+
+def test_keep_alive(server):
+    responses = exchange(
+        server,
+        b"GET /health HTTP/1.1\r\n\r\n"
+        b"GET /metrics HTTP/1.1\r\nConnection: close\r\n\r\n",
+    )
+    assert [(status, headers["connection"]) for status, headers, _ in responses] == [
+        (200, "keep-alive"), (200, "close"),
+    ]
+
+
+def test_head_has_no_body(server):
+    status, headers, body = request(server, "HEAD", "/health")
+    assert status == 200
+    assert int(headers["content-length"]) > 0
+    assert body == b""
+
+
+def test_metrics(server):
+    request(server, "GET", "/health")
+    _, headers, body = request(server, "GET", "/metrics")
+    assert headers["content-type"].startswith("text/plain")
+    assert 'spatialpack_http_request_duration_seconds_count{code="200",route="/health"} 1' in body.decode()
+
+
+def test_worker_hash_caches_are_bounded(make_pack, manifest, monkeypatch):
+    monkeypatch.setattr(server_module, "HASH_CACHE_PACKS", 2)
+    monkeypatch.setattr(server_module, "_worker", {})
+    packs = [make_pack(f"pack{i}", manifest(), ASSETS) for i in range(4)]
+    for pack in packs + packs[-1:]:
+        assert validate_pack_job(str(pack), False, {"verify_hashes": True})["status"] == "pass"
+    caches = server_module._worker["hash_caches"]
+    assert len(caches) == 2
+    assert (caches.hits, caches.misses) == (1, 4)
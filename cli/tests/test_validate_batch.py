@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from conftest import ASSETS
+from spatialpack.commands.validate import _discover_packs, validate
+
+
+@pytest.fixture
+def tree(make_pack, manifest, tmp_path):
+    """Three packs under ``packs/``, one of them failing MANIFEST-004."""
+    make_pack("packs/a", manifest(pack_id="test:au:a:v1"), ASSETS)
+    make_pack("packs/nested/b", manifest(pack_id="test:au:b:v1"), ASSETS)
+    make_pack("packs/c", manifest(pack_id="test:au:c:v1", bbox=[10, 0, 5, 1]), ASSETS)
+    (tmp_path / "packs" / "notes").mkdir()
+    return tmp_path / "packs"
+
+
+def test_discover_packs(tree, monkeypatch):
+    assert _discover_packs((tree,)) == [tree / "a", tree / "c", tree / "nested" / "b"]
+    # Duplicates collapse; a spatialpack.json argument names its pack
+    assert _discover_packs((tree / "a", tree / "a" / "spatialpack.json")) == [tree / "a"]
+
+    # Missing arguments are globbed relative to the working directory
+    monkeypatch.chdir(tree)
+    assert _discover_packs((Path("[ab]"), Path("nested/*"))) == [Path("a"), Path("nested/b")]
+
+
+def test_discover_missing_path(tmp_path):
+    with pytest.raises(Exception, match="does not exist"):
+        _discover_packs((tmp_path / "missing",))
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_batch_report(tree, tmp_path, jobs):
+    output = tmp_path / "report.json"
+    result = CliRunner().invoke(validate, [str(tree), "--jobs", str(jobs), "-q", "-o", str(output)])
+    assert result.exit_code == 1, result.output
+
+    report = json.loads(output.read_text())
+    assert report["status"] == "fail"
+    assert report["summary"] == {
+        "packs": 3, "passed": 2, "warned": 0, "failed": 1,
+        "errors": 1, "warnings": 0, "layers_validated": 3,
+    }
+    assert [pack["pack_path"] for pack in report["packs"]] == [
+        str(tree / "a"), str(tree / "c"), str(tree / "nested" / "b"),
+    ]
+    # One run id across the batch, whichever process validated the pack
+    assert {pack["run_id"] for pack in report["packs"]} == {report["run_id"]}
+    [failed] = [pack for pack in report["packs"] if pack["status"] == "fail"]
+    assert failed["errors"][0]["rule"] == "MANIFEST-004"
+
+    timings = report["timings"]
+    assert timings["jobs"] == jobs
+    assert timings["rules"]["_validate_bbox"]["calls"] == 3
+
+
+def test_batch_passes(make_pack, manifest, tmp_path):
+    make_pack("packs/a", manifest(pack_id="test:au:a:v1"), ASSETS)
+    make_pack("packs/b", manifest(pack_id="test:au:b:v1"), ASSETS)
+    result = CliRunner().invoke(validate, [str(tmp_path / "packs"), "-j", "0", "-q"])
+    assert result.exit_code == 0, result.output
+
+
+def test_no_packs(tmp_path):
+    (tmp_path / "empty").mkdir()
+    (tmp_path / "other").mkdir()
+    result = CliRunner().invoke(validate, [str(tmp_path / "empty"), str(tmp_path / "other")])
+    assert result.exit_code == 1
+    assert "No packs found" in result.output
@@ -0,0 +1,117 @@
+import json
+
+import pytest
+
+from conftest import ASSETS
+from spatialpack.integrity import HashCache
+from spatialpack.validators.manifest import ManifestValidator
+from spatialpack.watch import EVERYTHING, InotifyWatcher, PollingWatcher, WatchError, watch_pack
+
+
+def touch_tree(pack):
+    (pack / "layers" / "roads.parquet").write_bytes(b"changed")
+    (pack / "layers" / "new").mkdir()
+    (pack / "layers" / "new" / "rivers.parquet").write_bytes(b"rivers")
+    (pack / ".spatialpack").mkdir(exist_ok=True)
+    (pack / ".spatialpack" / "cache.json").write_text("{}")
+
+
+def collect(watcher, rounds=5) -> set[str]:
+    changed = set()
+    for _ in range(rounds):
+        changed |= watcher.read(0.05)
+    return changed
+
+
+def test_polling_watcher(make_pack, manifest):
+    pack = make_pack("pack", manifest(), ASSETS)
+    watcher = PollingWatcher(pack, interval=0.01)
+    touch_tree(pack)
+    assert collect(watcher) == {"layers/roads.parquet", "layers/new", "layers/new/rivers.parquet"}
+    (pack / "layers" / "roads.parquet").unlink()
+    assert collect(watcher) == {"layers/roads.parquet"}
+
+
+def test_inotify_watcher(make_pack, manifest):
+    pack = make_pack("pack", manifest(), ASSETS)
+    try:
+        watcher = InotifyWatcher(pack)
+    except WatchError as e:
+        pytest.skip(str(e))
+    try:
+        touch_tree(pack)
+        changed = collect(watcher)
+        # Files created in a new directory are seen once it is watched
+        (pack / "layers" / "new" / "lakes.parquet").write_bytes(b"lakes")
+        changed |= collect(watcher)
+    finally:
+        watcher.close()
+    assert changed == {
+        "layers/roads.parquet", "layers/new", "layers/new/rivers.parquet", "layers/new/lakes.parquet",
+    }
+
+
+class ScriptedWatcher:
+    name = "scripted"
+
+    def __init__(self, *reads: set[str]):
+        self.reads = list(reads)
+        self.closed = False
+
+    def read(self, timeout):
+        return self.reads.pop(0) if self.reads else set()
+
+    def close(self):
+        self.closed = True
+
+
+def test_watch_pack_debounces_bursts():
+    watcher = ScriptedWatcher(set(), {"a"}, {"b"}, set(), {"c"}, {EVERYTHING, "d"}, set())
+    bursts = watch_pack(watcher, debounce=0.01)
+    assert next(bursts) == {"a", "b"}
+    assert next(bursts) == {EVERYTHING}
+    bursts.close()
+    assert watcher.closed
+
+
+@pytest.fixture
+def validator(make_pack, manifest):
+    layers = [
+        {"id": "roads", "type": "vector", "title": "Roads", "parquet": "./layers/roads.parquet"},
+        {"id": "rivers", "type": "vector", "title": "Rivers", "parquet": "./layers/rivers/*.parquet"},
+    ]
+    files = {**ASSETS, "layers/rivers/a.parquet": b"a"}
+    pack = make_pack("pack", manifest(layers=layers), files)
+    return ManifestValidator(pack, verify_hashes=True, hash_cache=HashCache.for_pack(pack))
+
+
+def test_incremental_reruns_only_affected_units(validator):
+    pack = validator.pack_path
+    first = validator.validate_incremental()
+    assert first["rerun"] == ["manifest", "layers[0] (roads)", "layers[1] (rivers)", "structure", "integrity"]
+    assert first["errors"] == []
+
+    (pack / "layers" / "roads.parquet").write_bytes(b"tampered")
+    result = validator.validate_incremental({"layers/roads.parquet"})
+    assert result["rerun"] == ["layers[0] (roads)", "integrity"]
+    assert [error["rule"] for error in result["errors"]] == ["INTEGRITY-002"]
+
+    assert validator.validate_incremental({"layers/rivers/b.parquet"})["rerun"] == ["layers[1] (rivers)"]
+    assert validator.validate_incremental({"layers"})["rerun"] == [
+        "layers[0] (roads)", "layers[1] (rivers)", "structure",
+    ]
+    assert validator.validate_incremental({"notes.txt"})["rerun"] == []
+
+    # Results of units that were not re-run are kept
+    (pack / "layers" / "roads.parquet").write_bytes(ASSETS["layers/roads.parquet"])
+    assert validator.validate_incremental({"layers/roads.parquet"})["errors"] == []
+
+
+def test_manifest_change_reruns_everything(validator):
+    pack = validator.pack_path
+    validator.validate_incremental()
+    manifest = json.loads((pack / "spatialpack.json").read_text())
+    (pack / "spatialpack.json").write_text(json.dumps({**manifest, "bbox": [1, 0, 0, 1]}))
+    result = validator.validate_incremental({"spatialpack.json"})
+    assert len(result["rerun"]) == 5
+    assert [error["rule"] for error in result["errors"]] == ["MANIFEST-004"]
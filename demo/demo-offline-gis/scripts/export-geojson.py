@@ -4,19 +4,26 @@ Export asset data from DuckDB to GeoJSON format for frontend consumption.
 
 Usage:
     python scripts/export-geojson.py
+    python scripts/export-geojson.py --format geojsonseq [--output path]
 
 This script:
 1. Connects to demo.duckdb database
-2. Queries all assets
-3. Converts to GeoJSON FeatureCollection
-4. Writes to data/assets.geojson
+2. Streams assets (in table order) as Arrow record batches, with each
+   Feature serialised to JSON inside DuckDB
+3. Writes features incrementally as a compact FeatureCollection
+   (data/assets.geojson) or newline-delimited GeoJSONSeq
+4. Verifies the output by reading only its first and last bytes
+
+Memory use and time-to-first-byte stay flat as the asset table grows: no
+DataFrame, Python dict or whole-file string is ever built.
 """
 
+import argparse
 import json
+import os
 import sys
 import duckdb
 from pathlib import Path
-from datetime import date
 
 # Paths
 SCRIPT_DIR = Path(__file__).parent
@@ -24,8 +31,113 @@ PROJECT_ROOT = SCRIPT_DIR.parent
 DATA_DIR = PROJECT_ROOT / "data"
 DB_FILE = DATA_DIR / "demo.duckdb"
 GEOJSON_FILE = DATA_DIR / "assets.geojson"
+GEOJSONSEQ_FILE = DATA_DIR / "assets.geojsonseq"
+
+# Rows per Arrow record batch pulled from DuckDB
+BATCH_ROWS = 50_000
+
+# Bytes read from each end of the file during verification
+VERIFY_BYTES = 64 * 1024
+
+# One compact GeoJSON Feature per row, built by DuckDB's JSON extension
+FEATURE_SQL = """
+    SELECT json_object(
+        'type', 'Feature',
+        'id', id,
+        'geometry', json_object('type', 'Point', 'coordinates', json_array(lon, lat)),
+        'properties', json_object(
+            'id', id,
+            'name', name,
+            'type', type,
+            'status', status,
+            'description', description,
+            'last_inspection', CAST(last_inspection AS VARCHAR),
+            'capacity', capacity,
+            'region', region
+        )
+    )::VARCHAR AS feature
+    FROM assets
+"""
+
+
+def iter_feature_batches(con, sort_by_id=False):
+    """Yield lists of feature JSON strings, one Arrow record batch at a time.
+
+    Rows stream in table (insertion) order. Sorting by id forces DuckDB to
+    materialise the whole result before the first batch, so it is opt-in.
+    """
+    result = con.execute(FEATURE_SQL + ("ORDER BY id" if sort_by_id else ""))
+    try:
+        # DuckDB >= 1.4 names this to_arrow_reader; older releases fetch_record_batch
+        to_reader = getattr(result, "to_arrow_reader", None) or result.fetch_record_batch
+        reader = to_reader(BATCH_ROWS)
+    except ImportError:
+        # pyarrow not installed: fall back to row batches
+        while rows := result.fetchmany(BATCH_ROWS):
+            yield [row[0] for row in rows]
+        return
+    for batch in reader:
+        yield batch.column(0).to_pylist()
+
+
+def write_features(con, output, fmt, sort_by_id=False):
+    """Stream features to output; returns the number written."""
+    count = 0
+    with open(output, 'w', encoding='utf-8', newline='\n') as f:
+        if fmt == "geojson":
+            f.write('{"type":"FeatureCollection","features":[\n')
+        for features in iter_feature_batches(con, sort_by_id):
+            if fmt == "geojson":
+                f.write((",\n" if count else "") + ",\n".join(features))
+            else:
+                f.write("\n".join(features) + "\n")
+            count += len(features)
+        if fmt == "geojson":
+            f.write('\n]}\n')
+    return count
+
+
+def verify_output(output, fmt, expected_count):
+    """Check structure using only the head and tail of the file."""
+    size = output.stat().st_size
+    with open(output, 'rb') as f:
+        head = f.read(VERIFY_BYTES)
+        f.seek(max(0, size - VERIFY_BYTES))
+        tail = f.read()
+
+    if expected_count == 0:
+        if fmt == "geojson":
+            assert json.loads(head)["features"] == [], "Expected empty FeatureCollection"
+        return None
+
+    lines = head.split(b"\n")
+    if fmt == "geojson":
+        assert lines[0].startswith(b'{"type":"FeatureCollection"'), "Not a FeatureCollection"
+        assert tail.rstrip().endswith(b"]}"), "FeatureCollection not closed"
+        first_line, last_line = lines[1], tail.rstrip().split(b"\n")[-2]
+    else:
+        first_line, last_line = lines[0], tail.rstrip().split(b"\n")[-1]
+
+    first = json.loads(first_line.rstrip(b","))
+    last = json.loads(last_line.rstrip(b","))
+    for feature in (first, last):
+        assert feature['type'] == 'Feature', "Invalid feature type"
+        assert 'geometry' in feature, "Missing geometry"
+        assert feature['geometry']['type'] == 'Point', "Invalid geometry type"
+        assert 'properties' in feature, "Missing properties"
+    return first
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Export assets from DuckDB to GeoJSON")
+    parser.add_argument("--format", choices=["geojson", "geojsonseq"], default="geojson",
+                        help="FeatureCollection (default) or newline-delimited GeoJSONSeq")
+    parser.add_argument("--output", type=Path, help="Output file (default: data/assets.geojson[seq])")
+    parser.add_argument("--sort-by-id", action="store_true",
+                        help="Order features by id (buffers the full result in DuckDB)")
+    args = parser.parse_args()
+    output = args.output or (GEOJSON_FILE if args.format == "geojson" else GEOJSONSEQ_FILE)
+
     print("=" * 60)
     print("DuckDB to GeoJSON Exporter")
     print("=" * 60)
@@ -46,91 +158,29 @@ def main():
         print(f"   [ERROR] Failed to connect: {e}")
         sys.exit(1)
 
-    # Query assets
-    print("\n2. Querying assets...")
-    try:
-        assets_df = con.execute("""
-            SELECT
-                id, name, type, status, lat, lon,
-                description, last_inspection, capacity, region
-            FROM assets
-            ORDER BY id
-        """).fetchdf()
-        print(f"   [OK] Retrieved {len(assets_df)} assets")
-    except Exception as e:
-        print(f"   [ERROR] Query failed: {e}")
-        sys.exit(1)
-
-    # Convert to GeoJSON
-    print("\n3. Converting to GeoJSON...")
-    try:
-        features = []
-        for _, row in assets_df.iterrows():
-            # Convert date to string if not None
-            last_inspection = None
-            if pd.notna(row['last_inspection']):
-                last_inspection = str(row['last_inspection'])
-
-            feature = {
-                "type": "Feature",
-                "id": int(row['id']),
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [float(row['lon']), float(row['lat'])]
-                },
-                "properties": {
-                    "id": int(row['id']),
-                    "name": str(row['name']),
-                    "type": str(row['type']),
-                    "status": str(row['status']),
-                    "description": str(row['description']) if pd.notna(row['description']) else None,
-                    "last_inspection": last_inspection,
-                    "capacity": str(row['capacity']) if pd.notna(row['capacity']) else None,
-                    "region": str(row['region']) if pd.notna(row['region']) else None
-                }
-            }
-            features.append(feature)
-
-        geojson = {
-            "type": "FeatureCollection",
-            "features": features
-        }
-        print(f"   [OK] Created FeatureCollection with {len(features)} features")
-    except Exception as e:
-        print(f"   [ERROR] Conversion failed: {e}")
-        sys.exit(1)
-
-    # Write GeoJSON
-    print(f"\n4. Writing GeoJSON: {GEOJSON_FILE}")
+    # Stream features to disk
+    print(f"\n2. Streaming {args.format} to: {output}")
+    tmp_output = output.with_name(output.name + ".tmp")
     try:
-        with open(GEOJSON_FILE, 'w', encoding='utf-8') as f:
-            json.dump(geojson, f, indent=2, ensure_ascii=False)
+        count = write_features(con, tmp_output, args.format, args.sort_by_id)
+        os.replace(tmp_output, output)
 
         # Get file size
-        file_size = GEOJSON_FILE.stat().st_size
+        file_size = output.stat().st_size
         size_kb = file_size / 1024
-        print(f"   [OK] Written {size_kb:.1f} KB")
+        print(f"   [OK] Written {count} features, {size_kb:.1f} KB")
     except Exception as e:
-        print(f"   [ERROR] Failed to write file: {e}")
+        print(f"   [ERROR] Export failed: {e}")
+        if tmp_output.exists():
+            os.remove(tmp_output)
         sys.exit(1)
 
-    # Verify GeoJSON
-    print("\n5. Verifying GeoJSON...")
+    # Verify output (bounded read of head and tail)
+    print("\n3. Verifying output...")
     try:
-        with open(GEOJSON_FILE, 'r') as f:
-            verify = json.load(f)
-
-        assert verify['type'] == 'FeatureCollection', "Not a FeatureCollection"
-        assert len(verify['features']) == len(features), "Feature count mismatch"
-
-        # Check first feature structure
-        if verify['features']:
-            first = verify['features'][0]
-            assert first['type'] == 'Feature', "Invalid feature type"
-            assert 'geometry' in first, "Missing geometry"
-            assert first['geometry']['type'] == 'Point', "Invalid geometry type"
-            assert 'properties' in first, "Missing properties"
-            print(f"   [OK] Valid GeoJSON structure")
+        first = verify_output(output, args.format, count)
+        print(f"   [OK] Valid {args.format} structure")
+        if first:
             print(f"   Sample feature: {first['properties']['name']} ({first['properties']['type']})")
     except Exception as e:
         print(f"   [WARNING] Warning: Verification failed: {e}")
@@ -140,13 +190,11 @@ def main():
 
     print("\n" + "=" * 60)
     print("[OK] GeoJSON export complete!")
-    print(f"Location: {GEOJSON_FILE}")
-    print(f"Features: {len(features)}")
+    print(f"Location: {output}")
+    print(f"Features: {count}")
     print("\nThe assets.geojson file can now be loaded by the frontend")
     print("=" * 60)
 
-# Import pandas
-import pandas as pd
 
 if __name__ == "__main__":
     main()
@@ -4,18 +4,24 @@ Load asset data from CSV into DuckDB database with spatial extension.
 
 Usage:
     python scripts/load-assets.py
+    python scripts/load-assets.py --streaming [--csv path/to/assets.csv]
 
 This script:
 1. Reads assets.csv from data/ directory
 2. Validates data (coordinates, status, type)
 3. Creates/recreates demo.duckdb database
 4. Loads data with spatial geometry
+
+With --streaming, DuckDB reads the CSV directly (no pandas DataFrame):
+validation runs as a single pass of SQL aggregates and rows are inserted
+with their geometry in one INSERT, so memory stays bounded for
+million-row asset registers.
 """
 
+import argparse
 import os
 import sys
 import duckdb
-import pandas as pd
 from pathlib import Path
 
 # Paths
@@ -29,14 +35,21 @@ SEED_SQL = DATA_DIR / "seed.sql"
 # Validation constants
 VALID_STATUSES = {'OK', 'Watch', 'Alert', 'Critical'}
 VALID_TYPES = {'Substation', 'Depot', 'Yard', 'Tower', 'Switchyard'}
+REQUIRED_COLUMNS = ['id', 'name', 'type', 'status', 'lat', 'lon']
+INSERT_COLUMNS = ['id', 'name', 'type', 'status', 'lat', 'lon', 'description', 'last_inspection', 'capacity', 'region']
+
+# Column types for read_csv, so large files are not re-sniffed into wrong types
+CSV_TYPES = {'id': 'INTEGER', 'lat': 'DOUBLE', 'lon': 'DOUBLE', 'last_inspection': 'DATE'}
+
+# Maximum offending ids listed per validation error
+MAX_EXAMPLES = 10
 
 def validate_assets(df):
     """Validate asset data before loading."""
     errors = []
 
     # Check required columns
-    required_cols = ['id', 'name', 'type', 'status', 'lat', 'lon']
-    missing_cols = set(required_cols) - set(df.columns)
+    missing_cols = set(REQUIRED_COLUMNS) - set(df.columns)
     if missing_cols:
         errors.append(f"Missing required columns: {missing_cols}")
         return errors
@@ -69,7 +82,209 @@ def validate_assets(df):
 
     return errors
 
+def csv_source(csv_file):
+    """SQL table expression reading the CSV with DuckDB."""
+    path = str(csv_file).replace("'", "''")
+    types = ", ".join(f"'{col}': '{typ}'" for col, typ in CSV_TYPES.items())
+    return f"read_csv('{path}', header = true, types = {{{types}}})"
+
+
+def validate_assets_sql(con, source):
+    """Validate asset data with one pass of SQL aggregates.
+
+    Mirrors validate_assets() for any DuckDB relation (a read_csv() source
+    or the loaded assets table): counts and a bounded sample of offending
+    ids are computed in a single scan without materialising rows in Python.
+    """
+    errors = []
+
+    # Check required columns (schema only, no scan)
+    columns = {row[0] for row in con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()}
+    missing_cols = set(REQUIRED_COLUMNS) - columns
+    if missing_cols:
+        errors.append(f"Missing required columns: {missing_cols}")
+        return errors
+
+    statuses = ", ".join(f"'{s}'" for s in sorted(VALID_STATUSES))
+    types = ", ".join(f"'{t}'" for t in sorted(VALID_TYPES))
+    checks = [
+        ("Invalid latitudes (must be -90 to 90)", "lat < -90 OR lat > 90 OR lat IS NULL"),
+        ("Invalid longitudes (must be -180 to 180)", "lon < -180 OR lon > 180 OR lon IS NULL"),
+        (f"Invalid status values (valid: {VALID_STATUSES})", f"status IS NULL OR status NOT IN ({statuses})"),
+        (f"Invalid type values (valid: {VALID_TYPES})", f"type IS NULL OR type NOT IN ({types})"),
+    ]
+    aggregates = ",\n".join(
+        f"count(*) FILTER (WHERE {cond}), min(id) FILTER (WHERE {cond})"
+        for _, cond in checks
+    )
+    row = con.execute(f"""
+        SELECT count(*) - count(DISTINCT id), {aggregates}
+        FROM {source}
+    """).fetchone()
+
+    if row[0]:
+        dup_ids = [r[0] for r in con.execute(f"""
+            SELECT id FROM {source} GROUP BY id HAVING count(*) > 1 ORDER BY id LIMIT {MAX_EXAMPLES}
+        """).fetchall()]
+        errors.append(f"Duplicate IDs found: {dup_ids}")
+
+    for i, (message, _) in enumerate(checks):
+        count, first_id = row[1 + 2 * i], row[2 + 2 * i]
+        if count:
+            errors.append(f"{message}: {count} records, first id {first_id}")
+
+    return errors
+
+
+def create_schema(con):
+    """Create the assets table from seed.sql (or inline fallback)."""
+    if SEED_SQL.exists():
+        print(f"   - Executing schema from: {SEED_SQL}")
+        with open(SEED_SQL, 'r') as f:
+            con.execute(f.read())
+    else:
+        # Fallback: inline schema
+        print("   - Creating schema inline")
+        con.execute("INSTALL spatial")
+        con.execute("LOAD spatial")
+        con.execute("""
+            CREATE TABLE IF NOT EXISTS assets (
+                id INTEGER PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                type VARCHAR(50) NOT NULL,
+                status VARCHAR(20) NOT NULL,
+                lat DOUBLE NOT NULL,
+                lon DOUBLE NOT NULL,
+                description TEXT,
+                last_inspection DATE,
+                capacity VARCHAR(50),
+                region VARCHAR(100),
+                geom GEOMETRY
+            )
+        """)
+
+
+def verify_data(con, row_count):
+    """Print status/type distributions and geometry coverage."""
+    status_counts = con.execute("""
+        SELECT status, COUNT(*) as count
+        FROM assets
+        GROUP BY status
+        ORDER BY status
+    """).fetchall()
+    print("   Status distribution:")
+    for status, count in status_counts:
+        print(f"     - {status}: {count}")
+
+    type_counts = con.execute("""
+        SELECT type, COUNT(*) as count
+        FROM assets
+        GROUP BY type
+        ORDER BY count DESC
+    """).fetchall()
+    print("   Type distribution:")
+    for asset_type, count in type_counts:
+        print(f"     - {asset_type}: {count}")
+
+    geom_count = con.execute("SELECT COUNT(*) FROM assets WHERE geom IS NOT NULL").fetchone()[0]
+    print(f"   Geometry: {geom_count}/{row_count} records have valid geometry")
+
+    if geom_count == row_count:
+        print("   [OK] All records have geometry")
+    else:
+        print(f"   [WARNING] Warning: {row_count - geom_count} records missing geometry")
+
+
+def main_streaming(csv_file):
+    """Single-pass, bounded-memory load of the CSV through DuckDB.
+
+    Rows are streamed from read_csv() straight into the assets table with
+    their geometry, then validated with SQL aggregates over the loaded
+    columns. The database is built under a temporary name and only replaces
+    demo.duckdb once validation passes.
+    """
+    print("=" * 60)
+    print("DuckDB Asset Data Loader (streaming)")
+    print("=" * 60)
+
+    if not csv_file.exists():
+        print(f"ERROR: CSV file not found: {csv_file}")
+        print(f"Please create {csv_file} with asset data")
+        sys.exit(1)
+
+    source = csv_source(csv_file)
+    tmp_db = DB_FILE.with_name(DB_FILE.name + ".tmp")
+    if tmp_db.exists():
+        os.remove(tmp_db)
+
+    def fail(con, errors):
+        print("   [ERROR] Validation failed:")
+        for error in errors:
+            print(f"     - {error}")
+        con.close()
+        os.remove(tmp_db)
+        sys.exit(1)
+
+    print(f"\n1. Initializing DuckDB: {tmp_db}")
+    try:
+        con = duckdb.connect(str(tmp_db))
+        create_schema(con)
+        print("   [OK] Schema created")
+    except Exception as e:
+        print(f"   [ERROR] Failed to initialize database: {e}")
+        sys.exit(1)
+
+    # Stream rows with geometry in the same INSERT (no second UPDATE pass)
+    print(f"\n2. Streaming CSV into assets: {csv_file}")
+    try:
+        columns = {row[0] for row in con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()}
+        missing_cols = set(REQUIRED_COLUMNS) - columns
+        if missing_cols:
+            fail(con, [f"Missing required columns: {missing_cols}"])
+        select_cols = ", ".join(col if col in columns else f"NULL AS {col}" for col in INSERT_COLUMNS)
+        con.execute(f"""
+            INSERT INTO assets ({", ".join(INSERT_COLUMNS)}, geom)
+            SELECT {select_cols}, ST_Point(lon, lat) FROM {source}
+        """)
+        row_count = con.execute("SELECT COUNT(*) FROM assets").fetchone()[0]
+        print(f"   [OK] Inserted {row_count} records")
+    except duckdb.ConstraintException:
+        # Duplicate ids or NULLs in required columns: diagnose from the CSV
+        print("   [ERROR] Constraint violated while loading")
+        fail(con, validate_assets_sql(con, source))
+    except Exception as e:
+        print(f"   [ERROR] Failed to insert data: {e}")
+        con.close()
+        os.remove(tmp_db)
+        sys.exit(1)
+
+    # Validate loaded columns in one aggregate pass
+    print("\n3. Validating data...")
+    errors = validate_assets_sql(con, "assets")
+    if errors:
+        fail(con, errors)
+    print("   [OK] Validation passed")
+
+    print("\n4. Verifying data...")
+    try:
+        verify_data(con, row_count)
+    except Exception as e:
+        print(f"   [ERROR] Verification failed: {e}")
+
+    con.close()
+    os.replace(tmp_db, DB_FILE)
+
+    print("\n" + "=" * 60)
+    print("[OK] Database created successfully!")
+    print(f"Location: {DB_FILE}")
+    print(f"Records: {row_count}")
+    print("\nNext step: Run 'python scripts/export-geojson.py' to generate GeoJSON")
+    print("=" * 60)
+
+
 def main():
+    import pandas as pd
+
     print("=" * 60)
     print("DuckDB Asset Data Loader")
     print("=" * 60)
@@ -111,32 +326,7 @@ def main():
     try:
         con = duckdb.connect(str(DB_FILE))
 
-        # Run seed SQL
-        if SEED_SQL.exists():
-            print(f"   - Executing schema from: {SEED_SQL}")
-            with open(SEED_SQL, 'r') as f:
-                sql = f.read()
-                con.execute(sql)
-        else:
-            # Fallback: inline schema
-            print("   - Creating schema inline")
-            con.execute("INSTALL spatial")
-            con.execute("LOAD spatial")
-            con.execute("""
-                CREATE TABLE IF NOT EXISTS assets (
-                    id INTEGER PRIMARY KEY,
-                    name VARCHAR(255) NOT NULL,
-                    type VARCHAR(50) NOT NULL,
-                    status VARCHAR(20) NOT NULL,
-                    lat DOUBLE NOT NULL,
-                    lon DOUBLE NOT NULL,
-                    description TEXT,
-                    last_inspection DATE,
-                    capacity VARCHAR(50),
-                    region VARCHAR(100),
-                    geom GEOMETRY
-                )
-            """)
+        create_schema(con)
         print("   [OK] Schema created")
     except Exception as e:
         print(f"   [ERROR] Failed to initialize database: {e}")
@@ -163,36 +353,7 @@ def main():
     # Verify data
     print("\n6. Verifying data...")
     try:
-        # Count by status
-        status_counts = con.execute("""
-            SELECT status, COUNT(*) as count
-            FROM assets
-            GROUP BY status
-            ORDER BY status
-        """).fetchdf()
-        print("   Status distribution:")
-        for _, row in status_counts.iterrows():
-            print(f"     - {row['status']}: {row['count']}")
-
-        # Count by type
-        type_counts = con.execute("""
-            SELECT type, COUNT(*) as count
-            FROM assets
-            GROUP BY type
-            ORDER BY count DESC
-        """).fetchdf()
-        print("   Type distribution:")
-        for _, row in type_counts.iterrows():
-            print(f"     - {row['type']}: {row['count']}")
-
-        # Check geometry
-        geom_count = con.execute("SELECT COUNT(*) FROM assets WHERE geom IS NOT NULL").fetchone()[0]
-        print(f"   Geometry: {geom_count}/{row_count} records have valid geometry")
-
-        if geom_count == row_count:
-            print("   [OK] All records have geometry")
-        else:
-            print(f"   [WARNING] Warning: {row_count - geom_count} records missing geometry")
+        verify_data(con, row_count)
     except Exception as e:
         print(f"   [ERROR] Verification failed: {e}")
 
@@ -207,4 +368,14 @@ def main():
     print("=" * 60)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Load asset CSV into DuckDB")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Validate and load with DuckDB read_csv in a single pass (bounded memory)")
+    parser.add_argument("--csv", type=Path, default=CSV_FILE,
+                        help="CSV file to load with --streaming (default: data/assets.csv)")
+    args = parser.parse_args()
+
+    if args.streaming:
+        main_streaming(args.csv)
+    else:
+        main()